@@ -0,0 +1,84 @@
+"""
+Disponibilidade de agenda: uma chamada por período x uma chamada por dia
+
+Os casos de borda do cálculo ficam em tests/test_availability.py.
+
+Cenários (SQLite em memória, via app Flask), com e sem o cache de ocupação:
+- por dia: calendário de N clínicas x D dias com GET /available-times por dia/clínica
+- período: o mesmo calendário com um único GET /availability (lista e bitset)
+
+Uso:
+    python -m benchmarks.bench_availability --clinics 5 --days 30
+"""
+import argparse
+from datetime import date, timedelta
+
+from benchmarks.common import create_sqlite_engine, measure, print_table, seed
+from src.config import database
+from src.main import app
+from src.utils.availability import clinic_cache, occupancy_cache
+
+HOURS = {
+    'intervalo': 30,
+    'segunda': ['08:00-12:00', '14:00-18:00'],
+    'terca': ['08:00-12:00', '14:00-18:00'],
+    'quarta': ['08:00-12:00', '14:00-18:00'],
+    'quinta': ['08:00-12:00', '14:00-18:00'],
+    'sexta': ['08:00-12:00', '14:00-18:00'],
+    'sábado': ['08:00-12:00'],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clinics', type=int, default=5)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--iterations', type=int, default=30)
+    args = parser.parse_args()
+
+    engine = create_sqlite_engine()
+    data = seed(engine, tutors=20, clinics=args.clinics, animals_per_tutor=5, appointments_per_animal=4)
+    for clinic in data['clinics']:
+        engine.table('usuarios_clinicas').update({'horario_funcionamento': HOURS}).eq('id', clinic['id']).execute()
+    database.set_engine(engine)
+    client = app.test_client()
+
+    emails = [c['email'] for c in data['clinics']]
+    start = date.today() + timedelta(days=1)
+    days = [(start + timedelta(days=i)).isoformat() for i in range(args.days)]
+
+    def per_day():
+        for email in emails:
+            for day in days:
+                client.get(f'/api/appointments/available-times?email_clinica={email}&data={day}')
+
+    def ranged(formato):
+        url = f'/api/appointments/availability?clinicas={",".join(emails)}&inicio={start.isoformat()}&dias={args.days}&formato={formato}'
+
+        return lambda: client.get(url)
+
+    rows = []
+    ttl = occupancy_cache.ttl
+    for cached in (False, True):
+        for cache in (occupancy_cache, clinic_cache):
+            cache.ttl = ttl if cached else 0
+            cache.clear()
+        suffix = 'com cache' if cached else 'sem cache'
+        for label, fn, requests in [
+            (f'por dia ({len(emails)} x {args.days} req.), {suffix}', per_day, len(emails) * args.days),
+            (f'período, lista (1 req.), {suffix}', ranged('lista'), 1),
+            (f'período, bitset (1 req.), {suffix}', ranged('bitset'), 1),
+        ]:
+            result = measure(fn, iterations=args.iterations, warmup=2)
+            rows.append({'cenário': label, 'requisições': requests, **result})
+    print_table(f'Calendário de {args.clinics} clínicas x {args.days} dias (ms)', rows,
+                ['cenário', 'requisições', 'mean', 'p50', 'p95', 'p99'])
+
+    print(f"\nCache de ocupação: {occupancy_cache.stats()}")
+
+    sizes = [{'formato': f, 'bytes': len(ranged(f)().data)} for f in ('lista', 'bitset')]
+    print_table('Tamanho da resposta do período', sizes, ['formato', 'bytes'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""
+Painel da clínica (GET /api/clinics/me/stats): agregação no banco x contagem no navegador
+
+Mede, com o Supabase falso a ``--latency`` ms por chamada e ``--appointments``
+agendamentos por clínica (os casos de borda ficam em tests/test_clinic_stats.py):
+- o painel de um mês pela rota (tempo e bytes da resposta)
+- as listas do Dashboard (pendentes a partir de hoje, aceitos de hoje e atividade recente),
+  filtradas no servidor
+- o que o Dashboard fazia: todas as páginas de /api/appointments/ para contar no navegador
+
+Uso:
+    python -m benchmarks.bench_clinic_stats --appointments 100000 --latency 5
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from benchmarks.common import SENHA_HASH, create_sqlite_engine, measure, print_table
+from benchmarks.fake_supabase import FakeSupabase, install
+from src.main import app
+from src.utils.availability import APPOINTMENT_STATUSES
+from src.utils.auth import generate_token
+
+SLOTS_PER_DAY = 20
+
+
+def auth(user_id: str, user_type: str) -> dict:
+    with app.app_context():
+        return {'Authorization': f'Bearer {generate_token(user_id, user_type)}'}
+
+
+def stats(client, headers: dict, **params):
+    query = '&'.join(f'{k}={v}' for k, v in params.items())
+    return client.get(f'/api/clinics/me/stats?{query}', headers=headers)
+
+
+def expected(rows: list, consultations: list, start: date, end: date, today: date) -> dict:
+    """
+    Os mesmos números contados em Python sobre todas as linhas da clínica
+    """
+    period = [r for r in rows if start.isoformat() <= r['data_agendamento'] <= end.isoformat()]
+    per_day = Counter((r['data_agendamento'], r['status']) for r in period)
+    with_consultation = {c['agendamento_id'] for c in consultations}
+    in_period = [c for c in consultations if start.isoformat() <= c['data_consulta'][:10] <= end.isoformat()]
+    consultations_revenue = sum(c['valor'] or 0 for c in in_period)
+    done = [r for r in period if r['status'] == 'concluido']
+    return {
+        'status': {s: sum(1 for r in period if r['status'] == s) for s in APPOINTMENT_STATUSES},
+        'per_day': per_day,
+        'pacientes': len({r['animal_id'] for r in period if r['status'] not in ('cancelado', 'recusado')}),
+        'pendentes': sum(1 for r in rows if r['status'] == 'pendente' and r['data_agendamento'] >= today.isoformat()),
+        'nao_comparecimento': sum(1 for r in period if r['status'] == 'aceito'
+                                  and r['data_agendamento'] < today.isoformat()),
+        'receita_agendamentos': sum(r['valor'] or 0 for r in done),
+        'receita_total': consultations_revenue + sum(r['valor'] or 0 for r in done if r['id'] not in with_consultation),
+    }
+
+
+def populate(engine, clinics: int, appointments: int, today: date, seed_value: int = 17) -> list:
+    """
+    ``appointments`` agendamentos por clínica, SLOTS_PER_DAY por dia terminando 60 dias depois de hoje
+    """
+    rnd = random.Random(seed_value)
+    days = appointments // SLOTS_PER_DAY + 1
+    first = today + timedelta(days=60) - timedelta(days=days)
+    with engine.pool.connection() as conn:
+        conn.executemany('INSERT INTO usuarios_clinicas (id, nome_clinica, email, senha_hash) VALUES (?, ?, ?, ?)',
+                         ((f'c{i}', f'Clínica {i}', f'clinica{i}@bench.local', SENHA_HASH) for i in range(clinics)))
+        conn.execute('INSERT INTO usuarios_tutores (id, nome, email, senha_hash) VALUES (?, ?, ?, ?)',
+                     ['t0', 'Tutor', 'tutor@bench.local', SENHA_HASH])
+        conn.executemany('INSERT INTO animais (id, nome, especie, tutor_id, clinica_id) VALUES (?, ?, ?, ?, ?)',
+                         ((f'a{i}', f'Animal {i}', 'Cão', 't0', f'c{i % clinics}') for i in range(2000)))
+
+        def rows():
+            for c in range(clinics):
+                for j in range(appointments):
+                    day = first + timedelta(days=j // SLOTS_PER_DAY)
+                    slot = j % SLOTS_PER_DAY
+                    if day >= today:
+                        status = rnd.choice(['pendente', 'aceito', 'cancelado'])
+                    else:
+                        status = rnd.choices(['concluido', 'aceito', 'recusado', 'cancelado'], [80, 5, 8, 7])[0]
+                    yield (f'g{c}-{j}', 't0', f'c{c}', f'a{rnd.randrange(2000)}', day.isoformat(),
+                           f'{8 + slot // 2:02d}:{30 * (slot % 2):02d}', status, 'Consulta Geral',
+                           rnd.choice([100, 150, 200]))
+
+        conn.executemany('INSERT INTO agendamentos (id, tutor_id, clinica_id, animal_id, data_agendamento, horario, '
+                         'status, tipo_consulta, valor) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows())
+        conn.execute("INSERT INTO consultas (id, agendamento_id, animal_id, clinica_id, data_consulta, valor) "
+                     "SELECT 'k' || id, id, animal_id, clinica_id, data_agendamento || 'T' || horario || ':00+00:00', "
+                     "valor + 30 FROM agendamentos WHERE status = 'concluido' AND abs(random()) % 2 = 0")
+        conn.execute('ANALYZE')
+    return [f'c{i}' for i in range(clinics)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--appointments', type=int, default=100_000, help='agendamentos por clínica')
+    parser.add_argument('--clinics', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=5.0, help='latência do Supabase falso (ms)')
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='vetcare-painel-')
+    try:
+        engine = create_sqlite_engine(os.path.join(directory, 'painel.db'))
+        today = date.today()
+        start = time.perf_counter()
+        clinic_ids = populate(engine, args.clinics, args.appointments, today)
+        print(f'\nBase: {args.clinics} clínicas com {args.appointments} agendamentos cada '
+              f'({time.perf_counter() - start:.1f} s para gerar)')
+        fake = install(FakeSupabase(engine, latency=args.latency / 1000))
+        client = app.test_client()
+        headers = auth(clinic_ids[0], 'clinica')
+        sizes = {}
+
+        def month():
+            response = stats(client, headers)
+            assert response.status_code == 200
+            sizes['mês'] = len(response.get_data())
+
+        def year():
+            response = stats(client, headers, inicio=(today - timedelta(days=365)).isoformat(), fim=today.isoformat())
+            assert response.status_code == 200
+            sizes['ano'] = len(response.get_data())
+
+        def dashboard_lists():
+            # As três listas do Dashboard, filtradas no servidor
+            total = 0
+            for params in [{'status': 'pendente', 'inicio': today.isoformat(), 'order': 'asc', 'limit': 3},
+                           {'status': 'aceito', 'data': today.isoformat(), 'order': 'asc', 'limit': 3},
+                           {'fim': today.isoformat(), 'limit': 5}]:
+                response = client.get('/api/appointments/', query_string=params, headers=headers)
+                assert response.status_code == 200
+                total += len(response.get_data())
+            sizes['listas'] = total
+
+        def whole_list():
+            # O que o Dashboard fazia: a lista inteira para contar no navegador
+            total, cursor = 0, None
+            while True:
+                query = f'?limit=200&cursor={cursor}' if cursor else '?limit=200'
+                payload = client.get(f'/api/appointments/{query}', headers=headers).get_json()
+                total += len(json.dumps(payload))
+                cursor = payload['next_cursor']
+                if cursor is None:
+                    sizes['lista'] = total
+                    return
+
+        rows = []
+        for name, key, fn, iterations in [('painel do mês', 'mês', month, args.iterations),
+                                          ('painel de 1 ano', 'ano', year, args.iterations),
+                                          ('listas do Dashboard', 'listas', dashboard_lists, args.iterations),
+                                          ('lista inteira', 'lista', whole_list, 3)]:
+            fake.calls.clear()
+            result = measure(fn, iterations=iterations, warmup=1)
+            rows.append({'modo': name, 'p50 ms': result['p50'], 'chamadas': sum(fake.calls.values()) / (iterations + 1),
+                         'KB': sizes[key] / 1024})
+        print_table(f'Painel de uma clínica com {args.appointments} agendamentos (Supabase falso a '
+                    f'{args.latency:.0f} ms por chamada)', rows, ['modo', 'p50 ms', 'chamadas', 'KB'])
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+"""
+Gravação adiada (write-behind) do formulário de contato: POST síncrono x fila com spool
+
+Mede, com o Supabase falso a ``--latency`` ms por chamada (os casos de borda ficam em
+tests/test_contact_queue.py):
+- a latência do POST /api/contact/ síncrono e com a fila (com e sem fsync)
+- mensagens por segundo com várias threads e chamadas ao banco por mensagem
+- a duração de cada lote gravado (contact_flush_duration_seconds)
+
+Uso:
+    python -m benchmarks.bench_contact_queue --messages 400 --latency 30
+"""
+import os
+
+# Todas as requisições saem do mesmo IP
+os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+
+import argparse
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from benchmarks.common import create_sqlite_engine, measure, print_table
+from benchmarks.fake_supabase import FakeSupabase, install
+from src.main import app
+from src.routes import contact
+from src.utils.contact_queue import ContactQueue, insert_contacts
+from src.utils.metrics import contact_flush_duration, registry
+
+CRASH_EXIT = 3
+
+
+def message(i: int, **extra) -> dict:
+    return {'nome': f'Visitante {i}', 'email': f'visitante{i}@bench.local', 'telefone': '11999990000',
+            'assunto': 'Consulta', 'mensagem': f'Mensagem {i} ' + 'x' * 200, **extra}
+
+
+def record(i: int, **extra) -> dict:
+    return {'id': f'00000000-0000-0000-0000-{i:012d}', 'respondido': False,
+            'criado_em': '2026-01-01T00:00:00+00:00', **message(i), **extra}
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'tempo esgotado'
+        time.sleep(0.005)
+
+
+class Writer:
+    """
+    Grava no SQLite registrando cada lote; ``down`` simula o banco fora do ar
+    """
+
+    def __init__(self, reject=None):
+        self.batches = []
+        self.down = False
+        self.reject = reject
+        self._lock = threading.Lock()
+
+    def __call__(self, rows):
+        if self.down:
+            raise ConnectionError('banco fora do ar')
+        if self.reject and any(self.reject(row) for row in rows):
+            raise sqlite3.DataError('valor grande demais para a coluna')
+        with self._lock:
+            self.batches.append(len(rows))
+        insert_contacts(rows)
+
+
+def new_queue(directory: str, writer, **options) -> ContactQueue:
+    options = {'batch_size': 5, 'flush_interval': 0.05, 'retry_max_delay': 0.2, 'scan_interval': 3600,
+               **options}
+    return ContactQueue(directory, writer=writer, **options)
+
+
+def crash_child(directory: str):
+    """
+    Aceita 6 mensagens com o banco fora do ar e cai sem gravar nada (nem atexit)
+    """
+    writer = Writer()
+    writer.down = True
+    queue = new_queue(directory, writer, flush_interval=30, retry_max_delay=3600)
+    for i in range(100, 106):
+        queue.submit(record(i))
+    os._exit(CRASH_EXIT)
+
+
+def run_load(client, messages: int, threads: int) -> float:
+    """
+    Mensagens por segundo com ``threads`` clientes simultâneos
+    """
+    counter = iter(range(messages))
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            status = client.post('/api/contact/', json=message(10_000 + i)).status_code
+            assert status in (201, 202), status
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return messages / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=400)
+    parser.add_argument('--latency', type=float, default=30.0, help='latência do Supabase falso (ms)')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--crash-child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.crash_child:
+        crash_child(args.crash_child)
+        return
+
+    root = tempfile.mkdtemp(prefix='vetcare-contatos-')
+    try:
+        engine = create_sqlite_engine(os.path.join(root, 'bench.db'))
+        fake = install(FakeSupabase(engine))
+        spool = os.path.join(root, 'spool')
+        fake.latency = args.latency / 1000
+        client = app.test_client()
+        iterations = max(20, args.messages // 4)
+        configurations = [
+            ('síncrono', None),
+            ('fila, fsync', ContactQueue(spool, batch_size=50, flush_interval=0.2, fsync=True)),
+            ('fila, sem fsync', ContactQueue(spool, batch_size=50, flush_interval=0.2, fsync=False)),
+        ]
+        rows = []
+        for name, queue in configurations:
+            contact.contact_queue = queue or ContactQueue(spool, enabled=False)
+            registry.clear()
+            fake.calls.clear()
+            latency = measure(lambda: client.post('/api/contact/', json=message(0)), iterations=iterations, warmup=5)
+            throughput = run_load(client, args.messages, args.threads)
+            if queue is not None:
+                wait_for(lambda: queue.depth() == 0, timeout=60)
+                queue.stop()
+            sent = iterations + 5 + args.messages
+            flushes = contact_flush_duration.snapshot().get(('ok',))
+            rows.append({'modo': name, 'p50 ms': latency['p50'], 'p95 ms': latency['p95'],
+                         'msgs/s': throughput, 'banco/msg': fake.calls['contatos'] / sent,
+                         'lote ms': flushes[-2] / flushes[-1] * 1000 if flushes else ''})
+        print_table(f'POST /api/contact/ (Supabase falso a {args.latency:.0f} ms, {args.messages} mensagens, '
+                    f'{args.threads} threads)', rows, ['modo', 'p50 ms', 'p95 ms', 'msgs/s', 'banco/msg',
+                                                       'lote ms'])
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Latência por rota com cada engine de acesso a dados
+
+Engines medidas:
+- sqlite: engine direta sobre SQLite em memória (sempre disponível)
+- postgres: engine direta com pool, se DATABASE_URL estiver definida (schema.sql aplicado)
+- postgrest: cliente Supabase, se SUPABASE_URL/SUPABASE_ANON_KEY estiverem configuradas
+
+Uso:
+    python -m benchmarks.bench_engines --iterations 300
+"""
+import argparse
+import itertools
+import os
+from datetime import date, timedelta
+
+from benchmarks.common import create_sqlite_engine, measure, print_table, seed
+from src.config import database
+from src.database.engines import PostgrestEngine, SQLEngine
+from src.main import app
+from src.utils.auth import generate_token
+
+
+def available_engines():
+    engines = {'sqlite': create_sqlite_engine}
+    if os.getenv('DATABASE_URL'):
+        engines['postgres'] = lambda: SQLEngine.from_url(os.environ['DATABASE_URL'])
+    if database.supabase is not None:
+        engines['postgrest'] = lambda: PostgrestEngine(lambda: database.supabase)
+    return engines
+
+
+def bench_engine(engine, iterations: int) -> list:
+    data = seed(engine)
+    database.set_engine(engine)
+    client = app.test_client()
+
+    tutor = data['tutors'][0]
+    clinic = data['clinics'][0]
+    animal = next(a for a in data['animals'] if a['tutor_id'] == tutor['id'])
+    with app.app_context():
+        tutor_headers = {'Authorization': f'Bearer {generate_token(tutor["id"], "tutor")}'}
+        clinic_headers = {'Authorization': f'Bearer {generate_token(clinic["id"], "clinica")}'}
+
+    slots = itertools.count()
+    base_day = date.today() + timedelta(days=365)
+
+    def book():
+        slot = next(slots)
+        return client.post('/api/appointments/', headers=tutor_headers, json={
+            'animal_id': animal['id'],
+            'email_clinica': clinic['email'],
+            'data_agendamento': (base_day + timedelta(days=slot // 16)).isoformat(),
+            'horario': f'{8 + (slot % 16) // 2:02d}:{30 * (slot % 2):02d}',
+        })
+
+    routes = {
+        'GET /api/animals/ (tutor)': lambda: client.get('/api/animals/', headers=tutor_headers),
+        'GET /api/animals/ (clinica)': lambda: client.get('/api/animals/', headers=clinic_headers),
+        'GET /api/animals/<id>': lambda: client.get(f'/api/animals/{animal["id"]}'),
+        'GET /api/appointments/ (tutor)': lambda: client.get('/api/appointments/', headers=tutor_headers),
+        'GET /api/appointments/ (clinica)': lambda: client.get('/api/appointments/', headers=clinic_headers),
+        'GET /api/appointments/available-times': lambda: client.get(
+            '/api/appointments/available-times',
+            query_string={'email_clinica': clinic['email'], 'data': date.today().isoformat()},
+        ),
+        'POST /api/appointments/': book,
+    }
+
+    results = []
+    for name, call in routes.items():
+        status = call().status_code
+        results.append({'rota': name, 'status': status, **measure(call, iterations=iterations)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    for name, factory in available_engines().items():
+        results = bench_engine(factory(), args.iterations)
+        print_table(f'Engine: {name} (ms)', results, ['rota', 'status', 'mean', 'p50', 'p95', 'p99'])
+
+
+if __name__ == '__main__':
+    main()
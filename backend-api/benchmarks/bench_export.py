@@ -0,0 +1,144 @@
+"""
+Exportação do histórico da clínica em streaming (NDJSON e CSV)
+
+Popula um histórico grande de agendamentos (1 milhão por padrão) de uma clínica e mede,
+para cada formato (os casos de borda ficam em tests/test_export.py):
+- tempo total, linhas/s e bytes gerados por GET /api/exports/appointments
+- pico de memória (tracemalloc) da exportação em streaming com o histórico parcial e
+  completo, comparado a montar a lista inteira em memória (jsonify de todas as linhas)
+
+Uso:
+    python -m benchmarks.bench_export --appointments 1000000
+"""
+import argparse
+import time
+import tracemalloc
+import uuid
+from datetime import date, timedelta
+
+from flask import jsonify
+
+from benchmarks.common import SENHA_HASH, create_sqlite_engine, print_table
+from src.config import database
+from src.main import app
+from src.utils.auth import generate_token
+
+FIRST_DAY = date(2020, 1, 1)
+PER_DAY = 400
+
+
+def seed_history(engine, appointments: int, animals: int = 1000) -> dict:
+    """
+    Insere duas clínicas e o histórico de agendamentos concluídos direto no SQLite (em lotes).
+    A primeira clínica recebe ``appointments`` linhas; a segunda, algumas centenas.
+    """
+    clinic_ids = [uuid.uuid4().hex, uuid.uuid4().hex]
+    tutor_id = uuid.uuid4().hex
+    animal_ids = [uuid.uuid4().hex for _ in range(animals)]
+
+    with engine.pool.connection() as conn:
+        conn.executemany(
+            'INSERT INTO usuarios_clinicas (id, nome_clinica, email, senha_hash) VALUES (?, ?, ?, ?)',
+            [(cid, f'Clínica {i}', f'clinica{i}@export.local', SENHA_HASH) for i, cid in enumerate(clinic_ids)],
+        )
+        conn.execute('INSERT INTO usuarios_tutores (id, nome, email, senha_hash) VALUES (?, ?, ?, ?)',
+                     [tutor_id, 'Tutor Exportação', 'tutor@export.local', SENHA_HASH])
+        conn.executemany(
+            'INSERT INTO animais (id, nome, especie, tutor_id, clinica_id) VALUES (?, ?, ?, ?, ?)',
+            [(aid, f'Animal {i}', 'Cão', tutor_id, clinic_ids[0]) for i, aid in enumerate(animal_ids)],
+        )
+
+        def rows(clinic_id, count):
+            for i in range(count):
+                day = FIRST_DAY + timedelta(days=i // PER_DAY)
+                slot = i % PER_DAY
+                # Observações com vírgulas, aspas, quebras de linha e fórmulas (CSV)
+                note = ['Retorno, sem alterações', 'Tutor relatou "tosse"', 'Linha 1\nLinha 2', '=1+1', None][i % 5]
+                yield (uuid.uuid4().hex, tutor_id, clinic_id, animal_ids[i % animals], day.isoformat(),
+                       f'{8 + slot // 60 % 12:02d}:{slot % 60:02d}', note, 'concluido', 150.0)
+
+        sql = ('INSERT INTO agendamentos (id, tutor_id, clinica_id, animal_id, data_agendamento, horario, '
+               'observacoes, status, valor) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)')
+        batch = []
+        for row in rows(clinic_ids[0], appointments):
+            batch.append(row)
+            if len(batch) == 10000:
+                conn.executemany(sql, batch)
+                batch = []
+        conn.executemany(sql, batch + list(rows(clinic_ids[1], 300)))
+        conn.commit()
+
+    return {'clinics': clinic_ids, 'tutor': tutor_id}
+
+
+def consume(response) -> tuple:
+    """
+    Lê a resposta em streaming bloco a bloco, sem juntar o corpo; devolve (bytes, blocos)
+    """
+    size = chunks = 0
+    for chunk in response.response:
+        size += len(chunk)
+        chunks += 1
+    response.close()
+    return size, chunks
+
+
+def peak_memory(fn) -> float:
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--appointments', type=int, default=1000000)
+    args = parser.parse_args()
+
+    engine = create_sqlite_engine()
+    start = time.perf_counter()
+    data = seed_history(engine, args.appointments)
+    print(f'{args.appointments} agendamentos inseridos em {time.perf_counter() - start:.1f}s')
+    database.set_engine(engine)
+    client = app.test_client()
+    with app.app_context():
+        headers = {'Authorization': f'Bearer {generate_token(data["clinics"][0], "clinica")}'}
+
+    # Período que cobre ~10% do histórico (memória com menos linhas)
+    days = args.appointments // PER_DAY
+    partial = f'fim={FIRST_DAY + timedelta(days=max(days // 10 - 1, 0))}'
+
+    partial_rows = min(max(days // 10, 1) * PER_DAY, args.appointments)
+    rows = []
+    for output_format in ('ndjson', 'csv'):
+        for label, query, lines in [('10%', partial, partial_rows), ('completo', '', args.appointments)]:
+            url = f'/api/exports/appointments?format={output_format}&{query}'
+            start = time.perf_counter()
+            size, chunks = consume(client.get(url, headers=headers))
+            elapsed = time.perf_counter() - start
+            peak = peak_memory(lambda: consume(client.get(url, headers=headers)))
+            rows.append({'exportação': f'{output_format}, {label}', 'segundos': elapsed,
+                         'linhas/s': lines / elapsed, 'MB': size / 1024 / 1024, 'blocos': chunks, 'pico MB': peak})
+
+    # Referência: carregar todas as linhas e serializar de uma vez (como uma listagem sem paginação)
+    def in_memory(limit):
+        result = database.db.table('agendamentos').select('*').eq('clinica_id', data['clinics'][0]) \
+            .order('data_agendamento').order('horario').order('id').limit(limit).execute()
+        with app.app_context():
+            return len(jsonify(result.data).get_data())
+
+    for label, limit in [('10%', partial_rows), ('20%', 2 * partial_rows)]:
+        start = time.perf_counter()
+        size = in_memory(limit)
+        elapsed = time.perf_counter() - start
+        peak = peak_memory(lambda: in_memory(limit))
+        rows.append({'exportação': f'lista em memória, {label}', 'segundos': elapsed, 'linhas/s': limit / elapsed,
+                     'MB': size / 1024 / 1024, 'blocos': 1, 'pico MB': peak})
+
+    print_table(f'Exportação de {args.appointments} agendamentos', rows,
+                ['exportação', 'segundos', 'linhas/s', 'MB', 'blocos', 'pico MB'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Importação de animais em lote (POST /api/animals/import) x cadastro um a um (POST /api/animals/)
+
+Gera um arquivo CSV e um NDJSON com ``--rows`` animais e mede linhas/s (os casos de borda
+da importação ficam em tests/test_import.py):
+- cadastro um a um: uma requisição (e um INSERT) por animal
+- importação com lotes de 1, 100, 500 e 2000 registros por INSERT, em CSV e NDJSON
+
+Uso:
+    python -m benchmarks.bench_import --rows 20000
+"""
+import argparse
+import csv
+import io
+import json
+import time
+
+from benchmarks.common import create_sqlite_engine, print_table, seed
+from src.config import database
+from src.main import app
+from src.utils import animal_import
+from src.utils.auth import generate_token
+
+COLUMNS = ['nome', 'especie', 'raca', 'idade', 'peso', 'cor', 'sexo', 'castrado', 'observacoes', 'email_tutor']
+
+
+def make_records(count: int, tutor_emails: list) -> list:
+    return [{
+        'nome': f'Importado {i}',
+        'especie': ['Cão', 'Gato'][i % 2],
+        'raca': 'SRD',
+        'idade': str(i % 20),
+        'peso': f'{i % 40},5',
+        'cor': 'Caramelo',
+        'sexo': ['Macho', 'Fêmea', ''][i % 3],
+        'castrado': ['sim', 'não'][i % 2],
+        'observacoes': 'Migrado do sistema anterior, "ficha" completa',
+        'email_tutor': tutor_emails[i % len(tutor_emails)],
+    } for i in range(count)]
+
+
+def to_csv(records: list) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=COLUMNS, lineterminator='\n')
+    writer.writeheader()
+    writer.writerows(records)
+    return buffer.getvalue().encode('utf-8')
+
+
+def to_ndjson(records: list) -> bytes:
+    return b''.join(json.dumps(r, ensure_ascii=False).encode('utf-8') + b'\n' for r in records)
+
+
+def post_import(client, headers, body: bytes, mimetype: str, **params):
+    return client.post('/api/animals/import', data=body, query_string=params,
+                       headers={**headers, 'Content-Type': mimetype})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--single-rows', type=int, default=2000)
+    args = parser.parse_args()
+
+    engine = create_sqlite_engine()
+    data = seed(engine, tutors=50, clinics=1, animals_per_tutor=1, appointments_per_animal=0)
+    database.set_engine(engine)
+    client = app.test_client()
+    tutor = data['tutors'][0]
+    with app.app_context():
+        clinic_headers = {'Authorization': f'Bearer {generate_token(data["clinics"][0]["id"], "clinica")}'}
+        tutor_headers = {'Authorization': f'Bearer {generate_token(tutor["id"], "tutor")}'}
+
+    emails = [t['email'] for t in data['tutors']]
+    rows = []
+
+    # Referência: um POST /api/animals/ por animal
+    records = make_records(args.single_rows, emails)
+    start = time.perf_counter()
+    for record in records:
+        client.post('/api/animals/', json=record, headers=tutor_headers)
+    elapsed = time.perf_counter() - start
+    rows.append({'cadastro': 'um a um (POST /api/animals/)', 'linhas': args.single_rows, 'segundos': elapsed,
+                 'linhas/s': args.single_rows / elapsed})
+
+    records = make_records(args.rows, emails)
+    files = {'csv': (to_csv(records), 'text/csv'), 'ndjson': (to_ndjson(records), 'application/x-ndjson')}
+    for batch_size in [1, 100, 500, 2000]:
+        for file_format, (body, mimetype) in files.items():
+            rows_to_send = args.rows if batch_size > 1 else args.single_rows
+            if rows_to_send < args.rows:
+                body = (to_csv if file_format == 'csv' else to_ndjson)(records[:rows_to_send])
+            animal_import.ANIMAL_IMPORT_BATCH_SIZE = batch_size
+            start = time.perf_counter()
+            post_import(client, clinic_headers, body, mimetype)
+            elapsed = time.perf_counter() - start
+            rows.append({'cadastro': f'importação {file_format}, lotes de {batch_size}', 'linhas': rows_to_send,
+                         'segundos': elapsed, 'linhas/s': rows_to_send / elapsed})
+
+    print_table('Cadastro de animais em lote', rows, ['cadastro', 'linhas', 'segundos', 'linhas/s'])
+
+
+if __name__ == '__main__':
+    main()
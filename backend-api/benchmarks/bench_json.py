@@ -0,0 +1,92 @@
+"""
+Serialização JSON (json x orjson) e compressão (gzip x brotli) por endpoint
+
+Para cada endpoint pega o corpo real da resposta e compara:
+- tempo para serializar o mesmo objeto com o provedor padrão do Flask e com o orjson
+- bytes trafegados sem compressão, com gzip e com brotli (e o tempo para comprimir)
+- latência do endpoint sem compressão e com Accept-Encoding: br, gzip
+
+A equivalência dos provedores e da compressão é testada em tests/test_json.py.
+
+Uso:
+    python -m benchmarks.bench_json --animals 200 --text-size 400
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+from flask.json.provider import DefaultJSONProvider
+
+from benchmarks.common import create_sqlite_engine, measure, print_table, seed
+from src.config import database
+from src.main import app
+from src.utils import compression
+from src.utils.auth import generate_token
+from src.utils.json_provider import FastJSONProvider, orjson
+
+
+def timed_ms(fn, iterations: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--animals', type=int, default=200)
+    parser.add_argument('--text-size', type=int, default=400)
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_sqlite_engine()
+    data = seed(engine, tutors=1, clinics=1, animals_per_tutor=args.animals, appointments_per_animal=1,
+                text_size=args.text_size)
+    database.set_engine(engine)
+    clinic = engine.table('usuarios_clinicas').select('email').execute().data[0]
+
+    client = app.test_client()
+    with app.app_context():
+        headers = {'Authorization': f'Bearer {generate_token(data["tutors"][0]["id"], "tutor")}'}
+
+    limit = min(args.animals, 200)
+    start = (date.today() + timedelta(days=1)).isoformat()
+    endpoints = [
+        ('animais (fields=*)', f'/api/animals/?limit={limit}&fields=*'),
+        ('animais (padrão)', f'/api/animals/?limit={limit}'),
+        ('busca', f'/api/animals/search?q=animal&limit={limit}'),
+        ('agendamentos', f'/api/appointments/?limit={limit}'),
+        ('disponibilidade (30 dias)', f'/api/appointments/availability?clinicas={clinic["email"]}&inicio={start}&dias=30'),
+    ]
+
+    stdlib, fast = DefaultJSONProvider(app), FastJSONProvider(app)
+    encodings = ['gzip'] + (['br'] if compression.brotli is not None else [])
+    serialization, wire = [], []
+    for name, url in endpoints:
+        plain = client.get(url, headers={**headers, 'Accept-Encoding': 'identity'})
+        body = plain.get_json()
+        serialization.append({
+            'endpoint': name,
+            'json ms': timed_ms(lambda: stdlib.dumps(body), args.iterations),
+            'orjson ms': timed_ms(lambda: fast.dumps(body), args.iterations) if orjson else float('nan'),
+        })
+
+        row = {'endpoint': name, 'bytes': len(plain.data)}
+        for encoding in encodings:
+            compressed = client.get(url, headers={**headers, 'Accept-Encoding': encoding})
+            row[f'{encoding} bytes'] = len(compressed.data)
+            row[f'{encoding} ms'] = timed_ms(lambda: compression.compress(plain.data, encoding), args.iterations)
+        row['p50 sem'] = measure(lambda: client.get(url, headers={**headers, 'Accept-Encoding': 'identity'}),
+                                 iterations=args.iterations, warmup=3)['p50']
+        row['p50 comp.'] = measure(lambda: client.get(url, headers={**headers, 'Accept-Encoding': 'br, gzip'}),
+                                   iterations=args.iterations, warmup=3)['p50']
+        wire.append(row)
+
+    print_table('Serialização do corpo da resposta (ms)', serialization, ['endpoint', 'json ms', 'orjson ms'])
+    columns = ['endpoint', 'bytes'] + [f'{e} {m}' for e in encodings for m in ('bytes', 'ms')] + ['p50 sem', 'p50 comp.']
+    print_table('Bytes trafegados, tempo de compressão e latência do endpoint (ms)', wire, columns)
+
+
+if __name__ == '__main__':
+    main()
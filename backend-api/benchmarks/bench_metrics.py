@@ -0,0 +1,121 @@
+"""
+Métricas de latência (/metrics): custo por requisição com METRICS_ENABLED=true x false
+
+Mede (os casos de borda das métricas ficam em tests/test_metrics.py):
+- a mesma rota (GET /health e GET /api/appointments/ em SQLite) em dois processos,
+  um com as métricas ligadas e outro desligadas
+- o custo isolado de uma observação, de um ``execute()`` medido e da coleta do /metrics
+
+Uso:
+    python -m benchmarks.bench_metrics --iterations 2000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import create_sqlite_engine, measure, print_table, seed
+from src.config import database
+from src.main import app
+from src.utils import metrics
+from src.utils.auth import generate_token
+from src.utils.metrics import TimedQuery, http_request_duration, registry
+
+
+class NewObjectQuery:
+    """
+    Construtor no estilo do cliente Supabase: cada método devolve um objeto novo
+    """
+
+    def __init__(self, calls=()):
+        self.calls = list(calls)
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: NewObjectQuery(self.calls + [name])
+
+    def execute(self):
+        return self.calls
+
+
+def measure_routes(iterations: int) -> dict:
+    """
+    Latência das rotas neste processo (METRICS_ENABLED vem do ambiente)
+    """
+    engine = create_sqlite_engine()
+    data = seed(engine, tutors=5, clinics=1, animals_per_tutor=4, appointments_per_animal=5, text_size=20)
+    database.set_engine(engine)
+    client = app.test_client()
+    with app.app_context():
+        headers = {'Authorization': f'Bearer {generate_token(data["clinics"][0]["id"], "clinica")}'}
+
+    results = {}
+    for name, url, request_headers in [('GET /health', '/health', {}),
+                                       ('GET /api/appointments/', '/api/appointments/?limit=20', headers)]:
+        results[name] = measure(lambda: client.get(url, headers=request_headers), iterations=iterations, warmup=50)
+    return results
+
+
+def run_child(enabled: bool, iterations: int) -> dict:
+    env = {**os.environ, 'METRICS_ENABLED': 'true' if enabled else 'false', 'METRICS_DIR': ''}
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_metrics', '--child',
+                             '--iterations', str(iterations)],
+                            env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def per_call_us(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_routes(args.iterations)))
+        return
+
+    if not metrics.METRICS_ENABLED:
+        parser.error('rode com METRICS_ENABLED=true')
+    client = app.test_client()
+
+    on, off = run_child(True, args.iterations), run_child(False, args.iterations)
+    rows = []
+    for name in on:
+        for label, result in [('desligadas', off[name]), ('ligadas', on[name])]:
+            rows.append({'rota': f'{name} ({label})', 'média ms': result['mean'], 'p50 ms': result['p50'],
+                         'p95 ms': result['p95'], 'p99 ms': result['p99']})
+        rows.append({'rota': f'{name} (diferença)', 'média ms': on[name]['mean'] - off[name]['mean'],
+                     'p50 ms': on[name]['p50'] - off[name]['p50'], 'p95 ms': '', 'p99 ms': ''})
+    print_table(f'Latência por requisição ({args.iterations} iterações, processos separados)', rows,
+                ['rota', 'média ms', 'p50 ms', 'p95 ms', 'p99 ms'])
+
+    # Custos isolados
+    registry.clear()
+    raw = NewObjectQuery()
+    timed = TimedQuery(raw, 'agendamentos')
+    for endpoint in range(60):
+        for status in ('200', '201', '400', '404', '500'):
+            http_request_duration.observe((f'rota_{endpoint}', 'GET', status), 0.01)
+    started = time.perf_counter()
+    text = client.get('/metrics').get_data(as_text=True)
+    render_ms = (time.perf_counter() - started) * 1000
+    micro = [
+        {'operação': 'Histogram.observe', 'µs': per_call_us(
+            lambda: http_request_duration.observe(('rota_0', 'GET', '200'), 0.012), 200000)},
+        {'operação': 'execute() sem medição', 'µs': per_call_us(lambda: raw.eq('id', 1).execute(), 100000)},
+        {'operação': 'execute() medido', 'µs': per_call_us(lambda: timed.eq('id', 1).execute(), 100000)},
+        {'operação': f'GET /metrics ({len(text.splitlines())} linhas)', 'µs': render_ms * 1000},
+    ]
+    print_table('Custos isolados', micro, ['operação', 'µs'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Paginação por cursor (keyset) x OFFSET em uma clínica com muitos agendamentos
+
+Percorre a listagem de GET /api/appointments/ seguindo o next_cursor para obter o cursor
+de cada página e mede o custo de uma página no início, no meio e no fim da lista com cada
+estratégia. O percurso completo (sem repetições nem faltas) é testado em
+tests/test_pagination.py.
+
+Uso:
+    python -m benchmarks.bench_pagination --appointments 20000 --limit 50
+"""
+import argparse
+
+from benchmarks.common import create_sqlite_engine, measure, print_table, seed
+from src.config import database
+from src.main import app
+from src.routes.appointments import APPOINTMENT_KEYSET
+from src.utils.auth import generate_token
+from src.utils.pagination import Page, apply_page, decode_cursor
+
+
+def walk(client, headers, limit, order):
+    """
+    Percorre todas as páginas; devolve o cursor de cada página
+    """
+    cursors, cursor = [None], None
+    while True:
+        url = f'/api/appointments/?limit={limit}&order={order}' + (f'&cursor={cursor}' if cursor else '')
+        cursor = client.get(url, headers=headers).get_json()['next_cursor']
+        if cursor is None:
+            return cursors
+        cursors.append(cursor)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--appointments', type=int, default=20000)
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_sqlite_engine()
+    per_animal = 40
+    animals = max(args.appointments // per_animal, 1)
+    data = seed(engine, tutors=max(animals // 10, 1), clinics=1, animals_per_tutor=10,
+                appointments_per_animal=per_animal, text_size=20)
+    database.set_engine(engine)
+    total = len(data['appointments'])
+    clinic = data['clinics'][0]
+
+    client = app.test_client()
+    with app.app_context():
+        headers = {'Authorization': f'Bearer {generate_token(clinic["id"], "clinica")}'}
+
+    pages = walk(client, headers, args.limit, 'asc')
+    print(f'{total} agendamentos em {len(pages)} páginas')
+
+    def base_query():
+        return database.db.table('view_agendamentos_completo').select('*').eq('clinica_id', clinic['id'])
+
+    def keyset_page(cursor):
+        after = decode_cursor(cursor, APPOINTMENT_KEYSET, 'asc') if cursor else None
+        page = Page(APPOINTMENT_KEYSET, args.limit, False, after)
+        return lambda: apply_page(base_query(), page).execute()
+
+    def offset_page(offset):
+        def run():
+            query = base_query()
+            for column in APPOINTMENT_KEYSET:
+                query = query.order(column)
+            return query.range(offset, offset + args.limit - 1).execute()
+        return run
+
+    rows = []
+    for label, index in [('início', 0), ('meio', len(pages) // 2), ('fim', len(pages) - 1)]:
+        offset = index * args.limit
+        for strategy, fn in [('cursor', keyset_page(pages[index])), ('offset', offset_page(offset))]:
+            result = measure(fn, iterations=args.iterations, warmup=3)
+            rows.append({'página': f'{label} (linha {offset}), {strategy}', **result})
+        endpoint = f'/api/appointments/?limit={args.limit}&order=asc' + (f'&cursor={pages[index]}' if pages[index] else '')
+        result = measure(lambda: client.get(endpoint, headers=headers), iterations=args.iterations, warmup=3)
+        rows.append({'página': f'{label} (linha {offset}), endpoint', **result})
+
+    print_table(f'Custo de uma página de {args.limit} agendamentos (ms)', rows, ['página', 'mean', 'p50', 'p95', 'p99'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Perfil público do animal (QR Code): cache em memória, ETag/304 e banco fora do ar
+
+O banco (SQLite em memória) fica atrás de um wrapper que adiciona latência a cada
+consulta, simulando a ida ao Supabase, e que pode simular uma queda.
+
+O comportamento (ETag/304, invalidação pelo PUT, revalidação em segundo plano e cópia
+antiga com o banco fora do ar) é testado em tests/test_profile_cache.py.
+
+Uso:
+    python -m benchmarks.bench_profile --latency 0.02
+"""
+import argparse
+import time
+
+from benchmarks.common import create_sqlite_engine, measure, print_table, seed
+from src.config import database
+from src.main import app
+from src.utils.profile_cache import profile_cache
+
+
+class UpstreamDown(Exception):
+    pass
+
+
+class FlakyUpstream:
+    """
+    Engine que repassa as consultas para outra, com latência fixa e queda simulada
+    """
+
+    def __init__(self, engine, latency: float):
+        self.engine = engine
+        self.latency = latency
+        self.down = False
+        self.calls = 0
+
+    def table(self, name):
+        return FlakyQuery(self, self.engine.table(name))
+
+    def rpc(self, name, params=None):
+        return FlakyQuery(self, self.engine.rpc(name, params))
+
+    def __getattr__(self, name):
+        return getattr(self.engine, name)
+
+
+class FlakyQuery:
+    def __init__(self, upstream, query):
+        self._upstream = upstream
+        self._query = query
+
+    def __getattr__(self, name):
+        method = getattr(self._query, name)
+
+        def call(*args, **kwargs):
+            result = method(*args, **kwargs)
+            return self if result is self._query else result
+        return call
+
+    def execute(self):
+        self._upstream.calls += 1
+        time.sleep(self._upstream.latency)
+        if self._upstream.down:
+            raise UpstreamDown('Supabase indisponível')
+        return self._query.execute()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency', type=float, default=0.02, help='latência simulada do banco (s)')
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_sqlite_engine()
+    data = seed(engine, tutors=1, clinics=1, animals_per_tutor=2, appointments_per_animal=0)
+    upstream = FlakyUpstream(engine, args.latency)
+    database.set_engine(upstream)
+    animal_id = data['animals'][0]['id']
+    engine.table('animais').update({'nome': 'Rex'}).eq('id', animal_id).execute()
+
+    client = app.test_client()
+    ttl, stale, retry_after = profile_cache.ttl, profile_cache.stale_while_revalidate, profile_cache.retry_after
+
+    url = f'/api/animals/{animal_id}'
+    etag = client.get(url).headers['ETag']
+    rows = []
+
+    size = profile_cache.max_size
+    profile_cache.max_size = 0
+    rows.append({'leitura do QR Code': 'sem cache (banco a cada leitura)',
+                 **measure(lambda: client.get(url), iterations=min(args.iterations, 50), warmup=2)})
+    profile_cache.max_size = size
+
+    rows.append({'leitura do QR Code': 'cache em memória (200)',
+                 **measure(lambda: client.get(url), iterations=args.iterations)})
+    rows.append({'leitura do QR Code': 'If-None-Match (304)',
+                 **measure(lambda: client.get(url, headers={'If-None-Match': etag}), iterations=args.iterations)})
+
+    # Entrada vencida: a primeira leitura espera a falha, as seguintes usam a cópia sem tentar de novo
+    profile_cache.ttl, profile_cache.stale_while_revalidate, profile_cache.retry_after = 0.001, 0, 60
+    time.sleep(0.01)
+    upstream.down = True
+    try:
+        rows.append({'leitura do QR Code': 'banco fora do ar (cópia antiga)',
+                     **measure(lambda: client.get(url), iterations=min(args.iterations, 50), warmup=2)})
+    finally:
+        upstream.down = False
+        profile_cache.ttl, profile_cache.stale_while_revalidate, profile_cache.retry_after = ttl, stale, retry_after
+
+    print_table(f'GET /api/animals/{{id}} com {args.latency * 1000:.0f} ms de latência no banco (ms)', rows,
+                ['leitura do QR Code', 'mean', 'p50', 'p95', 'p99'])
+
+
+if __name__ == '__main__':
+    main()
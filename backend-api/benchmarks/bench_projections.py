@@ -0,0 +1,96 @@
+"""
+Tamanho das respostas e tempo de serialização por projeção (parâmetro fields)
+
+Os animais têm textos longos realistas (histórico médico e observações) e ainda o
+QR Code antigo em base64 na coluna qr_code_url, como nas bases não migradas.
+
+Para cada listagem compara (bytes, tempo de serialização JSON e latência):
+- select('*'): todas as colunas, como antes da projeção
+- fields=*: todos os campos permitidos (qr_code_url calculado, sem o base64)
+- padrão: projeção enxuta da listagem
+- mínimo: só os campos exibidos em um card (ex.: nome e espécie)
+
+O recorte de cada projeção é testado em tests/test_projections.py.
+
+Uso:
+    python -m benchmarks.bench_projections --animals 50 --text-size 4000
+"""
+import argparse
+import json
+import time
+
+from benchmarks.common import create_sqlite_engine, measure, print_table, seed
+from src.config import database
+from src.main import app
+from src.utils.auth import generate_token
+
+LEGACY_QR = 'data:image/png;base64,' + 'iVBORw0KGgo' * 250
+
+
+def serialization_ms(body: dict, iterations: int = 50) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        app.json.dumps(body)
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--animals', type=int, default=50)
+    parser.add_argument('--text-size', type=int, default=4000)
+    parser.add_argument('--iterations', type=int, default=100)
+    args = parser.parse_args()
+
+    engine = create_sqlite_engine()
+    data = seed(engine, tutors=1, clinics=1, animals_per_tutor=args.animals, appointments_per_animal=1,
+                text_size=args.text_size)
+    engine.table('animais').update({'qr_code_url': LEGACY_QR}).eq('tutor_id', data['tutors'][0]['id']).execute()
+    for appointment in data['appointments']:
+        engine.table('agendamentos').update({'observacoes': 'z' * (args.text_size // 4)}).eq('id', appointment['id']).execute()
+    database.set_engine(engine)
+
+    client = app.test_client()
+    with app.app_context():
+        headers = {'Authorization': f'Bearer {generate_token(data["tutors"][0]["id"], "tutor")}'}
+
+    limit = f'limit={args.animals}'
+    scenarios = [
+        ('animais', f'/api/animals/?{limit}', 'fields=nome,especie'),
+        ('busca', f'/api/animals/search?q=Animal&{limit}', 'fields=nome_animal,especie'),
+        ('agendamentos', f'/api/appointments/?{limit}', 'fields=data_agendamento,horario,status,nome_animal'),
+    ]
+    tables = {
+        'animais': ('animais', 'animals'),
+        'busca': ('view_animais_completo', 'animals'),
+        'agendamentos': ('view_agendamentos_completo', 'appointments'),
+    }
+
+    rows = []
+    for name, url, minimal in scenarios:
+        table, key = tables[name]
+
+        # Linha de base: todas as colunas, sem passar pela projeção
+        def select_all():
+            return {key: database.db.table(table).select('*').limit(args.animals).execute().data}
+        body = select_all()
+        result = measure(lambda: app.json.dumps(select_all()), iterations=args.iterations, warmup=3)
+        rows.append({
+            'listagem': f"{name}, select('*') (consulta + JSON)", 'bytes': len(json.dumps(body, default=str)),
+            'json ms': serialization_ms(body), 'p50': result['p50'], 'p95': result['p95'],
+        })
+
+        for label, params in [('fields=*', 'fields=*'), ('padrão', ''), ('mínimo', minimal)]:
+            full_url = f'{url}&{params}' if params else url
+            response = client.get(full_url, headers=headers)
+            result = measure(lambda: client.get(full_url, headers=headers), iterations=args.iterations, warmup=3)
+            rows.append({
+                'listagem': f'{name}, {label} (endpoint)', 'bytes': len(response.data),
+                'json ms': serialization_ms(response.get_json()), 'p50': result['p50'], 'p95': result['p95'],
+            })
+
+    print_table(f'{args.animals} linhas por resposta, textos de {args.text_size} caracteres (tempos em ms)', rows,
+                ['listagem', 'bytes', 'json ms', 'p50', 'p95'])
+
+
+if __name__ == '__main__':
+    main()
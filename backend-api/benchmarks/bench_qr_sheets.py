@@ -0,0 +1,59 @@
+"""
+Vazão da geração de etiquetas com QR Code em lote, por número de processos
+
+Uso:
+    python -m benchmarks.bench_qr_sheets --animals 1000
+"""
+import argparse
+import os
+import resource
+import time
+import uuid
+
+from benchmarks.common import print_table
+from src.utils.tag_sheets import get_pool, stream_pdf, stream_zip
+
+
+def run(output_format: str, animals: list, targets: list, workers: int) -> dict:
+    pool = get_pool(workers)
+    try:
+        # Aquecer os processos antes de medir
+        list(stream_zip(animals[:workers], targets[:workers], pool=pool))
+
+        start = time.perf_counter()
+        if output_format == 'pdf':
+            stream = stream_pdf(animals, targets, pool=pool)
+        else:
+            stream = stream_zip(animals, targets, pool=pool)
+        size = sum(len(chunk) for chunk in stream)
+        elapsed = time.perf_counter() - start
+    finally:
+        pool.shutdown()
+
+    rate = len(animals) / elapsed
+    return {
+        'formato/processos': f'{output_format} x{workers}',
+        'etiquetas/s': rate,
+        'por núcleo': rate / workers,
+        'MB': size / 1e6,
+        'RSS pico MB': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--animals', type=int, default=500)
+    args = parser.parse_args()
+
+    animals = [{'id': str(uuid.uuid4()), 'nome': f'Animal {i}'} for i in range(args.animals)]
+    targets = [f'http://localhost:3000/animal/{a["id"]}' for a in animals]
+
+    cores = os.cpu_count() or 1
+    counts = sorted({1, 2, cores // 2 or 1, cores})
+    results = [run(fmt, animals, targets, n) for fmt in ('pdf', 'zip') for n in counts]
+    print_table(f'{args.animals} etiquetas', results,
+                ['formato/processos', 'etiquetas/s', 'por núcleo', 'MB', 'RSS pico MB'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Limite de requisições (token bucket) no login, cadastro e contato
+
+Mede (os casos de borda ficam em tests/test_rate_limit.py):
+- um ataque de credential stuffing no login (tentativas de um IP, uma senha errada por
+  vez) com e sem o limite: tempo total, chamadas ao banco e hashes bcrypt
+- o custo de uma verificação no balde em memória e no compartilhado (SQLite)
+- a memória dos baldes com muito mais chaves do que o máximo
+
+Uso:
+    python -m benchmarks.bench_rate_limit --attempts 300
+"""
+import os
+
+# Custo do bcrypt de produção seria lento demais para centenas de tentativas
+os.environ.setdefault('BCRYPT_ROUNDS', '8')
+
+import argparse
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.common import create_sqlite_engine, print_table, seed
+from benchmarks.fake_supabase import FakeSupabase, install
+from src.main import app
+from src.utils import rate_limit
+from src.utils.auth import hash_password, hashing_pool
+from src.utils.rate_limit import (DatabaseBackend, MemoryBackend, RateLimiter, RateLimitPolicy, bucket_key,
+                                  rate_limiter)
+
+PASSWORD = 'senha123'
+
+
+def login(client, email: str, ip: str, password: str = 'errada1', headers: dict = None):
+    return client.post('/api/auth/login', json={'email': email, 'senha': password},
+                       environ_base={'REMOTE_ADDR': ip}, headers=headers or {})
+
+
+def per_call_us(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(i)
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--attempts', type=int, default=300)
+    parser.add_argument('--latency', type=float, default=0.005, help='latência do Supabase falso (s)')
+    parser.add_argument('--keys', type=int, default=200000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='vetcare-rate-limit-')
+    try:
+        engine = create_sqlite_engine(os.path.join(directory, 'app.db'))
+        data = seed(engine, tutors=3, clinics=1, animals_per_tutor=1, appointments_per_animal=1, text_size=10)
+        tutor = data['tutors'][0]
+        engine.table('usuarios_tutores').update({'senha_hash': hash_password(PASSWORD)}).eq('id', tutor['id']).execute()
+        client = app.test_client()
+
+        # Credential stuffing: um IP, senhas erradas para o email de um tutor
+        rows = []
+        for label, enabled in [('sem limite', False), ('com limite', True)]:
+            rate_limit.RATE_LIMIT_ENABLED = enabled
+            rate_limiter.local.clear()
+            fake = install(FakeSupabase(engine, latency=args.latency))
+            hashes = hashing_pool.count
+            start = time.perf_counter()
+            statuses = [login(client, tutor['email'], '203.0.113.7', f'tentativa{i}').status_code
+                        for i in range(args.attempts)]
+            elapsed = time.perf_counter() - start
+            rows.append({
+                'cenário': f'{args.attempts} tentativas ({label})',
+                'tempo s': elapsed,
+                '401': statuses.count(401),
+                '429': statuses.count(429),
+                'banco': sum(fake.calls.values()),
+                'bcrypt': hashing_pool.count - hashes,
+            })
+        rate_limit.RATE_LIMIT_ENABLED = True
+        print_table(f'Credential stuffing no login (BCRYPT_ROUNDS={os.environ["BCRYPT_ROUNDS"]}, '
+                    f'Supabase falso com {args.latency * 1000:.0f} ms)', rows,
+                    ['cenário', 'tempo s', '401', '429', 'banco', 'bcrypt'])
+
+        # Custo de uma verificação
+        policy = RateLimitPolicy(20, 60)
+        memory = MemoryBackend(50000)
+        install(FakeSupabase(create_sqlite_engine(os.path.join(directory, 'shared.db'))))
+        shared = RateLimiter(MemoryBackend(50000), DatabaseBackend())
+        keys = [bucket_key('login', 'ip', f'198.51.{i // 256}.{i % 256}') for i in range(5000)]
+        costs = [
+            {'operação': 'bucket_key (blake2b)', 'µs': per_call_us(lambda i: bucket_key('login', 'ip', '10.0.0.1'), 50000)},
+            {'operação': 'balde em memória', 'µs': per_call_us(lambda i: memory.consume(keys[i % 5000], policy), 50000)},
+            {'operação': 'local + compartilhado (SQLite)', 'µs': per_call_us(lambda i: shared.hit(keys[i % 5000], policy), 5000)},
+        ]
+        print_table('Custo por verificação', costs, ['operação', 'µs'])
+
+        # Memória: muito mais chaves que o máximo
+        rows = []
+        for max_keys in [10000, 50000]:
+            tracemalloc.start()
+            backend = MemoryBackend(max_keys)
+            for i in range(args.keys):
+                backend.consume(bucket_key('login', 'ip', f'ip-{i}'), policy)
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            rows.append({'máximo de chaves': max_keys, 'chaves vistas': args.keys,
+                         'baldes': backend.stats()['keys'], 'MB': current / 1024 / 1024,
+                         'bytes/balde': current / backend.stats()['keys']})
+        print_table('Memória dos baldes', rows, ['máximo de chaves', 'chaves vistas', 'baldes', 'MB', 'bytes/balde'])
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,369 @@
+"""
+Suíte de benchmark das rotas (auth, animals, appointments, contact) com Supabase falso
+
+Troca ``src.config.database.supabase`` pelo cliente falso em processo
+(benchmarks/fake_supabase.py), com latência por chamada e tamanho de base configuráveis,
+e passa por todas as rotas dos quatro blueprints pelo test client do Flask:
+- sequencial: ``--iterations`` requisições por rota, latência p50/p95/p99
+- carga: ``--load-requests`` requisições por rota vindas de ``--concurrency`` threads,
+  vazão (req/s) e p95 sob concorrência
+
+Toda resposta precisa ter o status esperado (a suíte também serve de teste de fumaça).
+Os resultados são comparados com benchmarks/baseline_routes.json: p50/p95 acima de
+``--tolerance`` (mais ``--slack-ms``, para rotas abaixo de 1 ms) ou vazão abaixo de
+``--tolerance`` contam como regressão e o processo termina com código 1. A linha de base
+só vale para os mesmos parâmetros (e a mesma máquina); ``--update-baseline`` regrava.
+
+O bcrypt usa BCRYPT_ROUNDS=4 salvo se a variável já estiver definida (com o custo real,
+as rotas de login e cadastro medem basicamente o bcrypt), e o limite de requisições fica
+desligado (RATE_LIMIT_ENABLED=false), já que todas as chamadas vêm do mesmo IP.
+
+Uso:
+    python -m benchmarks.bench_routes
+    python -m benchmarks.bench_routes --latency 0.02 --tutors 2000 --only appointments
+    python -m benchmarks.bench_routes --update-baseline
+"""
+import os
+
+# Antes de importar o app: o custo do bcrypt é lido na importação, e o limite de
+# requisições barraria as chamadas repetidas do mesmo IP (medido em bench_rate_limit)
+os.environ.setdefault('BCRYPT_ROUNDS', '4')
+os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+
+import argparse
+import itertools
+import json
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from benchmarks.common import create_sqlite_engine, print_table, seed
+from benchmarks.fake_supabase import FakeSupabase, install
+from src.main import app
+from src.utils.auth import generate_token, hash_password
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline_routes.json')
+PASSWORD = 'senha123'
+
+
+class Scenario:
+    """
+    Uma rota da suíte: ``request(i)`` monta os argumentos do test client da i-ésima chamada
+    """
+
+    def __init__(self, name: str, method: str, request, expected: int):
+        self.name = name
+        self.method = method
+        self.request = request
+        self.expected = expected
+
+
+class Pool:
+    """
+    Registros consumidos um por requisição (ex.: agendamentos pendentes para aceitar)
+    """
+
+    def __init__(self, items: list):
+        self._items = iter(items)
+        self._lock = threading.Lock()
+
+    def take(self):
+        with self._lock:
+            return next(self._items)
+
+
+def build_dataset(engine, tutors: int, consumable: int) -> dict:
+    """
+    Base com ``tutors`` tutores (3 animais e 2 agendamentos por animal) e os registros
+    consumidos pelas rotas que mudam estado (``consumable`` de cada)
+    """
+    data = seed(engine, tutors=tutors, clinics=max(tutors // 50, 2), animals_per_tutor=3,
+                appointments_per_animal=2, text_size=100)
+    tutor, clinic = data['tutors'][0], data['clinics'][0]
+
+    # Senha conhecida, com o custo do bcrypt em uso (o login não regrava o hash)
+    password_hash = hash_password(PASSWORD)
+    engine.table('usuarios_tutores').update({'senha_hash': password_hash}).eq('id', tutor['id']).execute()
+    engine.table('usuarios_clinicas').update({'senha_hash': password_hash}).eq('id', clinic['id']).execute()
+
+    animal = engine.table('animais').insert({
+        'nome': 'Rex', 'especie': 'Cão', 'sexo': 'Macho', 'tutor_id': tutor['id'], 'clinica_id': clinic['id']
+    }).execute().data[0]
+
+    # Agendamentos pendentes em dias distantes (não colidem com os criados pela suíte)
+    start = date.today() + timedelta(days=3000)
+    pending = engine.table('agendamentos').insert([
+        {'tutor_id': tutor['id'], 'clinica_id': clinic['id'], 'animal_id': animal['id'],
+         'data_agendamento': (start + timedelta(days=i // 16)).isoformat(),
+         'horario': f'{8 + (i % 16) // 2:02d}:{30 * (i % 2):02d}', 'status': 'pendente'}
+        for i in range(consumable * 2)
+    ]).execute().data
+    contacts = engine.table('contatos').insert([
+        {'nome': f'Contato {i}', 'email': f'contato{i}@bench.local', 'mensagem': 'Olá'} for i in range(50)
+    ]).execute().data
+
+    return {
+        **data,
+        'tutor': tutor,
+        'clinic': clinic,
+        'animal': animal,
+        'to_accept': Pool([a['id'] for a in pending[:consumable]]),
+        'to_cancel': Pool([a['id'] for a in pending[consumable:]]),
+        'contacts': contacts,
+    }
+
+
+def build_scenarios(data: dict) -> list:
+    tutor, clinic, animal = data['tutor'], data['clinic'], data['animal']
+    with app.app_context():
+        as_tutor = {'Authorization': f'Bearer {generate_token(tutor["id"], "tutor")}'}
+        as_clinic = {'Authorization': f'Bearer {generate_token(clinic["id"], "clinica")}'}
+    animals = [a['id'] for a in data['animals']]
+    contacts = [c['id'] for c in data['contacts']]
+    day = (date.today() + timedelta(days=7)).isoformat()
+    emails = ','.join(c['email'] for c in data['clinics'][:5])
+    unique = itertools.count()
+    # Um horário livre por chamada: dias a partir de daqui a ~3 anos, 16 horários por dia
+    first_day = date.today() + timedelta(days=1000)
+
+    def slot():
+        n = next(unique)
+        return (first_day + timedelta(days=n // 16)).isoformat(), f'{8 + (n % 16) // 2:02d}:{30 * (n % 2):02d}'
+
+    def booking(_):
+        day_, time_ = slot()
+        return {'headers': as_tutor, 'json': {'animal_id': animal['id'], 'email_clinica': clinic['email'],
+                                              'data_agendamento': day_, 'horario': time_}}
+
+    def import_body(i):
+        rows = '\n'.join(f'Importado {i}-{n},Gato,Fêmea,{n % 15}' for n in range(20))
+        return {'headers': {**as_tutor, 'Content-Type': 'text/csv'}, 'data': f'nome,especie,sexo,idade\n{rows}\n'}
+
+    return [
+        # auth
+        Scenario('auth.register_tutor', 'POST', lambda i: {'json': {
+            'nome': 'Tutor', 'email': f'novo{next(unique)}@tutor.bench', 'senha': PASSWORD, 'telefone': '11999998888'
+        }}, 201),
+        Scenario('auth.register_clinica', 'POST', lambda i: {'json': {
+            'nome_clinica': 'Clínica', 'email': f'nova{next(unique)}@clinica.bench', 'senha': PASSWORD,
+            'telefone': '1133334444'
+        }}, 201),
+        Scenario('auth.login', 'POST', lambda i: {'json': {'email': tutor['email'], 'senha': PASSWORD}}, 200),
+        Scenario('auth.verify_token', 'GET', lambda i: {'headers': as_tutor}, 200),
+        Scenario('auth.logout', 'POST', lambda i: {}, 200),
+        # animals
+        Scenario('animals.get_animals', 'GET', lambda i: {'headers': as_tutor}, 200),
+        Scenario('animals.create_animal', 'POST', lambda i: {'headers': as_tutor, 'json': {
+            'nome': f'Novo {i}', 'especie': 'Gato', 'sexo': 'Fêmea', 'peso': '4,2'
+        }}, 201),
+        Scenario('animals.import_animals', 'POST', import_body, 200),
+        Scenario('animals.get_animal_by_id', 'GET', lambda i: {'path': f'/{animals[i % len(animals)]}'}, 200),
+        Scenario('animals.update_animal', 'PUT', lambda i: {'path': f'/{animal["id"]}', 'headers': as_tutor,
+                                                            'json': {'observacoes': f'Revisão {i}'}}, 200),
+        Scenario('animals.search_animals', 'GET', lambda i: {'query': 'q=animal&limit=20', 'headers': as_clinic}, 200),
+        Scenario('animals.get_animal_qr_code', 'GET', lambda i: {'path': f'/{animals[i % len(animals)]}/qr'}, 200),
+        Scenario('animals.create_qr_sheet', 'POST', lambda i: {'headers': as_clinic, 'json': {
+            'animal_ids': animals[:6], 'format': 'pdf'
+        }}, 200),
+        # appointments
+        Scenario('appointments.get_appointments', 'GET', lambda i: {'query': 'limit=20', 'headers': as_clinic}, 200),
+        Scenario('appointments.create_appointment', 'POST', booking, 201),
+        Scenario('appointments.update_appointment_status', 'PUT', lambda i: {
+            'path': f'/{data["to_accept"].take()}/status', 'headers': as_clinic, 'json': {'status': 'aceito'}
+        }, 200),
+        Scenario('appointments.cancel_appointment', 'DELETE', lambda i: {
+            'path': f'/{data["to_cancel"].take()}', 'headers': as_tutor
+        }, 200),
+        Scenario('appointments.get_available_times', 'GET', lambda i: {
+            'query': f'email_clinica={clinic["email"]}&data={day}'
+        }, 200),
+        Scenario('appointments.get_availability', 'GET', lambda i: {'query': f'clinicas={emails}&dias=7'}, 200),
+        # contact
+        Scenario('contact.create_contact', 'POST', lambda i: {'json': {
+            'nome': 'Visitante', 'email': 'visitante@bench.local', 'mensagem': 'Quero agendar'
+        }}, 201),
+        Scenario('contact.get_contacts', 'GET', lambda i: {'query': 'limit=20'}, 200),
+        Scenario('contact.mark_as_responded', 'PUT', lambda i: {'path': f'/{contacts[i % len(contacts)]}/respond'}, 200),
+    ]
+
+
+def url_for(scenario: Scenario, args: dict) -> str:
+    """
+    URL da rota a partir do nome do endpoint e dos trechos montados pelo cenário
+    """
+    rule = next(r for r in app.url_map.iter_rules()
+                if r.endpoint == scenario.name and scenario.method in r.methods)
+    prefix = rule.rule.split('<')[0].rstrip('/') if '<' in rule.rule else rule.rule
+    path = prefix + args.pop('path', '')
+    query = args.pop('query', None)
+    return f'{path}?{query}' if query else path
+
+
+def call(client, scenario: Scenario, i: int) -> float:
+    args = scenario.request(i)
+    url = url_for(scenario, args)
+    start = time.perf_counter()
+    response = client.open(url, method=scenario.method, **args)
+    response.get_data()
+    elapsed = (time.perf_counter() - start) * 1000
+    assert response.status_code == scenario.expected, \
+        f'{scenario.name}: status {response.status_code} (esperado {scenario.expected}): {response.get_data(as_text=True)[:300]}'
+    return elapsed
+
+
+def percentiles(samples: list) -> dict:
+    samples = sorted(samples)
+    return {
+        'p50': samples[len(samples) // 2],
+        'p95': samples[max(int(len(samples) * 0.95) - 1, 0)],
+        'p99': samples[max(int(len(samples) * 0.99) - 1, 0)],
+    }
+
+
+def run_sequential(scenario: Scenario, iterations: int, warmup: int) -> dict:
+    client = app.test_client()
+    for i in range(warmup):
+        call(client, scenario, i)
+    return percentiles([call(client, scenario, warmup + i) for i in range(iterations)])
+
+
+def run_load(scenario: Scenario, requests: int, concurrency: int, offset: int) -> dict:
+    """
+    ``requests`` chamadas divididas entre ``concurrency`` threads, cada uma com seu test client
+    """
+    counter = itertools.count(offset)
+    local = threading.local()
+
+    def worker(_):
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        return call(local.client, scenario, next(counter))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = list(executor.map(worker, range(requests)))
+    elapsed = time.perf_counter() - start
+    return {'rps': requests / elapsed, **{f'load_{k}': v for k, v in percentiles(samples).items()}}
+
+
+def measure_scenario(scenario: Scenario, args, fake: FakeSupabase, offset: int = 0) -> dict:
+    calls = sum(fake.calls.values())
+    result = run_sequential(scenario, args.iterations, args.warmup)
+    result['calls'] = (sum(fake.calls.values()) - calls) / (args.iterations + args.warmup)
+    result.update(run_load(scenario, args.load_requests, args.concurrency, offset + args.warmup + args.iterations))
+    return result
+
+
+def best_of(first: dict, second: dict) -> dict:
+    return {k: max(v, second[k]) if k == 'rps' else min(v, second[k]) for k, v in first.items()}
+
+
+def compare(results: dict, baseline: dict, tolerance: float, slack_ms: float) -> list:
+    """
+    Regressões como (endpoint, descrição)
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric in ('p50', 'p95'):
+            limit = previous[metric] * (1 + tolerance) + slack_ms
+            if current[metric] > limit:
+                regressions.append((name, f'{metric} {current[metric]:.2f} ms > {limit:.2f} ms '
+                                          f'(linha de base {previous[metric]:.2f} ms)'))
+        if 'rps' in current and 'rps' in previous and current['rps'] < previous['rps'] * (1 - tolerance):
+            regressions.append((name, f'vazão {current["rps"]:.0f} req/s < {previous["rps"] * (1 - tolerance):.0f} '
+                                      f'(linha de base {previous["rps"]:.0f} req/s)'))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.005, help='latência de cada chamada ao Supabase falso (s)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='acréscimo aleatório de até N segundos por chamada')
+    parser.add_argument('--tutors', type=int, default=200, help='tamanho da base (3 animais por tutor)')
+    parser.add_argument('--iterations', type=int, default=60)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--load-requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--only', help='prefixo dos endpoints (ex.: appointments ou auth.login)')
+    parser.add_argument('--tolerance', type=float, default=0.3, help='piora relativa aceita (0.3 = 30%%)')
+    parser.add_argument('--slack-ms', type=float, default=1.0, help='piora absoluta aceita em p50/p95 (ms)')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args()
+
+    # Cada rota pode rodar duas vezes (confirmação de regressão)
+    consumable = 2 * (args.warmup + args.iterations + args.load_requests)
+    # Arquivo em vez de memória compartilhada: o SQLite em memória trava a tabela inteira
+    # em escritas concorrentes, o arquivo espera o lock (timeout do sqlite3)
+    directory = tempfile.mkdtemp(prefix='vetcare-routes-')
+    try:
+        run(args, parser, os.path.join(directory, 'bench.db'), consumable)
+    finally:
+        shutil.rmtree(directory)
+
+
+def run(args, parser, path: str, consumable: int):
+    engine = create_sqlite_engine(path, pool_size=args.concurrency + 2)
+    data = build_dataset(engine, args.tutors, consumable)
+    fake = install(FakeSupabase(engine, latency=args.latency, jitter=args.jitter))
+    scenarios = [s for s in build_scenarios(data) if not args.only or s.name.startswith(args.only)]
+    config = {'latency': args.latency, 'jitter': args.jitter, 'tutors': args.tutors, 'iterations': args.iterations,
+              'load_requests': args.load_requests, 'concurrency': args.concurrency,
+              'bcrypt_rounds': int(os.environ['BCRYPT_ROUNDS'])}
+
+    print(f'{len(scenarios)} rotas, base com {len(data["animals"])} animais, latência do Supabase falso '
+          f'{args.latency * 1000:.1f} ms, BCRYPT_ROUNDS={config["bcrypt_rounds"]}, {os.cpu_count()} núcleos')
+    results = {}
+    for scenario in scenarios:
+        results[scenario.name] = measure_scenario(scenario, args, fake)
+
+    print_table(f'Sequencial ({args.iterations} req/rota) e carga ({args.load_requests} req/rota, '
+                f'{args.concurrency} threads), latências em ms',
+                [{'endpoint': name, **r} for name, r in results.items()],
+                ['endpoint', 'calls', 'p50', 'p95', 'p99', 'load_p95', 'rps'])
+
+    if args.update_baseline:
+        if args.only:
+            parser.error('--update-baseline grava todas as rotas; rode sem --only')
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'config': config, 'endpoints': results}, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'\nLinha de base gravada em {args.baseline}')
+        return
+
+    if not os.path.exists(args.baseline):
+        print('\nSem linha de base (rode com --update-baseline)')
+        return
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline['config'] != config:
+        print(f'\nLinha de base gravada com outros parâmetros ({baseline["config"]}); comparação ignorada')
+        return
+
+    regressions = compare(results, baseline['endpoints'], args.tolerance, args.slack_ms)
+    if regressions:
+        # Confirmação: mede de novo as rotas suspeitas e fica com o melhor das duas medições
+        # (a vazão sob carga varia de uma execução para outra, principalmente com poucos núcleos)
+        suspects = {name for name, _ in regressions}
+        offset = args.warmup + args.iterations + args.load_requests
+        for scenario in scenarios:
+            if scenario.name in suspects:
+                results[scenario.name] = best_of(results[scenario.name], measure_scenario(scenario, args, fake, offset))
+        regressions = compare(results, baseline['endpoints'], args.tolerance, args.slack_ms)
+    if regressions:
+        print('\nRegressões em relação à linha de base (confirmadas em uma segunda medição):')
+        for name, description in regressions:
+            print(f'  - {name}: {description}')
+        sys.exit(1)
+    print(f'\nSem regressões em relação à linha de base (tolerância {args.tolerance:.0%} + {args.slack_ms} ms)')
+
+
+if __name__ == '__main__':
+    main()
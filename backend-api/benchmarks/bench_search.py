@@ -0,0 +1,118 @@
+"""
+Busca de animais: ILIKE '%termo%' na view x RPC buscar_animais (índice de trigramas)
+
+Popula uma base grande (1 milhão de animais por padrão) com nomes realistas e mede, para
+termos raros, comuns e curtos (os casos de borda ficam em tests/test_search.py):
+- ILIKE: o filtro antigo (nome_animal.ilike.%q%,nome_tutor.ilike.%q%) na view, sem índice
+- RPC: buscar_animais restrita à clínica (tabelas FTS5 trigram no SQLite)
+- endpoint: GET /api/animals/search autenticado como a clínica
+
+No SQLite a RPC usa as tabelas FTS5 do schema_sqlite.sql; no PostgreSQL, os índices GIN
+de trigramas do schema.sql.
+
+Uso:
+    python -m benchmarks.bench_search --animals 1000000
+"""
+import argparse
+import random
+import time
+import uuid
+
+from benchmarks.common import SENHA_HASH, create_sqlite_engine, measure, print_table
+from src.config import database
+from src.main import app
+from src.utils.auth import generate_token
+
+PET_NAMES = [
+    'Thor', 'Mel', 'Luna', 'Bob', 'Nina', 'Fred', 'Pipoca', 'Amora', 'Bidu', 'Toby', 'Lola', 'Max',
+    'Frida', 'Paçoca', 'Belinha', 'Simba', 'Chico', 'Jade', 'Zeus', 'Pérola', 'Mia', 'Pretinha',
+    'Costelinha', 'Biscoito', 'Fumaça', 'Jabuticaba', 'Pandora', 'Tião', 'Açúcar', 'Estopinha',
+]
+FIRST_NAMES = ['Ana', 'José', 'Maria', 'João', 'Antônio', 'Francisca', 'Luís', 'Márcia', 'Sebastião', 'Cecília']
+LAST_NAMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Conceição', 'Araújo', 'Gonçalves', 'Simões', 'Assunção']
+RARE_NAME = 'Zeferino Quixabá'
+
+
+def seed_search(engine, animals: int, clinics: int, animals_per_tutor: int = 2) -> dict:
+    """
+    Insere clínicas, tutores e animais direto no SQLite (em lotes), com nomes variados
+    """
+    rng = random.Random(42)
+    clinic_ids = [uuid.uuid4().hex for _ in range(clinics)]
+    tutors = max(animals // animals_per_tutor, 1)
+    tutor_ids = [uuid.uuid4().hex for _ in range(tutors)]
+
+    with engine.pool.connection() as conn:
+        conn.executemany(
+            'INSERT INTO usuarios_clinicas (id, nome_clinica, email, senha_hash) VALUES (?, ?, ?, ?)',
+            [(cid, f'Clínica {i}', f'clinica{i}@busca.local', SENHA_HASH) for i, cid in enumerate(clinic_ids)],
+        )
+        conn.executemany(
+            'INSERT INTO usuarios_tutores (id, nome, email, senha_hash) VALUES (?, ?, ?, ?)',
+            [(tid, f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}',
+              f'tutor{i}@busca.local', SENHA_HASH) for i, tid in enumerate(tutor_ids)],
+        )
+        batch = []
+        for i in range(animals):
+            name = f'{rng.choice(PET_NAMES)} {rng.randrange(1000)}'
+            batch.append((uuid.uuid4().hex, name, 'Cão', tutor_ids[i // animals_per_tutor],
+                          clinic_ids[i % clinics], f'2024-01-01 00:00:{i:07d}'))
+            if len(batch) == 10000 or i == animals - 1:
+                conn.executemany(
+                    'INSERT INTO animais (id, nome, especie, tutor_id, clinica_id, criado_em) '
+                    'VALUES (?, ?, ?, ?, ?, ?)', batch,
+                )
+                batch = []
+        conn.execute('UPDATE animais SET nome = ? WHERE rowid = (SELECT min(rowid) FROM animais)', [RARE_NAME])
+        conn.commit()
+
+    return {'clinics': clinic_ids, 'tutors': tutor_ids}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--animals', type=int, default=1000000)
+    parser.add_argument('--clinics', type=int, default=200)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_sqlite_engine()
+    start = time.perf_counter()
+    data = seed_search(engine, args.animals, args.clinics)
+    print(f'{args.animals} animais inseridos em {time.perf_counter() - start:.1f}s')
+    database.set_engine(engine)
+
+    client = app.test_client()
+    clinic_id = data['clinics'][0]
+    with app.app_context():
+        clinic_headers = {'Authorization': f'Bearer {generate_token(clinic_id, "clinica")}'}
+
+    terms = [('raro', 'quixaba'), ('comum', 'thor'), ('sobrenome do tutor', 'conceicao'), ('curto', 'mi')]
+    rows = []
+    for label, term in terms:
+        def legacy():
+            # Filtro antigo, sem escopo e com o termo concatenado no or=
+            return database.db.table('view_animais_completo').select('id, nome_animal').or_(
+                f'nome_animal.ilike.%{term}%,nome_tutor.ilike.%{term}%'
+            ).order('criado_em', desc=True).limit(args.limit + 1).execute()
+
+        def rpc():
+            return database.db.rpc('buscar_animais', {
+                'p_termo': term, 'p_clinica_id': clinic_id, 'p_limite': args.limit + 1
+            }).execute()
+
+        def endpoint():
+            return client.get('/api/animals/search', query_string={'q': term, 'limit': args.limit},
+                              headers=clinic_headers)
+
+        for strategy, fn in [('ILIKE', legacy), ('RPC', rpc), ('endpoint', endpoint)]:
+            result = measure(fn, iterations=args.iterations, warmup=2)
+            rows.append({'busca': f'{label} ({term}), {strategy}', **result})
+
+    print_table(f'Busca em {args.animals} animais, página de {args.limit} (ms)', rows,
+                ['busca', 'mean', 'p50', 'p95', 'p99'])
+
+
+if __name__ == '__main__':
+    main()
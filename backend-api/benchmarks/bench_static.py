@@ -0,0 +1,152 @@
+"""
+Arquivos estáticos: serve() antigo (os.path.exists + send_from_directory, compressão a cada
+requisição) x manifesto em memória com variantes brotli/gzip pré-comprimidas
+
+Gera um build falso do Vite (index.html, JS e CSS com hash no nome, imagem, favicon) e
+mede por arquivo (os casos de borda ficam em tests/test_static_assets.py):
+- latência (p50/p95) e bytes trafegados com Accept-Encoding: br, gzip
+- chamadas a os.stat/open por requisição
+- revalidação com If-None-Match
+
+Uso:
+    python -m benchmarks.bench_static --js-size 600000
+"""
+import argparse
+import builtins
+import os
+import random
+import shutil
+import tempfile
+
+from flask import Flask, send_from_directory
+from flask_cors import CORS
+
+from benchmarks.common import measure, print_table
+from src import main as server
+from src.utils.compression import init_compression
+from src.utils.static_assets import StaticAssets
+
+JS_NAME = 'assets/index-BxYz12_a.js'
+CSS_NAME = 'assets/index-C4fQ9k-2.css'
+IMAGE_NAME = 'assets/logo-D8aLm0Qz.png'
+
+
+def write_build(root: str, js_size: int):
+    """
+    Build falso do Vite: textos repetitivos como um bundle real (comprimem ~4x)
+    """
+    rng = random.Random(7)
+    words = ['function', 'return', 'const', 'useState', 'props', 'children', 'className', 'onClick',
+             'animal', 'agendamento', 'clinica', 'tutor', 'null', 'undefined', '=>', '{', '}', '(', ')']
+    os.makedirs(os.path.join(root, 'assets'))
+
+    def text(size):
+        parts, total = [], 0
+        while total < size:
+            word = rng.choice(words) + rng.choice([' ', ';', ',', '.', '\n'])
+            parts.append(word)
+            total += len(word)
+        return ''.join(parts)
+
+    files = {
+        'index.html': f'<!doctype html><html><head><script type="module" src="/{JS_NAME}"></script>'
+                      f'<link rel="stylesheet" href="/{CSS_NAME}"></head><body><div id="root"></div>'
+                      f'{text(2000)}</body></html>'.encode(),
+        JS_NAME: text(js_size).encode(),
+        CSS_NAME: text(js_size // 10).encode(),
+        IMAGE_NAME: rng.randbytes(200_000),
+        'favicon.svg': ('<svg xmlns="http://www.w3.org/2000/svg">' + '<rect/>' * 400 + '</svg>').encode(),
+    }
+    for name, body in files.items():
+        with open(os.path.join(root, name), 'wb') as f:
+            f.write(body)
+    return files
+
+
+def legacy_app(root: str) -> Flask:
+    """
+    serve() como era antes do manifesto, com os mesmos hooks do app (CORS e compressão)
+    """
+    app = Flask(__name__, static_folder=root)
+    init_compression(app)
+    CORS(app, origins=server.CORS_ORIGINS)
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        file_path = os.path.join(app.static_folder, path)
+        if path != "" and os.path.exists(file_path):
+            return send_from_directory(app.static_folder, path)
+        elif os.path.exists(os.path.join(app.static_folder, 'index.html')):
+            return send_from_directory(app.static_folder, 'index.html')
+        else:
+            return "index.html not found", 404
+
+    return app
+
+
+def count_fs_calls(fn) -> int:
+    """
+    Chamadas a os.stat / open feitas por ``fn`` (os.path.exists usa os.stat)
+    """
+    calls = 0
+    original_stat, original_open = os.stat, builtins.open
+
+    def stat(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        return original_stat(*args, **kwargs)
+
+    def open_(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        return original_open(*args, **kwargs)
+
+    os.stat, builtins.open = stat, open_
+    try:
+        fn()
+    finally:
+        os.stat, builtins.open = original_stat, original_open
+    return calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--js-size', type=int, default=600000)
+    parser.add_argument('--iterations', type=int, default=300)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='vetcare-static-')
+    try:
+        write_build(root, args.js_size)
+        server.static_assets = StaticAssets(root).load()
+        print(f'Manifesto: {server.static_assets.stats()}')
+        client = server.app.test_client()
+
+        legacy = legacy_app(root).test_client()
+        headers = {'Accept-Encoding': 'br, gzip'}
+        rows = []
+        for name in ['index.html', JS_NAME, CSS_NAME, IMAGE_NAME]:
+            url = '/' if name == 'index.html' else f'/{name}'
+            for label, target in [('antigo', legacy), ('manifesto', client)]:
+                response = target.get(url, headers=headers)
+                result = measure(lambda: target.get(url, headers=headers), iterations=args.iterations, warmup=5)
+                etag = response.headers.get('ETag')
+                revalidate = measure(lambda: target.get(url, headers={**headers, 'If-None-Match': etag}),
+                                     iterations=args.iterations, warmup=5)
+                rows.append({
+                    'arquivo': f'{name} ({label})',
+                    'bytes': len(response.data),
+                    'p50 ms': result['p50'],
+                    'p95 ms': result['p95'],
+                    'stat/open': count_fs_calls(lambda: target.get(url, headers=headers)),
+                    '304 p50 ms': revalidate['p50'],
+                })
+        print_table('Arquivos estáticos com Accept-Encoding: br, gzip', rows,
+                    ['arquivo', 'bytes', 'p50 ms', 'p95 ms', 'stat/open', '304 p50 ms'])
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Linha do tempo médica do animal (GET /api/animals/<id>/timeline): view x três consultas
+
+Mede, com o Supabase falso a ``--latency`` ms por chamada e ``--animals`` animais com
+``--events`` eventos cada (os casos de borda ficam em tests/test_timeline.py):
+- a rota, que lê uma página da view_linha_do_tempo_animal em uma chamada
+- a alternativa de três consultas (uma por tabela) intercaladas em Python
+
+Uso:
+    python -m benchmarks.bench_timeline --animals 20000 --events 30 --latency 5
+"""
+import argparse
+import heapq
+import os
+import random
+import shutil
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+from benchmarks.common import SENHA_HASH, create_sqlite_engine, measure, print_table
+from benchmarks.fake_supabase import FakeSupabase, install
+from src.config.database import db
+from src.main import app
+from src.utils.auth import generate_token
+
+VIEW = 'view_linha_do_tempo_animal'
+
+
+def auth(user_id: str, user_type: str) -> dict:
+    with app.app_context():
+        return {'Authorization': f'Bearer {generate_token(user_id, user_type)}'}
+
+
+def timeline(client, animal: str, headers: dict, **params):
+    query = '&'.join(f'{k}={v}' for k, v in params.items())
+    return client.get(f'/api/animals/{animal}/timeline?{query}', headers=headers)
+
+
+def animal_id(i: int) -> str:
+    # A rota só aceita UUID
+    return str(uuid.UUID(int=i))
+
+
+def populate(engine, animals: int, events: int, seed_value: int = 13) -> dict:
+    """
+    ``animals`` animais com ``events`` eventos cada (metade agendamentos, um quarto consultas, um quarto vacinas)
+    """
+    rnd = random.Random(seed_value)
+    clinics = max(1, animals // 500)
+    tutors = max(1, animals // 2)
+    start = date(2020, 1, 1)
+    with engine.pool.connection() as conn:
+        conn.executemany('INSERT INTO usuarios_clinicas (id, nome_clinica, email, senha_hash) VALUES (?, ?, ?, ?)',
+                         ((f'c{i}', f'Clínica {i}', f'clinica{i}@bench.local', SENHA_HASH) for i in range(clinics)))
+        conn.executemany('INSERT INTO usuarios_tutores (id, nome, email, senha_hash) VALUES (?, ?, ?, ?)',
+                         ((f't{i}', f'Tutor {i}', f'tutor{i}@bench.local', SENHA_HASH) for i in range(tutors)))
+        conn.executemany('INSERT INTO animais (id, nome, especie, tutor_id, clinica_id) VALUES (?, ?, ?, ?, ?)',
+                         ((animal_id(i), f'Animal {i}', 'Cão', f't{i % tutors}', f'c{i % clinics}')
+                          for i in range(animals)))
+
+        appointments, consultations, vaccines = [], [], []
+        for a in range(animals):
+            for e in range(events):
+                day = start + timedelta(days=rnd.randrange(6 * 365))
+                clinic = f'c{a % clinics}'
+                if e % 4 < 2:
+                    appointments.append((f'g{a}-{e}', f't{a % tutors}', clinic, animal_id(a), day.isoformat(),
+                                         f'{8 + e % 10:02d}:00', 'concluido', 'Consulta Geral', 100))
+                elif e % 4 == 2:
+                    consultations.append((f'k{a}-{e}', f'g{a}-{e - 2}', animal_id(a), clinic,
+                                          f'{day.isoformat()}T10:{e % 60:02d}:00+00:00', 'Diagnóstico ' * 4,
+                                          'Tratamento ' * 8, 150))
+                else:
+                    vaccines.append((f'v{a}-{e}', animal_id(a), clinic, 'V10', day.isoformat(),
+                                     (day + timedelta(days=365)).isoformat()))
+        conn.executemany('INSERT INTO agendamentos (id, tutor_id, clinica_id, animal_id, data_agendamento, horario, '
+                         'status, tipo_consulta, valor) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', appointments)
+        conn.executemany('INSERT INTO consultas (id, agendamento_id, animal_id, clinica_id, data_consulta, '
+                         'diagnostico, tratamento, valor) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', consultations)
+        conn.executemany('INSERT INTO vacinas (id, animal_id, clinica_id, nome_vacina, data_aplicacao, '
+                         'data_vencimento) VALUES (?, ?, ?, ?, ?, ?)', vaccines)
+        conn.execute('ANALYZE')
+    return {'clinics': clinics, 'tutors': tutors,
+            'rows': len(appointments) + len(consultations) + len(vaccines)}
+
+
+def three_queries(animal: str, limit: int) -> list:
+    """
+    Alternativa descartada: uma consulta por tabela (cada uma com limit + 1) e a intercalação em Python
+    """
+    consultations = db.table('consultas').select('id, data_consulta, diagnostico, tratamento, medicamentos, '
+                                                 'veterinario, valor, proxima_consulta, clinica_id') \
+        .eq('animal_id', animal).order('data_consulta', desc=True).limit(limit + 1).execute().data
+    vaccines = db.table('vacinas').select('id, data_aplicacao, nome_vacina, observacoes, veterinario, '
+                                          'data_vencimento, clinica_id') \
+        .eq('animal_id', animal).order('data_aplicacao', desc=True).limit(limit + 1).execute().data
+    appointments = db.table('agendamentos').select('id, data_agendamento, horario, tipo_consulta, observacoes, '
+                                                   'status, valor, clinica_id') \
+        .eq('animal_id', animal).order('data_agendamento', desc=True).order('horario', desc=True) \
+        .limit(limit + 1).execute().data
+
+    def when(row):
+        if 'data_consulta' in row:
+            return datetime.fromisoformat(row['data_consulta']).replace(tzinfo=None)
+        if 'horario' in row:
+            return datetime.fromisoformat(f'{row["data_agendamento"]}T{row["horario"]}')
+        return datetime.fromisoformat(row['data_aplicacao'])
+
+    merged = heapq.merge(consultations, vaccines, appointments, key=lambda row: (when(row), row['id']), reverse=True)
+    return list(merged)[:limit + 1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--animals', type=int, default=20_000)
+    parser.add_argument('--events', type=int, default=30, help='eventos por animal')
+    parser.add_argument('--latency', type=float, default=5.0, help='latência do Supabase falso (ms)')
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='vetcare-linha-do-tempo-')
+    try:
+        engine = create_sqlite_engine(os.path.join(directory, 'linha.db'))
+        start = time.perf_counter()
+        counts = populate(engine, args.animals, args.events)
+        print(f'\nBase: {args.animals} animais, {counts["rows"]} eventos '
+              f'({time.perf_counter() - start:.1f} s para gerar)')
+        fake = install(FakeSupabase(engine, latency=args.latency / 1000))
+        client = app.test_client()
+        rnd = random.Random(5)
+        headers = {}
+
+        def route():
+            a = rnd.randrange(args.animals)
+            headers.setdefault(a, auth(f't{a % counts["tutors"]}', 'tutor'))
+            response = timeline(client, animal_id(a), headers[a], limit=args.limit)
+            assert response.status_code == 200 and len(response.get_json()['timeline']) == args.limit
+
+        def view_only():
+            db.table(VIEW).select('*').eq('animal_id', animal_id(rnd.randrange(args.animals))) \
+                .order('data', desc=True).order('id', desc=True).limit(args.limit + 1).execute()
+
+        def merged():
+            assert len(three_queries(animal_id(rnd.randrange(args.animals)), args.limit)) == args.limit + 1
+
+        rows = []
+        for name, fn in [('rota (dono + view)', route), ('view (1 chamada)', view_only),
+                         ('3 consultas + merge', merged)]:
+            fake.calls.clear()
+            result = measure(fn, iterations=args.iterations, warmup=10)
+            rows.append({'modo': name, 'p50 ms': result['p50'], 'p95 ms': result['p95'],
+                         'chamadas': sum(fake.calls.values()) / (args.iterations + 10)})
+        print_table(f'Página de {args.limit} eventos (Supabase falso a {args.latency:.0f} ms por chamada)', rows,
+                    ['modo', 'p50 ms', 'p95 ms', 'chamadas'])
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
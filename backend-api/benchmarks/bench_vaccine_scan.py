@@ -0,0 +1,136 @@
+"""
+Vacinas: varredura de vencimentos (lembretes por tutor e clínica)
+
+Mede, num SQLite local com ``--vaccines`` vacinas (os casos de borda ficam em
+tests/test_vaccines.py):
+- uma varredura de ``--days`` dias pela view, página a página (tempo, páginas, memória)
+- a mesma faixa lida sem o índice (varredura da tabela inteira), para comparação
+
+Uso:
+    python -m benchmarks.bench_vaccine_scan --vaccines 3000000 --days 30
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from benchmarks.common import SENHA_HASH, create_sqlite_engine, print_table
+from src.config import database
+from src.utils.vaccine_reminders import due_vaccine_pages, group_reminders
+
+VACCINE_NAMES = ['V10', 'Antirrábica', 'Giárdia', 'Gripe canina', 'V4 felina', 'V5 felina', 'Leishmaniose', 'FeLV']
+
+
+def populate(engine, vaccines: int, today: date, seed_value: int = 11):
+    """
+    Tutores, animais e ``vaccines`` vacinas aplicadas nos últimos 3 anos (10% sem vencimento)
+    """
+    rnd = random.Random(seed_value)
+    clinics = max(1, vaccines // 15000)
+    tutors = max(1, vaccines // 60)
+    animals = max(1, vaccines // 15)
+    with engine.pool.connection() as conn:
+        conn.executemany('INSERT INTO usuarios_clinicas (id, nome_clinica, email, senha_hash) VALUES (?, ?, ?, ?)',
+                         ((f'c{i}', f'Clínica {i}', f'clinica{i}@bench.local', SENHA_HASH) for i in range(clinics)))
+        conn.executemany('INSERT INTO usuarios_tutores (id, nome, email, senha_hash, telefone) VALUES (?, ?, ?, ?, ?)',
+                         ((f't{i}', f'Tutor {i}', f'tutor{i}@bench.local', SENHA_HASH, '11999990000')
+                          for i in range(tutors)))
+        conn.executemany('INSERT INTO animais (id, nome, especie, tutor_id, clinica_id) VALUES (?, ?, ?, ?, ?)',
+                         ((f'a{i}', f'Animal {i}', 'Cão', f't{rnd.randrange(tutors)}', f'c{rnd.randrange(clinics)}')
+                          for i in range(animals)))
+
+        def rows():
+            for i in range(vaccines):
+                applied = today - timedelta(days=rnd.randrange(3 * 365))
+                expires = None if rnd.random() < 0.1 else (applied + timedelta(days=365)).isoformat()
+                yield (f'v{i:09d}', f'a{rnd.randrange(animals)}', f'c{rnd.randrange(clinics)}',
+                       rnd.choice(VACCINE_NAMES), applied.isoformat(), expires, f'L{i % 997}')
+
+        conn.executemany('INSERT INTO vacinas (id, animal_id, clinica_id, nome_vacina, data_aplicacao, '
+                         'data_vencimento, lote) VALUES (?, ?, ?, ?, ?, ?, ?)', rows())
+        conn.execute('ANALYZE')
+    return {'clinics': clinics, 'tutors': tutors, 'animals': animals}
+
+
+def scan(days: int, today: date, page_size: int) -> dict:
+    page_times = []
+    pages = due_vaccine_pages(days, today, page_size=page_size)
+
+    def timed_pages():
+        while True:
+            start = time.perf_counter()
+            rows = next(pages, None)
+            if rows is None:
+                return
+            page_times.append((time.perf_counter() - start) * 1000)
+            yield rows
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    reminders = group_reminders(timed_pages())
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    page_times.sort()
+    return {
+        'seconds': elapsed,
+        'pages': len(page_times),
+        'page_p50': page_times[len(page_times) // 2] if page_times else 0,
+        'page_p95': page_times[min(len(page_times) - 1, int(len(page_times) * 0.95))] if page_times else 0,
+        'reminders': len(reminders),
+        'vaccines': sum(len(reminder['vacinas']) for reminder in reminders),
+        'peak_mb': peak / 1024 / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--vaccines', type=int, default=3_000_000)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--page-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='vetcare-vacinas-')
+    try:
+        engine = create_sqlite_engine(os.path.join(directory, 'vacinas.db'))
+        today = date(2026, 6, 1)
+        start = time.perf_counter()
+        counts = populate(engine, args.vaccines, today)
+        print(f'\nBase: {args.vaccines} vacinas, {counts["animals"]} animais, {counts["tutors"]} tutores, '
+              f'{counts["clinics"]} clínicas ({time.perf_counter() - start:.1f} s para gerar)')
+        database.set_engine(engine)
+
+        result = scan(args.days, today, args.page_size)
+        end = (today + timedelta(days=args.days)).isoformat()
+        with engine.pool.connection() as conn:
+            start = time.perf_counter()
+            full = conn.execute('SELECT count(*) FROM vacinas NOT INDEXED WHERE data_vencimento >= ? '
+                                'AND data_vencimento <= ?', [today.isoformat(), end]).fetchone()[0]
+            full_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            indexed = conn.execute('SELECT count(*) FROM vacinas WHERE data_vencimento >= ? AND data_vencimento <= ?',
+                                   [today.isoformat(), end]).fetchone()[0]
+            indexed_seconds = time.perf_counter() - start
+
+        print_table(f'Varredura de {args.days} dias (páginas de {args.page_size})', [
+            {'etapa': 'lembretes pela view (páginas)', 's': result['seconds'], 'linhas': result['vaccines'],
+             'páginas': result['pages']},
+            {'etapa': 'faixa pelo índice (count)', 's': indexed_seconds, 'linhas': indexed, 'páginas': ''},
+            {'etapa': 'faixa sem índice (tabela inteira, count)', 's': full_seconds, 'linhas': full, 'páginas': ''},
+        ], ['etapa', 's', 'linhas', 'páginas'])
+        print_table('Detalhes da varredura', [
+            {'medida': 'página p50 (ms)', 'valor': result['page_p50']},
+            {'medida': 'página p95 (ms)', 'valor': result['page_p95']},
+            {'medida': 'lembretes (tutor x clínica)', 'valor': result['reminders']},
+            {'medida': 'pico de memória Python (MB)', 'valor': result['peak_mb']},
+        ], ['medida', 'valor'])
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Utilitários compartilhados pelos benchmarks
+
+Execute os benchmarks a partir da pasta backend-api, por exemplo:
+    python -m benchmarks.bench_engines
+"""
+import os
+import statistics
+import time
+import uuid
+from datetime import date, timedelta
+
+from src.database.engines import SQLEngine
+
+SCHEMA_SQLITE = os.path.join(os.path.dirname(__file__), '..', '..', 'database', 'schema_sqlite.sql')
+SENHA_HASH = '$2b$12$C6UzMDM.H6dfI/f/IKcEeO5vYb0xEMT5Bj1ZB1qpFQjTl3nVQp5gS'
+
+
+def create_sqlite_engine(path: str = None, pool_size: int = 5) -> SQLEngine:
+    """
+    Cria um banco SQLite (em memória por padrão) com o esquema da aplicação
+    """
+    url = f'sqlite:///{path}' if path else 'sqlite://'
+    engine = SQLEngine.from_url(url, pool_size=pool_size)
+    with open(SCHEMA_SQLITE, encoding='utf-8') as f:
+        engine.execute_script(f.read())
+    return engine
+
+
+def seed(engine, tutors: int = 10, clinics: int = 2, animals_per_tutor: int = 5,
+         appointments_per_animal: int = 4, text_size: int = 200) -> dict:
+    """
+    Popula o banco pela própria camada de dados (funciona com qualquer engine)
+    """
+    tag = uuid.uuid4().hex[:8]
+    clinic_rows = engine.table('usuarios_clinicas').insert([
+        {'nome_clinica': f'Clínica {i}', 'email': f'clinica{i}-{tag}@bench.local',
+         'senha_hash': SENHA_HASH, 'telefone': '1133334444'}
+        for i in range(clinics)
+    ]).execute().data
+    tutor_rows = engine.table('usuarios_tutores').insert([
+        {'nome': f'Tutor {i}', 'email': f'tutor{i}-{tag}@bench.local',
+         'senha_hash': SENHA_HASH, 'telefone': '11999998888'}
+        for i in range(tutors)
+    ]).execute().data
+
+    animals = []
+    for t, tutor in enumerate(tutor_rows):
+        animals += engine.table('animais').insert([
+            {'nome': f'Animal {t}-{i}', 'especie': 'Cão', 'raca': 'SRD', 'sexo': 'Macho',
+             'historico_medico': 'x' * text_size, 'observacoes': 'y' * text_size,
+             'tutor_id': tutor['id'], 'clinica_id': clinic_rows[i % clinics]['id']}
+            for i in range(animals_per_tutor)
+        ]).execute().data
+
+    appointments = []
+    start = date.today() + timedelta(days=1)
+    for a, animal in enumerate(animals):
+        rows = []
+        for i in range(appointments_per_animal):
+            slot = a * appointments_per_animal + i
+            rows.append({
+                'tutor_id': animal['tutor_id'], 'clinica_id': animal['clinica_id'],
+                'animal_id': animal['id'],
+                'data_agendamento': (start + timedelta(days=slot // 16)).isoformat(),
+                'horario': f'{8 + (slot % 16) // 2:02d}:{30 * (slot % 2):02d}',
+                'status': 'pendente',
+            })
+        if rows:
+            appointments += engine.table('agendamentos').insert(rows).execute().data
+
+    return {'clinics': clinic_rows, 'tutors': tutor_rows, 'animals': animals, 'appointments': appointments}
+
+
+def measure(fn, iterations: int = 200, warmup: int = 10) -> dict:
+    """
+    Mede a latência de ``fn`` e devolve média e percentis em milissegundos
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'mean': statistics.fmean(samples),
+        'p50': samples[len(samples) // 2],
+        'p95': samples[int(len(samples) * 0.95) - 1],
+        'p99': samples[int(len(samples) * 0.99) - 1],
+    }
+
+
+def print_table(title: str, rows: list, columns: list):
+    """
+    Imprime os resultados em formato de tabela (a primeira coluna é o rótulo)
+    """
+    print(f'\n{title}')
+    header = f'{columns[0]:<48}' + ''.join(f'{c:>12}' for c in columns[1:])
+    print(header)
+    print('-' * len(header))
+    for row in rows:
+        line = f'{str(row[columns[0]]):<48}'
+        for c in columns[1:]:
+            value = row[c]
+            line += f'{value:>12.3f}' if isinstance(value, float) else f'{str(value):>12}'
+        print(line)
@@ -0,0 +1,80 @@
+"""
+Cliente Supabase falso, em processo, para os benchmarks das rotas
+
+Tem a mesma interface fluente do cliente real (``table(...).select(...).eq(...).execute()``
+e ``rpc(...)``), implementada pela engine SQL sobre um SQLite em memória com o esquema da
+aplicação. Cada ``execute()`` espera ``latency`` segundos (mais um sorteio de até
+``jitter``) antes de ir ao banco, simulando a ida e volta ao PostgREST. A espera é um
+``time.sleep``: libera o GIL como a espera de rede real.
+
+Uso:
+    fake = FakeSupabase(create_sqlite_engine(), latency=0.005)
+    install(fake)   # substitui src.config.database.supabase
+"""
+import random
+import threading
+import time
+from collections import Counter
+
+from src.config import database
+from src.database.engines import PostgrestEngine
+
+
+class FakeQuery:
+    """
+    Construtor de consulta do cliente falso: repassa a cadeia e atrasa o ``execute()``
+    """
+
+    def __init__(self, client, query, table: str):
+        self._client = client
+        self._query = query
+        self._table = table
+
+    def __getattr__(self, name):
+        method = getattr(self._query, name)
+
+        def call(*args, **kwargs):
+            result = method(*args, **kwargs)
+            return self if result is self._query else result
+        return call
+
+    def execute(self):
+        self._client.wait(self._table)
+        return self._query.execute()
+
+
+class FakeSupabase:
+    """
+    Substituto do ``supabase.Client`` com latência configurável por chamada
+    """
+
+    def __init__(self, engine, latency: float = 0.0, jitter: float = 0.0, seed: int = 7):
+        self.engine = engine
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def wait(self, table: str):
+        with self._lock:
+            self.calls[table] += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, self.engine.table(name), name)
+
+    def rpc(self, name: str, params: dict = None) -> FakeQuery:
+        return FakeQuery(self, self.engine.rpc(name, params or {}), name)
+
+
+def install(fake: FakeSupabase):
+    """
+    Troca os clientes globais do Supabase pelo falso e aponta a engine ativa para eles
+    """
+    database.supabase = fake
+    database.supabase_admin = fake
+    database.set_engine(PostgrestEngine(lambda: database.supabase))
+    return fake
@@ -0,0 +1,127 @@
+"""
+Servidor falso do PostgREST (Supabase) para testes de carga locais
+
+Entende o subconjunto de filtros usado pelas rotas (eq, neq, gt, gte, lt, lte, in)
+e adiciona uma latência fixa a cada resposta, simulando a ida e volta ao Supabase.
+
+Uso:
+    python -m benchmarks.fake_upstream --port 18001 --latency 0.05
+"""
+import argparse
+import asyncio
+import uuid
+from datetime import date, timedelta
+
+from aiohttp import web
+
+CLINIC_EMAIL = 'clinica@bench.local'
+CLINIC_ID = '00000000-0000-0000-0000-00000000c001'
+TUTOR_ID = '00000000-0000-0000-0000-00000000a001'
+ANIMAL_ID = '00000000-0000-0000-0000-00000000b001'
+
+OPERATORS = {
+    'eq': lambda a, b: a == b,
+    'neq': lambda a, b: a != b,
+    'gt': lambda a, b: a > b,
+    'gte': lambda a, b: a >= b,
+    'lt': lambda a, b: a < b,
+    'lte': lambda a, b: a <= b,
+}
+
+
+def initial_data(appointments: int = 200) -> dict:
+    today = date.today()
+    return {
+        'usuarios_clinicas': [{'id': CLINIC_ID, 'nome_clinica': 'Clínica Bench', 'email': CLINIC_EMAIL,
+                               'horario_funcionamento': None, 'ativo': 'true'}],
+        'usuarios_tutores': [{'id': TUTOR_ID, 'nome': 'Tutor Bench', 'email': 'tutor@bench.local', 'ativo': 'true'}],
+        'animais': [{'id': ANIMAL_ID, 'nome': 'Rex', 'especie': 'Cão', 'tutor_id': TUTOR_ID,
+                     'clinica_id': CLINIC_ID, 'ativo': 'true'}],
+        'agendamentos': [
+            {'id': str(uuid.uuid4()), 'tutor_id': TUTOR_ID, 'clinica_id': CLINIC_ID, 'animal_id': ANIMAL_ID,
+             'data_agendamento': (today + timedelta(days=i // 16)).isoformat(),
+             'horario': f'{8 + (i % 16) // 2:02d}:{30 * (i % 2):02d}:00', 'status': 'pendente'}
+            for i in range(appointments)
+        ],
+    }
+
+
+def matches(row: dict, filters: list) -> bool:
+    for column, operator, value in filters:
+        current = row.get(column)
+        current = str(current).lower() if isinstance(current, bool) else current
+        if operator == 'in':
+            if str(current) not in value:
+                return False
+        elif not OPERATORS[operator](str(current), value):
+            return False
+    return True
+
+
+def parse_filters(query) -> list:
+    filters = []
+    for column, expression in query.items():
+        if column in ('select', 'order', 'limit', 'offset', 'on_conflict', 'columns'):
+            continue
+        operator, _, value = expression.partition('.')
+        if operator == 'in':
+            value = [v.strip('"') for v in value.strip('()').split(',')]
+        elif value in ('True', 'False'):
+            value = value.lower()
+        filters.append((column, operator, value))
+    return filters
+
+
+def project(row: dict, select: str) -> dict:
+    if not select or select == '*':
+        return row
+    return {c.strip(): row.get(c.strip()) for c in select.split(',')}
+
+
+def create_app(latency: float, appointments: int = 200) -> web.Application:
+    data = initial_data(appointments)
+
+    async def handle(request):
+        await asyncio.sleep(latency)
+        rows = data.setdefault(request.match_info['table'], [])
+        filters = parse_filters(request.query)
+
+        if request.method == 'GET':
+            selected = [project(r, request.query.get('select')) for r in rows if matches(r, filters)]
+            return web.json_response(selected)
+
+        if request.method == 'POST':
+            payload = await request.json()
+            payload = payload if isinstance(payload, list) else [payload]
+            created = [{'id': str(uuid.uuid4()), **row} for row in payload]
+            rows.extend(created)
+            return web.json_response(created, status=201)
+
+        if request.method == 'PATCH':
+            changes = await request.json()
+            updated = []
+            for row in rows:
+                if matches(row, filters):
+                    row.update(changes)
+                    updated.append(row)
+            return web.json_response(updated)
+
+        return web.json_response({'message': 'método não suportado'}, status=405)
+
+    app = web.Application()
+    app.router.add_route('*', '/rest/v1/{table}', handle)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=18001)
+    parser.add_argument('--latency', type=float, default=0.05, help='latência por chamada, em segundos')
+    parser.add_argument('--appointments', type=int, default=200)
+    args = parser.parse_args()
+    web.run_app(create_app(args.latency, args.appointments), host='127.0.0.1', port=args.port,
+                print=None, access_log=None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Teste de carga: modo síncrono (Flask) x modo assíncrono (ASGI) contra um upstream falso
+
+Sobe três processos locais: o PostgREST falso (com latência configurável), o servidor
+Flask (threaded, como em ``python src/main.py``) e o servidor ASGI (uvicorn), e dispara
+requisições concorrentes contra as mesmas rotas nos dois modos.
+
+Uso:
+    python -m benchmarks.load_asgi --requests 2000 --concurrency 200 --latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date
+
+import aiohttp
+import jwt
+
+from benchmarks.fake_upstream import CLINIC_EMAIL, TUTOR_ID
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SECRET_KEY = 'bench-secret'
+
+
+def start(args: list, env: dict) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, *args], cwd=BACKEND_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def wait_ready(url: str, timeout: float = 20.0):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(url) as response:
+                    if response.status < 500:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f'Servidor não respondeu: {url}')
+
+
+async def run_load(base_url: str, requests: int, concurrency: int, token: str) -> dict:
+    targets = [
+        (f'{base_url}/api/appointments/available-times', {'email_clinica': CLINIC_EMAIL, 'data': date.today().isoformat()}, {}),
+        (f'{base_url}/api/appointments/', {}, {'Authorization': f'Bearer {token}'}),
+    ]
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=120)) as session:
+        async def one(i):
+            nonlocal errors
+            url, params, headers = targets[i % len(targets)]
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    async with session.get(url, params=params, headers=headers) as response:
+                        await response.read()
+                        if response.status != 200:
+                            errors += 1
+                except aiohttp.ClientError:
+                    errors += 1
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'req/s': requests / elapsed,
+        'p50 ms': statistics.median(latencies),
+        'p95 ms': latencies[int(len(latencies) * 0.95) - 1],
+        'erros': errors,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.05, help='latência do upstream falso, em segundos')
+    parser.add_argument('--base-port', type=int, default=18001)
+    args = parser.parse_args()
+
+    upstream_port, sync_port, async_port = args.base_port, args.base_port + 1, args.base_port + 2
+    fake_key = jwt.encode({'role': 'anon'}, 'fake', algorithm='HS256')
+    env = {
+        **os.environ,
+        'SUPABASE_URL': f'http://127.0.0.1:{upstream_port}',
+        'SUPABASE_ANON_KEY': fake_key,
+        'SUPABASE_SERVICE_KEY': fake_key,
+        'SECRET_KEY': SECRET_KEY,
+        'DB_ENGINE': 'postgrest',
+        'FLASK_ENV': 'production',
+    }
+    token = jwt.encode({'user_id': TUTOR_ID, 'user_type': 'tutor', 'exp': int(time.time()) + 3600},
+                       SECRET_KEY, algorithm='HS256')
+
+    processes = [
+        start(['-m', 'benchmarks.fake_upstream', '--port', str(upstream_port), '--latency', str(args.latency)], env),
+        start(['-c', f'from src.main import app; app.run(host="127.0.0.1", port={sync_port}, threaded=True)'], env),
+        start(['-m', 'uvicorn', 'src.asgi:app', '--host', '127.0.0.1', '--port', str(async_port),
+               '--log-level', 'warning'], env),
+    ]
+    try:
+        for port in (sync_port, async_port):
+            await wait_ready(f'http://127.0.0.1:{port}/health')
+
+        print(f'{args.requests} requisições, concorrência {args.concurrency}, latência do upstream {args.latency * 1000:.0f} ms')
+        for mode, port in (('sync (Flask)', sync_port), ('async (ASGI)', async_port)):
+            result = await run_load(f'http://127.0.0.1:{port}', args.requests, args.concurrency, token)
+            print(f'{mode:<14} ' + '  '.join(f'{k}: {v:.1f}' if isinstance(v, float) else f'{k}: {v}'
+                                             for k, v in result.items()))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+"""
+Teste de carga: servidor de desenvolvimento (``python src/main.py``) x gunicorn (prefork + threads)
+
+Sobe o PostgREST falso (com latência configurável) e, um de cada vez, o servidor de
+desenvolvimento do Flask e o gunicorn com algumas combinações de workers e threads
+(gunicorn.conf.py, com preload e aquecimento). Para cada um mede a primeira requisição
+autenticada logo após subir (conexão com o banco ainda fria no servidor de
+desenvolvimento) e a vazão sob carga nas mesmas rotas do load_asgi.
+
+Uso:
+    python -m benchmarks.load_server --requests 2000 --concurrency 100 --latency 0.02
+    python -m benchmarks.load_server --servers 1x1,2x8,1x32
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import aiohttp
+import jwt
+
+from benchmarks.fake_upstream import TUTOR_ID
+from benchmarks.load_asgi import SECRET_KEY, run_load, start, wait_ready
+
+
+async def first_request(base_url: str, token: str) -> float:
+    async with aiohttp.ClientSession() as session:
+        start_time = time.perf_counter()
+        async with session.get(f'{base_url}/api/appointments/', headers={'Authorization': f'Bearer {token}'}) as response:
+            await response.read()
+            assert response.status == 200, response.status
+        return (time.perf_counter() - start_time) * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.02, help='latência do upstream falso, em segundos')
+    parser.add_argument('--servers', default='1x1,2x16,4x8', help='combinações workers x threads do gunicorn')
+    parser.add_argument('--base-port', type=int, default=18101)
+    args = parser.parse_args()
+
+    upstream_port, server_port = args.base_port, args.base_port + 1
+    fake_key = jwt.encode({'role': 'anon'}, 'fake', algorithm='HS256')
+    env = {
+        **os.environ,
+        'SUPABASE_URL': f'http://127.0.0.1:{upstream_port}',
+        'SUPABASE_ANON_KEY': fake_key,
+        'SUPABASE_SERVICE_KEY': fake_key,
+        'SECRET_KEY': SECRET_KEY,
+        'DB_ENGINE': 'postgrest',
+        'FLASK_ENV': 'production',
+        'PORT': str(server_port),
+    }
+    token = jwt.encode({'user_id': TUTOR_ID, 'user_type': 'tutor', 'exp': int(time.time()) + 3600},
+                       SECRET_KEY, algorithm='HS256')
+
+    servers = [('python src/main.py', ['src/main.py'], {})]
+    for combo in args.servers.split(','):
+        workers, threads = combo.split('x')
+        servers.append((f'gunicorn {workers} workers x {threads} threads',
+                        ['-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'src.main:app'],
+                        {'WEB_CONCURRENCY': workers, 'GUNICORN_THREADS': threads, 'GUNICORN_LOG_LEVEL': 'warning'}))
+
+    upstream = start(['-m', 'benchmarks.fake_upstream', '--port', str(upstream_port),
+                      '--latency', str(args.latency)], env)
+    print(f'{args.requests} requisições, concorrência {args.concurrency}, latência do upstream '
+          f'{args.latency * 1000:.0f} ms, {os.cpu_count()} núcleos')
+    try:
+        for name, command, extra_env in servers:
+            server = start(command, {**env, **extra_env})
+            try:
+                base_url = f'http://127.0.0.1:{server_port}'
+                await wait_ready(f'{base_url}/health')
+                cold = await first_request(base_url, token)
+                result = await run_load(base_url, args.requests, args.concurrency, token)
+                print(f'{name:<34} primeira req: {cold:.1f} ms  ' +
+                      '  '.join(f'{k}: {v:.1f}' if isinstance(v, float) else f'{k}: {v}' for k, v in result.items()))
+            finally:
+                server.terminate()
+                server.wait()
+    finally:
+        upstream.terminate()
+        upstream.wait()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
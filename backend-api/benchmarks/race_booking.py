@@ -0,0 +1,81 @@
+"""
+Corrida de agendamentos: vários tutores tentam reservar o mesmo horário ao mesmo tempo
+
+Com a função criar_agendamento e o índice único parcial, exatamente uma requisição
+deve receber 201 e todas as outras 409. O script sai com código 1 caso contrário.
+
+Por padrão usa um arquivo SQLite temporário; com DATABASE_URL definida (schema.sql
+aplicado) roda contra o PostgreSQL.
+
+Uso:
+    python -m benchmarks.race_booking --requests 20
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+from collections import Counter
+from datetime import date, timedelta
+
+from benchmarks.common import create_sqlite_engine, seed
+from src.config import database
+from src.database.engines import SQLEngine
+from src.main import app
+from src.utils.auth import generate_token
+
+
+def run(engine, requests: int) -> Counter:
+    data = seed(engine, tutors=requests, clinics=1, animals_per_tutor=1, appointments_per_animal=0)
+    database.set_engine(engine)
+    clinic = data['clinics'][0]
+    payload = {
+        'email_clinica': clinic['email'],
+        'data_agendamento': (date.today() + timedelta(days=30)).isoformat(),
+        'horario': '10:00',
+    }
+
+    barrier = threading.Barrier(requests)
+    statuses = Counter()
+    lock = threading.Lock()
+
+    with app.app_context():
+        tokens = {animal['id']: generate_token(animal['tutor_id'], 'tutor') for animal in data['animals']}
+
+    def book(animal):
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {tokens[animal["id"]]}'}
+        barrier.wait()
+        response = client.post('/api/appointments/', json={**payload, 'animal_id': animal['id']}, headers=headers)
+        with lock:
+            statuses[response.status_code] += 1
+
+    threads = [threading.Thread(target=book, args=(animal,)) for animal in data['animals']]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=20)
+    args = parser.parse_args()
+
+    if os.getenv('DATABASE_URL'):
+        statuses = run(SQLEngine.from_url(os.environ['DATABASE_URL'], pool_size=args.requests), args.requests)
+    else:
+        with tempfile.TemporaryDirectory() as folder:
+            engine = create_sqlite_engine(os.path.join(folder, 'race.db'), pool_size=args.requests)
+            statuses = run(engine, args.requests)
+
+    print(', '.join(f'{status}: {count}' for status, count in sorted(statuses.items())))
+    if statuses != Counter({201: 1, 409: args.requests - 1}):
+        print('FALHA: esperado exatamente um 201 e os demais 409')
+        sys.exit(1)
+    print('OK: apenas uma reserva foi aceita')
+
+
+if __name__ == '__main__':
+    main()
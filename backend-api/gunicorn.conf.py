@@ -0,0 +1,86 @@
+"""
+Servidor de produção (gunicorn): processos prefork, cada um com várias threads
+
+Executar a partir da pasta backend-api:
+    gunicorn -c gunicorn.conf.py src.main:app
+
+O app é importado uma vez no processo mestre (preload_app) e os workers são criados por
+fork, compartilhando a memória do código já carregado. Cada worker aquece a conexão com
+o banco e o bcrypt antes de receber requisições (src/utils/warmup.py).
+
+Recarga sem derrubar conexões:
+- ``kill -HUP <mestre>``: relê esta configuração e troca os workers aos poucos
+  (cada worker antigo termina as requisições em andamento, até GUNICORN_GRACEFUL_TIMEOUT)
+- código novo (com preload_app o HUP reaproveita o app já importado): ``kill -USR2 <mestre>``
+  sobe um novo mestre com o código atualizado; depois ``kill -QUIT <mestre antigo>``
+"""
+import multiprocessing
+import os
+import tempfile
+
+# Variáveis definidas no .env também valem aqui (o app só as carrega ao ser importado)
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Retratos das métricas de cada worker, somados no /metrics (src/utils/metrics.py).
+# Definida antes do preload (o app lê a variável ao ser importado) e mantida entre recargas (HUP)
+if not os.getenv('METRICS_DIR'):
+    os.environ['METRICS_DIR'] = tempfile.mkdtemp(prefix='vetcare-metrics-')
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# Processos: padrão 2 por núcleo, no máximo 8 (cada um mantém seus caches e conexões)
+workers = int(os.getenv('WEB_CONCURRENCY', str(min(multiprocessing.cpu_count() * 2, 8))))
+# Threads por processo: as rotas passam a maior parte do tempo esperando o banco (I/O).
+# Com DB_ENGINE=postgres, mantenha DB_POOL_SIZE >= threads
+threads = int(os.getenv('GUNICORN_THREADS', '16'))
+worker_class = 'gthread'
+
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+# Reinicia cada worker depois de N requisições (0 desativa); o jitter evita reinícios simultâneos
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '0'))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def on_starting(server):
+    from src.utils.metrics import registry
+    registry.directory = os.environ['METRICS_DIR']
+    registry.clear_snapshots()
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    from src.utils.warmup import preload
+    server.log.info(f'Aquecimento do mestre (ms): {preload()}')
+
+
+def post_worker_init(worker):
+    from src.utils.warmup import warmup_worker
+    worker.log.info(f'Aquecimento do worker {worker.pid} (ms): {warmup_worker()}')
+    from src.utils.metrics import registry
+    registry.start_flusher()
+    # Fila de contatos: também sem CONTACT_WRITE_BEHIND, se sobrou spool de uma execução anterior
+    from src.utils.contact_queue import contact_queue
+    if contact_queue.enabled or contact_queue.spooled():
+        contact_queue.start()
+
+
+def worker_exit(server, worker):
+    # Contatos pendentes: uma última tentativa; o que falhar fica no spool para os outros workers
+    from src.utils.contact_queue import contact_queue
+    contact_queue.stop()
+    # Última gravação: as requisições atendidas pelo worker continuam somadas no /metrics
+    from src.utils.metrics import registry
+    try:
+        registry.flush()
+    except OSError as e:
+        server.log.warning(f'Métricas do worker {worker.pid} não gravadas: {str(e)}')
@@ -0,0 +1,209 @@
+"""
+Entrada ASGI da API (modo assíncrono)
+
+As rotas de agendamento mais acessadas rodam como corrotinas sobre o cliente assíncrono
+do banco. As demais rotas continuam no app Flask, adaptado para ASGI.
+
+Executar a partir da pasta backend-api:
+    uvicorn src.asgi:app --host 0.0.0.0 --port 5000
+"""
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse as StarletteJSONResponse
+from starlette.routing import Route
+
+from src.config.database import async_db, close_async_engine, init_async_engine
+from src.main import CORS_EXPOSE_HEADERS, CORS_ORIGINS, app as flask_app
+from src.routes.appointments import (APPOINTMENT_FIELDS, APPOINTMENT_KEYSET, BOOKING_ERRORS, BookingRejected,
+                                     InvalidAppointmentFilter, InvalidSlot, apply_appointment_filters, booking_request,
+                                     booking_result, slot_error_lookups)
+from src.utils.auth import AuthError, user_from_header
+from src.utils.compression import CompressionMiddleware
+from src.utils.contact_queue import contact_queue
+from src.utils.availability import (
+    clinics_query, compile_schedule, free_masks, lookup_clinics, lookup_occupancy,
+    missed_range, occupancy_masks, occupancy_query, store_clinics, store_missed_occupancy
+)
+from src.utils.fields import InvalidFields
+from src.utils.json_provider import dumps_bytes
+from src.utils.metrics import MetricsMiddleware
+from src.utils.pagination import InvalidPage, apply_page, finish_page, page_args
+
+
+class JSONResponse(StarletteJSONResponse):
+    """
+    Resposta JSON com o mesmo serializador do app Flask (orjson quando instalado)
+    """
+
+    def render(self, content) -> bytes:
+        return dumps_bytes(content)
+
+
+def get_current_user(request):
+    """
+    Mesmo comportamento do decorator token_required, retornando (usuário, resposta de erro)
+    """
+    try:
+        # verify_token lê a SECRET_KEY da configuração do app Flask
+        with flask_app.app_context():
+            return user_from_header(request.headers.get('Authorization')), None
+    except AuthError as e:
+        return None, JSONResponse({'message': str(e)}, 401)
+
+
+async def get_appointments(request):
+    """
+    Listar agendamentos do usuário logado (paginado: limit, cursor, order; campos: fields;
+    filtros: status, data, inicio e fim)
+    """
+    current_user, error = get_current_user(request)
+    if error:
+        return error
+
+    try:
+        page = page_args(request.query_params, APPOINTMENT_KEYSET)
+        columns = APPOINTMENT_FIELDS.select(APPOINTMENT_FIELDS.fields(request.query_params))
+        column = 'tutor_id' if current_user['type'] == 'tutor' else 'clinica_id'
+        query = async_db.table('view_agendamentos_completo').select(columns).eq(column, current_user['id'])
+        query = apply_appointment_filters(query, request.query_params)
+        result = await apply_page(query, page).execute()
+        appointments, next_cursor = finish_page(result.data, page)
+
+        return JSONResponse({'appointments': appointments, 'next_cursor': next_cursor}, 200)
+
+    except (InvalidPage, InvalidFields, InvalidAppointmentFilter) as e:
+        return JSONResponse({'error': str(e)}, 400)
+    except Exception as e:
+        return JSONResponse({'error': f'Erro interno: {str(e)}'}, 500)
+
+
+async def create_appointment(request):
+    """
+    Criar novo agendamento (apenas tutores)
+    """
+    current_user, error = get_current_user(request)
+    if error:
+        return error
+
+    try:
+        if current_user['type'] != 'tutor':
+            return JSONResponse({'error': 'Apenas tutores podem criar agendamentos'}, 403)
+
+        try:
+            params = booking_request(current_user['id'], await request.json())
+        except InvalidSlot as e:
+            for erro, query in slot_error_lookups(async_db, e.params):
+                if not (await query.execute()).data:
+                    raise BookingRejected(*BOOKING_ERRORS[erro])
+            raise
+
+        # Verificação do animal, da clínica, do conflito de horário e inserção em uma única chamada
+        result = await async_db.rpc('criar_agendamento', params).execute()
+        appointment = booking_result(result.data)
+
+        return JSONResponse({
+            'message': 'Agendamento criado com sucesso',
+            'appointment': appointment
+        }, 201)
+
+    except BookingRejected as e:
+        return JSONResponse({'error': str(e)}, e.status)
+    except Exception as e:
+        return JSONResponse({'error': f'Erro interno: {str(e)}'}, 500)
+
+
+async def get_available_times(request):
+    """
+    Buscar horários disponíveis para uma clínica em uma data específica
+    """
+    try:
+        email_clinica = request.query_params.get('email_clinica')
+        data_agendamento = request.query_params.get('data')
+
+        if not email_clinica or not data_agendamento:
+            return JSONResponse({'error': 'Email da clínica e data são obrigatórios'}, 400)
+
+        # Mesmo cache das rotas síncronas (availability.py); só a consulta ao banco é assíncrona
+        email_clinica = email_clinica.lower()
+        clinics, missing, generation = lookup_clinics([email_clinica])
+        if missing:
+            result = await clinics_query(async_db, missing).execute()
+            store_clinics(clinics, result.data, generation)
+        clinica = clinics.get(email_clinica)
+
+        if clinica is None:
+            return JSONResponse({'error': 'Clínica não encontrada'}, 404)
+
+        try:
+            day = datetime.strptime(data_agendamento, '%Y-%m-%d').date()
+        except ValueError:
+            return JSONResponse({'error': 'Formato de data inválido. Use YYYY-MM-DD'}, 400)
+
+        appointments, missed, generation = lookup_occupancy([clinica['id']], [day])
+        if missed:
+            # Um dia de uma clínica: cabe em uma página
+            result = await occupancy_query(async_db, *missed_range(missed)).execute()
+            appointments += store_missed_occupancy(missed, result.data, generation)
+
+        occupied_times = [str(apt['horario'])[:5] for apt in appointments]
+
+        schedule = compile_schedule(clinica.get('horario_funcionamento'))
+        occupied = occupancy_masks({clinica['id']: schedule}, appointments)
+        available_times = schedule.times(free_masks(schedule, clinica['id'], [day], occupied)[day.isoformat()])
+
+        return JSONResponse({
+            'available_times': available_times,
+            'occupied_times': occupied_times
+        }, 200)
+
+    except Exception as e:
+        return JSONResponse({'error': f'Erro interno: {str(e)}'}, 500)
+
+
+async def appointments_root(request):
+    if request.method == 'POST':
+        return await create_appointment(request)
+    return await get_appointments(request)
+
+
+@asynccontextmanager
+async def lifespan(_):
+    await init_async_engine()
+    # Fila de contatos: grava o spool deixado por uma execução anterior
+    if contact_queue.enabled or contact_queue.spooled():
+        contact_queue.start()
+    yield
+    contact_queue.stop()
+    await close_async_engine()
+
+
+async_app = Starlette(
+    routes=[
+        Route('/api/appointments/', appointments_root, methods=['GET', 'POST']),
+        Route('/api/appointments/available-times', get_available_times, methods=['GET']),
+    ],
+    middleware=[
+        Middleware(MetricsMiddleware),
+        Middleware(CORSMiddleware, allow_origins=CORS_ORIGINS, allow_methods=['*'], allow_headers=['*'],
+                   expose_headers=CORS_EXPOSE_HEADERS),
+        Middleware(CompressionMiddleware),
+    ],
+    lifespan=lifespan,
+)
+
+# Rotas servidas pelos handlers assíncronos; o restante vai para o app Flask
+ASYNC_PATHS = {route.path for route in async_app.routes}
+
+wsgi_app = WSGIMiddleware(flask_app)
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan' or scope.get('path') in ASYNC_PATHS:
+        await async_app(scope, receive, send)
+    else:
+        await wsgi_app(scope, receive, send)
@@ -1,6 +1,9 @@
 import os
+import threading
 from supabase import create_client, Client
 from dotenv import load_dotenv
+from src.database.engines import AsyncPostgrestEngine, AsyncSQLEngine, PostgrestEngine, SQLEngine
+from src.utils.metrics import timed_query
 
 load_dotenv()
 
@@ -9,12 +12,24 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 
+# Engine de acesso a dados: 'postgrest' (cliente Supabase) ou 'postgres' (SQL direto com pool)
+DB_ENGINE = os.getenv("DB_ENGINE", "postgrest")
+DATABASE_URL = os.getenv("DATABASE_URL")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_PREPARE_THRESHOLD = int(os.getenv("DB_PREPARE_THRESHOLD", "5"))
+# Conexões HTTP simultâneas ao PostgREST no modo ASGI
+DB_ASYNC_MAX_CONNECTIONS = int(os.getenv("DB_ASYNC_MAX_CONNECTIONS", "200"))
+
 # Para desenvolvimento, permitir valores de exemplo
 if SUPABASE_URL == "https://exemplo.supabase.co":
     print("⚠️  AVISO: Usando configurações de exemplo. Configure o .env com valores reais do Supabase.")
     # Criar cliente mock para desenvolvimento
     supabase = None
     supabase_admin = None
+elif DB_ENGINE != "postgrest" and not SUPABASE_URL:
+    # A engine direta não depende do Supabase
+    supabase = None
+    supabase_admin = None
 else:
     if not SUPABASE_URL or not SUPABASE_ANON_KEY:
         raise ValueError("SUPABASE_URL e SUPABASE_ANON_KEY devem estar definidas no arquivo .env")
@@ -25,3 +40,115 @@ else:
     # Cliente Supabase para operações administrativas (backend)
     supabase_admin: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY) if SUPABASE_SERVICE_KEY else supabase
 
+_engine = None
+_engine_lock = threading.Lock()
+_async_engine = None
+
+
+def create_engine():
+    """
+    Cria a engine configurada em DB_ENGINE
+    """
+    if DB_ENGINE == "postgrest":
+        # Lê o cliente global a cada chamada (permite substituí-lo em testes)
+        return PostgrestEngine(lambda: supabase)
+
+    if DB_ENGINE == "postgres":
+        if not DATABASE_URL:
+            raise ValueError("DATABASE_URL deve estar definida para DB_ENGINE=postgres")
+        return SQLEngine.from_url(DATABASE_URL, pool_size=DB_POOL_SIZE, prepare_threshold=DB_PREPARE_THRESHOLD)
+
+    raise ValueError(f"DB_ENGINE inválido: {DB_ENGINE}")
+
+
+def get_engine():
+    """
+    Retorna a engine ativa (criada na primeira chamada)
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine()
+    return _engine
+
+
+def set_engine(engine):
+    """
+    Substitui a engine ativa (benchmarks e testes com banco local)
+    """
+    global _engine
+    _engine = engine
+
+
+class Database:
+    """
+    Ponto de acesso a dados usado pelas rotas, independente da engine
+    (cada ``execute()`` entra em db_query_duration_seconds)
+    """
+
+    def table(self, name: str):
+        return timed_query(get_engine().table(name), name)
+
+    def rpc(self, name: str, params: dict = None):
+        return timed_query(get_engine().rpc(name, params), name, 'rpc')
+
+
+db = Database()
+
+
+async def init_async_engine():
+    """
+    Cria a engine assíncrona usada pelo modo ASGI (deve rodar dentro do event loop)
+    """
+    global _async_engine
+    if _async_engine is not None:
+        return _async_engine
+
+    if DB_ENGINE == "postgrest":
+        if supabase is None:
+            raise RuntimeError("Cliente Supabase não configurado")
+        engine = AsyncPostgrestEngine(SUPABASE_URL, SUPABASE_ANON_KEY, max_connections=DB_ASYNC_MAX_CONNECTIONS)
+        await engine.start()
+        _async_engine = engine
+    else:
+        # A engine SQL compartilha o pool com o modo síncrono
+        _async_engine = AsyncSQLEngine(get_engine())
+    return _async_engine
+
+
+async def close_async_engine():
+    """
+    Encerra as conexões da engine assíncrona
+    """
+    global _async_engine
+    if _async_engine is not None and hasattr(_async_engine, 'close'):
+        await _async_engine.close()
+    _async_engine = None
+
+
+def set_async_engine(engine):
+    """
+    Substitui a engine assíncrona ativa
+    """
+    global _async_engine
+    _async_engine = engine
+
+
+class AsyncDatabase:
+    """
+    Ponto de acesso a dados dos handlers assíncronos: ``await async_db.table(...)...execute()``
+    """
+
+    def table(self, name: str):
+        if _async_engine is None:
+            raise RuntimeError("Engine assíncrona não inicializada (chame init_async_engine)")
+        return timed_query(_async_engine.table(name), name, asynchronous=True)
+
+    def rpc(self, name: str, params: dict = None):
+        if _async_engine is None:
+            raise RuntimeError("Engine assíncrona não inicializada (chame init_async_engine)")
+        return timed_query(_async_engine.rpc(name, params), name, 'rpc', asynchronous=True)
+
+
+async_db = AsyncDatabase()
@@ -0,0 +1,217 @@
+"""
+Equivalentes em Python das funções SQL do schema.sql, para o banco SQLite local
+
+O SQLite não tem funções armazenadas, então cada RPC é registrada na engine como
+uma função Python que roda na mesma transação/conexão do pool.
+"""
+import re
+import sqlite3
+import time
+import unicodedata
+
+
+def _rows(cursor) -> list:
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def criar_agendamento(engine, p_tutor_id, p_animal_id, p_email_clinica, p_data_agendamento,
+                      p_horario, p_tipo_consulta='Consulta Geral', p_observacoes=None):
+    """
+    Mesmo contrato da função criar_agendamento do schema.sql
+    """
+    with engine.pool.connection() as conn:
+        animal = conn.execute(
+            'SELECT 1 FROM animais WHERE id = ? AND tutor_id = ? AND ativo = 1',
+            [p_animal_id, p_tutor_id],
+        ).fetchone()
+        if animal is None:
+            return {'erro': 'animal_nao_encontrado'}
+
+        clinica = conn.execute(
+            'SELECT id FROM usuarios_clinicas WHERE email = ? AND ativo = 1',
+            [p_email_clinica],
+        ).fetchone()
+        if clinica is None:
+            return {'erro': 'clinica_nao_encontrada'}
+
+        try:
+            cursor = conn.execute(
+                'INSERT INTO agendamentos (tutor_id, clinica_id, animal_id, data_agendamento, horario, '
+                'tipo_consulta, observacoes, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?) RETURNING *',
+                [p_tutor_id, clinica[0], p_animal_id, p_data_agendamento, p_horario,
+                 p_tipo_consulta, p_observacoes, 'pendente'],
+            )
+            return {'agendamento': _rows(cursor)[0]}
+        except sqlite3.IntegrityError:
+            # Índice único parcial de horários ativos
+            conn.rollback()
+            return {'erro': 'horario_ocupado'}
+
+
+def normalizar_busca(texto):
+    """
+    Mesmo resultado da função normalizar_busca do schema.sql: minúsculas e sem acentos
+    """
+    if texto is None:
+        return None
+    decomposed = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _trigrams(texto: str) -> set:
+    # Mesma divisão do pg_trgm: cada palavra com dois espaços antes e um depois
+    trigrams = set()
+    for word in re.findall(r'\w+', texto):
+        word = f'  {word} '
+        trigrams.update(word[i:i + 3] for i in range(len(word) - 2))
+    return trigrams
+
+
+def relevancia(termo: str, texto: str) -> float:
+    """
+    Aproximação de (similarity + word_similarity) / 2 do pg_trgm, com textos já normalizados
+    """
+    a, b = _trigrams(termo), _trigrams(texto)
+    if not a or not b:
+        return 0.0
+    common = len(a & b)
+    return (common / len(a | b) + common / len(a)) / 2
+
+
+def buscar_animais(engine, p_termo, p_tutor_id=None, p_clinica_id=None, p_limite=50,
+                   p_apos_relevancia=None, p_apos_id=None):
+    """
+    Mesmo contrato da função buscar_animais do schema.sql
+
+    Os trechos do nome são encontrados pelas tabelas FTS5 (trigram) do schema_sqlite.sql;
+    a busca por semelhança (erros de digitação) existe apenas no PostgreSQL.
+    """
+    termo = normalizar_busca((p_termo or '').strip())
+    if not termo:
+        return []
+
+    scope, scope_params = '', []
+    if p_tutor_id:
+        scope += ' AND a.tutor_id = ?'
+        scope_params.append(p_tutor_id)
+    if p_clinica_id:
+        scope += ' AND a.clinica_id = ?'
+        scope_params.append(p_clinica_id)
+
+    if len(termo) >= 3:
+        # Frase entre aspas: o tokenizador trigram encontra o trecho em qualquer posição
+        match, value = '{table} MATCH ?', '"' + termo.replace('"', '""') + '"'
+    else:
+        # Menos de 3 caracteres não formam um trigrama: percorre a tabela de busca
+        match, value = 'instr({table}.nome, ?) > 0', termo
+
+    # CROSS JOIN fixa a ordem: primeiro o índice de busca, depois o escopo (senão o SQLite
+    # percorre os animais da clínica e repete o MATCH para cada um)
+    scores = {}
+    animals = engine.fetch(
+        f'SELECT a.id, animais_busca.nome FROM animais_busca '
+        f'CROSS JOIN animais a ON a.rowid = animais_busca.rowid '
+        f'WHERE {match.format(table="animais_busca")} AND a.ativo = 1{scope}',
+        [value] + scope_params,
+    )
+    for row in animals:
+        scores[row['id']] = relevancia(termo, row['nome'])
+
+    # Nome do tutor pesa um pouco menos que o nome do animal
+    tutors = engine.fetch(
+        f'SELECT a.id, usuarios_tutores_busca.nome FROM usuarios_tutores_busca '
+        f'CROSS JOIN usuarios_tutores t ON t.rowid = usuarios_tutores_busca.rowid '
+        f'CROSS JOIN animais a INDEXED BY idx_animais_tutor_id ON a.tutor_id = t.id '
+        f'WHERE {match.format(table="usuarios_tutores_busca")} AND a.ativo = 1{scope}',
+        [value] + scope_params,
+    )
+    for row in tutors:
+        scores[row['id']] = max(scores.get(row['id'], 0.0), relevancia(termo, row['nome']) * 0.8)
+
+    exact = engine.fetch(f'SELECT a.id FROM animais a WHERE a.id = ? AND a.ativo = 1{scope}',
+                         [(p_termo or '').strip()] + scope_params)
+    for row in exact:
+        scores[row['id']] = 1.0
+
+    ranking = sorted(((round(score, 4), animal_id) for animal_id, score in scores.items()), reverse=True)
+    if p_apos_id is not None:
+        ranking = [key for key in ranking if key < (p_apos_relevancia, p_apos_id)]
+    ranking = ranking[:p_limite]
+    if not ranking:
+        return []
+
+    marks = ', '.join('?' for _ in ranking)
+    rows = engine.fetch(
+        f'SELECT id, nome_animal, especie, raca, idade, sexo, foto_url, nome_tutor, email_tutor, '
+        f'telefone_tutor, nome_clinica, criado_em FROM view_animais_completo WHERE id IN ({marks})',
+        [animal_id for _, animal_id in ranking],
+    )
+    by_id = {row['id']: row for row in rows}
+    return [{**by_id[animal_id], 'relevancia': score} for score, animal_id in ranking if animal_id in by_id]
+
+
+def consumir_limite(engine, p_chave, p_capacidade, p_por_segundo, p_custo=1):
+    """
+    Mesmo contrato da função consumir_limite do schema.sql
+    """
+    now = time.time()
+    with engine.pool.connection() as conn:
+        # O upsert abre a transação de escrita: consumos simultâneos esperam o lock
+        tokens = conn.execute(
+            'INSERT INTO limites_requisicao (chave, tokens, atualizado_em) VALUES (?, ?, ?) '
+            'ON CONFLICT (chave) DO UPDATE SET '
+            'tokens = MIN(?, tokens + MAX(excluded.atualizado_em - atualizado_em, 0) * ?), '
+            'atualizado_em = excluded.atualizado_em RETURNING tokens',
+            [p_chave, p_capacidade, now, p_capacidade, p_por_segundo],
+        ).fetchone()[0]
+        if tokens < p_custo:
+            return {'permitido': False, 'espera': (p_custo - tokens) / p_por_segundo}
+        conn.execute('UPDATE limites_requisicao SET tokens = ? WHERE chave = ?', [tokens - p_custo, p_chave])
+        return {'permitido': True, 'espera': 0}
+
+
+def estatisticas_clinica(engine, p_clinica_id, p_inicio, p_fim, p_hoje=None):
+    """
+    Mesmo contrato da função estatisticas_clinica do schema.sql
+    """
+    p_hoje = p_hoje or time.strftime('%Y-%m-%d')
+    periodo = 'FROM agendamentos WHERE clinica_id = ? AND data_agendamento BETWEEN ? AND ?'
+    params = [p_clinica_id, p_inicio, p_fim]
+    with engine.pool.connection() as conn:
+        por_dia = _rows(conn.execute(
+            f'SELECT data_agendamento AS data, status, count(*) AS total {periodo} '
+            f'GROUP BY data_agendamento, status ORDER BY data_agendamento, status',
+            params,
+        ))
+        # Uma passada pelo período para os totais (como as subconsultas sobre o CTE do PostgreSQL)
+        totais = _rows(conn.execute(
+            f"SELECT count(DISTINCT CASE WHEN status NOT IN ('cancelado', 'recusado') THEN animal_id END) "
+            f"AS pacientes, "
+            f"count(CASE WHEN status = 'aceito' AND data_agendamento < ? THEN 1 END) AS nao_comparecimento, "
+            f"COALESCE(sum(CASE WHEN status = 'concluido' THEN valor END), 0) AS receita_agendamentos, "
+            f"COALESCE(sum(CASE WHEN status = 'concluido' AND NOT EXISTS "
+            f"(SELECT 1 FROM consultas c WHERE c.agendamento_id = agendamentos.id) THEN valor END), 0) "
+            f"AS receita_sem_consulta {periodo}",
+            [p_hoje] + params,
+        ))[0]
+        pendentes = conn.execute(
+            "SELECT count(*) FROM agendamentos WHERE clinica_id = ? AND data_agendamento >= ? AND status = 'pendente'",
+            [p_clinica_id, p_hoje],
+        ).fetchone()[0]
+        # data_consulta é texto ISO: o dia seguinte a p_fim fecha o período
+        receita_consultas = conn.execute(
+            "SELECT COALESCE(sum(valor), 0) FROM consultas WHERE clinica_id = ? AND data_consulta >= ? "
+            "AND data_consulta < date(?, '+1 day')",
+            [p_clinica_id, p_inicio, p_fim],
+        ).fetchone()[0]
+    return {'por_dia': por_dia, 'pendentes': pendentes, 'receita_consultas': receita_consultas, **totais}
+
+
+def register_sqlite_functions(engine):
+    engine.rpc_handlers.update({
+        'criar_agendamento': criar_agendamento,
+        'buscar_animais': buscar_animais,
+        'consumir_limite': consumir_limite,
+        'estatisticas_clinica': estatisticas_clinica,
+    })
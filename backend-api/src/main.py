@@ -1,17 +1,29 @@
 import os
 import sys
-from flask import Flask, send_from_directory
+from flask import Flask, request
 from flask_cors import CORS
 from dotenv import load_dotenv
 
+# Corrigir path para funcionar no Render
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
 # Importação dos blueprints
 from src.routes.auth import auth_bp
 from src.routes.animals import animals_bp
 from src.routes.appointments import appointments_bp
 from src.routes.contact import contact_bp
-
-# Corrigir path para funcionar no Render
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from src.routes.clinics import clinics_bp
+from src.routes.exports import exports_bp
+from src.routes.vaccines import vaccines_bp
+from src.utils.auth import hashing_pool, token_cache
+from src.utils.availability import clinic_cache, occupancy_cache
+from src.utils.compression import init_compression
+from src.utils.contact_queue import contact_queue
+from src.utils.json_provider import init_json_provider
+from src.utils.metrics import init_metrics, register_stats
+from src.utils.profile_cache import profile_cache
+from src.utils.rate_limit import rate_limiter
+from src.utils.static_assets import StaticAssets
 
 # Carregar variáveis de ambiente
 load_dotenv()
@@ -20,33 +32,60 @@ load_dotenv()
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'asdf#FGSgvasgf$5$WGT')
 
+# Latência por rota e por chamada ao banco em /metrics (primeiro hook: mede também CORS e compressão)
+init_metrics(app)
+
+# JSON mais rápido (orjson) e respostas comprimidas (gzip/brotli)
+init_json_provider(app)
+init_compression(app)
+
 # Configurar CORS (mais seguro)
-CORS(app, origins=[
+CORS_ORIGINS = [
     "http://localhost:5173",  # Para desenvolvimento
     "https://vetcare-frontend.onrender.com",  # Produção no Render
     "https://seu-dominio.com"  # Caso use domínio próprio
-])
+]
+# Cabeçalhos de resposta que o frontend pode ler (X-Truncated: lote de etiquetas incompleto)
+CORS_EXPOSE_HEADERS = ['X-Truncated']
+CORS(app, origins=CORS_ORIGINS, expose_headers=CORS_EXPOSE_HEADERS)
 
 # Registrar blueprints (rotas organizadas)
 app.register_blueprint(auth_bp, url_prefix='/api/auth')
 app.register_blueprint(animals_bp, url_prefix='/api/animals')
 app.register_blueprint(appointments_bp, url_prefix='/api/appointments')
 app.register_blueprint(contact_bp, url_prefix='/api/contact')
+app.register_blueprint(exports_bp, url_prefix='/api/exports')
+app.register_blueprint(vaccines_bp, url_prefix='/api/vaccines')
+app.register_blueprint(clinics_bp, url_prefix='/api/clinics')
+
+# Servir arquivos estáticos (React/Vite build) a partir do manifesto montado na inicialização
+static_assets = StaticAssets(app.static_folder).load()
 
-# Servir arquivos estáticos (React/Vite build)
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
     if app.static_folder is None:
         return "Static folder not configured", 404
 
-    file_path = os.path.join(app.static_folder, path)
-    if path != "" and os.path.exists(file_path):
-        return send_from_directory(app.static_folder, path)
-    elif os.path.exists(os.path.join(app.static_folder, 'index.html')):
-        return send_from_directory(app.static_folder, 'index.html')
-    else:
+    response = static_assets.response(path or 'index.html', request)
+    if response is None and not path.startswith('assets/'):
+        # Rotas do SPA caem no index.html; arquivo de build inexistente é 404 (não HTML no lugar de JS)
+        response = static_assets.response('index.html', request)
+    if response is None:
         return "index.html not found", 404
+    return response
+
+# Contadores internos (caches, pool do bcrypt, limites, fila de contatos) em /metrics/stats
+register_stats('token_cache', token_cache.stats)
+register_stats('password_hashing', hashing_pool.stats)
+register_stats('availability_cache', lambda: {
+    'occupancy': occupancy_cache.stats(),
+    'clinics': clinic_cache.stats()
+})
+register_stats('animal_profile_cache', profile_cache.stats)
+register_stats('rate_limit', rate_limiter.stats)
+register_stats('contact_queue', contact_queue.stats)
+register_stats('static_assets', static_assets.stats)
 
 # Endpoint de verificação de saúde
 @app.route('/health')
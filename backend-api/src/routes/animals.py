@@ -1,31 +1,102 @@
-from flask import Blueprint, request, jsonify
-from src.config.database import supabase
+from flask import Blueprint, Response, request, jsonify, make_response, stream_with_context
+from src.config.database import db
+from src.utils.access import clinic_can_access_animal
+from src.utils.animal_import import IMPORT_FORMATS, AnimalImporter, InvalidAnimal, build_animal, iter_records
 from src.utils.auth import token_required
+from src.utils.fields import InvalidFields, Projection
+from src.utils.pagination import InvalidPage, finish_page, page_args, paginate
+from src.utils.profile_cache import ANIMAL_PROFILE_CACHE_STALE, ANIMAL_PROFILE_CACHE_STALE_IF_ERROR, profile_cache
+from src.utils.tag_sheets import stream_pdf, stream_zip
+from datetime import datetime, timezone
+from functools import lru_cache
+import csv
+import hashlib
 import qrcode
+import qrcode.image.svg
 import io
-import base64
 import os
+import uuid
 
 animals_bp = Blueprint('animals', __name__)
 
+# Quantidade de imagens de QR Code renderizadas mantidas em memória
+QR_CACHE_SIZE = int(os.getenv('QR_CACHE_SIZE', '512'))
+QR_FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+# Cache HTTP da imagem (segundos); depois disso o cliente revalida com a ETag
+QR_MAX_AGE = int(os.getenv('QR_MAX_AGE', '3600'))
+# Limite de animais por folha de etiquetas
+QR_SHEET_MAX_ANIMALS = int(os.getenv('QR_SHEET_MAX_ANIMALS', '2000'))
+# Ordenação das listagens (paginação por cursor)
+ANIMAL_KEYSET = ['criado_em', 'id']
+# A busca é ordenada por relevância (a mais alta primeiro)
+SEARCH_KEYSET = ['relevancia', 'id']
+# Tamanho máximo do termo de busca
+ANIMAL_SEARCH_MAX_LENGTH = int(os.getenv('ANIMAL_SEARCH_MAX_LENGTH', '100'))
+
+# Linha do tempo médica (consultas, vacinas e agendamentos em uma view)
+TIMELINE_KEYSET = ['data', 'id']
+TIMELINE_TYPES = ('consulta', 'vacina', 'agendamento')
+TIMELINE_COLUMNS = ('tipo, id, data, titulo, descricao, medicamentos, veterinario, status, valor, proxima_data, '
+                    'clinica_id, nome_clinica')
+
+# Campos aceitos em ?fields= (qr_code_url é calculado pela API)
+ANIMAL_FIELDS = Projection(
+    allowed=['id', 'nome', 'especie', 'raca', 'idade', 'peso', 'cor', 'sexo', 'castrado', 'foto_url',
+             'qr_code_url', 'historico_medico', 'observacoes', 'tutor_id', 'clinica_id', 'criado_em', 'atualizado_em'],
+    # Listagem sem os textos longos (histórico médico e observações)
+    default=['id', 'nome', 'especie', 'raca', 'idade', 'peso', 'cor', 'sexo', 'castrado', 'foto_url',
+             'qr_code_url', 'tutor_id', 'clinica_id', 'criado_em'],
+    computed=('qr_code_url',),
+    required=ANIMAL_KEYSET
+)
+ANIMAL_VIEW_FIELDS = Projection(
+    allowed=['id', 'nome_animal', 'especie', 'raca', 'idade', 'sexo', 'foto_url', 'qr_code_url',
+             'nome_tutor', 'email_tutor', 'telefone_tutor', 'nome_clinica', 'criado_em'],
+    computed=('qr_code_url',),
+    required=['id']
+)
+# Perfil público guardado em cache: todas as colunas da view (fields é aplicado na resposta)
+PROFILE_COLUMNS = ANIMAL_VIEW_FIELDS.select(ANIMAL_VIEW_FIELDS.allowed) + ', atualizado_em'
+# Cache HTTP do perfil público (navegadores e CDN revalidam com ETag / Last-Modified)
+PROFILE_MAX_AGE = int(os.getenv('ANIMAL_PROFILE_MAX_AGE', '60'))
+PROFILE_CACHE_CONTROL = (f'public, max-age={PROFILE_MAX_AGE}, '
+                         f'stale-while-revalidate={int(ANIMAL_PROFILE_CACHE_STALE)}, '
+                         f'stale-if-error={int(ANIMAL_PROFILE_CACHE_STALE_IF_ERROR)}')
+ANIMAL_SEARCH_FIELDS = Projection(
+    allowed=ANIMAL_VIEW_FIELDS.allowed + ['relevancia'],
+    default=['id', 'nome_animal', 'especie', 'raca', 'foto_url', 'qr_code_url', 'nome_tutor', 'nome_clinica',
+             'criado_em', 'relevancia'],
+    computed=('qr_code_url',),
+    required=SEARCH_KEYSET
+)
+
 @animals_bp.route('/', methods=['GET'])
 @token_required
 def get_animals(current_user):
     """
-    Listar animais do usuário logado
+    Listar animais do usuário logado (paginado: limit, cursor, order; campos: fields)
     """
     try:
+        page = page_args(request.args, ANIMAL_KEYSET)
+        fields = ANIMAL_FIELDS.fields(request.args)
+        columns = ANIMAL_FIELDS.select(fields)
+        
         if current_user['type'] == 'tutor':
             # Tutores veem apenas seus próprios animais
-            result = supabase.table('animais').select('*').eq('tutor_id', current_user['id']).eq('ativo', True).execute()
+            query = db.table('animais').select(columns).eq('tutor_id', current_user['id']).eq('ativo', True)
         else:
             # Clínicas veem animais associados a elas
-            result = supabase.table('animais').select('*').eq('clinica_id', current_user['id']).eq('ativo', True).execute()
+            query = db.table('animais').select(columns).eq('clinica_id', current_user['id']).eq('ativo', True)
+        
+        animals, next_cursor = paginate(query, page)
         
         return jsonify({
-            'animals': result.data
+            'animals': present_animals(animals, fields),
+            'next_cursor': next_cursor
         }), 200
         
+    except (InvalidPage, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
@@ -38,72 +109,102 @@ def create_animal(current_user):
     try:
         data = request.get_json()
         
-        # Validação dos campos obrigatórios
-        required_fields = ['nome', 'especie']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({'error': f'Campo {field} é obrigatório'}), 400
-        
         # Apenas tutores podem cadastrar animais inicialmente
         if current_user['type'] != 'tutor':
             return jsonify({'error': 'Apenas tutores podem cadastrar animais'}), 403
         
-        animal_data = {
-            'nome': data['nome'].strip(),
-            'especie': data['especie'].strip(),
-            'raca': data.get('raca', '').strip(),
-            'idade': data.get('idade'),
-            'peso': data.get('peso'),
-            'cor': data.get('cor', '').strip(),
-            'sexo': data.get('sexo'),
-            'castrado': data.get('castrado', False),
-            'historico_medico': data.get('historico_medico', '').strip(),
-            'observacoes': data.get('observacoes', '').strip(),
-            'tutor_id': current_user['id']
-        }
+        # Campos obrigatórios, sexo e números (mesmas regras da importação em lote)
+        animal_data = build_animal(data, current_user['id'])
         
-        # Validar sexo se fornecido
-        if animal_data['sexo'] and animal_data['sexo'] not in ['Macho', 'Fêmea']:
-            return jsonify({'error': 'Sexo deve ser "Macho" ou "Fêmea"'}), 400
-        
-        result = supabase.table('animais').insert(animal_data).execute()
+        result = db.table('animais').insert(animal_data).execute()
         
         if result.data:
-            animal = result.data[0]
-            
-            # Gerar QR Code
-            qr_code_url = generate_qr_code(animal['id'])
-            
-            # Atualizar animal com URL do QR Code
-            supabase.table('animais').update({'qr_code_url': qr_code_url}).eq('id', animal['id']).execute()
-            
-            animal['qr_code_url'] = qr_code_url
-            
+            # O QR Code é gerado sob demanda em /api/animals/<id>/qr
             return jsonify({
                 'message': 'Animal cadastrado com sucesso',
-                'animal': animal
+                'animal': with_qr_code_url(result.data[0])
             }), 201
         else:
             return jsonify({'error': 'Erro ao cadastrar animal'}), 500
             
+    except InvalidAnimal as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
+@animals_bp.route('/import', methods=['POST'])
+@token_required
+def import_animals(current_user):
+    """
+    Importar animais em lote a partir de um arquivo CSV (com cabeçalho) ou NDJSON
+    O arquivo vai no corpo (Content-Type text/csv ou application/x-ndjson) ou no campo
+    "file" de um formulário multipart; ?format=csv|ndjson força o formato.
+    Tutores importam os próprios animais; clínicas informam o tutor na coluna email_tutor.
+    Linhas inválidas são listadas no relatório sem interromper a importação.
+    """
+    importer = AnimalImporter(current_user)
+    try:
+        if current_user['type'] not in ['tutor', 'clinica']:
+            return jsonify({'error': 'Acesso negado'}), 403
+        
+        upload = request.files.get('file') if request.mimetype == 'multipart/form-data' else None
+        if upload is not None:
+            stream, mimetype = upload.stream, upload.mimetype
+            name = (upload.filename or '').lower()
+            if name.endswith('.csv'):
+                mimetype = 'text/csv'
+            elif name.endswith(('.ndjson', '.jsonl')):
+                mimetype = 'application/x-ndjson'
+        else:
+            stream, mimetype = request.stream, request.mimetype
+        
+        file_format = (request.args.get('format') or IMPORT_FORMATS.get(mimetype, '')).lower()
+        if file_format not in ['csv', 'ndjson']:
+            return jsonify({'error': 'Envie um arquivo CSV (text/csv) ou NDJSON (application/x-ndjson)'}), 400
+        
+        report = importer.run(iter_records(stream, file_format))
+        
+        return jsonify({
+            'message': f'{report.imported} animais importados',
+            **report.to_dict()
+        }), 200
+        
+    except (UnicodeDecodeError, csv.Error) as e:
+        # Arquivo corrompido no meio: as linhas anteriores já foram gravadas
+        return jsonify({'error': f'Arquivo inválido: {str(e)}', **importer.report.to_dict()}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}', **importer.report.to_dict()}), 500
+
 @animals_bp.route('/<animal_id>', methods=['GET'])
 def get_animal_by_id(animal_id):
     """
-    Buscar animal por ID (público para QR Code)
+    Buscar animal por ID (público para QR Code; campos: fields)
+    Responde com ETag/Last-Modified (304 quando o cliente já tem a versão atual) e
+    usa o cache do perfil, que continua respondendo se o banco estiver fora do ar
     """
     try:
-        result = supabase.table('view_animais_completo').select('*').eq('id', animal_id).execute()
+        try:
+            uuid.UUID(animal_id)
+        except ValueError:
+            return jsonify({'error': 'ID de animal inválido'}), 400
+        
+        fields = ANIMAL_VIEW_FIELDS.fields(request.args)
+        animal = profile_cache.get(animal_id, load_animal_profile)
         
-        if not result.data:
+        if animal is None:
             return jsonify({'error': 'Animal não encontrado'}), 404
         
-        return jsonify({
-            'animal': result.data[0]
-        }), 200
+        response = jsonify({
+            'animal': present_animals(ANIMAL_VIEW_FIELDS.pick([animal], fields), fields)[0]
+        })
+        response.set_etag(hashlib.sha256(response.get_data()).hexdigest()[:32])
+        response.last_modified = parse_timestamp(animal.get('atualizado_em'))
+        response.headers['Cache-Control'] = PROFILE_CACHE_CONTROL
+        
+        return response.make_conditional(request)
         
+    except InvalidFields as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
@@ -115,7 +216,7 @@ def update_animal(current_user, animal_id):
     """
     try:
         # Verificar se o animal existe e se o usuário tem permissão
-        animal_result = supabase.table('animais').select('*').eq('id', animal_id).eq('ativo', True).execute()
+        animal_result = db.table('animais').select('id, tutor_id, clinica_id').eq('id', animal_id).eq('ativo', True).execute()
         
         if not animal_result.data:
             return jsonify({'error': 'Animal não encontrado'}), 404
@@ -143,12 +244,13 @@ def update_animal(current_user, animal_id):
             return jsonify({'error': 'Sexo deve ser "Macho" ou "Fêmea"'}), 400
         
         if update_data:
-            result = supabase.table('animais').update(update_data).eq('id', animal_id).execute()
+            result = db.table('animais').update(update_data).eq('id', animal_id).execute()
+            profile_cache.invalidate(animal_id)
             
             if result.data:
                 return jsonify({
                     'message': 'Animal atualizado com sucesso',
-                    'animal': result.data[0]
+                    'animal': with_qr_code_url(result.data[0])
                 }), 200
             else:
                 return jsonify({'error': 'Erro ao atualizar animal'}), 500
@@ -162,56 +264,265 @@ def update_animal(current_user, animal_id):
 @token_required
 def search_animals(current_user):
     """
-    Pesquisar animais por nome, tutor ou código
+    Pesquisar animais por nome, tutor ou código, ordenados por relevância
+    (paginado: limit, cursor; campos: fields)
     """
     try:
         query = request.args.get('q', '').strip()
         
         if not query:
             return jsonify({'error': 'Parâmetro de busca é obrigatório'}), 400
+        if len(query) > ANIMAL_SEARCH_MAX_LENGTH:
+            return jsonify({'error': f'A busca aceita no máximo {ANIMAL_SEARCH_MAX_LENGTH} caracteres'}), 400
+        if request.args.get('order', 'desc').lower() != 'desc':
+            raise InvalidPage('A busca é ordenada por relevância (order=desc)')
         
-        # Buscar na view que já traz dados completos
-        result = supabase.table('view_animais_completo').select('*').or_(
-            f'nome_animal.ilike.%{query}%,nome_tutor.ilike.%{query}%,id.eq.{query}'
-        ).execute()
+        page = page_args(request.args, SEARCH_KEYSET)
+        fields = ANIMAL_SEARCH_FIELDS.fields(request.args)
+        after_relevance, after_id = page.after or (None, None)
+        
+        # Tutores buscam apenas entre os seus animais, clínicas entre os associados a elas
+        scope = 'p_tutor_id' if current_user['type'] == 'tutor' else 'p_clinica_id'
+        rows = db.rpc('buscar_animais', {
+            'p_termo': query,
+            scope: current_user['id'],
+            'p_limite': page.limit + 1,
+            'p_apos_relevancia': after_relevance,
+            'p_apos_id': after_id
+        }).execute().data
+        animals, next_cursor = finish_page(rows or [], page)
         
         return jsonify({
-            'animals': result.data
+            'animals': present_animals(ANIMAL_SEARCH_FIELDS.pick(animals, fields), fields),
+            'next_cursor': next_cursor
         }), 200
         
+    except (InvalidPage, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
-def generate_qr_code(animal_id):
+@animals_bp.route('/<animal_id>/timeline', methods=['GET'])
+@token_required
+def get_animal_timeline(current_user, animal_id):
     """
-    Gerar QR Code para o animal
+    Linha do tempo médica do animal: consultas, vacinas e agendamentos em ordem cronológica
+    (paginado: limit, cursor, order; filtro: tipo=consulta,vacina,agendamento)
+    Tutor dono do animal ou clínica que o atende
     """
     try:
-        # URL que será codificada no QR Code
-        base_url = os.getenv('QR_CODE_BASE_URL', 'http://localhost:3000/animal/')
-        qr_url = f"{base_url}{animal_id}"
-        
-        # Gerar QR Code
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(qr_url)
-        qr.make(fit=True)
-        
-        # Criar imagem
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Converter para base64
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        img_str = base64.b64encode(buffer.getvalue()).decode()
+        try:
+            uuid.UUID(animal_id)
+        except ValueError:
+            return jsonify({'error': 'ID de animal inválido'}), 400
+        
+        page = page_args(request.args, TIMELINE_KEYSET)
+        types = [t.strip() for t in request.args.get('tipo', '').split(',') if t.strip()]
+        if any(t not in TIMELINE_TYPES for t in types):
+            return jsonify({'error': f'tipo deve ser um ou mais de: {", ".join(TIMELINE_TYPES)}'}), 400
+        
+        if current_user['type'] == 'tutor':
+            animal_result = db.table('animais').select('id').eq('id', animal_id).eq('tutor_id', current_user['id']).eq('ativo', True).execute()
+            access = True if animal_result.data else None
+        else:
+            access = clinic_can_access_animal(current_user['id'], animal_id)
+        
+        if access is None:
+            return jsonify({'error': 'Animal não encontrado'}), 404
+        if not access:
+            return jsonify({'error': 'Sem permissão para ver o histórico deste animal'}), 403
         
-        return f"data:image/png;base64,{img_str}"
+        # Uma ida ao banco por página: a view une as três tabelas, cada uma lida pelo índice do animal
+        query = db.table('view_linha_do_tempo_animal').select(TIMELINE_COLUMNS).eq('animal_id', animal_id)
+        if types:
+            query = query.in_('tipo', types)
+        
+        events, next_cursor = paginate(query, page)
+        
+        return jsonify({
+            'timeline': events,
+            'next_cursor': next_cursor
+        }), 200
         
+    except InvalidPage as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        print(f"Erro ao gerar QR Code: {e}")
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+@animals_bp.route('/<animal_id>/qr', methods=['GET'])
+def get_animal_qr_code(animal_id):
+    """
+    Imagem do QR Code do animal (público, usado nas carteirinhas)
+    Parâmetros: format=png|svg, size=1-40 (pixels por módulo), download=1
+    """
+    try:
+        try:
+            uuid.UUID(animal_id)
+        except ValueError:
+            return jsonify({'error': 'ID de animal inválido'}), 400
+        
+        image_format = request.args.get('format', 'png').lower()
+        if image_format not in QR_FORMATS:
+            return jsonify({'error': 'Formato deve ser "png" ou "svg"'}), 400
+        
+        try:
+            box_size = int(request.args.get('size', 10))
+        except ValueError:
+            return jsonify({'error': 'Tamanho inválido'}), 400
+        if not 1 <= box_size <= 40:
+            return jsonify({'error': 'Tamanho deve estar entre 1 e 40'}), 400
+        
+        # Só gera imagem para animais cadastrados (mesmo cache do perfil público)
+        if profile_cache.get(animal_id, load_animal_profile) is None:
+            return jsonify({'error': 'Animal não encontrado'}), 404
+        
+        image, etag = render_qr_code(animal_id, image_format, box_size)
+        
+        response = make_response(image)
+        response.mimetype = QR_FORMATS[image_format]
+        response.set_etag(etag)
+        # A imagem depende de QR_CODE_BASE_URL: a ETag muda junto e o cliente revalida
+        response.headers['Cache-Control'] = f'public, max-age={QR_MAX_AGE}'
+        if request.args.get('download'):
+            response.headers['Content-Disposition'] = f'attachment; filename="qr-code-{animal_id}.{image_format}"'
+        
+        return response.make_conditional(request)
+        
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+@animals_bp.route('/qr-sheet', methods=['POST'])
+@token_required
+def create_qr_sheet(current_user):
+    """
+    Etiquetas com QR Code em lote para clínicas (PDF para impressão ou ZIP de PNGs)
+    Corpo: {"animal_ids": [...]} ou {"all": true}, "format": "pdf" | "zip", "size": 1-40
+    """
+    try:
+        if current_user['type'] != 'clinica':
+            return jsonify({'error': 'Apenas clínicas podem gerar etiquetas em lote'}), 403
+        
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Corpo da requisição deve ser um objeto JSON'}), 400
+        
+        output_format = data.get('format', 'pdf')
+        if output_format not in ['pdf', 'zip']:
+            return jsonify({'error': 'Formato deve ser "pdf" ou "zip"'}), 400
+        
+        box_size = data.get('size', 10)
+        if isinstance(box_size, bool) or not isinstance(box_size, int) or not 1 <= box_size <= 40:
+            return jsonify({'error': 'Tamanho deve estar entre 1 e 40'}), 400
+        
+        select_all = data.get('all') is True
+        animal_ids = data.get('animal_ids')
+        if not select_all:
+            if not animal_ids:
+                return jsonify({'error': 'Informe animal_ids ou all'}), 400
+            if not isinstance(animal_ids, list):
+                return jsonify({'error': 'animal_ids deve ser uma lista'}), 400
+            if len(animal_ids) > QR_SHEET_MAX_ANIMALS:
+                return jsonify({'error': f'Máximo de {QR_SHEET_MAX_ANIMALS} animais por lote'}), 400
+            try:
+                for animal_id in animal_ids:
+                    uuid.UUID(animal_id)
+            except (TypeError, AttributeError, ValueError):
+                return jsonify({'error': 'animal_ids deve conter apenas IDs de animais válidos'}), 400
+        
+        # Apenas animais associados à clínica
+        query = db.table('animais').select('id, nome').eq('clinica_id', current_user['id']).eq('ativo', True)
+        if not select_all:
+            query = query.in_('id', animal_ids)
+        # Um a mais que o limite: indica se "all" deixou animais de fora
+        animals = query.order('nome').order('id').limit(QR_SHEET_MAX_ANIMALS + 1).execute().data
+        truncated = len(animals) > QR_SHEET_MAX_ANIMALS
+        animals = animals[:QR_SHEET_MAX_ANIMALS]
+        
+        if not animals:
+            return jsonify({'error': 'Nenhum animal encontrado'}), 404
+        
+        targets = [qr_code_target(animal['id']) for animal in animals]
+        
+        if output_format == 'pdf':
+            stream = stream_pdf(animals, targets)
+            mimetype = 'application/pdf'
+        else:
+            stream = stream_zip(animals, targets, box_size)
+            mimetype = 'application/zip'
+        
+        return Response(stream_with_context(stream), mimetype=mimetype, headers={
+            'Content-Disposition': f'attachment; filename="etiquetas-qr.{output_format}"',
+            # Com "all", a clínica tem mais animais que QR_SHEET_MAX_ANIMALS: o lote veio incompleto
+            'X-Truncated': 'true' if truncated else 'false'
+        })
+        
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+def qr_code_target(animal_id):
+    """
+    URL codificada no QR Code (página pública do animal)
+    """
+    base_url = os.getenv('QR_CODE_BASE_URL', 'http://localhost:3000/animal/')
+    return f"{base_url}{animal_id}"
+
+def load_animal_profile(animal_id):
+    """
+    Perfil público do animal direto do banco (None quando não existe ou está inativo)
+    """
+    result = db.table('view_animais_completo').select(PROFILE_COLUMNS).eq('id', animal_id).execute()
+    return result.data[0] if result.data else None
+
+def parse_timestamp(value):
+    """
+    Data/hora do banco (texto ISO) para o cabeçalho Last-Modified
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
         return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def present_animals(animals, fields):
+    """
+    Preenche qr_code_url apenas quando o campo foi pedido
+    """
+    if 'qr_code_url' in fields:
+        return [with_qr_code_url(animal) for animal in animals]
+    return animals
 
+def with_qr_code_url(animal):
+    """
+    Preenche qr_code_url com o endpoint que gera a imagem sob demanda
+    """
+    base_url = os.getenv('API_URL') or request.host_url
+    animal['qr_code_url'] = f"{base_url.rstrip('/')}/api/animals/{animal['id']}/qr"
+    return animal
+
+@lru_cache(maxsize=QR_CACHE_SIZE)
+def render_qr_code(animal_id, image_format='png', box_size=10):
+    """
+    Renderiza o QR Code do animal e retorna (bytes da imagem, ETag)
+    """
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=box_size,
+        border=4,
+        image_factory=qrcode.image.svg.SvgPathImage if image_format == 'svg' else None,
+    )
+    qr.add_data(qr_code_target(animal_id))
+    qr.make(fit=True)
+    
+    img = qr.make_image(fill_color="black", back_color="white") if image_format == 'png' else qr.make_image()
+    
+    buffer = io.BytesIO()
+    if image_format == 'png':
+        img.save(buffer, format='PNG')
+    else:
+        img.save(buffer)
+    image = buffer.getvalue()
+    
+    return image, hashlib.sha256(image).hexdigest()
@@ -1,28 +1,104 @@
 from flask import Blueprint, request, jsonify
-from src.config.database import supabase
+from src.config.database import db
 from src.utils.auth import token_required
+from src.utils.fields import InvalidFields, Projection
+from src.utils.pagination import InvalidPage, page_args, paginate
+from src.utils.availability import (
+    ACTIVE_STATUSES, APPOINTMENT_STATUSES, AVAILABILITY_MAX_CLINICS, AVAILABILITY_MAX_DAYS, compile_schedule,
+    date_range, free_masks, get_clinics, get_occupancy, invalidate_slot, occupancy_masks
+)
 from datetime import datetime, date
 
 appointments_bp = Blueprint('appointments', __name__)
 
+# Erros retornados pela função criar_agendamento do banco
+BOOKING_ERRORS = {
+    'animal_nao_encontrado': ('Animal não encontrado ou não pertence ao tutor', 404),
+    'clinica_nao_encontrada': ('Clínica não encontrada com este email', 404),
+    'horario_ocupado': ('Já existe um agendamento neste horário', 409),
+}
+
+# Ordenação da listagem (paginação por cursor)
+APPOINTMENT_KEYSET = ['data_agendamento', 'horario', 'id']
+
+# Campos aceitos em ?fields= (colunas da view_agendamentos_completo)
+APPOINTMENT_FIELDS = Projection(
+    allowed=['id', 'data_agendamento', 'horario', 'tipo_consulta', 'status', 'observacoes', 'nome_animal', 'especie',
+             'nome_tutor', 'email_tutor', 'telefone_tutor', 'nome_clinica', 'email_clinica', 'tutor_id', 'clinica_id',
+             'animal_id', 'criado_em'],
+    # Listagem sem os contatos do tutor e os ids internos
+    default=['id', 'data_agendamento', 'horario', 'tipo_consulta', 'status', 'observacoes', 'nome_animal', 'especie',
+             'nome_tutor', 'nome_clinica', 'email_clinica', 'animal_id', 'criado_em'],
+    required=APPOINTMENT_KEYSET
+)
+
+
+class InvalidAppointmentFilter(ValueError):
+    """
+    Filtro da listagem de agendamentos inválido (responder com 400)
+    """
+
+
+def apply_appointment_filters(query, args):
+    """
+    Filtros da listagem, aplicados no banco antes da paginação: ``status`` (um ou mais,
+    separados por vírgula) e ``data`` (um dia) ou ``inicio``/``fim`` (YYYY-MM-DD, inclusive)
+    """
+    statuses = [status.strip() for status in args.get('status', '').split(',') if status.strip()]
+    invalid = [status for status in statuses if status not in APPOINTMENT_STATUSES]
+    if invalid:
+        raise InvalidAppointmentFilter(f'Status deve ser um dos: {", ".join(APPOINTMENT_STATUSES)}')
+    if args.get('data') and (args.get('inicio') or args.get('fim')):
+        raise InvalidAppointmentFilter('Use data ou inicio/fim, não os dois')
+
+    try:
+        inicio, fim = (datetime.strptime(args[name], '%Y-%m-%d').date() if args.get(name) else None
+                       for name in ('inicio', 'fim'))
+        if args.get('data'):
+            inicio = fim = datetime.strptime(args['data'], '%Y-%m-%d').date()
+    except ValueError:
+        raise InvalidAppointmentFilter('Datas devem estar no formato YYYY-MM-DD')
+    if inicio and fim and inicio > fim:
+        raise InvalidAppointmentFilter('inicio deve ser anterior ou igual a fim')
+
+    if len(statuses) == 1:
+        query = query.eq('status', statuses[0])
+    elif statuses:
+        query = query.in_('status', statuses)
+    if inicio:
+        query = query.gte('data_agendamento', inicio.isoformat())
+    if fim:
+        query = query.lte('data_agendamento', fim.isoformat())
+    return query
+
 @appointments_bp.route('/', methods=['GET'])
 @token_required
 def get_appointments(current_user):
     """
-    Listar agendamentos do usuário logado
+    Listar agendamentos do usuário logado (paginado: limit, cursor, order; campos: fields;
+    filtros: status, data, inicio e fim)
     """
     try:
+        page = page_args(request.args, APPOINTMENT_KEYSET)
+        columns = APPOINTMENT_FIELDS.select(APPOINTMENT_FIELDS.fields(request.args))
+        
         if current_user['type'] == 'tutor':
             # Tutores veem seus próprios agendamentos
-            result = supabase.table('view_agendamentos_completo').select('*').eq('tutor_id', current_user['id']).execute()
+            query = db.table('view_agendamentos_completo').select(columns).eq('tutor_id', current_user['id'])
         else:
             # Clínicas veem agendamentos direcionados a elas
-            result = supabase.table('view_agendamentos_completo').select('*').eq('clinica_id', current_user['id']).execute()
+            query = db.table('view_agendamentos_completo').select(columns).eq('clinica_id', current_user['id'])
+        query = apply_appointment_filters(query, request.args)
+        
+        appointments, next_cursor = paginate(query, page)
         
         return jsonify({
-            'appointments': result.data
+            'appointments': appointments,
+            'next_cursor': next_cursor
         }), 200
         
+    except (InvalidPage, InvalidFields, InvalidAppointmentFilter) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
@@ -36,77 +112,24 @@ def create_appointment(current_user):
         if current_user['type'] != 'tutor':
             return jsonify({'error': 'Apenas tutores podem criar agendamentos'}), 403
         
-        data = request.get_json()
-        
-        # Validação dos campos obrigatórios
-        required_fields = ['animal_id', 'email_clinica', 'data_agendamento', 'horario']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({'error': f'Campo {field} é obrigatório'}), 400
-        
-        animal_id = data['animal_id']
-        email_clinica = data['email_clinica'].strip().lower()
-        data_agendamento = data['data_agendamento']
-        horario = data['horario']
-        tipo_consulta = data.get('tipo_consulta', 'Consulta Geral')
-        observacoes = data.get('observacoes', '').strip()
-        
-        # Verificar se o animal pertence ao tutor
-        animal_result = supabase.table('animais').select('*').eq('id', animal_id).eq('tutor_id', current_user['id']).eq('ativo', True).execute()
-        
-        if not animal_result.data:
-            return jsonify({'error': 'Animal não encontrado ou não pertence ao tutor'}), 404
-        
-        # Buscar clínica pelo email
-        clinica_result = supabase.table('usuarios_clinicas').select('id').eq('email', email_clinica).eq('ativo', True).execute()
-        
-        if not clinica_result.data:
-            return jsonify({'error': 'Clínica não encontrada com este email'}), 404
-        
-        clinica_id = clinica_result.data[0]['id']
-        
-        # Validar data (não pode ser no passado)
         try:
-            appointment_date = datetime.strptime(data_agendamento, '%Y-%m-%d').date()
-            if appointment_date < date.today():
-                return jsonify({'error': 'Data do agendamento não pode ser no passado'}), 400
-        except ValueError:
-            return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD'}), 400
+            params = booking_request(current_user['id'], request.get_json())
+        except InvalidSlot as e:
+            for erro, query in slot_error_lookups(db, e.params):
+                if not query.execute().data:
+                    raise BookingRejected(*BOOKING_ERRORS[erro])
+            raise
         
-        # Validar horário
-        try:
-            datetime.strptime(horario, '%H:%M')
-        except ValueError:
-            return jsonify({'error': 'Formato de horário inválido. Use HH:MM'}), 400
-        
-        # Verificar se já existe agendamento no mesmo horário
-        existing_appointment = supabase.table('agendamentos').select('id').eq('clinica_id', clinica_id).eq('data_agendamento', data_agendamento).eq('horario', horario).in_('status', ['pendente', 'aceito']).execute()
-        
-        if existing_appointment.data:
-            return jsonify({'error': 'Já existe um agendamento neste horário'}), 409
-        
-        # Criar agendamento
-        appointment_data = {
-            'tutor_id': current_user['id'],
-            'clinica_id': clinica_id,
-            'animal_id': animal_id,
-            'data_agendamento': data_agendamento,
-            'horario': horario,
-            'tipo_consulta': tipo_consulta,
-            'observacoes': observacoes,
-            'status': 'pendente'
-        }
+        # Verificação do animal, da clínica, do conflito de horário e inserção em uma única chamada
+        appointment = booking_result(db.rpc('criar_agendamento', params).execute().data)
         
-        result = supabase.table('agendamentos').insert(appointment_data).execute()
-        
-        if result.data:
-            return jsonify({
-                'message': 'Agendamento criado com sucesso',
-                'appointment': result.data[0]
-            }), 201
-        else:
-            return jsonify({'error': 'Erro ao criar agendamento'}), 500
+        return jsonify({
+            'message': 'Agendamento criado com sucesso',
+            'appointment': appointment
+        }), 201
             
+    except BookingRejected as e:
+        return jsonify({'error': str(e)}), e.status
     except Exception as e:
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
@@ -138,7 +161,7 @@ def update_appointment_status(current_user, appointment_id):
             return jsonify({'error': 'Motivo da recusa é obrigatório'}), 400
         
         # Verificar se o agendamento existe e pertence à clínica
-        appointment_result = supabase.table('agendamentos').select('*').eq('id', appointment_id).eq('clinica_id', current_user['id']).execute()
+        appointment_result = db.table('agendamentos').select('id, status, clinica_id, data_agendamento').eq('id', appointment_id).eq('clinica_id', current_user['id']).execute()
         
         if not appointment_result.data:
             return jsonify({'error': 'Agendamento não encontrado'}), 404
@@ -157,9 +180,13 @@ def update_appointment_status(current_user, appointment_id):
         if new_status == 'recusado':
             update_data['motivo_recusa'] = motivo_recusa
         
-        result = supabase.table('agendamentos').update(update_data).eq('id', appointment_id).execute()
+        result = db.table('agendamentos').update(update_data).eq('id', appointment_id).execute()
         
         if result.data:
+            # Recusa libera o horário
+            if new_status not in ACTIVE_STATUSES:
+                invalidate_slot(appointment['clinica_id'], appointment['data_agendamento'])
+            
             return jsonify({
                 'message': f'Agendamento {new_status} com sucesso',
                 'appointment': result.data[0]
@@ -179,9 +206,9 @@ def cancel_appointment(current_user, appointment_id):
     try:
         # Verificar se o agendamento existe
         if current_user['type'] == 'tutor':
-            appointment_result = supabase.table('agendamentos').select('*').eq('id', appointment_id).eq('tutor_id', current_user['id']).execute()
+            appointment_result = db.table('agendamentos').select('id, status, clinica_id, data_agendamento').eq('id', appointment_id).eq('tutor_id', current_user['id']).execute()
         else:
-            appointment_result = supabase.table('agendamentos').select('*').eq('id', appointment_id).eq('clinica_id', current_user['id']).execute()
+            appointment_result = db.table('agendamentos').select('id, status, clinica_id, data_agendamento').eq('id', appointment_id).eq('clinica_id', current_user['id']).execute()
         
         if not appointment_result.data:
             return jsonify({'error': 'Agendamento não encontrado'}), 404
@@ -193,9 +220,10 @@ def cancel_appointment(current_user, appointment_id):
             return jsonify({'error': 'Agendamento não pode ser cancelado'}), 400
         
         # Atualizar status para cancelado
-        result = supabase.table('agendamentos').update({'status': 'cancelado'}).eq('id', appointment_id).execute()
+        result = db.table('agendamentos').update({'status': 'cancelado'}).eq('id', appointment_id).execute()
         
         if result.data:
+            invalidate_slot(appointment['clinica_id'], appointment['data_agendamento'])
             return jsonify({
                 'message': 'Agendamento cancelado com sucesso'
             }), 200
@@ -217,27 +245,26 @@ def get_available_times():
         if not email_clinica or not data_agendamento:
             return jsonify({'error': 'Email da clínica e data são obrigatórios'}), 400
         
-        # Buscar clínica
-        clinica_result = supabase.table('usuarios_clinicas').select('id, horario_funcionamento').eq('email', email_clinica.lower()).eq('ativo', True).execute()
+        # Buscar clínica (em cache por alguns segundos)
+        clinica = get_clinics([email_clinica.lower()]).get(email_clinica.lower())
         
-        if not clinica_result.data:
+        if clinica is None:
             return jsonify({'error': 'Clínica não encontrada'}), 404
         
-        clinica = clinica_result.data[0]
-        
-        # Buscar agendamentos já marcados nesta data
-        appointments_result = supabase.table('agendamentos').select('horario').eq('clinica_id', clinica['id']).eq('data_agendamento', data_agendamento).in_('status', ['pendente', 'aceito']).execute()
+        try:
+            day = datetime.strptime(data_agendamento, '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD'}), 400
         
-        occupied_times = [apt['horario'] for apt in appointments_result.data]
+        # Buscar agendamentos já marcados nesta data (cache invalidado a cada alteração)
+        appointments = get_occupancy([clinica['id']], [day])
         
-        # Horários padrão (pode ser customizado por clínica no futuro)
-        default_times = [
-            '08:00', '08:30', '09:00', '09:30', '10:00', '10:30',
-            '11:00', '11:30', '14:00', '14:30', '15:00', '15:30',
-            '16:00', '16:30', '17:00', '17:30'
-        ]
+        occupied_times = [str(apt['horario'])[:5] for apt in appointments]
         
-        available_times = [time for time in default_times if time not in occupied_times]
+        # Horários do dia conforme o horário de funcionamento da clínica
+        schedule = compile_schedule(clinica.get('horario_funcionamento'))
+        occupied = occupancy_masks({clinica['id']: schedule}, appointments)
+        available_times = schedule.times(free_masks(schedule, clinica['id'], [day], occupied)[day.isoformat()])
         
         return jsonify({
             'available_times': available_times,
@@ -247,3 +274,171 @@ def get_available_times():
     except Exception as e:
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
+@appointments_bp.route('/availability', methods=['GET'])
+def get_availability():
+    """
+    Horários disponíveis de várias clínicas em um período (calendário de agendamento)
+    Parâmetros: clinicas (emails separados por vírgula), inicio (YYYY-MM-DD, padrão hoje),
+    dias (padrão 30) e formato ('lista' ou 'bitset')
+    """
+    try:
+        emails = [e.strip().lower() for e in request.args.get('clinicas', '').split(',') if e.strip()]
+        formato = request.args.get('formato', 'lista')
+        
+        if not emails:
+            return jsonify({'error': 'Informe ao menos uma clínica'}), 400
+        if len(emails) > AVAILABILITY_MAX_CLINICS:
+            return jsonify({'error': f'Máximo de {AVAILABILITY_MAX_CLINICS} clínicas por consulta'}), 400
+        if formato not in ('lista', 'bitset'):
+            return jsonify({'error': 'Formato inválido. Use lista ou bitset'}), 400
+        
+        try:
+            inicio = datetime.strptime(request.args['inicio'], '%Y-%m-%d').date() if request.args.get('inicio') else date.today()
+            dias = int(request.args.get('dias', 30))
+        except ValueError:
+            return jsonify({'error': 'Parâmetros inválidos. Use inicio=YYYY-MM-DD e dias numérico'}), 400
+        
+        if not 1 <= dias <= AVAILABILITY_MAX_DAYS:
+            return jsonify({'error': f'dias deve estar entre 1 e {AVAILABILITY_MAX_DAYS}'}), 400
+        
+        by_email = get_clinics(emails)
+        
+        if not by_email:
+            return jsonify({'error': 'Clínica não encontrada'}), 404
+        
+        days = date_range(inicio, dias)
+        schedules = {c['id']: compile_schedule(c.get('horario_funcionamento')) for c in by_email.values()}
+        
+        # Uma única consulta para os agendamentos que não estão em cache
+        occupied = occupancy_masks(schedules, get_occupancy(list(schedules), days))
+        
+        clinicas = []
+        for email in emails:
+            clinica = by_email.get(email)
+            if clinica is None:
+                continue
+            schedule = schedules[clinica['id']]
+            masks = free_masks(schedule, clinica['id'], days, occupied)
+            entry = {
+                'email': clinica['email'],
+                'nome_clinica': clinica['nome_clinica'],
+                'intervalo': schedule.interval
+            }
+            if formato == 'bitset':
+                # Bit i da máscara (hexadecimal) corresponde a horarios[i]
+                entry['horarios'] = list(schedule.slots)
+                entry['dias'] = {day: format(mask, 'x') for day, mask in masks.items()}
+            else:
+                entry['dias'] = {day: schedule.times(mask) for day, mask in masks.items()}
+            clinicas.append(entry)
+        
+        return jsonify({
+            'inicio': days[0].isoformat(),
+            'fim': days[-1].isoformat(),
+            'clinicas': clinicas,
+            'nao_encontradas': [email for email in emails if email not in by_email]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+def validate_appointment_slot(data_agendamento, horario):
+    """
+    Valida data (formato e não estar no passado) e horário; retorna a mensagem de erro ou None
+    """
+    try:
+        appointment_date = datetime.strptime(data_agendamento, '%Y-%m-%d').date()
+        if appointment_date < date.today():
+            return 'Data do agendamento não pode ser no passado'
+    except ValueError:
+        return 'Formato de data inválido. Use YYYY-MM-DD'
+    
+    try:
+        datetime.strptime(horario, '%H:%M')
+    except ValueError:
+        return 'Formato de horário inválido. Use HH:MM'
+    
+    return None
+
+def booking_params(tutor_id, animal_id, email_clinica, data_agendamento, horario, tipo_consulta, observacoes):
+    """
+    Parâmetros da função criar_agendamento
+    """
+    return {
+        'p_tutor_id': tutor_id,
+        'p_animal_id': animal_id,
+        'p_email_clinica': email_clinica,
+        'p_data_agendamento': data_agendamento,
+        'p_horario': horario,
+        'p_tipo_consulta': tipo_consulta,
+        'p_observacoes': observacoes
+    }
+
+class BookingRejected(Exception):
+    """
+    Agendamento recusado: a mensagem e o status HTTP vão na resposta
+    """
+
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
+class InvalidSlot(BookingRejected):
+    """
+    Data ou horário inválidos (400), com os parâmetros já montados para conferir o animal e a clínica
+    """
+
+    def __init__(self, message: str, params: dict):
+        super().__init__(message, 400)
+        self.params = params
+
+def booking_request(tutor_id, data) -> dict:
+    """
+    Valida o corpo do POST /api/appointments/ e devolve os parâmetros de criar_agendamento
+    (usado pela rota Flask e pelo handler ASGI)
+    """
+    # Validação dos campos obrigatórios
+    required_fields = ['animal_id', 'email_clinica', 'data_agendamento', 'horario']
+    for field in required_fields:
+        if not data.get(field):
+            raise BookingRejected(f'Campo {field} é obrigatório', 400)
+    
+    params = booking_params(
+        tutor_id,
+        data['animal_id'],
+        data['email_clinica'].strip().lower(),
+        data['data_agendamento'],
+        data['horario'],
+        data.get('tipo_consulta', 'Consulta Geral'),
+        data.get('observacoes', '').strip(),
+    )
+    
+    error = validate_appointment_slot(data['data_agendamento'], data['horario'])
+    if error:
+        raise InvalidSlot(error, params)
+    
+    return params
+
+def slot_error_lookups(database, params: dict) -> list:
+    """
+    Consultas (db ou async_db) do animal e da clínica, cada uma com o erro de BOOKING_ERRORS
+    se não achar nada. Só rodam com data ou horário inválidos: animal ou clínica inexistentes
+    respondem 404 antes do erro de data/horário, como na validação anterior à função do banco.
+    """
+    return [
+        ('animal_nao_encontrado', database.table('animais').select('id').eq('id', params['p_animal_id'])
+            .eq('tutor_id', params['p_tutor_id']).eq('ativo', True).limit(1)),
+        ('clinica_nao_encontrada', database.table('usuarios_clinicas').select('id')
+            .eq('email', params['p_email_clinica']).eq('ativo', True).limit(1)),
+    ]
+
+def booking_result(outcome: dict) -> dict:
+    """
+    Agendamento criado pela função criar_agendamento (BookingRejected com o erro que ela
+    devolveu); libera o horário no cache de ocupação
+    """
+    if outcome.get('erro'):
+        raise BookingRejected(*BOOKING_ERRORS[outcome['erro']])
+    
+    invalidate_slot(outcome['agendamento']['clinica_id'], outcome['agendamento']['data_agendamento'])
+    return outcome['agendamento']
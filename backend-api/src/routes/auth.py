@@ -1,11 +1,14 @@
 from flask import Blueprint, request, jsonify
-from src.config.database import supabase
-from src.utils.auth import hash_password, verify_password, generate_token, validate_email, validate_password, validate_phone
+from src.config.database import db
+from src.utils.auth import HashingPoolFull, hash_password, verify_password, needs_rehash, rehash_password_later, generate_token, validate_email, validate_password, validate_phone
+from src.utils.availability import parse_hours
+from src.utils.rate_limit import rate_limited
 import uuid
 
 auth_bp = Blueprint('auth', __name__)
 
 @auth_bp.route('/register/tutor', methods=['POST'])
+@rate_limited('register')
 def register_tutor():
     """
     Cadastro de tutor
@@ -40,7 +43,7 @@ def register_tutor():
             return jsonify({'error': 'Telefone inválido'}), 400
         
         # Verificar se email já existe
-        existing_user = supabase.table('usuarios_tutores').select('id').eq('email', email).execute()
+        existing_user = db.table('usuarios_tutores').select('id').eq('email', email).execute()
         if existing_user.data:
             return jsonify({'error': 'Email já cadastrado'}), 409
         
@@ -59,7 +62,7 @@ def register_tutor():
             'cep': cep
         }
         
-        result = supabase.table('usuarios_tutores').insert(user_data).execute()
+        result = db.table('usuarios_tutores').insert(user_data).execute()
         
         if result.data:
             user = result.data[0]
@@ -79,10 +82,13 @@ def register_tutor():
         else:
             return jsonify({'error': 'Erro ao cadastrar tutor'}), 500
             
+    except HashingPoolFull:
+        return jsonify({'error': 'Servidor ocupado, tente novamente em instantes'}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
 @auth_bp.route('/register/clinica', methods=['POST'])
+@rate_limited('register')
 def register_clinica():
     """
     Cadastro de clínica veterinária
@@ -107,6 +113,7 @@ def register_clinica():
         cnpj = data.get('cnpj', '').strip()
         responsavel_tecnico = data.get('responsavel_tecnico', '').strip()
         crmv = data.get('crmv', '').strip()
+        horario_funcionamento = data.get('horario_funcionamento')
         
         # Validações
         if not validate_email(email):
@@ -119,8 +126,14 @@ def register_clinica():
         if not validate_phone(telefone):
             return jsonify({'error': 'Telefone inválido'}), 400
         
+        if horario_funcionamento:
+            try:
+                parse_hours(horario_funcionamento)
+            except ValueError as e:
+                return jsonify({'error': f'Horário de funcionamento inválido: {str(e)}'}), 400
+        
         # Verificar se email já existe
-        existing_user = supabase.table('usuarios_clinicas').select('id').eq('email', email).execute()
+        existing_user = db.table('usuarios_clinicas').select('id').eq('email', email).execute()
         if existing_user.data:
             return jsonify({'error': 'Email já cadastrado'}), 409
         
@@ -139,10 +152,11 @@ def register_clinica():
             'cep': cep,
             'cnpj': cnpj,
             'responsavel_tecnico': responsavel_tecnico,
-            'crmv': crmv
+            'crmv': crmv,
+            'horario_funcionamento': horario_funcionamento or None
         }
         
-        result = supabase.table('usuarios_clinicas').insert(user_data).execute()
+        result = db.table('usuarios_clinicas').insert(user_data).execute()
         
         if result.data:
             user = result.data[0]
@@ -162,10 +176,13 @@ def register_clinica():
         else:
             return jsonify({'error': 'Erro ao cadastrar clínica'}), 500
             
+    except HashingPoolFull:
+        return jsonify({'error': 'Servidor ocupado, tente novamente em instantes'}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
 @auth_bp.route('/login', methods=['POST'])
+@rate_limited('login')
 def login():
     """
     Login para tutores e clínicas
@@ -186,7 +203,7 @@ def login():
         # Buscar usuário na tabela correspondente
         table_name = 'usuarios_tutores' if user_type == 'tutor' else 'usuarios_clinicas'
         
-        result = supabase.table(table_name).select('*').eq('email', email).eq('ativo', True).execute()
+        result = db.table(table_name).select('*').eq('email', email).eq('ativo', True).execute()
         
         if not result.data:
             return jsonify({'error': 'Email ou senha incorretos'}), 401
@@ -197,6 +214,12 @@ def login():
         if not verify_password(senha, user['senha_hash']):
             return jsonify({'error': 'Email ou senha incorretos'}), 401
         
+        # Atualizar o hash se o custo do bcrypt configurado mudou (em segundo plano: o login
+        # não espera um segundo bcrypt)
+        if needs_rehash(user['senha_hash']):
+            rehash_password_later(senha, lambda senha_hash: db.table(table_name).update(
+                {'senha_hash': senha_hash}).eq('id', user['id']).execute())
+        
         # Gerar token
         token = generate_token(user['id'], user_type)
         
@@ -218,6 +241,8 @@ def login():
             'user': user_data
         }), 200
         
+    except HashingPoolFull:
+        return jsonify({'error': 'Servidor ocupado, tente novamente em instantes'}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
@@ -248,7 +273,7 @@ def verify_token():
         # Buscar dados atualizados do usuário
         table_name = 'usuarios_tutores' if data['user_type'] == 'tutor' else 'usuarios_clinicas'
         
-        result = supabase.table(table_name).select('*').eq('id', data['user_id']).eq('ativo', True).execute()
+        result = db.table(table_name).select('*').eq('id', data['user_id']).eq('ativo', True).execute()
         
         if not result.data:
             return jsonify({'error': 'Usuário não encontrado'}), 404
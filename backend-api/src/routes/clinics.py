@@ -0,0 +1,107 @@
+from flask import Blueprint, request, jsonify
+from src.config.database import db
+from src.utils.auth import token_required
+from src.utils.availability import APPOINTMENT_STATUSES
+from datetime import date, datetime, timedelta
+import os
+
+clinics_bp = Blueprint('clinics', __name__)
+
+# Maior período aceito em /me/stats (dias): limita o tamanho de por_dia
+CLINIC_STATS_MAX_DAYS = int(os.getenv('CLINIC_STATS_MAX_DAYS', '366'))
+
+
+def parse_period(args, today: date):
+    """
+    inicio e fim (YYYY-MM-DD, inclusive); sem eles, o mês atual
+    """
+    try:
+        start = datetime.strptime(args['inicio'], '%Y-%m-%d').date() if args.get('inicio') else today.replace(day=1)
+        if args.get('fim'):
+            end = datetime.strptime(args['fim'], '%Y-%m-%d').date()
+        else:
+            end = (start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    except ValueError:
+        raise ValueError('Formato de data inválido. Use YYYY-MM-DD')
+    if end < start:
+        raise ValueError('fim deve ser igual ou posterior a inicio')
+    if (end - start).days + 1 > CLINIC_STATS_MAX_DAYS:
+        raise ValueError(f'O período aceita no máximo {CLINIC_STATS_MAX_DAYS} dias')
+    return start, end
+
+
+def rate(part, whole):
+    return round(part / whole, 4) if whole else None
+
+
+def build_stats(raw: dict, start: date, end: date) -> dict:
+    """
+    Monta a resposta a partir dos agregados de estatisticas_clinica (um dia por posição de por_dia)
+    """
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    per_day = {day.isoformat(): {'data': day.isoformat(), 'total': 0, **dict.fromkeys(APPOINTMENT_STATUSES, 0)}
+               for day in days}
+    status = dict.fromkeys(APPOINTMENT_STATUSES, 0)
+    for row in raw.get('por_dia') or []:
+        day = per_day[str(row['data'])[:10]]
+        day[row['status']] += row['total']
+        day['total'] += row['total']
+        status[row['status']] += row['total']
+
+    no_show = raw['nao_comparecimento']
+    revenue_appointments = float(raw['receita_agendamentos'])
+    revenue_consultations = float(raw['receita_consultas'])
+    return {
+        'periodo': {'inicio': start.isoformat(), 'fim': end.isoformat()},
+        'total': sum(status.values()),
+        'status': status,
+        'por_dia': list(per_day.values()),
+        'pacientes': raw['pacientes'],
+        'pendentes': raw['pendentes'],
+        'nao_comparecimento': {
+            'total': no_show,
+            # Entre os que deveriam ter acontecido: concluídos + faltas
+            'taxa': rate(no_show, status['concluido'] + no_show)
+        },
+        'recusa': {
+            'total': status['recusado'],
+            # Entre os respondidos pela clínica
+            'taxa': rate(status['recusado'], status['recusado'] + status['aceito'] + status['concluido'])
+        },
+        'receita': {
+            'agendamentos': revenue_appointments,
+            'consultas': revenue_consultations,
+            # Consultas + agendamentos concluídos sem consulta registrada (sem contar duas vezes)
+            'total': round(revenue_consultations + float(raw['receita_sem_consulta']), 2)
+        }
+    }
+
+@clinics_bp.route('/me/stats', methods=['GET'])
+@token_required
+def get_my_stats(current_user):
+    """
+    Painel da clínica logada no período (inicio, fim; padrão: mês atual): agendamentos por
+    status e por dia, faltas, recusas e receita, agregados no banco
+    """
+    try:
+        if current_user['type'] != 'clinica':
+            return jsonify({'error': 'Apenas clínicas têm painel de estatísticas'}), 403
+
+        today = date.today()
+        try:
+            start, end = parse_period(request.args, today)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        # Uma ida ao banco: GROUP BY no período, o tamanho não depende do histórico
+        raw = db.rpc('estatisticas_clinica', {
+            'p_clinica_id': current_user['id'],
+            'p_inicio': start.isoformat(),
+            'p_fim': end.isoformat(),
+            'p_hoje': today.isoformat()
+        }).execute().data
+
+        return jsonify(build_stats(raw, start, end)), 200
+
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
@@ -1,9 +1,18 @@
+import uuid
+from datetime import datetime, timezone
 from flask import Blueprint, request, jsonify
-from src.config.database import supabase
+from src.config.database import db
+from src.utils.contact_queue import contact_queue
+from src.utils.pagination import InvalidPage, page_args, paginate
+from src.utils.rate_limit import rate_limited
 
 contact_bp = Blueprint('contact', __name__)
 
+# Ordenação da listagem (paginação por cursor)
+CONTACT_KEYSET = ['criado_em', 'id']
+
 @contact_bp.route('/', methods=['POST'])
+@rate_limited('contact')
 def create_contact():
     """
     Criar nova mensagem de contato
@@ -37,7 +46,24 @@ def create_contact():
             'mensagem': mensagem
         }
         
-        result = supabase.table('contatos').insert(contact_data).execute()
+        # Gravação adiada: a mensagem vai para o spool e o banco é gravado em lote depois
+        if contact_queue.enabled:
+            contact_data.update({
+                'id': str(uuid.uuid4()),
+                'respondido': False,
+                'criado_em': datetime.now(timezone.utc).isoformat()
+            })
+            try:
+                contact_queue.submit(contact_data)
+                return jsonify({
+                    'message': 'Mensagem enviada com sucesso! Entraremos em contato em breve.',
+                    'contact': contact_data
+                }), 202
+            except OSError as e:
+                # Spool indisponível (disco cheio, sem permissão): grava direto no banco
+                print(f"Erro no spool de contatos: {e}")
+        
+        result = db.table('contatos').insert(contact_data).execute()
         
         if result.data:
             return jsonify({
@@ -53,16 +79,21 @@ def create_contact():
 @contact_bp.route('/', methods=['GET'])
 def get_contacts():
     """
-    Listar mensagens de contato (para administração)
+    Listar mensagens de contato (para administração; paginado: limit, cursor, order)
     """
     try:
+        page = page_args(request.args, CONTACT_KEYSET)
+        
         # Esta rota pode ser protegida com autenticação de admin no futuro
-        result = supabase.table('contatos').select('*').order('criado_em', desc=True).execute()
+        contacts, next_cursor = paginate(db.table('contatos').select('*'), page)
         
         return jsonify({
-            'contacts': result.data
+            'contacts': contacts,
+            'next_cursor': next_cursor
         }), 200
         
+    except InvalidPage as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
@@ -72,7 +103,7 @@ def mark_as_responded(contact_id):
     Marcar mensagem como respondida
     """
     try:
-        result = supabase.table('contatos').update({'respondido': True}).eq('id', contact_id).execute()
+        result = db.table('contatos').update({'respondido': True}).eq('id', contact_id).execute()
         
         if result.data:
             return jsonify({
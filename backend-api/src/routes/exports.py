@@ -0,0 +1,113 @@
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from src.config.database import db
+from src.utils.auth import token_required
+from src.utils.export import EXPORT_FORMATS, ExportSource, csv_stream, iter_pages, ndjson_stream
+from datetime import datetime, timedelta
+import itertools
+
+exports_bp = Blueprint('exports', __name__)
+
+# Históricos exportáveis pela clínica (todas as linhas, inclusive canceladas/inativas)
+EXPORT_SOURCES = {
+    'appointments': ExportSource(
+        table='agendamentos',
+        columns=['id', 'data_agendamento', 'horario', 'status', 'tipo_consulta', 'valor', 'observacoes',
+                 'motivo_recusa', 'animal_id', 'tutor_id', 'clinica_id', 'criado_em', 'atualizado_em'],
+        keyset=['data_agendamento', 'horario', 'id'],
+        date_column='data_agendamento'
+    ),
+    'animals': ExportSource(
+        table='animais',
+        # qr_code_url fica de fora: o QR Code é gerado sob demanda
+        columns=['id', 'nome', 'especie', 'raca', 'idade', 'peso', 'cor', 'sexo', 'castrado', 'foto_url',
+                 'historico_medico', 'observacoes', 'tutor_id', 'clinica_id', 'ativo', 'criado_em', 'atualizado_em'],
+        keyset=['criado_em', 'id'],
+        date_column='criado_em',
+        timestamp=True
+    ),
+    'consultations': ExportSource(
+        table='consultas',
+        columns=['id', 'data_consulta', 'veterinario', 'diagnostico', 'tratamento', 'medicamentos', 'observacoes',
+                 'proxima_consulta', 'valor', 'agendamento_id', 'animal_id', 'clinica_id', 'criado_em'],
+        keyset=['data_consulta', 'id'],
+        date_column='data_consulta',
+        timestamp=True
+    ),
+    'vaccines': ExportSource(
+        table='vacinas',
+        columns=['id', 'nome_vacina', 'data_aplicacao', 'data_vencimento', 'lote', 'veterinario', 'observacoes',
+                 'animal_id', 'clinica_id', 'criado_em'],
+        keyset=['data_aplicacao', 'id'],
+        date_column='data_aplicacao'
+    ),
+}
+
+# Nome do arquivo baixado
+EXPORT_FILE_NAMES = {
+    'appointments': 'agendamentos',
+    'animals': 'animais',
+    'consultations': 'consultas',
+    'vaccines': 'vacinas',
+}
+
+@exports_bp.route('/<resource>', methods=['GET'])
+@token_required
+def export_history(current_user, resource):
+    """
+    Exportar o histórico da clínica em streaming
+    Parâmetros: format=ndjson|csv (padrão ndjson), inicio e fim (YYYY-MM-DD, inclusive)
+    Recursos: appointments, animals, consultations, vaccines
+    """
+    try:
+        if current_user['type'] != 'clinica':
+            return jsonify({'error': 'Apenas clínicas podem exportar o histórico'}), 403
+
+        source = EXPORT_SOURCES.get(resource)
+        if source is None:
+            return jsonify({'error': f'Recurso inválido. Use: {", ".join(EXPORT_SOURCES)}'}), 404
+
+        output_format = request.args.get('format', 'ndjson').lower()
+        if output_format not in EXPORT_FORMATS:
+            return jsonify({'error': 'Formato deve ser "ndjson" ou "csv"'}), 400
+
+        try:
+            inicio = datetime.strptime(request.args['inicio'], '%Y-%m-%d').date() if request.args.get('inicio') else None
+            fim = datetime.strptime(request.args['fim'], '%Y-%m-%d').date() if request.args.get('fim') else None
+        except ValueError:
+            return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD'}), 400
+
+        if inicio and fim and inicio > fim:
+            return jsonify({'error': 'inicio deve ser anterior ou igual a fim'}), 400
+
+        def query():
+            q = db.table(source.table).select(', '.join(source.columns)).eq('clinica_id', current_user['id'])
+            if inicio:
+                q = q.gte(source.date_column, inicio.isoformat())
+            if fim:
+                if source.timestamp:
+                    # Data/hora: inclui o dia inteiro de fim
+                    q = q.lt(source.date_column, (fim + timedelta(days=1)).isoformat())
+                else:
+                    q = q.lte(source.date_column, fim.isoformat())
+            return q
+
+        # A primeira página é lida antes de responder: erros do banco ainda viram um 500 em JSON
+        pages = iter_pages(query, source.keyset)
+        first = next(pages, [])
+        pages = itertools.chain([first], pages)
+
+        if output_format == 'csv':
+            stream = csv_stream(pages, source.columns)
+        else:
+            stream = ndjson_stream(pages)
+
+        period = '-'.join(d.isoformat() for d in (inicio, fim) if d)
+        filename = f'{EXPORT_FILE_NAMES[resource]}{"-" + period if period else ""}.{output_format}'
+
+        return Response(stream_with_context(stream), mimetype=EXPORT_FORMATS[output_format], headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'Cache-Control': 'no-store'
+        })
+
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
@@ -0,0 +1,249 @@
+from flask import Blueprint, request, jsonify
+from src.config.database import db
+from src.utils.access import clinic_can_access_animal
+from src.utils.auth import token_required
+from src.utils.pagination import InvalidPage, page_args, paginate
+from src.utils.vaccine_reminders import due_vaccine_pages, group_reminders
+from datetime import date, datetime
+import os
+
+vaccines_bp = Blueprint('vaccines', __name__)
+
+# Ordenação da listagem (paginação por cursor)
+VACCINE_KEYSET = ['data_aplicacao', 'id']
+VACCINE_COLUMNS = ('id, nome_vacina, data_aplicacao, data_vencimento, lote, veterinario, observacoes, '
+                   'animal_id, clinica_id, criado_em')
+# Campos de texto e tamanho máximo (colunas do schema.sql)
+VACCINE_TEXT_FIELDS = {'nome_vacina': 255, 'lote': 100, 'veterinario': 255, 'observacoes': None}
+# Maior janela aceita em /due (dias)
+VACCINE_DUE_MAX_DAYS = int(os.getenv('VACCINE_DUE_MAX_DAYS', '180'))
+
+
+class InvalidVaccine(ValueError):
+    """
+    Dados de vacina inválidos (responder com 400)
+    """
+
+
+def parse_date(value, field):
+    try:
+        return datetime.strptime(str(value), '%Y-%m-%d').date()
+    except ValueError:
+        raise InvalidVaccine(f'{field}: formato de data inválido. Use YYYY-MM-DD')
+
+
+def build_vaccine(data, current=None):
+    """
+    Valida os campos enviados; ``current`` é a vacina gravada (atualização parcial)
+    """
+    if not isinstance(data, dict):
+        raise InvalidVaccine('Corpo da requisição deve ser um objeto JSON')
+
+    vaccine = {}
+    for field, max_length in VACCINE_TEXT_FIELDS.items():
+        if field not in data:
+            continue
+        value = data[field]
+        if value is not None and not isinstance(value, str):
+            raise InvalidVaccine(f'Campo {field} deve ser texto')
+        value = (value or '').strip() or None
+        if max_length and value and len(value) > max_length:
+            raise InvalidVaccine(f'Campo {field} deve ter no máximo {max_length} caracteres')
+        vaccine[field] = value
+
+    for field in ('data_aplicacao', 'data_vencimento'):
+        if field in data:
+            vaccine[field] = parse_date(data[field], field).isoformat() if data[field] else None
+
+    merged = {**(current or {}), **vaccine}
+    for field in ('nome_vacina', 'data_aplicacao'):
+        if not merged.get(field):
+            raise InvalidVaccine(f'Campo {field} é obrigatório')
+    if str(merged['data_aplicacao']) > date.today().isoformat():
+        raise InvalidVaccine('data_aplicacao não pode ser futura')
+    if merged.get('data_vencimento') and str(merged['data_vencimento']) < str(merged['data_aplicacao']):
+        raise InvalidVaccine('data_vencimento deve ser igual ou posterior a data_aplicacao')
+    return vaccine
+
+
+def get_clinic_vaccine(clinica_id, vaccine_id):
+    result = db.table('vacinas').select(VACCINE_COLUMNS).eq('id', vaccine_id).eq('clinica_id', clinica_id).execute()
+    return result.data[0] if result.data else None
+
+@vaccines_bp.route('/', methods=['POST'])
+@token_required
+def create_vaccine(current_user):
+    """
+    Registrar vacina aplicada (clínicas)
+    """
+    try:
+        if current_user['type'] != 'clinica':
+            return jsonify({'error': 'Apenas clínicas podem registrar vacinas'}), 403
+
+        data = request.get_json(silent=True)
+        vaccine = build_vaccine(data)
+        animal_id = data.get('animal_id')
+        if not animal_id:
+            return jsonify({'error': 'Campo animal_id é obrigatório'}), 400
+
+        access = clinic_can_access_animal(current_user['id'], animal_id)
+        if access is None:
+            return jsonify({'error': 'Animal não encontrado'}), 404
+        if not access:
+            return jsonify({'error': 'Sem permissão para registrar vacinas deste animal'}), 403
+
+        vaccine.update({'animal_id': animal_id, 'clinica_id': current_user['id']})
+        result = db.table('vacinas').insert(vaccine).execute()
+
+        if result.data:
+            return jsonify({
+                'message': 'Vacina registrada com sucesso',
+                'vaccine': result.data[0]
+            }), 201
+        else:
+            return jsonify({'error': 'Erro ao registrar vacina'}), 500
+
+    except InvalidVaccine as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+@vaccines_bp.route('/', methods=['GET'])
+@token_required
+def get_vaccines(current_user):
+    """
+    Listar vacinas (paginado: limit, cursor, order)
+    Clínicas: as que aplicaram (animal_id opcional); tutores: as de um animal seu (animal_id obrigatório)
+    """
+    try:
+        page = page_args(request.args, VACCINE_KEYSET)
+        animal_id = request.args.get('animal_id')
+
+        query = db.table('vacinas').select(VACCINE_COLUMNS)
+        if current_user['type'] == 'clinica':
+            query = query.eq('clinica_id', current_user['id'])
+        else:
+            if not animal_id:
+                return jsonify({'error': 'Informe animal_id'}), 400
+            animal_result = db.table('animais').select('id').eq('id', animal_id).eq('tutor_id', current_user['id']).eq('ativo', True).execute()
+            if not animal_result.data:
+                return jsonify({'error': 'Animal não encontrado'}), 404
+        if animal_id:
+            query = query.eq('animal_id', animal_id)
+
+        vaccines, next_cursor = paginate(query, page)
+
+        return jsonify({
+            'vaccines': vaccines,
+            'next_cursor': next_cursor
+        }), 200
+
+    except InvalidPage as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+@vaccines_bp.route('/due', methods=['GET'])
+@token_required
+def get_due_vaccines(current_user):
+    """
+    Vacinas aplicadas pela clínica que vencem nos próximos ``dias`` (padrão 30), agrupadas por tutor
+    """
+    try:
+        if current_user['type'] != 'clinica':
+            return jsonify({'error': 'Apenas clínicas podem consultar vencimentos'}), 403
+
+        try:
+            days = int(request.args.get('dias', 30))
+        except ValueError:
+            return jsonify({'error': 'dias deve ser um número'}), 400
+        if not 0 <= days <= VACCINE_DUE_MAX_DAYS:
+            return jsonify({'error': f'dias deve estar entre 0 e {VACCINE_DUE_MAX_DAYS}'}), 400
+
+        reminders = group_reminders(due_vaccine_pages(days, clinica_id=current_user['id']))
+
+        return jsonify({
+            'reminders': reminders,
+            'total': sum(len(reminder['vacinas']) for reminder in reminders)
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+@vaccines_bp.route('/<vaccine_id>', methods=['GET'])
+@token_required
+def get_vaccine(current_user, vaccine_id):
+    """
+    Buscar vacina por ID (clínica que aplicou ou tutor do animal)
+    """
+    try:
+        result = db.table('vacinas').select(VACCINE_COLUMNS).eq('id', vaccine_id).execute()
+        if not result.data:
+            return jsonify({'error': 'Vacina não encontrada'}), 404
+        vaccine = result.data[0]
+
+        if current_user['type'] == 'clinica':
+            allowed = vaccine['clinica_id'] == current_user['id']
+        else:
+            animal_result = db.table('animais').select('id').eq('id', vaccine['animal_id']).eq('tutor_id', current_user['id']).execute()
+            allowed = bool(animal_result.data)
+        if not allowed:
+            return jsonify({'error': 'Vacina não encontrada'}), 404
+
+        return jsonify({'vaccine': vaccine}), 200
+
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+@vaccines_bp.route('/<vaccine_id>', methods=['PUT'])
+@token_required
+def update_vaccine(current_user, vaccine_id):
+    """
+    Atualizar vacina (apenas a clínica que aplicou)
+    """
+    try:
+        if current_user['type'] != 'clinica':
+            return jsonify({'error': 'Apenas clínicas podem editar vacinas'}), 403
+
+        current = get_clinic_vaccine(current_user['id'], vaccine_id)
+        if current is None:
+            return jsonify({'error': 'Vacina não encontrada'}), 404
+
+        update_data = build_vaccine(request.get_json(silent=True), current)
+        if not update_data:
+            return jsonify({'error': 'Nenhum campo para atualizar'}), 400
+
+        result = db.table('vacinas').update(update_data).eq('id', vaccine_id).eq('clinica_id', current_user['id']).execute()
+
+        if result.data:
+            return jsonify({
+                'message': 'Vacina atualizada com sucesso',
+                'vaccine': result.data[0]
+            }), 200
+        else:
+            return jsonify({'error': 'Vacina não encontrada'}), 404
+
+    except InvalidVaccine as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+@vaccines_bp.route('/<vaccine_id>', methods=['DELETE'])
+@token_required
+def delete_vaccine(current_user, vaccine_id):
+    """
+    Excluir vacina (apenas a clínica que aplicou)
+    """
+    try:
+        if current_user['type'] != 'clinica':
+            return jsonify({'error': 'Apenas clínicas podem excluir vacinas'}), 403
+
+        result = db.table('vacinas').delete().eq('id', vaccine_id).eq('clinica_id', current_user['id']).execute()
+
+        if result.data:
+            return jsonify({'message': 'Vacina excluída com sucesso'}), 200
+        else:
+            return jsonify({'error': 'Vacina não encontrada'}), 404
+
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
@@ -0,0 +1,18 @@
+"""
+Permissões compartilhadas entre as rotas (quem pode ver os dados de quem)
+"""
+from src.config.database import db
+
+
+def clinic_can_access_animal(clinica_id, animal_id):
+    """
+    A clínica atende o animal: é a clínica do cadastro ou tem agendamento com ele.
+    Devolve None se o animal não existe (ou está inativo).
+    """
+    animal_result = db.table('animais').select('id, clinica_id').eq('id', animal_id).eq('ativo', True).execute()
+    if not animal_result.data:
+        return None
+    if animal_result.data[0]['clinica_id'] == clinica_id:
+        return True
+    appointment = db.table('agendamentos').select('id').eq('animal_id', animal_id).eq('clinica_id', clinica_id).limit(1).execute()
+    return bool(appointment.data)
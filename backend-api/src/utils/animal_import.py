@@ -0,0 +1,239 @@
+"""
+Cadastro de animais: validação (a mesma do POST /api/animals/) e importação em lote
+
+A importação lê o arquivo enviado (CSV com cabeçalho ou NDJSON) linha a linha direto
+do corpo da requisição, valida cada registro e grava em lotes de ANIMAL_IMPORT_BATCH_SIZE
+com um único INSERT por lote. Registros inválidos entram no relatório com o número da
+linha e não interrompem a importação; se um lote inteiro for recusado pelo banco, as
+linhas dele são gravadas uma a uma para achar as que falharam.
+"""
+import csv
+import io
+import json
+import os
+
+from src.config.database import db
+
+# Registros gravados por INSERT
+ANIMAL_IMPORT_BATCH_SIZE = int(os.getenv('ANIMAL_IMPORT_BATCH_SIZE', '500'))
+# Máximo de registros por arquivo (as linhas seguintes são ignoradas)
+ANIMAL_IMPORT_MAX_ROWS = int(os.getenv('ANIMAL_IMPORT_MAX_ROWS', '50000'))
+# Máximo de erros detalhados no relatório (os demais só entram na contagem)
+ANIMAL_IMPORT_MAX_ERRORS = int(os.getenv('ANIMAL_IMPORT_MAX_ERRORS', '1000'))
+
+IMPORT_FORMATS = {'text/csv': 'csv', 'application/x-ndjson': 'ndjson', 'application/jsonl': 'ndjson'}
+ANIMAL_SEXOS = ['Macho', 'Fêmea']
+
+_TRUE = {'true', '1', 'sim', 's', 'yes', 'y'}
+_FALSE = {'false', '0', 'nao', 'não', 'n', 'no', ''}
+
+
+class InvalidAnimal(ValueError):
+    """
+    Dados de cadastro inválidos (mensagem pronta para o cliente)
+    """
+
+
+def _text(data: dict, field: str) -> str:
+    value = data.get(field)
+    return '' if value is None else str(value).strip()
+
+
+def _number(data: dict, field: str, cast, maximum):
+    value = data.get(field)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    if isinstance(value, bool):
+        raise InvalidAnimal(f'Campo {field} deve ser numérico')
+    try:
+        # CSV exportado de planilhas em português usa vírgula decimal
+        number = cast(value.strip().replace(',', '.')) if isinstance(value, str) else cast(value)
+    except (TypeError, ValueError):
+        raise InvalidAnimal(f'Campo {field} deve ser numérico')
+    if cast is int and isinstance(value, float) and not value.is_integer():
+        raise InvalidAnimal(f'Campo {field} deve ser numérico')
+    if not 0 <= number < maximum:
+        raise InvalidAnimal(f'Campo {field} fora do intervalo permitido')
+    return number
+
+
+def _boolean(data: dict, field: str) -> bool:
+    value = data.get(field)
+    if value is None or isinstance(value, bool):
+        return bool(value)
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise InvalidAnimal(f'Campo {field} deve ser verdadeiro ou falso')
+
+
+def build_animal(data: dict, tutor_id: str, clinica_id: str = None) -> dict:
+    """
+    Valida os dados de cadastro e monta a linha da tabela animais
+    Levanta InvalidAnimal com a mensagem do primeiro problema encontrado
+    """
+    if not isinstance(data, dict):
+        raise InvalidAnimal('Registro deve ser um objeto')
+
+    for field in ['nome', 'especie']:
+        if not _text(data, field):
+            raise InvalidAnimal(f'Campo {field} é obrigatório')
+
+    sexo = _text(data, 'sexo') or None
+    if sexo and sexo not in ANIMAL_SEXOS:
+        raise InvalidAnimal('Sexo deve ser "Macho" ou "Fêmea"')
+
+    animal = {
+        'nome': _text(data, 'nome'),
+        'especie': _text(data, 'especie'),
+        'raca': _text(data, 'raca'),
+        'idade': _number(data, 'idade', int, 1000),
+        # DECIMAL(5,2) no banco
+        'peso': _number(data, 'peso', float, 1000),
+        'cor': _text(data, 'cor'),
+        'sexo': sexo,
+        'castrado': _boolean(data, 'castrado'),
+        'historico_medico': _text(data, 'historico_medico'),
+        'observacoes': _text(data, 'observacoes'),
+        'tutor_id': tutor_id
+    }
+    if clinica_id:
+        animal['clinica_id'] = clinica_id
+    return animal
+
+
+def iter_records(stream, file_format: str):
+    """
+    Lê os registros do arquivo sem carregá-lo inteiro: gera (linha, registro ou InvalidAnimal)
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if file_format == 'csv':
+        reader = csv.DictReader(text)
+        for record in reader:
+            if not any((value or '').strip() for value in record.values() if isinstance(value, str)):
+                continue
+            yield reader.line_num, record
+        return
+
+    for number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            yield number, InvalidAnimal('JSON inválido')
+
+
+class ImportReport:
+    """
+    Resultado da importação: contagens e erros por linha
+    """
+
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+        self.truncated = False
+
+    def error(self, line: int, message: str):
+        self.failed += 1
+        if len(self.errors) < ANIMAL_IMPORT_MAX_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+
+    def to_dict(self) -> dict:
+        return {
+            'imported': self.imported,
+            'failed': self.failed,
+            'errors': self.errors,
+            'truncated': self.truncated
+        }
+
+
+class AnimalImporter:
+    """
+    Importa animais para um tutor (os próprios) ou para uma clínica (tutor pela coluna email_tutor)
+    """
+
+    def __init__(self, user: dict, batch_size: int = None, max_rows: int = None):
+        self.user = user
+        self.batch_size = batch_size or ANIMAL_IMPORT_BATCH_SIZE
+        self.max_rows = max_rows or ANIMAL_IMPORT_MAX_ROWS
+        self.report = ImportReport()
+        # email -> id dos tutores já consultados (None quando não existe)
+        self._tutors = {}
+
+    def run(self, records) -> ImportReport:
+        batch = []
+        rows = 0
+        for line, record in records:
+            if rows >= self.max_rows:
+                self.report.truncated = True
+                break
+            rows += 1
+            if isinstance(record, InvalidAnimal):
+                self.report.error(line, str(record))
+                continue
+            batch.append((line, record))
+            if len(batch) >= self.batch_size:
+                self._flush(batch)
+                batch = []
+        if batch:
+            self._flush(batch)
+        return self.report
+
+    def _resolve_tutors(self, batch):
+        """
+        Busca numa consulta só os tutores (por email) do lote que ainda não estão no mapa
+        """
+        emails = {_text(record, 'email_tutor').lower() for _, record in batch if isinstance(record, dict)}
+        missing = [email for email in emails if email and email not in self._tutors]
+        if not missing:
+            return
+        found = db.table('usuarios_tutores').select('id, email').in_('email', missing).eq('ativo', True).execute().data
+        self._tutors.update({email: None for email in missing})
+        self._tutors.update({row['email'].lower(): row['id'] for row in found})
+
+    def _build(self, record) -> dict:
+        if not isinstance(record, dict):
+            raise InvalidAnimal('Registro deve ser um objeto')
+        if self.user['type'] == 'tutor':
+            return build_animal(record, self.user['id'])
+        email = _text(record, 'email_tutor').lower()
+        if not email:
+            raise InvalidAnimal('Campo email_tutor é obrigatório')
+        tutor_id = self._tutors.get(email)
+        if tutor_id is None:
+            raise InvalidAnimal(f'Tutor não encontrado: {email}')
+        return build_animal(record, tutor_id, self.user['id'])
+
+    def _flush(self, batch):
+        if self.user['type'] == 'clinica':
+            self._resolve_tutors(batch)
+
+        valid = []
+        for line, record in batch:
+            try:
+                valid.append((line, self._build(record)))
+            except InvalidAnimal as e:
+                self.report.error(line, str(e))
+        if not valid:
+            return
+
+        try:
+            result = db.table('animais').insert([animal for _, animal in valid]).execute()
+            self.report.imported += len(result.data)
+            return
+        except Exception as e:
+            if len(valid) == 1:
+                self.report.error(valid[0][0], f'Erro ao cadastrar animal: {str(e)}')
+                return
+
+        # O banco recusou o lote: grava linha a linha para isolar as que falham
+        for line, animal in valid:
+            try:
+                db.table('animais').insert(animal).execute()
+                self.report.imported += 1
+            except Exception as e:
+                self.report.error(line, f'Erro ao cadastrar animal: {str(e)}')
@@ -1,23 +1,181 @@
 import bcrypt
+import hashlib
 import jwt
 import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from functools import wraps
 from flask import request, jsonify, current_app
+from src.utils.metrics import observe_password_hash
+from src.utils.ttl_cache import TTLCache
+
+# Quantidade máxima de tokens já verificados mantidos em memória
+TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', '10000'))
+
+# Custo do bcrypt e limites do pool dedicado ao hashing de senhas
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+HASH_POOL_SIZE = int(os.getenv('HASH_POOL_SIZE', '2'))
+HASH_QUEUE_LIMIT = int(os.getenv('HASH_QUEUE_LIMIT', '32'))
+
+
+class TokenCache(TTLCache):
+    """
+    Cache LRU de tokens já verificados, indexado pelo hash do token.
+    Cada entrada expira junto com o token (campo exp, por isso o relógio é time.time).
+    """
+
+    def __init__(self, max_size: int, clock=time.time):
+        super().__init__(max_size, float('inf'), clock=clock)
+
+    @staticmethod
+    def key(token: str, secret: str) -> str:
+        # O segredo entra no hash para que uma troca de SECRET_KEY invalide o cache
+        return hashlib.sha256(f'{secret}:{token}'.encode('utf-8')).hexdigest()
+
+    def set(self, key: str, payload: dict):
+        if 'exp' in payload:
+            super().set(key, payload, expires_at=payload['exp'])
+
+
+token_cache = TokenCache(TOKEN_CACHE_SIZE)
+
+class HashingPoolFull(Exception):
+    """
+    Fila do pool de hashing cheia: a rota deve responder 503
+    """
+
+
+class HashingPool:
+    """
+    Executor de tamanho fixo para bcrypt, com limite de operações na fila.
+    Assim uma rajada de logins ocupa no máximo ``workers`` núcleos e o excesso é recusado.
+    """
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.rejected = 0
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def _acquire(self):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HashingPoolFull()
+
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        return time.perf_counter()
+
+    def _release(self, fn, start: float):
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.in_flight -= 1
+            self.count += 1
+            self.total_seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+        self._slots.release()
+        observe_password_hash(fn.__name__.strip('_'), elapsed)
+
+    def run(self, fn, *args):
+        """
+        Executa ``fn`` no pool e aguarda o resultado
+        """
+        start = self._acquire()
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._release(fn, start)
+
+    def submit(self, fn, *args) -> Future:
+        """
+        Agenda ``fn`` no pool sem aguardar (ocupa uma vaga da fila até terminar)
+        """
+        start = self._acquire()
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._release(fn, start)
+            raise
+        future.add_done_callback(lambda _: self._release(fn, start))
+        return future
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queue_depth': max(self.in_flight - self.workers, 0),
+                'in_flight': self.in_flight,
+                'max_in_flight': self.max_in_flight,
+                'rejected': self.rejected,
+                'count': self.count,
+                'avg_ms': (self.total_seconds / self.count * 1000) if self.count else 0.0,
+                'max_ms': self.max_seconds * 1000,
+            }
+
+
+hashing_pool = HashingPool(HASH_POOL_SIZE, HASH_QUEUE_LIMIT)
+
+
+def _hashpw(password: str) -> str:
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+
+def _checkpw(password: str, hashed: str) -> bool:
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
 
 def hash_password(password: str) -> str:
     """
-    Gera hash da senha usando bcrypt
+    Gera hash da senha usando bcrypt (no pool de hashing)
     """
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+    return hashing_pool.run(_hashpw, password)
 
 def verify_password(password: str, hashed: str) -> bool:
     """
-    Verifica se a senha corresponde ao hash
+    Verifica se a senha corresponde ao hash (no pool de hashing)
     """
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    return hashing_pool.run(_checkpw, password, hashed)
+
+def needs_rehash(hashed: str) -> bool:
+    """
+    Indica se o hash foi gerado com um custo diferente de BCRYPT_ROUNDS
+    """
+    try:
+        return int(hashed.split('$')[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+def rehash_password_later(password: str, store) -> Future:
+    """
+    Gera no pool de hashing, sem bloquear a requisição, o hash da senha com o custo atual;
+    ``store(novo_hash)`` roda no worker ao terminar. Com a fila cheia a troca fica para
+    o próximo login (retorna None).
+    """
+    try:
+        future = hashing_pool.submit(_hashpw, password)
+    except HashingPoolFull:
+        return None
+
+    def done(f):
+        try:
+            store(f.result())
+        except Exception as e:
+            print(f"Erro ao atualizar hash da senha: {e}")
+
+    future.add_done_callback(done)
+    return future
 
 def generate_token(user_id: str, user_type: str) -> str:
     """
@@ -33,47 +191,68 @@ def generate_token(user_id: str, user_type: str) -> str:
 
 def verify_token(token: str) -> dict:
     """
-    Verifica e decodifica token JWT
+    Verifica e decodifica token JWT (tokens válidos ficam em cache até expirarem)
     """
+    secret = current_app.config['SECRET_KEY']
+    cache_key = TokenCache.key(token, secret)
+
+    payload = token_cache.get(cache_key)
+    if payload is not None:
+        return payload
+
     try:
-        payload = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+        payload = jwt.decode(token, secret, algorithms=['HS256'])
+        token_cache.set(cache_key, payload)
         return payload
     except jwt.ExpiredSignatureError:
         return None
     except jwt.InvalidTokenError:
         return None
 
+class AuthError(Exception):
+    """
+    Cabeçalho Authorization ausente ou token inválido (responder 401 com a mensagem)
+    """
+
+
+def user_from_header(auth_header) -> dict:
+    """
+    Usuário do token no cabeçalho ``Authorization: Bearer TOKEN`` (None quando ausente).
+    Usado pelo decorator token_required e pelos handlers ASGI.
+    """
+    token = None
+
+    if auth_header is not None:
+        try:
+            token = auth_header.split(" ")[1]  # Bearer TOKEN
+        except IndexError:
+            raise AuthError('Token inválido')
+
+    if not token:
+        raise AuthError('Token não fornecido')
+
+    try:
+        data = verify_token(token)
+    except Exception:
+        raise AuthError('Token inválido')
+    if data is None:
+        raise AuthError('Token inválido ou expirado')
+
+    try:
+        return {'id': data['user_id'], 'type': data['user_type']}
+    except (KeyError, TypeError):
+        raise AuthError('Token inválido')
+
 def token_required(f):
     """
     Decorator para rotas que requerem autenticação
     """
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        
-        # Verificar se o token está no header Authorization
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            try:
-                token = auth_header.split(" ")[1]  # Bearer TOKEN
-            except IndexError:
-                return jsonify({'message': 'Token inválido'}), 401
-        
-        if not token:
-            return jsonify({'message': 'Token não fornecido'}), 401
-        
         try:
-            data = verify_token(token)
-            if data is None:
-                return jsonify({'message': 'Token inválido ou expirado'}), 401
-            
-            current_user = {
-                'id': data['user_id'],
-                'type': data['user_type']
-            }
-            
-        except Exception as e:
-            return jsonify({'message': 'Token inválido'}), 401
+            current_user = user_from_header(request.headers.get('Authorization'))
+        except AuthError as e:
+            return jsonify({'message': str(e)}), 401
         
         return f(current_user, *args, **kwargs)
     
@@ -0,0 +1,377 @@
+"""
+Cálculo de horários disponíveis a partir do horario_funcionamento das clínicas
+
+O horário de funcionamento de cada clínica é compilado uma vez em um modelo de
+horários: um eixo com todos os horários possíveis da clínica e uma máscara de bits
+por dia da semana (bit i ligado = horário i aberto). Os agendamentos ativos de um
+período inteiro são buscados em uma única consulta e viram uma máscara por dia;
+a disponibilidade de cada dia é ``aberto & ~ocupado``.
+
+Formato do horario_funcionamento (dias ausentes = fechado):
+    {
+        "intervalo": 30,
+        "segunda": ["08:00-12:00", "14:00-18:00"],
+        "sabado": ["08:00-12:00"]
+    }
+"""
+import json
+import os
+import unicodedata
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import NamedTuple
+
+from src.config.database import db
+from src.utils.ttl_cache import TTLCache
+
+# Limites de uma consulta de disponibilidade por período
+AVAILABILITY_MAX_DAYS = int(os.getenv('AVAILABILITY_MAX_DAYS', '62'))
+AVAILABILITY_MAX_CLINICS = int(os.getenv('AVAILABILITY_MAX_CLINICS', '20'))
+
+# Cache de ocupação por (clínica, data) e de clínicas por email: validade em segundos
+# (rede de segurança para alterações feitas fora da API; 0 desativa) e número de entradas
+AVAILABILITY_CACHE_TTL = float(os.getenv('AVAILABILITY_CACHE_TTL', '30'))
+AVAILABILITY_CACHE_SIZE = int(os.getenv('AVAILABILITY_CACHE_SIZE', '20000'))
+
+# Status dos agendamentos (CHECK da tabela agendamentos)
+APPOINTMENT_STATUSES = ('pendente', 'aceito', 'recusado', 'concluido', 'cancelado')
+# Agendamentos que ocupam o horário
+ACTIVE_STATUSES = ['pendente', 'aceito']
+
+# Linhas por página ao buscar agendamentos (limite padrão de linhas do PostgREST)
+OCCUPANCY_PAGE_SIZE = 1000
+
+WEEKDAYS = ['segunda', 'terca', 'quarta', 'quinta', 'sexta', 'sabado', 'domingo']
+DEFAULT_INTERVAL = 30
+
+# Horários usados quando a clínica não configurou o horário de funcionamento
+DEFAULT_TIMES = [
+    '08:00', '08:30', '09:00', '09:30', '10:00', '10:30',
+    '11:00', '11:30', '14:00', '14:30', '15:00', '15:30',
+    '16:00', '16:30', '17:00', '17:30'
+]
+
+
+class Schedule(NamedTuple):
+    """
+    Modelo de horários compilado de uma clínica
+    """
+    interval: int
+    slots: tuple  # eixo de horários 'HH:MM' em ordem
+    week: tuple   # 7 máscaras (segunda a domingo) com os horários abertos
+    index: dict   # 'HH:MM' -> posição do bit
+
+    def times(self, mask: int) -> list:
+        """
+        Horários ligados na máscara, em ordem
+        """
+        return [slot for i, slot in enumerate(self.slots) if mask >> i & 1]
+
+    def open_mask(self, day: date) -> int:
+        return self.week[day.weekday()]
+
+
+def _build(interval: int, days: list) -> Schedule:
+    # days: para cada dia da semana, a lista de horários abertos em minutos
+    minutes = sorted({m for day in days for m in day})
+    index = {f'{m // 60:02d}:{m % 60:02d}': i for i, m in enumerate(minutes)}
+    position = {m: i for i, m in enumerate(minutes)}
+    week = tuple(sum(1 << position[m] for m in set(day)) for day in days)
+    return Schedule(interval, tuple(index), week, index)
+
+
+def _minutes(value: str, allow_end_of_day: bool = False) -> int:
+    hours, _, mins = value.strip().partition(':')
+    if len(hours) != 2 or len(mins) != 2 or not (hours + mins).isdigit():
+        raise ValueError(f'Horário inválido: {value}')
+    total = int(hours) * 60 + int(mins)
+    limit = 24 * 60 if allow_end_of_day else 24 * 60 - 1
+    if int(mins) > 59 or total > limit:
+        raise ValueError(f'Horário inválido: {value}')
+    return total
+
+
+def _weekday_key(name: str) -> str:
+    # 'Terça' -> 'terca', 'sábado' -> 'sabado'
+    name = unicodedata.normalize('NFKD', name.strip().lower())
+    return ''.join(c for c in name if not unicodedata.combining(c)).replace('-feira', '')
+
+
+def parse_hours(config: dict) -> Schedule:
+    """
+    Valida e compila um horario_funcionamento; lança ValueError se for inválido
+    """
+    if not isinstance(config, dict):
+        raise ValueError('horario_funcionamento deve ser um objeto')
+
+    interval = config.get('intervalo', DEFAULT_INTERVAL)
+    if not isinstance(interval, int) or isinstance(interval, bool) or not 5 <= interval <= 240:
+        raise ValueError('intervalo deve ser um número de minutos entre 5 e 240')
+
+    days = [[] for _ in WEEKDAYS]
+    for key, ranges in config.items():
+        if key == 'intervalo':
+            continue
+        weekday = _weekday_key(key)
+        if weekday not in WEEKDAYS:
+            raise ValueError(f'Dia da semana inválido: {key}')
+        if not isinstance(ranges, list):
+            raise ValueError(f'Os horários de {key} devem ser uma lista')
+
+        for item in ranges:
+            start, separator, end = str(item).partition('-')
+            if not separator:
+                raise ValueError(f'Faixa inválida: {item} (use HH:MM-HH:MM)')
+            start, end = _minutes(start), _minutes(end, allow_end_of_day=True)
+            if start >= end:
+                raise ValueError(f'Faixa inválida: {item}')
+            # Só entram horários cuja consulta termina dentro da faixa
+            days[WEEKDAYS.index(weekday)] += range(start, end - interval + 1, interval)
+
+    return _build(interval, days)
+
+
+@lru_cache(maxsize=1024)
+def _compile_cached(canonical: str) -> Schedule:
+    return parse_hours(json.loads(canonical))
+
+
+DEFAULT_SCHEDULE = _build(DEFAULT_INTERVAL, [[_minutes(t) for t in DEFAULT_TIMES]] * 7)
+
+
+def compile_schedule(raw) -> Schedule:
+    """
+    Modelo de horários de uma clínica a partir do valor da coluna (JSON ou texto).
+    Sem configuração, ou com configuração inválida, usa os horários padrão.
+    """
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw) if raw.strip() else None
+        except ValueError:
+            return DEFAULT_SCHEDULE
+    if not raw:
+        return DEFAULT_SCHEDULE
+    try:
+        return _compile_cached(json.dumps(raw, sort_keys=True))
+    except (TypeError, ValueError):
+        return DEFAULT_SCHEDULE
+
+
+class AvailabilityCache(TTLCache):
+    """
+    Cache LRU com validade curta, invalidado pelas rotas que alteram agendamentos.
+    Registra a idade das entradas servidas (quanto os dados podem estar atrasados).
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        super().__init__(max_size, ttl)
+        self._age_total = 0.0
+        self._age_max = 0.0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                return None
+            age = self.clock() - entry.stored_at
+            self._age_total += age
+            self._age_max = max(self._age_max, age)
+            return entry.value
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        with self._lock:
+            hits = self.hits
+            return {
+                **stats,
+                'avg_age_seconds': round(self._age_total / hits, 3) if hits else 0.0,
+                'max_age_seconds': round(self._age_max, 3),
+                'ttl_seconds': self.ttl,
+            }
+
+
+occupancy_cache = AvailabilityCache(AVAILABILITY_CACHE_SIZE, AVAILABILITY_CACHE_TTL)
+clinic_cache = AvailabilityCache(AVAILABILITY_CACHE_SIZE, AVAILABILITY_CACHE_TTL)
+
+CLINIC_COLUMNS = 'id, email, nome_clinica, horario_funcionamento'
+
+
+def date_range(start: date, days: int) -> list:
+    return [start + timedelta(days=i) for i in range(days)]
+
+
+def clinics_query(database, emails: list):
+    """
+    Consulta das clínicas ativas por email (``database``: db ou async_db)
+    """
+    return database.table('usuarios_clinicas').select(CLINIC_COLUMNS).in_('email', emails).eq('ativo', True)
+
+
+def occupancy_query(database, clinic_ids: list, start: date, end: date):
+    """
+    Consulta dos agendamentos ativos das clínicas no período (``database``: db ou async_db)
+    """
+    return database.table('agendamentos').select('clinica_id, data_agendamento, horario') \
+        .in_('clinica_id', clinic_ids) \
+        .gte('data_agendamento', start.isoformat()) \
+        .lte('data_agendamento', end.isoformat()) \
+        .in_('status', ACTIVE_STATUSES)
+
+
+def fetch_occupancy(clinic_ids: list, start: date, end: date) -> list:
+    """
+    Agendamentos ativos das clínicas no período (uma consulta, paginada se necessário)
+    """
+    rows = []
+    offset = 0
+    while True:
+        page = occupancy_query(db, clinic_ids, start, end) \
+            .order('id') \
+            .range(offset, offset + OCCUPANCY_PAGE_SIZE - 1) \
+            .execute().data
+        rows += page
+        if len(page) < OCCUPANCY_PAGE_SIZE:
+            return rows
+        offset += OCCUPANCY_PAGE_SIZE
+
+
+# O cache é consultado e gravado pelas mesmas funções nas rotas síncronas e assíncronas;
+# só a ida ao banco fica com quem chama:
+#     clinics, missing, generation = lookup_clinics(emails)
+#     if missing:
+#         store_clinics(clinics, clinics_query(db, missing).execute().data, generation)
+# A geração é lida antes da consulta ao banco: se houver uma invalidação no meio, o
+# resultado (que pode estar desatualizado) não é gravado.
+
+def lookup_clinics(emails: list):
+    """
+    Clínicas em cache: (clínicas por email, emails que faltam, geração do cache)
+    """
+    generation = clinic_cache.generation
+    clinics = {}
+    missing = []
+    for email in emails:
+        clinic = clinic_cache.get(email)
+        if clinic is None:
+            missing.append(email)
+        else:
+            clinics[email] = clinic
+    return clinics, missing, generation
+
+
+def store_clinics(clinics: dict, rows: list, generation: int) -> dict:
+    """
+    Grava no cache as clínicas buscadas no banco e as junta às encontradas em cache
+    """
+    for clinic in rows:
+        clinic_cache.set(clinic['email'], clinic, generation)
+        clinics[clinic['email']] = clinic
+    return clinics
+
+
+def get_clinics(emails: list) -> dict:
+    """
+    Clínicas ativas por email, consultando o banco só para as que não estão em cache
+    """
+    clinics, missing, generation = lookup_clinics(emails)
+    if missing:
+        store_clinics(clinics, clinics_query(db, missing).execute().data, generation)
+    return clinics
+
+
+def lookup_occupancy(clinic_ids: list, days: list):
+    """
+    Ocupação em cache: (agendamentos encontrados, pares (clínica, dia) que faltam, geração do cache)
+    """
+    generation = occupancy_cache.generation
+    rows = []
+    missed = set()
+    for clinic_id in clinic_ids:
+        for day in days:
+            cached = occupancy_cache.get((clinic_id, day.isoformat()))
+            if cached is None:
+                missed.add((clinic_id, day))
+            else:
+                rows += cached
+    return rows, missed, generation
+
+
+def missed_range(missed: set):
+    """
+    Clínicas e período (início, fim) que cobrem os pares que faltam, para uma única consulta
+    """
+    clinic_ids = sorted({clinic_id for clinic_id, _ in missed})
+    return clinic_ids, min(day for _, day in missed), max(day for _, day in missed)
+
+
+def store_missed_occupancy(missed: set, fetched: list, generation: int) -> list:
+    """
+    Grava no cache a ocupação buscada para missed_range(missed) e devolve só a dos pares que faltavam
+    """
+    clinic_ids, start, end = missed_range(missed)
+    store_occupancy(clinic_ids, date_range(start, (end - start).days + 1), fetched, generation)
+
+    # A consulta cobre o intervalo inteiro: aproveitar só os pares que faltavam
+    wanted = {(clinic_id, day.isoformat()) for clinic_id, day in missed}
+    return [row for row in fetched if (row['clinica_id'], str(row['data_agendamento'])[:10]) in wanted]
+
+
+def get_occupancy(clinic_ids: list, days: list) -> list:
+    """
+    Agendamentos ativos das clínicas nos dias pedidos. Os pares (clínica, dia) em cache
+    não vão ao banco; os demais são buscados em uma única consulta.
+    """
+    rows, missed, generation = lookup_occupancy(clinic_ids, days)
+    if missed:
+        fetched = fetch_occupancy(*missed_range(missed))
+        rows += store_missed_occupancy(missed, fetched, generation)
+    return rows
+
+
+def store_occupancy(clinic_ids: list, days: list, rows: list, generation: int):
+    """
+    Grava no cache a ocupação de cada (clínica, dia) consultado, inclusive dias vazios
+    """
+    grouped = {(clinic_id, day.isoformat()): [] for clinic_id in clinic_ids for day in days}
+    for row in rows:
+        key = (row['clinica_id'], str(row['data_agendamento'])[:10])
+        if key in grouped:
+            grouped[key].append(row)
+    for key, value in grouped.items():
+        occupancy_cache.set(key, value, generation)
+
+
+def invalidate_slot(clinic_id, data_agendamento):
+    """
+    Descarta a ocupação em cache de um dia da clínica (chamar após alterar agendamentos)
+    """
+    occupancy_cache.invalidate((clinic_id, str(data_agendamento)[:10]))
+
+
+def occupancy_masks(schedules: dict, rows: list) -> dict:
+    """
+    Máscara de horários ocupados por (clinica_id, data)
+    Horários fora do modelo da clínica (ex.: horário alterado depois) são ignorados.
+    """
+    masks = {}
+    for row in rows:
+        schedule = schedules.get(row['clinica_id'])
+        if schedule is None:
+            continue
+        bit = schedule.index.get(str(row['horario'])[:5])
+        if bit is None:
+            continue
+        key = (row['clinica_id'], str(row['data_agendamento'])[:10])
+        masks[key] = masks.get(key, 0) | 1 << bit
+    return masks
+
+
+def free_masks(schedule: Schedule, clinic_id, days: list, occupied: dict) -> dict:
+    """
+    Máscara de horários livres de cada dia do período
+    """
+    result = {}
+    for day in days:
+        key = day.isoformat()
+        result[key] = schedule.open_mask(day) & ~occupied.get((clinic_id, key), 0)
+    return result
@@ -0,0 +1,163 @@
+"""
+Compressão das respostas (gzip / brotli) negociada pelo Accept-Encoding
+
+Só comprime respostas de tipos textuais (JSON, texto, SVG) acima de COMPRESSION_MIN_SIZE
+bytes; respostas em streaming, arquivos e respostas já comprimidas passam direto.
+O brotli é usado quando o pacote está instalado e o cliente aceita ``br``.
+
+Para o Flask, ``init_compression(app)`` registra um after_request; para o app ASGI,
+``CompressionMiddleware`` faz o mesmo nas rotas assíncronas.
+"""
+import gzip
+import os
+
+from werkzeug.http import parse_accept_header
+
+try:
+    import brotli
+except ImportError:  # dependência opcional
+    brotli = None
+
+# Tamanho mínimo (bytes) para comprimir; 0 desativa a compressão
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+# Níveis baixos: a resposta é comprimida a cada requisição, então a CPU pesa mais que alguns bytes
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', '6'))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '4'))
+
+COMPRESSIBLE_TYPES = {
+    'application/json', 'application/x-ndjson', 'application/javascript', 'application/xml',
+    'image/svg+xml', 'text/csv', 'text/html', 'text/javascript', 'text/plain', 'text/css', 'text/xml',
+}
+
+
+def choose_encoding(accept_encoding: str, offered: list = None):
+    """
+    Melhor codificação aceita pelo cliente (``br``, ``gzip`` ou None)
+    ``offered`` restringe as opções (ex.: variantes já comprimidas de um arquivo)
+    """
+    if not accept_encoding:
+        return None
+    if offered is None:
+        offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+    if not offered:
+        return None
+    return parse_accept_header(accept_encoding).best_match(offered)
+
+
+def is_compressible(mimetype: str) -> bool:
+    return (mimetype or '').split(';')[0].strip().lower() in COMPRESSIBLE_TYPES
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=COMPRESSION_GZIP_LEVEL)
+
+
+def add_vary(value: str) -> str:
+    """
+    Acrescenta Accept-Encoding ao cabeçalho Vary (caches guardam uma versão por codificação)
+    """
+    items = [item.strip() for item in (value or '').split(',') if item.strip()]
+    if not any(item.lower() in ('accept-encoding', '*') for item in items):
+        items.append('Accept-Encoding')
+    return ', '.join(items)
+
+
+def compress_response(response, accept_encoding: str):
+    """
+    Comprime uma resposta do Flask, se valer a pena
+    """
+    if COMPRESSION_MIN_SIZE <= 0 or not is_compressible(response.mimetype):
+        return response
+    if response.direct_passthrough or response.is_streamed or 'Content-Encoding' in response.headers:
+        return response
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return response
+
+    response.headers['Vary'] = add_vary(response.headers.get('Vary'))
+    body = response.get_data()
+    encoding = choose_encoding(accept_encoding)
+    if encoding is None or len(body) < COMPRESSION_MIN_SIZE:
+        return response
+
+    response.set_data(compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    # O corpo mudou: a ETag passa a ser fraca (continua valendo para If-None-Match)
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    from flask import request
+
+    @app.after_request
+    def compress_after_request(response):
+        if request.method == 'HEAD':
+            return response
+        return compress_response(response, request.headers.get('Accept-Encoding', ''))
+
+    return app
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI: comprime respostas de corpo único (ex.: JSONResponse do Starlette).
+    Respostas em streaming e as que já vêm comprimidas (ex.: do Flask) passam direto.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or COMPRESSION_MIN_SIZE <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode('latin-1').lower(): value.decode('latin-1') for key, value in scope['headers']}
+        encoding = choose_encoding(headers.get('accept-encoding', ''))
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message['type'] == 'http.response.start':
+                response_headers = {key.decode('latin-1').lower(): value.decode('latin-1')
+                                    for key, value in message.get('headers', [])}
+                if 'content-encoding' in response_headers or not is_compressible(response_headers.get('content-type')):
+                    await send(message)
+                else:
+                    start = message
+                return
+
+            if message['type'] != 'http.response.body' or start is None:
+                await send(message)
+                return
+
+            start_message, start = start, None
+            body = message.get('body', b'')
+            response_headers = [(key, value) for key, value in start_message.get('headers', [])
+                                if key.lower() not in (b'content-length', b'vary')]
+            vary = next((value.decode('latin-1') for key, value in start_message.get('headers', [])
+                         if key.lower() == b'vary'), None)
+            response_headers.append((b'vary', add_vary(vary).encode('latin-1')))
+
+            if message.get('more_body') or encoding is None or len(body) < COMPRESSION_MIN_SIZE:
+                # Streaming ou corpo pequeno: repassa sem comprimir
+                if not message.get('more_body'):
+                    response_headers.append((b'content-length', str(len(body)).encode('latin-1')))
+                else:
+                    response_headers += [(key, value) for key, value in start_message.get('headers', [])
+                                         if key.lower() == b'content-length']
+                await send({**start_message, 'headers': response_headers})
+                await send(message)
+                return
+
+            body = compress(body, encoding)
+            response_headers += [(b'content-encoding', encoding.encode('latin-1')),
+                                 (b'content-length', str(len(body)).encode('latin-1'))]
+            await send({**start_message, 'headers': response_headers})
+            await send({**message, 'body': body})
+
+        await self.app(scope, receive, send_compressed)
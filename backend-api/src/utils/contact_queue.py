@@ -0,0 +1,450 @@
+"""
+Gravação adiada (write-behind) das mensagens de contato
+
+Com CONTACT_WRITE_BEHIND=true, o POST /api/contact/ valida a mensagem, grava-a no spool
+local e responde 202 sem esperar o banco. Uma thread grava as pendentes em lotes (upsert
+em contatos) quando juntam CONTACT_BATCH_SIZE mensagens ou quando a mais antiga espera
+CONTACT_FLUSH_INTERVAL segundos.
+
+Spool (CONTACT_SPOOL_DIR): cada processo acrescenta as mensagens, uma por linha em JSON,
+a um segmento próprio (``segmento-<pid>-<token>-<n>.ndjson``), com fsync antes da
+resposta, e mantém travados (flock) os seus segmentos. Um segmento só é apagado depois
+que todas as suas mensagens foram gravadas; com o banco fora do ar, o lote volta a ser
+tentado com espera crescente (até CONTACT_RETRY_MAX_DELAY) e nada sai do disco. Ao
+iniciar, e a cada CONTACT_SPOOL_SCAN_INTERVAL segundos, a fila adota os segmentos que
+nenhum processo vivo trava (worker que caiu ou reiniciou) e grava as mensagens deles.
+
+O id (UUID) e o criado_em de cada mensagem são gerados na chegada: regravar um lote
+depois de uma queda (upsert que ignora duplicados) não duplica mensagens. Se um lote
+falha, as mensagens são tentadas uma a uma; as que o banco recusa por dado inválido ou
+restrição violada (ex.: telefone maior que a coluna) enquanto outras do mesmo lote passam
+vão para ``rejeitados.ndjson`` em vez de travar a fila. Qualquer outro erro no meio (rede,
+tempo esgotado, banco fora do ar) devolve o segmento inteiro para nova tentativa.
+"""
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: sem trava entre processos; use um CONTACT_SPOOL_DIR por processo
+    fcntl = None
+
+from src.config.database import db
+from src.utils.metrics import observe_contact_flush
+
+CONTACT_WRITE_BEHIND = os.getenv('CONTACT_WRITE_BEHIND', 'false').lower() == 'true'
+CONTACT_SPOOL_DIR = os.getenv('CONTACT_SPOOL_DIR') or os.path.join(tempfile.gettempdir(), 'vetcare-contatos')
+CONTACT_BATCH_SIZE = int(os.getenv('CONTACT_BATCH_SIZE', '50'))
+CONTACT_FLUSH_INTERVAL = float(os.getenv('CONTACT_FLUSH_INTERVAL', '1'))
+CONTACT_RETRY_MAX_DELAY = float(os.getenv('CONTACT_RETRY_MAX_DELAY', '30'))
+CONTACT_SPOOL_SCAN_INTERVAL = float(os.getenv('CONTACT_SPOOL_SCAN_INTERVAL', '60'))
+# fsync de cada mensagem antes do 202 (false: sobrevive à queda do processo, não à da máquina)
+CONTACT_SPOOL_FSYNC = os.getenv('CONTACT_SPOOL_FSYNC', 'true').lower() == 'true'
+
+SEGMENT_PREFIX = 'segmento-'
+SEGMENT_SUFFIX = '.ndjson'
+REJECTED_FILE = 'rejeitados.ndjson'
+# Classes de SQLSTATE do próprio registro: 22 (dado inválido) e 23 (restrição violada)
+REJECTED_SQLSTATE_CLASSES = ('22', '23')
+
+
+def insert_contacts(rows: list):
+    """
+    Grava um lote em contatos; mensagens já gravadas (mesmo id) são ignoradas
+    """
+    db.table('contatos').upsert(rows, on_conflict='id', ignore_duplicates=True).execute()
+
+
+def is_rejected(error: Exception) -> bool:
+    """
+    Erro causado pela própria mensagem (o banco a recusaria em qualquer tentativa), e não
+    pela rede ou pelo banco fora do ar
+    """
+    # DB-API (psycopg, sqlite3): DataError e IntegrityError e suas subclasses
+    if any(cls.__name__ in ('DataError', 'IntegrityError') for cls in type(error).__mro__):
+        return True
+    # PostgREST (APIError do cliente Supabase): o code é o SQLSTATE do PostgreSQL
+    code = getattr(error, 'sqlstate', None) or getattr(error, 'code', None)
+    return isinstance(code, str) and code[:2] in REJECTED_SQLSTATE_CLASSES
+
+
+def _lock(file) -> bool:
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+class Segment:
+    """
+    Arquivo do spool (aberto e travado por este processo) e as mensagens que ele contém
+    """
+    __slots__ = ('path', 'file', 'records', 'size', 'first_at')
+
+    def __init__(self, path: str, file, records: list = None):
+        self.path = path
+        self.file = file
+        self.records = records if records is not None else []
+        self.size = 0
+        self.first_at = time.monotonic()
+
+    def append(self, line: bytes, fsync: bool):
+        try:
+            # Arquivo sem buffer: cada write vai direto ao sistema (pode escrever só parte)
+            view = memoryview(line)
+            while view:
+                view = view[self.file.write(view):]
+            if fsync:
+                os.fsync(self.file.fileno())
+        except OSError:
+            # Sem linha pela metade: a próxima mensagem seria colada nela e as duas se perderiam
+            os.ftruncate(self.file.fileno(), self.size)
+            self.file.seek(self.size)
+            raise
+        self.size += len(line)
+
+    def close(self, remove: bool = False):
+        # Apaga ainda travado: quem abriu o arquivo antes disso encontra st_nlink == 0
+        if remove:
+            os.remove(self.path)
+        self.file.close()
+
+
+class ContactQueue:
+    """
+    Fila de gravação adiada com spool em disco; ``start()`` deve ser chamado depois do fork
+    """
+
+    def __init__(self, directory: str, batch_size: int = 50, flush_interval: float = 1.0,
+                 retry_max_delay: float = 30.0, scan_interval: float = 60.0, fsync: bool = True,
+                 writer=insert_contacts, enabled: bool = True):
+        self.directory = directory
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.retry_max_delay = retry_max_delay
+        self.scan_interval = scan_interval
+        self.fsync = fsync
+        self.writer = writer
+        self.enabled = enabled
+
+        self.accepted = 0
+        self.flushed = 0
+        self.adopted = 0
+        self.rejected = 0
+        self.corrupted = 0
+        self.flush_errors = 0
+        self.last_error = None
+        self.last_flush_ms = None
+
+        self._cond = threading.Condition()
+        self._active = None
+        self._sealed = deque()
+        self._thread = None
+        self._stopping = False
+        self._exit_hook = False
+        self._token = None
+        self._counter = 0
+        self._failures = 0
+        self._retry_at = 0.0
+        self._next_scan = 0.0
+
+    # ---- ciclo de vida ----
+
+    def start(self):
+        """
+        Abre o segmento deste processo, adota o spool órfão e inicia a thread de gravação
+        """
+        with self._cond:
+            self._start_locked()
+
+    def _start_locked(self):
+        if self._thread is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._stopping = False
+        self._token = uuid.uuid4().hex[:8]
+        self._active = self._open_segment()
+        self._next_scan = 0.0
+        self._thread = threading.Thread(target=self._run, name='contact-queue', daemon=True)
+        self._thread.start()
+        if not self._exit_hook:
+            atexit.register(self.stop)
+            self._exit_hook = True
+
+    def stop(self, timeout: float = 10.0):
+        """
+        Grava o que estiver pendente (uma tentativa) e fecha o spool; o que não foi gravado
+        continua em disco para o próximo processo
+        """
+        with self._cond:
+            thread = self._thread
+            if thread is None:
+                return
+            self._stopping = True
+            self._cond.notify()
+        thread.join(timeout)
+        with self._cond:
+            if thread.is_alive():
+                # Gravação travada: os arquivos ficam abertos até o fim do processo
+                return
+            segments = list(self._sealed) + ([self._active] if self._active is not None else [])
+            for segment in segments:
+                segment.close(remove=not segment.records)
+            self._sealed.clear()
+            self._active = None
+            self._thread = None
+
+    def spooled(self) -> list:
+        """
+        Segmentos presentes no spool (deste e de outros processos)
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name for name in os.listdir(self.directory)
+                      if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX))
+
+    # ---- entrada ----
+
+    def submit(self, record: dict):
+        """
+        Grava a mensagem no spool; ao retornar, ela sobrevive a uma queda do processo.
+        Levanta OSError se o disco falhar (a rota grava direto no banco).
+        """
+        line = (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+        with self._cond:
+            self._start_locked()
+            segment = self._active
+            segment.append(line, self.fsync)
+            if not segment.records:
+                segment.first_at = time.monotonic()
+            segment.records.append(record)
+            self.accepted += 1
+            if len(segment.records) >= self.batch_size:
+                self._seal()
+                self._cond.notify()
+
+    def _open_segment(self) -> Segment:
+        self._counter += 1
+        name = f'{SEGMENT_PREFIX}{os.getpid()}-{self._token}-{self._counter:06d}{SEGMENT_SUFFIX}'
+        path = os.path.join(self.directory, name)
+        file = open(path, 'xb', buffering=0)
+        _lock(file)
+        return Segment(path, file)
+
+    def _seal(self):
+        # Chamado com o lock: o segmento cheio (ou vencido) vai para a fila de gravação
+        segment = self._open_segment()
+        self._sealed.append(self._active)
+        self._active = segment
+
+    # ---- gravação ----
+
+    def _wait_time(self, now: float) -> float:
+        """
+        Segundos até haver trabalho para a thread (0 = agora)
+        """
+        deadlines = [self._next_scan]
+        if now < self._retry_at:
+            deadlines.append(self._retry_at)
+        elif self._sealed:
+            return 0.0
+        elif self._active.records:
+            deadlines.append(self._active.first_at + self.flush_interval)
+        return max(0.0, min(deadlines) - now)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    wait = self._wait_time(time.monotonic())
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                stopping = self._stopping
+                now = time.monotonic()
+                active = self._active
+                if active.records and (stopping or (now >= self._retry_at
+                                                    and now - active.first_at >= self.flush_interval)):
+                    self._seal()
+                scan = now >= self._next_scan
+                if scan:
+                    self._next_scan = now + self.scan_interval
+                retry = stopping or now >= self._retry_at
+
+            if scan and not stopping:
+                self.adopt_orphans()
+            if retry:
+                self._flush_sealed()
+            if stopping:
+                return
+
+    def _flush_sealed(self):
+        while True:
+            with self._cond:
+                if not self._sealed:
+                    return
+                segment = self._sealed[0]
+
+            start = time.perf_counter()
+            try:
+                rejected = self._write(segment.records)
+            except Exception as e:
+                elapsed = time.perf_counter() - start
+                observe_contact_flush('error', elapsed)
+                with self._cond:
+                    self.flush_errors += 1
+                    self.last_error = str(e)
+                    self._failures += 1
+                    delay = min(self.retry_max_delay, max(self.flush_interval, 0.1) * 2 ** min(self._failures - 1, 16))
+                    self._retry_at = time.monotonic() + delay
+                print(f"Erro ao gravar contatos ({len(segment.records)} pendentes no lote, "
+                      f"nova tentativa em {delay:.1f} s): {e}")
+                return
+
+            elapsed = time.perf_counter() - start
+            observe_contact_flush('ok', elapsed)
+            with self._cond:
+                self._sealed.popleft()
+                self.flushed += len(segment.records) - len(rejected)
+                self.rejected += len(rejected)
+                self.last_flush_ms = round(elapsed * 1000, 2)
+                self._failures = 0
+                self._retry_at = 0.0
+            if rejected:
+                self._reject(rejected)
+            segment.close(remove=True)
+
+    def _write(self, records: list) -> list:
+        """
+        Grava as mensagens em lotes; devolve as recusadas pelo banco (levanta se nenhuma passou
+        ou se alguma falhou por outro motivo)
+        """
+        rejected = []
+        for i in range(0, len(records), self.batch_size):
+            batch = records[i:i + self.batch_size]
+            try:
+                self.writer(batch)
+                continue
+            except Exception:
+                if len(batch) == 1:
+                    raise
+            # Lote recusado: uma a uma, para separar a mensagem inválida de uma queda do banco
+            failures, error = [], None
+            for record in batch:
+                try:
+                    self.writer([record])
+                except Exception as e:
+                    if not is_rejected(e):
+                        # Queda no meio: o segmento volta inteiro (o upsert ignora as já gravadas)
+                        raise
+                    failures.append((record, str(e)))
+                    error = e
+            if len(failures) == len(batch):
+                raise error
+            rejected.extend(failures)
+        return rejected
+
+    def _reject(self, failures: list):
+        lines = ''.join(json.dumps({'erro': error, 'contato': record}, ensure_ascii=False) + '\n'
+                        for record, error in failures)
+        print(f"Contatos recusados pelo banco: {len(failures)} (em {REJECTED_FILE})")
+        with open(os.path.join(self.directory, REJECTED_FILE), 'a', encoding='utf-8') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    # ---- spool órfão ----
+
+    def adopt_orphans(self) -> int:
+        """
+        Adota os segmentos sem processo dono (não travados) e os põe na fila de gravação;
+        devolve o número de mensagens adotadas
+        """
+        with self._cond:
+            own = {segment.path for segment in self._sealed}
+            if self._active is not None:
+                own.add(self._active.path)
+
+        adopted = 0
+        for name in self.spooled():
+            path = os.path.join(self.directory, name)
+            if path in own:
+                continue
+            try:
+                file = open(path, 'r+b')
+            except OSError:
+                continue
+            if not _lock(file) or os.fstat(file.fileno()).st_nlink == 0:
+                # Travado por outro processo, ou gravado e apagado entre o listdir e o open
+                file.close()
+                continue
+
+            records, corrupted = [], 0
+            for line in file.read().splitlines():
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # Última linha incompleta de um processo que caiu no meio da escrita
+                    corrupted += 1
+
+            segment = Segment(path, file, records)
+            if not records:
+                segment.close(remove=True)
+                continue
+            with self._cond:
+                self._sealed.append(segment)
+                self.adopted += len(records)
+                self.corrupted += corrupted
+                self._cond.notify()
+            adopted += len(records)
+        return adopted
+
+    # ---- observabilidade ----
+
+    def depth(self) -> int:
+        with self._cond:
+            return sum(len(segment.records) for segment in self._sealed) + \
+                (len(self._active.records) if self._active is not None else 0)
+
+    def stats(self) -> dict:
+        with self._cond:
+            segments = list(self._sealed) + ([self._active] if self._active is not None else [])
+            pending = [segment for segment in segments if segment.records]
+            now = time.monotonic()
+            return {
+                'enabled': self.enabled,
+                'running': self._thread is not None,
+                'depth': sum(len(segment.records) for segment in pending),
+                'segments': len(pending),
+                'oldest_pending_s': round(now - min(s.first_at for s in pending), 3) if pending else 0.0,
+                'accepted': self.accepted,
+                'flushed': self.flushed,
+                'adopted': self.adopted,
+                'rejected': self.rejected,
+                'corrupted': self.corrupted,
+                'flush_errors': self.flush_errors,
+                'last_flush_ms': self.last_flush_ms,
+                'retry_in_s': round(max(0.0, self._retry_at - now), 3),
+                'last_error': self.last_error,
+            }
+
+
+contact_queue = ContactQueue(
+    CONTACT_SPOOL_DIR,
+    batch_size=CONTACT_BATCH_SIZE,
+    flush_interval=CONTACT_FLUSH_INTERVAL,
+    retry_max_delay=CONTACT_RETRY_MAX_DELAY,
+    scan_interval=CONTACT_SPOOL_SCAN_INTERVAL,
+    fsync=CONTACT_SPOOL_FSYNC,
+    enabled=CONTACT_WRITE_BEHIND,
+)
@@ -0,0 +1,92 @@
+"""
+Exportação em streaming (NDJSON ou CSV) do histórico das clínicas
+
+As linhas são lidas do banco em páginas de EXPORT_PAGE_SIZE com cursor (keyset) e
+enviadas ao cliente página a página, então a memória usada não depende do tamanho
+do histórico exportado.
+"""
+import csv
+import io
+import os
+from typing import NamedTuple
+
+from src.utils.json_provider import dumps_bytes
+from src.utils.pagination import Page, apply_page
+
+# Linhas lidas do banco por vez (o PostgREST do Supabase devolve no máximo 1000 por padrão)
+EXPORT_PAGE_SIZE = int(os.getenv('EXPORT_PAGE_SIZE', '1000'))
+
+EXPORT_FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+# Prefixos que planilhas interpretam como fórmula
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class ExportSource(NamedTuple):
+    """
+    Tabela exportável: colunas, ordenação (keyset) e coluna usada no filtro de período
+    """
+    table: str
+    columns: list
+    keyset: list
+    date_column: str
+    # True quando date_column é data/hora (o fim do período vai até o fim do dia)
+    timestamp: bool = False
+
+
+def iter_pages(query_factory, keyset: list, page_size: int = None):
+    """
+    Percorre a consulta inteira em páginas, seguindo o cursor da última linha
+    ``query_factory()`` deve devolver uma consulta nova (com filtros, sem ordenação)
+    """
+    page_size = page_size or EXPORT_PAGE_SIZE
+    after = None
+    while True:
+        rows = apply_page(query_factory(), Page(keyset, page_size, False, after)).execute().data
+        if not rows:
+            return
+        more = len(rows) > page_size
+        rows = rows[:page_size]
+        yield rows
+        if not more:
+            return
+        after = [rows[-1][column] for column in keyset]
+
+
+def ndjson_stream(pages):
+    """
+    Um objeto JSON por linha; cada página vira um bloco da resposta
+    """
+    for rows in pages:
+        yield b''.join(dumps_bytes(row) + b'\n' for row in rows)
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (dict, list)):
+        return dumps_bytes(value).decode('utf-8')
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        # Evita que o conteúdo digitado por usuários vire fórmula ao abrir na planilha
+        return "'" + value
+    return value
+
+
+def csv_stream(pages, columns: list):
+    """
+    CSV com cabeçalho; cada página vira um bloco da resposta
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(columns)
+    for rows in pages:
+        for row in rows:
+            writer.writerow([_csv_value(row.get(column)) for column in columns])
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Sem nenhuma linha: envia só o cabeçalho
+        yield buffer.getvalue().encode('utf-8')
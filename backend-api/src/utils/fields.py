@@ -0,0 +1,63 @@
+"""
+Projeção de colunas das respostas (parâmetro ``fields``)
+
+Cada recurso tem uma lista de campos permitidos e uma projeção padrão enxuta para as
+listagens. Os campos pedidos viram o ``select`` enviado ao banco, então colunas grandes
+(histórico médico, observações) só trafegam quando o cliente pede.
+
+Exemplos: ``?fields=id,nome,especie`` ou ``?fields=*`` (todos os campos permitidos).
+"""
+
+
+class InvalidFields(ValueError):
+    """
+    Campo fora da lista permitida (responder com 400)
+    """
+
+
+class Projection:
+    """
+    Campos permitidos de um recurso, projeção padrão, campos calculados pela API
+    (não existem no banco) e colunas sempre lidas (ex.: as da paginação)
+    """
+
+    def __init__(self, allowed: list, default: list = None, computed: tuple = (), required: tuple = ()):
+        self.allowed = list(allowed)
+        self.default = list(default or allowed)
+        self.computed = set(computed)
+        self.required = list(required)
+
+    def fields(self, args) -> list:
+        """
+        Campos pedidos em ``fields`` (ou a projeção padrão), validados
+        """
+        raw = (args.get('fields') or '').strip()
+        if not raw:
+            return self.default
+        if raw == '*':
+            return self.allowed
+
+        fields = []
+        for name in raw.split(','):
+            name = name.strip()
+            if name and name not in fields:
+                fields.append(name)
+        invalid = [name for name in fields if name not in self.allowed]
+        if invalid or not fields:
+            raise InvalidFields(f'Campos inválidos: {", ".join(invalid)}. Permitidos: {", ".join(self.allowed)}')
+        return fields
+
+    def select(self, fields: list) -> str:
+        """
+        Lista de colunas para o ``select`` do banco
+        """
+        columns = [name for name in fields if name not in self.computed]
+        columns += [name for name in self.required if name not in columns]
+        return ', '.join(columns)
+
+    def pick(self, rows: list, fields: list) -> list:
+        """
+        Recorta linhas que já vêm com todas as colunas (ex.: resultado de uma RPC)
+        """
+        columns = self.select(fields).split(', ')
+        return [{name: row.get(name) for name in columns} for row in rows]
@@ -0,0 +1,90 @@
+"""
+Serialização JSON das respostas
+
+Usa o orjson quando instalado (bem mais rápido que o módulo json nas listagens grandes)
+e cai para o json da biblioteca padrão quando não está. Nos dois casos UUID, datas,
+horários e Decimal saem no mesmo formato que o PostgREST devolve (texto ISO e número).
+
+JSON_PROVIDER=orjson (padrão) ou stdlib (provedor original do Flask).
+"""
+import datetime
+import decimal
+import json
+import os
+import uuid
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # dependência opcional
+    orjson = None
+
+JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'orjson').lower()
+
+
+def _default(value):
+    """
+    Tipos que nem o json nem o orjson serializam sozinhos
+    """
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f'Objeto do tipo {type(value).__name__} não é serializável em JSON')
+
+
+def dumps_bytes(obj, sort_keys: bool = False, indent: bool = False) -> bytes:
+    """
+    Serializa ``obj`` direto para bytes (corpo da resposta)
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+
+    separators = None if indent else (',', ':')
+    return json.dumps(obj, default=_default, ensure_ascii=False, sort_keys=sort_keys,
+                      indent=2 if indent else None, separators=separators).encode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Provedor JSON do Flask baseado no orjson (jsonify, request.get_json, app.json)
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs:
+            # Opções específicas do json (cls, indent, ...): usa o provedor padrão
+            kwargs.setdefault('default', _default)
+            return super().dumps(obj, **kwargs)
+        return dumps_bytes(obj, sort_keys=self.sort_keys).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(
+            dumps_bytes(obj, sort_keys=self.sort_keys, indent=indent) + (b'\n' if indent else b''),
+            mimetype=self.mimetype
+        )
+
+
+def init_json_provider(app):
+    """
+    Troca o provedor JSON do app conforme JSON_PROVIDER
+    """
+    if JSON_PROVIDER != 'stdlib':
+        app.json = FastJSONProvider(app)
+    return app.json
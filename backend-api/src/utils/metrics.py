@@ -0,0 +1,390 @@
+"""
+Métricas de latência no formato de texto do Prometheus (``GET /metrics``)
+
+- ``http_request_duration_seconds{endpoint,method,status}``: cada requisição, pelo endpoint
+  do Flask (``animals.create_animal``, ``serve``...) ou da rota assíncrona; URLs sem rota
+  entram como ``unmatched``. Nas respostas em streaming mede até o início do envio.
+- ``db_query_duration_seconds{table,operation,outcome}``: cada ``execute()`` feito pelo
+  ``db``/``async_db`` (select, insert, update, upsert, delete ou rpc), com ``outcome``
+  ``ok`` ou ``error``
+- ``password_hash_duration_seconds{operation}``: bcrypt no pool de hashing (inclui a fila)
+- ``contact_flush_duration_seconds{outcome}``: cada lote gravado pela fila de contatos
+  (CONTACT_WRITE_BEHIND), com ``outcome`` ``ok`` ou ``error``
+
+Registrar uma observação custa uma busca em dicionário, um ``bisect`` e um lock; a
+formatação do texto só acontece quando o Prometheus coleta.
+
+Com vários processos (gunicorn), cada worker grava periodicamente um retrato das suas
+métricas em METRICS_DIR/<pid>.json e o ``/metrics`` soma o próprio estado com os
+arquivos dos demais, qualquer que seja o worker que atenda a coleta.
+
+``GET /metrics/stats`` devolve em JSON os contadores internos registrados com
+``register_stats`` (caches, pool de hashing, filas) do processo que atendeu, com a
+mesma autorização do ``/metrics``.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, g, jsonify, request
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+# Pasta dos retratos por processo (vazio: só o processo atual); gunicorn.conf.py define uma
+METRICS_DIR = os.getenv('METRICS_DIR', '')
+# Intervalo de gravação do retrato de cada worker (segundos)
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '5'))
+# Se definido, o /metrics exige "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Limites padrão do cliente oficial do Prometheus (segundos)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Métodos dos construtores de consulta que definem a operação
+QUERY_OPERATIONS = {'select', 'insert', 'update', 'upsert', 'delete'}
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """
+    Histograma com rótulos; guarda por combinação de rótulos a contagem de cada faixa
+    (não acumulada), a soma e o total
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple, buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Faixas + (+Inf), soma, total
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {labels: list(series) for labels, series in self._series.items()}
+
+    def count(self, labels: tuple) -> int:
+        with self._lock:
+            series = self._series.get(labels)
+            return series[-1] if series else 0
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self, series: dict) -> list:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        bounds = [_format_value(b) for b in self.buckets] + ['+Inf']
+        for labels in sorted(series):
+            values = series[labels]
+            base = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels))
+            prefix = f'{base},' if base else ''
+            cumulative = 0
+            for bound, count in zip(bounds, values):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            suffix = f'{{{base}}}' if base else ''
+            lines.append(f'{self.name}_sum{suffix} {_format_value(values[-2])}')
+            lines.append(f'{self.name}_count{suffix} {values[-1]}')
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Conjunto de histogramas do processo, com os retratos dos outros workers em METRICS_DIR
+    """
+
+    def __init__(self, directory: str = ''):
+        self.directory = directory
+        self.histograms = {}
+        self._flusher = None
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple) -> Histogram:
+        histogram = Histogram(name, documentation, labelnames)
+        self.histograms[name] = histogram
+        return histogram
+
+    def clear(self):
+        for histogram in self.histograms.values():
+            histogram.clear()
+
+    def _snapshot_path(self, pid: int) -> str:
+        return os.path.join(self.directory, f'{pid}.json')
+
+    def flush(self):
+        """
+        Grava o retrato deste processo (escrita atômica: arquivo temporário + rename)
+        """
+        if not self.directory:
+            return
+        data = {
+            name: [[list(labels), series] for labels, series in histogram.snapshot().items()]
+            for name, histogram in self.histograms.items()
+        }
+        path = self._snapshot_path(os.getpid())
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(data, f)
+        os.replace(temporary, path)
+
+    def start_flusher(self, interval: float = METRICS_FLUSH_INTERVAL):
+        """
+        Thread que grava o retrato periodicamente (chamar em cada worker, depois do fork)
+        """
+        if not self.directory or self._flusher is not None:
+            return
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.flush()
+                except OSError:
+                    pass
+
+        self._flusher = threading.Thread(target=loop, name='metrics-flush', daemon=True)
+        self._flusher.start()
+
+    def clear_snapshots(self):
+        """
+        Remove retratos de execuções anteriores (no mestre, antes de criar os workers)
+        """
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        for name in os.listdir(self.directory):
+            if name.endswith('.json') or name.endswith('.tmp'):
+                os.remove(os.path.join(self.directory, name))
+
+    def collect(self) -> dict:
+        """
+        Séries de cada histograma: estado atual do processo somado aos retratos dos outros
+        """
+        merged = {name: histogram.snapshot() for name, histogram in self.histograms.items()}
+        if not self.directory or not os.path.isdir(self.directory):
+            return merged
+
+        own = f'{os.getpid()}.json'
+        for file_name in os.listdir(self.directory):
+            if not file_name.endswith('.json') or file_name == own:
+                continue
+            try:
+                with open(os.path.join(self.directory, file_name)) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                # Worker gravando ou arquivo removido entre o listdir e o open
+                continue
+            for name, entries in data.items():
+                series = merged.get(name)
+                if series is None:
+                    continue
+                for labels, values in entries:
+                    labels = tuple(labels)
+                    current = series.get(labels)
+                    series[labels] = values if current is None else [a + b for a, b in zip(current, values)]
+        return merged
+
+    def render(self) -> str:
+        collected = self.collect()
+        lines = []
+        for name, histogram in self.histograms.items():
+            lines.extend(histogram.render(collected[name]))
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry(METRICS_DIR)
+http_request_duration = registry.histogram(
+    'http_request_duration_seconds', 'Duração das requisições HTTP por endpoint, método e status',
+    ('endpoint', 'method', 'status'))
+db_query_duration = registry.histogram(
+    'db_query_duration_seconds', 'Duração das chamadas ao banco por tabela, operação e resultado',
+    ('table', 'operation', 'outcome'))
+password_hash_duration = registry.histogram(
+    'password_hash_duration_seconds', 'Duração do bcrypt no pool de hashing, incluindo a fila',
+    ('operation',))
+contact_flush_duration = registry.histogram(
+    'contact_flush_duration_seconds', 'Duração da gravação de cada lote da fila de contatos, por resultado',
+    ('outcome',))
+
+
+class TimedQuery:
+    """
+    Envolve um construtor de consultas da engine e mede o ``execute()`` por tabela e operação.
+    Os métodos encadeados continuam funcionando tanto nos construtores que devolvem
+    ``self`` (SQL) quanto nos que devolvem um objeto novo (cliente Supabase).
+    """
+    __slots__ = ('_query', '_table', '_operation')
+
+    def __init__(self, query, table: str, operation: str = 'select'):
+        self._query = query
+        self._table = table
+        self._operation = operation
+
+    def __getattr__(self, name):
+        attribute = getattr(self._query, name)
+        if not callable(attribute):
+            return attribute
+        operation = name if name in QUERY_OPERATIONS else self._operation
+
+        def call(*args, **kwargs):
+            result = attribute(*args, **kwargs)
+            if result is self._query:
+                self._operation = operation
+                return self
+            if hasattr(result, 'execute'):
+                return type(self)(result, self._table, operation)
+            return result
+        return call
+
+    def execute(self):
+        start = time.perf_counter()
+        outcome = 'error'
+        try:
+            result = self._query.execute()
+            outcome = 'ok'
+            return result
+        finally:
+            db_query_duration.observe((self._table, self._operation, outcome), time.perf_counter() - start)
+
+
+class AsyncTimedQuery(TimedQuery):
+    """
+    Versão de ``TimedQuery`` para as engines assíncronas (``await ... .execute()``)
+    """
+    __slots__ = ()
+
+    async def execute(self):
+        start = time.perf_counter()
+        outcome = 'error'
+        try:
+            result = await self._query.execute()
+            outcome = 'ok'
+            return result
+        finally:
+            db_query_duration.observe((self._table, self._operation, outcome), time.perf_counter() - start)
+
+
+def timed_query(query, table: str, operation: str = 'select', asynchronous: bool = False):
+    """
+    Construtor medido (ou o próprio construtor com METRICS_ENABLED=false)
+    """
+    if not METRICS_ENABLED:
+        return query
+    return (AsyncTimedQuery if asynchronous else TimedQuery)(query, table, operation)
+
+
+def observe_password_hash(operation: str, seconds: float):
+    if METRICS_ENABLED:
+        password_hash_duration.observe((operation,), seconds)
+
+
+def observe_contact_flush(outcome: str, seconds: float):
+    if METRICS_ENABLED:
+        contact_flush_duration.observe((outcome,), seconds)
+
+
+# Contadores internos servidos por /metrics/stats: nome -> função que devolve um dict
+_stats_providers = {}
+
+
+def register_stats(name: str, provider):
+    """
+    Inclui ``provider()`` em ``/metrics/stats`` com a chave ``name``
+    """
+    _stats_providers[name] = provider
+
+
+def _authorized(authorization: str) -> bool:
+    return not METRICS_TOKEN or authorization == f'Bearer {METRICS_TOKEN}'
+
+
+def init_metrics(app):
+    """
+    Registra o middleware de latência e a rota ``/metrics`` no app Flask.
+    Deve ser chamado antes dos demais hooks, para que a medição inclua CORS e compressão.
+    """
+    if not METRICS_ENABLED:
+        return
+
+    @app.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            rule = request.url_rule
+            http_request_duration.observe(
+                (rule.endpoint if rule is not None else 'unmatched', request.method, str(response.status_code)),
+                time.perf_counter() - start)
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        if not _authorized(request.headers.get('Authorization', '')):
+            return Response('Não autorizado\n', 401, content_type='text/plain; charset=utf-8')
+        response = Response(registry.render(), content_type=CONTENT_TYPE)
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+
+    @app.route('/metrics/stats')
+    def metrics_stats():
+        if not _authorized(request.headers.get('Authorization', '')):
+            return Response('Não autorizado\n', 401, content_type='text/plain; charset=utf-8')
+        response = jsonify({name: provider() for name, provider in _stats_providers.items()})
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que registra ``http_request_duration_seconds`` das rotas assíncronas
+    (as rotas Flask montadas no ASGI já são medidas pelos hooks do próprio app)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            endpoint = scope.get('endpoint')
+            name = f'async.{endpoint.__name__}' if endpoint is not None else 'unmatched'
+            http_request_duration.observe((name, scope['method'], str(status)), time.perf_counter() - start)
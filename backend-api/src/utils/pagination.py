@@ -0,0 +1,128 @@
+"""
+Paginação por cursor (keyset) das listagens
+
+Cada listagem é ordenada por um conjunto de colunas que identifica a linha de forma
+única (ex.: ``criado_em, id``). A próxima página começa logo depois da última linha
+recebida, com um filtro ``(colunas) > (valores do cursor)``, então o custo de uma
+página não depende de quantas páginas já foram lidas (ao contrário do OFFSET).
+
+Parâmetros aceitos: ``limit``, ``cursor`` (devolvido em ``next_cursor``) e
+``order`` (``asc`` ou ``desc``).
+"""
+import base64
+import json
+import os
+
+# Tamanho de página quando o cliente não informa limit, e o máximo aceito
+PAGE_DEFAULT_LIMIT = int(os.getenv('PAGE_DEFAULT_LIMIT', '50'))
+PAGE_MAX_LIMIT = int(os.getenv('PAGE_MAX_LIMIT', '200'))
+
+
+class InvalidPage(ValueError):
+    """
+    Parâmetros de paginação inválidos (responder com 400)
+    """
+
+
+class Page:
+    """
+    Parâmetros de uma página já validados
+    """
+
+    def __init__(self, keyset: list, limit: int, desc: bool, after: list = None):
+        self.keyset = keyset
+        self.limit = limit
+        self.desc = desc
+        self.after = after
+
+    @property
+    def order(self) -> str:
+        return 'desc' if self.desc else 'asc'
+
+
+def encode_cursor(values: list, order: str) -> str:
+    raw = json.dumps({'v': values, 'o': order}, separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, keyset: list, order: str) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data = json.loads(raw)
+        values, cursor_order = data['v'], data['o']
+    except (ValueError, TypeError, KeyError):
+        raise InvalidPage('Cursor inválido')
+    if not isinstance(values, list) or len(values) != len(keyset):
+        raise InvalidPage('Cursor inválido')
+    if any(not isinstance(v, (str, int, float)) or '"' in str(v) or '\\' in str(v) for v in values):
+        raise InvalidPage('Cursor inválido')
+    if cursor_order != order:
+        raise InvalidPage('O cursor foi gerado com outra ordenação')
+    return values
+
+
+def page_args(args, keyset: list, default_order: str = 'desc') -> Page:
+    """
+    Lê limit, cursor e order da query string
+    """
+    order = args.get('order', default_order).lower()
+    if order not in ('asc', 'desc'):
+        raise InvalidPage('order deve ser asc ou desc')
+
+    try:
+        limit = int(args.get('limit', PAGE_DEFAULT_LIMIT))
+    except ValueError:
+        raise InvalidPage('limit deve ser um número')
+    if not 1 <= limit <= PAGE_MAX_LIMIT:
+        raise InvalidPage(f'limit deve estar entre 1 e {PAGE_MAX_LIMIT}')
+
+    cursor = args.get('cursor')
+    after = decode_cursor(cursor, keyset, order) if cursor else None
+    return Page(keyset, limit, order == 'desc', after)
+
+
+def _quote(value) -> str:
+    # Valores entre aspas no filtro or= do PostgREST (datas têm ':' e '.')
+    return f'"{value}"'
+
+
+def apply_page(query, page: Page):
+    """
+    Aplica ordenação, filtro do cursor e limite (uma linha a mais, para saber se há próxima página)
+    """
+    if page.after:
+        op = 'lt' if page.desc else 'gt'
+        keyset, values = page.keyset, page.after
+
+        # (a, b, c) > (x, y, z)  =>  a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)
+        branches = []
+        for i, column in enumerate(keyset):
+            terms = [f'{keyset[j]}.eq.{_quote(values[j])}' for j in range(i)]
+            terms.append(f'{column}.{op}.{_quote(values[i])}')
+            branches.append(terms[0] if len(terms) == 1 else f'and({",".join(terms)})')
+        query = query.or_(','.join(branches))
+
+        # Limite redundante na primeira coluna: permite ao banco percorrer o índice a partir do cursor
+        query = query.lte(keyset[0], values[0]) if page.desc else query.gte(keyset[0], values[0])
+
+    for column in page.keyset:
+        query = query.order(column, desc=page.desc)
+    return query.limit(page.limit + 1)
+
+
+def finish_page(rows: list, page: Page):
+    """
+    Separa a página e monta o next_cursor (None na última página)
+    """
+    if len(rows) <= page.limit:
+        return rows, None
+    rows = rows[:page.limit]
+    last = rows[-1]
+    return rows, encode_cursor([last[column] for column in page.keyset], page.order)
+
+
+def paginate(query, page: Page):
+    """
+    Executa a consulta paginada: ``rows, next_cursor = paginate(query, page)``
+    """
+    return finish_page(apply_page(query, page).execute().data, page)
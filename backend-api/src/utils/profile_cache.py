@@ -0,0 +1,141 @@
+"""
+Cache do perfil público do animal (página aberta pelo QR Code da coleira)
+
+Cache LRU em memória com três janelas de idade:
+- até ``ttl``: o perfil é servido direto do cache
+- até ``ttl + stale_while_revalidate``: serve a cópia antiga e atualiza em segundo plano
+- até ``ttl + stale_if_error``: busca no banco, mas se o banco falhar serve a cópia antiga
+
+Assim um QR Code lido com o Supabase lento ou fora do ar ainda mostra o contato do tutor.
+Depois de uma falha, a cópia antiga é servida sem nova tentativa durante ``retry_after`` segundos,
+para que cada leitura não espere o banco falhar de novo.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.ttl_cache import TTLCache
+
+# Validade (segundos) do perfil em cache e quanto tempo uma cópia antiga ainda pode ser servida
+ANIMAL_PROFILE_CACHE_TTL = float(os.getenv('ANIMAL_PROFILE_CACHE_TTL', '60'))
+ANIMAL_PROFILE_CACHE_STALE = float(os.getenv('ANIMAL_PROFILE_CACHE_STALE', '600'))
+ANIMAL_PROFILE_CACHE_STALE_IF_ERROR = float(os.getenv('ANIMAL_PROFILE_CACHE_STALE_IF_ERROR', '86400'))
+ANIMAL_PROFILE_CACHE_SIZE = int(os.getenv('ANIMAL_PROFILE_CACHE_SIZE', '10000'))
+
+
+class ProfileCache(TTLCache):
+    """
+    Cache LRU com stale-while-revalidate e stale-if-error, invalidado pela edição do animal.
+
+    Cada entrada guarda ``(perfil, retry_at)`` e vive ``ttl + stale_if_error``; ``retry_at``
+    é o instante até o qual, depois de uma falha do banco, a cópia antiga é servida direto.
+    """
+
+    def __init__(self, max_size: int, ttl: float, stale_while_revalidate: float, stale_if_error: float,
+                 retry_after: float = None, workers: int = 2):
+        super().__init__(max_size, ttl)
+        self.retry_after = ttl if retry_after is None else retry_after
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_if_error = max(stale_if_error, stale_while_revalidate)
+        self.stale_hits = 0
+        self.stale_on_error = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self._refreshing = set()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='profile-cache')
+
+    def get(self, key, loader):
+        """
+        Perfil de ``key``; ``loader(key)`` busca no banco (None quando não existe)
+        """
+        if not self.enabled:
+            return loader(key)
+
+        with self._lock:
+            entry = self._peek(key)
+            if entry is not None:
+                value, retry_at = entry.value
+                now = self.clock()
+                age = now - entry.stored_at
+                if retry_at and now < retry_at:
+                    self.stale_on_error += 1
+                    return value
+                if age < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                if age < self.ttl + self.stale_while_revalidate:
+                    self._entries.move_to_end(key)
+                    self.stale_hits += 1
+                    self._schedule_refresh(key, loader)
+                    return value
+            self.misses += 1
+            generation = self.generation
+
+        try:
+            value = loader(key)
+        except Exception:
+            # Banco indisponível: a cópia antiga é melhor que um erro para quem achou o animal
+            with self._lock:
+                entry = self._peek(key)
+                if entry is not None:
+                    self.stale_on_error += 1
+                    self._store(key, (entry.value[0], self.clock() + self.retry_after),
+                                entry.stored_at, entry.expires_at)
+                    return entry.value[0]
+            raise
+
+        self.set(key, value, generation)
+        return value
+
+    def _schedule_refresh(self, key, loader):
+        # Chamado com o lock: no máximo uma atualização em andamento por chave
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        self._executor.submit(self._refresh, key, loader, self.generation)
+
+    def _refresh(self, key, loader, generation: int):
+        try:
+            value = loader(key)
+        except Exception:
+            with self._lock:
+                self.refresh_errors += 1
+        else:
+            with self._lock:
+                self.refreshes += 1
+            self.set(key, value, generation)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def set(self, key, value, generation: int = None):
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if value is None:
+                self._entries.pop(key, None)
+                return
+            now = self.clock()
+            self._store(key, (value, None), now, now + self.ttl + self.stale_if_error)
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                **stats,
+                'stale_hits': self.stale_hits,
+                'hit_rate': round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+                'stale_on_error': self.stale_on_error,
+                'refreshes': self.refreshes,
+                'refresh_errors': self.refresh_errors,
+                'ttl_seconds': self.ttl,
+                'stale_while_revalidate_seconds': self.stale_while_revalidate,
+                'stale_if_error_seconds': self.stale_if_error,
+            }
+
+
+profile_cache = ProfileCache(ANIMAL_PROFILE_CACHE_SIZE, ANIMAL_PROFILE_CACHE_TTL,
+                             ANIMAL_PROFILE_CACHE_STALE, ANIMAL_PROFILE_CACHE_STALE_IF_ERROR)
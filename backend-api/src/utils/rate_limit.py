@@ -0,0 +1,264 @@
+"""
+Limite de requisições (token bucket) das rotas públicas que custam caro: login, cadastro e contato
+
+Cada política é um balde de ``capacidade`` fichas que se recarrega em ``segundos``
+(``RATE_LIMIT_LOGIN_IP=20/60``: rajada de 20 tentativas, depois uma a cada 3 s). Cada
+rota consome uma ficha do balde do IP e uma do balde do email informado no corpo, antes
+de qualquer consulta ao banco ou bcrypt; sem ficha, a resposta é 429 com Retry-After.
+
+No login, o limite apertado por email vale para o par (IP, email): quem erra a senha de
+outra pessoa não bloqueia o login dela de outro IP. O balde só do email é bem mais folgado
+e recarrega mais rápido do que um único IP consegue gastar; só um ataque distribuído o esvazia.
+
+Estado:
+- ``MemoryBackend``: por processo, com no máximo RATE_LIMIT_MAX_KEYS baldes (os usados
+  há mais tempo saem primeiro; as chaves são hashes de 16 bytes, então a memória não
+  depende do tamanho dos emails). É também o substituto local nos benchmarks.
+- ``DatabaseBackend`` (RATE_LIMIT_BACKEND=database): baldes compartilhados entre workers e
+  instâncias na tabela limites_requisicao (função consumir_limite do schema.sql). O balde
+  local é consultado antes e barra sozinho quem já estourou o limite só neste processo,
+  sem chamada ao banco; se o banco falhar, vale só o limite local.
+"""
+import hashlib
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from functools import wraps
+
+from flask import jsonify, request
+
+from src.config.database import db
+
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+# memory (por processo) ou database (compartilhado entre workers)
+RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')
+RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', '50000'))
+# Proxies confiáveis na frente da API (Render: 1); o IP do cliente é o N-ésimo do fim do X-Forwarded-For
+RATE_LIMIT_PROXY_HOPS = int(os.getenv('RATE_LIMIT_PROXY_HOPS', '0'))
+
+
+class RateLimitPolicy:
+    """
+    Balde de ``capacity`` fichas recarregado em ``period`` segundos
+    """
+    __slots__ = ('capacity', 'period', 'per_second')
+
+    def __init__(self, capacity: int, period: float):
+        if capacity <= 0 or period <= 0:
+            raise ValueError('Capacidade e período devem ser positivos')
+        self.capacity = capacity
+        self.period = period
+        self.per_second = capacity / period
+
+    @classmethod
+    def parse(cls, value: str):
+        """
+        ``"20/60"`` -> 20 fichas por 60 segundos; vazio desativa a política
+        """
+        if not value or not value.strip():
+            return None
+        capacity, _, period = value.partition('/')
+        return cls(int(capacity), float(period or 1))
+
+
+def _policy(name: str, default: str):
+    return RateLimitPolicy.parse(os.getenv(name, default))
+
+
+# Políticas por rota e por tipo de chave
+RATE_LIMIT_POLICIES = {
+    'login': {
+        'ip': _policy('RATE_LIMIT_LOGIN_IP', '20/60'),
+        'ip_email': _policy('RATE_LIMIT_LOGIN_IP_EMAIL', '5/60'),
+        'email': _policy('RATE_LIMIT_LOGIN_EMAIL', '100/600'),
+    },
+    'register': {
+        'ip': _policy('RATE_LIMIT_REGISTER_IP', '5/600'),
+        'email': _policy('RATE_LIMIT_REGISTER_EMAIL', '3/600'),
+    },
+    'contact': {
+        'ip': _policy('RATE_LIMIT_CONTACT_IP', '5/600'),
+        'email': _policy('RATE_LIMIT_CONTACT_EMAIL', '3/600'),
+    },
+}
+
+
+def bucket_key(route: str, kind: str, value: str) -> bytes:
+    return hashlib.blake2b(f'{route}:{kind}:{value}'.encode('utf-8'), digest_size=16).digest()
+
+
+class RateLimitBackend(ABC):
+    """
+    Interface dos estados de balde: ``consume`` devolve 0 se a ficha foi consumida,
+    senão os segundos até haver ficha
+    """
+
+    @abstractmethod
+    def consume(self, key: bytes, policy: RateLimitPolicy, cost: float = 1.0) -> float:
+        """
+        Consome ``cost`` fichas do balde ``key``
+        """
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemoryBackend(RateLimitBackend):
+    """
+    Baldes em memória, no máximo ``max_keys`` (o dicionário mantém a ordem de uso)
+    """
+
+    def __init__(self, max_keys: int, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.evicted = 0
+        self._clock = clock
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key: bytes, policy: RateLimitPolicy, cost: float = 1.0) -> float:
+        now = self._clock()
+        with self._lock:
+            state = self._buckets.pop(key, None)
+            if state is None:
+                tokens = policy.capacity
+            else:
+                tokens = min(policy.capacity, state[0] + (now - state[1]) * policy.per_second)
+
+            wait = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                wait = (cost - tokens) / policy.per_second
+            # Reinserir leva a chave para o fim: o início do dicionário é o balde usado há mais tempo
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                del self._buckets[next(iter(self._buckets))]
+                self.evicted += 1
+            return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'keys': len(self._buckets), 'max_keys': self.max_keys, 'evicted': self.evicted}
+
+
+class DatabaseBackend(RateLimitBackend):
+    """
+    Baldes compartilhados na tabela limites_requisicao (uma chamada RPC por consumo)
+    """
+
+    def consume(self, key: bytes, policy: RateLimitPolicy, cost: float = 1.0) -> float:
+        result = db.rpc('consumir_limite', {
+            'p_chave': key.hex(),
+            'p_capacidade': policy.capacity,
+            'p_por_segundo': policy.per_second,
+            'p_custo': cost,
+        }).execute().data
+        return 0.0 if result['permitido'] else float(result['espera'])
+
+
+class RateLimiter:
+    """
+    Consulta o balde local e, se houver, o compartilhado
+    """
+
+    def __init__(self, local: RateLimitBackend, shared: RateLimitBackend = None):
+        self.local = local
+        self.shared = shared
+        self.allowed = 0
+        self.limited = 0
+        self.shared_errors = 0
+        self._lock = threading.Lock()
+
+    def hit(self, key: bytes, policy: RateLimitPolicy) -> float:
+        wait = self.local.consume(key, policy)
+        if not wait and self.shared is not None:
+            try:
+                wait = self.shared.consume(key, policy)
+            except Exception as e:
+                # Banco fora do ar não derruba o login: fica valendo só o limite local
+                with self._lock:
+                    self.shared_errors += 1
+                print(f"Erro no limite compartilhado: {e}")
+        return wait
+
+    def check(self, route: str, identities: dict) -> float:
+        """
+        Consome uma ficha de cada política da rota; devolve a maior espera (0 = liberado).
+        Para na primeira política estourada, sem gastar fichas das demais (por isso o balde
+        do par IP e email vem antes do balde só do email).
+        """
+        for kind, policy in RATE_LIMIT_POLICIES[route].items():
+            value = identities.get(kind)
+            if policy is None or not value:
+                continue
+            wait = self.hit(bucket_key(route, kind, value), policy)
+            if wait:
+                with self._lock:
+                    self.limited += 1
+                return wait
+        with self._lock:
+            self.allowed += 1
+        return 0.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = {'allowed': self.allowed, 'limited': self.limited, 'shared_errors': self.shared_errors}
+        return {
+            'backend': 'database' if self.shared is not None else 'memory',
+            **counters,
+            **self.local.stats(),
+        }
+
+
+def create_rate_limiter() -> RateLimiter:
+    if RATE_LIMIT_BACKEND == 'memory':
+        return RateLimiter(MemoryBackend(RATE_LIMIT_MAX_KEYS))
+    if RATE_LIMIT_BACKEND == 'database':
+        return RateLimiter(MemoryBackend(RATE_LIMIT_MAX_KEYS), DatabaseBackend())
+    raise ValueError(f'RATE_LIMIT_BACKEND inválido: {RATE_LIMIT_BACKEND}')
+
+
+rate_limiter = create_rate_limiter()
+
+
+def client_ip() -> str:
+    """
+    IP do cliente; atrás de proxies confiáveis, lido do X-Forwarded-For (de trás para frente,
+    já que o início da lista é escrito pelo próprio cliente)
+    """
+    if RATE_LIMIT_PROXY_HOPS > 0:
+        forwarded = [ip.strip() for ip in request.headers.get('X-Forwarded-For', '').split(',') if ip.strip()]
+        if len(forwarded) >= RATE_LIMIT_PROXY_HOPS:
+            return forwarded[-RATE_LIMIT_PROXY_HOPS]
+    return request.remote_addr or ''
+
+
+def rate_limited(route: str):
+    """
+    Decorator: aplica as políticas de ``route`` por IP, pelo email do corpo JSON e pelo par
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if RATE_LIMIT_ENABLED:
+                data = request.get_json(silent=True)
+                email = data.get('email') if isinstance(data, dict) else None
+                email = email.strip().lower() if isinstance(email, str) else None
+                ip = client_ip()
+                wait = rate_limiter.check(route, {
+                    'ip': ip,
+                    'ip_email': f'{ip}|{email}' if email else None,
+                    'email': email,
+                })
+                if wait:
+                    return jsonify({'error': 'Muitas tentativas. Tente novamente mais tarde'}), 429, \
+                        {'Retry-After': str(math.ceil(wait))}
+            return f(*args, **kwargs)
+        return decorated
+    return decorator
@@ -0,0 +1,170 @@
+"""
+Arquivos estáticos do frontend (build do Vite) servidos a partir de um manifesto em memória
+
+Na inicialização a pasta estática é percorrida uma vez: cada arquivo entra no manifesto
+com tipo, ETag (hash do conteúdo), data de modificação, política de cache e, para tipos
+textuais, as variantes brotli/gzip já comprimidas (usa os ``.br``/``.gz`` gerados no build
+quando existem, senão comprime na hora). Nas requisições não há ``os.path.exists`` nem
+leitura de disco: o caminho é procurado no dicionário e o corpo sai da memória (arquivos
+acima de STATIC_MEMORY_MAX_FILE são lidos do disco a cada requisição).
+
+- ``assets/nome-[hash].ext`` (nomes gerados pelo Vite): cache de um ano, ``immutable``
+- ``index.html``: ``no-cache`` (o navegador revalida e recebe 304 enquanto não houver deploy)
+- demais arquivos: ``max-age`` de STATIC_MAX_AGE segundos
+
+Todas as respostas aceitam If-None-Match / If-Modified-Since (304) e Range.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import time
+from datetime import datetime, timezone
+
+from flask import Response, send_file
+
+from src.utils.compression import COMPRESSION_MIN_SIZE, add_vary, brotli, choose_encoding, is_compressible
+
+# Comprime as variantes na inicialização quando o build não trouxe .br/.gz
+STATIC_PRECOMPRESS = os.getenv('STATIC_PRECOMPRESS', 'true').lower() == 'true'
+# Compressão máxima: roda uma vez por arquivo, na inicialização
+STATIC_BROTLI_QUALITY = int(os.getenv('STATIC_BROTLI_QUALITY', '11'))
+# Cache dos arquivos sem hash no nome (segundos)
+STATIC_MAX_AGE = int(os.getenv('STATIC_MAX_AGE', '3600'))
+# Arquivos maiores que isso (bytes) não ficam em memória
+STATIC_MEMORY_MAX_FILE = int(os.getenv('STATIC_MEMORY_MAX_FILE', str(4 * 1024 * 1024)))
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Nomes gerados pelo Vite: assets/index-BxYz12_a.js
+HASHED_ASSET = re.compile(r'^assets/.+-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$')
+VARIANT_EXTENSIONS = {'.br': 'br', '.gz': 'gzip'}
+
+
+class StaticAsset:
+    """
+    Entrada do manifesto: metadados, corpo e variantes comprimidas de um arquivo
+    """
+    __slots__ = ('file_path', 'mimetype', 'size', 'etag', 'last_modified', 'cache_control', 'body', 'variants')
+
+    def __init__(self, file_path: str, mimetype: str, size: int, etag: str, last_modified: datetime,
+                 cache_control: str, body: bytes = None, variants: dict = None):
+        self.file_path = file_path
+        self.mimetype = mimetype
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+        self.cache_control = cache_control
+        self.body = body
+        self.variants = variants or {}
+
+
+def cache_control_for(path: str) -> str:
+    if HASHED_ASSET.match(path):
+        return IMMUTABLE_CACHE_CONTROL
+    if path.endswith('.html'):
+        return 'no-cache'
+    return f'public, max-age={STATIC_MAX_AGE}'
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=STATIC_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+class StaticAssets:
+    """
+    Manifesto da pasta estática, montado uma vez por processo (com preload, antes do fork)
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.files = {}
+        self.load_ms = 0.0
+
+    def load(self):
+        start = time.perf_counter()
+        files = {}
+        if self.root and os.path.isdir(self.root):
+            for directory, _, names in os.walk(self.root):
+                for name in names:
+                    file_path = os.path.join(directory, name)
+                    path = os.path.relpath(file_path, self.root).replace(os.sep, '/')
+                    base, extension = os.path.splitext(path)
+                    if extension in VARIANT_EXTENSIONS and os.path.isfile(os.path.join(self.root, base)):
+                        # Variante gerada no build: entra junto com o arquivo original
+                        continue
+                    files[path] = self._build(path, file_path)
+        self.files = files
+        self.load_ms = (time.perf_counter() - start) * 1000
+        return self
+
+    def _build(self, path: str, file_path: str) -> StaticAsset:
+        with open(file_path, 'rb') as f:
+            body = f.read()
+        stat = os.stat(file_path)
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+        variants = {}
+        if is_compressible(mimetype) and COMPRESSION_MIN_SIZE > 0 and len(body) >= COMPRESSION_MIN_SIZE:
+            for extension, encoding in VARIANT_EXTENSIONS.items():
+                built = file_path + extension
+                if os.path.isfile(built) and os.stat(built).st_mtime >= stat.st_mtime:
+                    with open(built, 'rb') as f:
+                        variants[encoding] = f.read()
+                elif STATIC_PRECOMPRESS and (encoding != 'br' or brotli is not None):
+                    variants[encoding] = _compress(body, encoding)
+            # Só vale a pena servir a variante se ela for menor
+            variants = {e: v for e, v in variants.items() if len(v) < len(body)}
+
+        in_memory = len(body) <= STATIC_MEMORY_MAX_FILE
+        return StaticAsset(
+            file_path=file_path,
+            mimetype=mimetype,
+            size=len(body),
+            etag=hashlib.sha256(body).hexdigest()[:32],
+            last_modified=datetime.fromtimestamp(int(stat.st_mtime), timezone.utc),
+            cache_control=cache_control_for(path),
+            body=body if in_memory else None,
+            variants=variants if in_memory else {}
+        )
+
+    def response(self, path: str, request):
+        """
+        Resposta para ``path`` (relativo à pasta estática), ou None se não estiver no manifesto
+        """
+        asset = self.files.get(path)
+        if asset is None:
+            return None
+
+        encoding = choose_encoding(request.headers.get('Accept-Encoding', ''), list(asset.variants))
+        if asset.body is None:
+            response = send_file(asset.file_path, mimetype=asset.mimetype, etag=False, conditional=False)
+            body_length = asset.size
+        else:
+            body = asset.variants[encoding] if encoding else asset.body
+            response = Response(body, mimetype=asset.mimetype)
+            body_length = len(body)
+
+        if asset.variants:
+            response.headers['Vary'] = add_vary(response.headers.get('Vary'))
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+            # Cada variante tem a própria ETag (o corpo é outro)
+            response.set_etag(f'{asset.etag}-{encoding}')
+        else:
+            response.set_etag(asset.etag)
+        response.last_modified = asset.last_modified
+        response.headers['Cache-Control'] = asset.cache_control
+
+        return response.make_conditional(request, accept_ranges=True, complete_length=body_length)
+
+    def stats(self) -> dict:
+        return {
+            'files': len(self.files),
+            'bytes': sum(asset.size for asset in self.files.values()),
+            'in_memory': sum(1 for asset in self.files.values() if asset.body is not None),
+            'compressed_variants': sum(len(asset.variants) for asset in self.files.values()),
+            'load_ms': round(self.load_ms, 1),
+        }
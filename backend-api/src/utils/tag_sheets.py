@@ -0,0 +1,241 @@
+"""
+Geração em lote de etiquetas com QR Code (PDF para impressão ou ZIP de PNGs)
+
+A renderização dos QR Codes roda em um pool de processos e o arquivo é montado e
+enviado aos poucos, mantendo no máximo uma janela de etiquetas em memória.
+"""
+import io
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import qrcode
+
+QR_SHEET_WORKERS = int(os.getenv('QR_SHEET_WORKERS', str(os.cpu_count() or 1)))
+
+# Página A4 em pontos, grade de 3 x 4 etiquetas
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+COLUMNS, ROWS = 3, 4
+MARGIN = 36
+QR_POINTS = 130
+FONT_SIZE = 10
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class SheetPool(ProcessPoolExecutor):
+    """
+    Pool de processos (spawn) que guarda o número de workers com que foi criado
+    """
+
+    def __init__(self, workers: int):
+        super().__init__(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        self.workers = workers
+
+
+def get_pool(workers: int = None) -> SheetPool:
+    """
+    Pool de processos compartilhado (criado na primeira chamada, com QR_SHEET_WORKERS)
+    """
+    global _pool
+    if workers is not None:
+        # Pool avulso com tamanho específico (benchmarks)
+        return SheetPool(workers)
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SheetPool(QR_SHEET_WORKERS)
+    return _pool
+
+
+def _build_qr(target: str) -> qrcode.QRCode:
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=1, border=4)
+    qr.add_data(target)
+    qr.make(fit=True)
+    return qr
+
+
+def render_bitmap(target: str):
+    """
+    Matriz do QR Code como imagem de 1 bit por módulo (formato de imagem do PDF).
+    Retorna (largura, dados comprimidos com zlib).
+    """
+    matrix = _build_qr(target).get_matrix()
+    size = len(matrix)
+    rows = bytearray()
+    for row in matrix:
+        # No DeviceGray de 1 bit, 0 é preto: módulos escuros viram bits 0
+        bits = ''.join('0' if dark else '1' for dark in row).ljust((size + 7) // 8 * 8, '1')
+        rows += int(bits, 2).to_bytes(len(bits) // 8, 'big')
+    return size, zlib.compress(bytes(rows))
+
+
+def render_png(target: str, box_size: int = 10) -> bytes:
+    """
+    QR Code em PNG
+    """
+    qr = _build_qr(target)
+    qr.box_size = box_size
+    buffer = io.BytesIO()
+    qr.make_image(fill_color="black", back_color="white").save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def render_in_pool(fn, args: list, pool: SheetPool = None):
+    """
+    Executa ``fn`` para cada item no pool de processos, devolvendo os resultados em ordem.
+    Só mantém uma janela de tarefas em andamento, para a memória não crescer com o lote.
+    """
+    pool = pool or get_pool()
+    window = max(pool.workers * 4, 1)
+    pending = deque()
+
+    for item in args:
+        pending.append(pool.submit(fn, *item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+
+    while pending:
+        yield pending.popleft().result()
+
+
+def _pdf_text(value: str) -> bytes:
+    value = value.encode('cp1252', errors='replace')
+    return value.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def stream_pdf(animals: list, targets: list, pool: SheetPool = None):
+    """
+    Gera o PDF das etiquetas aos poucos (um pedaço por objeto)
+    ``animals`` são dicionários com id e nome; ``targets`` as URLs codificadas
+    """
+    offsets = {}
+    position = 0
+
+    def write(data: bytes) -> bytes:
+        nonlocal position
+        position += len(data)
+        return data
+
+    def obj(number: int, body: bytes) -> bytes:
+        offsets[number] = position
+        return write(f'{number} 0 obj\n'.encode() + body + b'\nendobj\n')
+
+    # Objetos fixos: 1 catálogo, 2 lista de páginas (escrita no final), 3 fonte
+    yield write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    yield obj(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+    yield obj(3, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+
+    next_number = 4
+    pages = []
+    per_page = COLUMNS * ROWS
+    cell_width = (PAGE_WIDTH - 2 * MARGIN) / COLUMNS
+    cell_height = (PAGE_HEIGHT - 2 * MARGIN) / ROWS
+    images, content = [], []
+
+    def finish_page():
+        nonlocal next_number
+        stream = '\n'.join(content).encode('latin-1')
+        content_number, page_number = next_number, next_number + 1
+        next_number += 2
+        resources = ' '.join(f'/Im{n} {n} 0 R' for n in images)
+        chunk = obj(content_number, f'<< /Length {len(stream)} >>\nstream\n'.encode() + stream + b'\nendstream')
+        chunk += obj(page_number, (
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] '
+            f'/Resources << /Font << /F1 3 0 R >> /XObject << {resources} >> >> '
+            f'/Contents {content_number} 0 R >>'
+        ).encode())
+        pages.append(page_number)
+        images.clear()
+        content.clear()
+        return chunk
+
+    results = render_in_pool(render_bitmap, [(t,) for t in targets], pool)
+    for index, (animal, (size, data)) in enumerate(zip(animals, results)):
+        slot = index % per_page
+        column, row = slot % COLUMNS, slot // COLUMNS
+
+        image_number = next_number
+        next_number += 1
+        images.append(image_number)
+        yield obj(image_number, (
+            f'<< /Type /XObject /Subtype /Image /Width {size} /Height {size} /ColorSpace /DeviceGray '
+            f'/BitsPerComponent 1 /Filter /FlateDecode /Length {len(data)} >>\nstream\n'
+        ).encode() + data + b'\nendstream')
+
+        x = MARGIN + column * cell_width + (cell_width - QR_POINTS) / 2
+        y = PAGE_HEIGHT - MARGIN - (row + 1) * cell_height + (cell_height - QR_POINTS) / 2 + FONT_SIZE
+        name = (animal.get('nome') or '')[:28]
+        text_x = MARGIN + column * cell_width + (cell_width - len(name) * FONT_SIZE * 0.5) / 2
+        content.append(f'q {QR_POINTS} 0 0 {QR_POINTS} {x:.2f} {y:.2f} cm /Im{image_number} Do Q')
+        content.append(
+            f'BT /F1 {FONT_SIZE} Tf {text_x:.2f} {y - FONT_SIZE * 1.5:.2f} Td ('
+            + _pdf_text(name).decode('latin-1') + ') Tj ET'
+        )
+
+        if slot == per_page - 1:
+            yield finish_page()
+
+    if images or not pages:
+        yield finish_page()
+
+    kids = ' '.join(f'{n} 0 R' for n in pages)
+    yield obj(2, f'<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>'.encode())
+
+    xref_position = position
+    total = next_number
+    xref = [f'xref\n0 {total}\n', '0000000000 65535 f \n']
+    xref += [f'{offsets.get(n, 0):010d} 00000 n \n' for n in range(1, total)]
+    yield write(''.join(xref).encode())
+    yield write(f'trailer\n<< /Size {total} /Root 1 0 R >>\nstartxref\n{xref_position}\n%%EOF\n'.encode())
+
+
+class _StreamBuffer(io.RawIOBase):
+    """
+    Saída sem seek para o ZipFile: acumula os bytes escritos até serem retirados
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def take(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _file_name(animal: dict) -> str:
+    name = re.sub(r'[^A-Za-z0-9_-]+', '-', animal.get('nome') or 'animal').strip('-') or 'animal'
+    return f"qr-{name}-{str(animal['id'])[:8]}.png"
+
+
+def stream_zip(animals: list, targets: list, box_size: int = 10, pool: SheetPool = None):
+    """
+    Gera um ZIP com um PNG por animal, enviando cada arquivo assim que fica pronto
+    """
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+        results = render_in_pool(render_png, [(t, box_size) for t in targets], pool)
+        for animal, image in zip(animals, results):
+            # PNG já é comprimido: armazenar sem nova compressão
+            archive.writestr(_file_name(animal), image)
+            yield buffer.take()
+    yield buffer.take()
@@ -0,0 +1,110 @@
+"""
+Cache LRU em memória com validade por entrada, base dos caches da API
+
+Usado pelo cache de tokens (src/utils/auth.py), pelos caches de disponibilidade
+(src/utils/availability.py) e pelo cache do perfil público (src/utils/profile_cache.py).
+
+``generation`` muda a cada invalidação: quem buscou os dados antes de uma invalidação
+passa a geração que leu para ``set``, que descarta o resultado (pode já estar desatualizado).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, NamedTuple
+
+
+class Entry(NamedTuple):
+    value: Any
+    stored_at: float
+    expires_at: float
+
+
+class TTLCache:
+    """
+    Cache LRU com validade de ``ttl`` segundos (ou ``expires_at`` da entrada) e contador de geração.
+
+    ``clock`` mede a idade das entradas: ``time.monotonic`` por padrão, ``time.time`` quando
+    a validade vem de fora (o ``exp`` de um JWT).
+    Subclasses usam ``_peek``, ``_lookup`` e ``_store`` com ``_lock`` já adquirido.
+    """
+
+    def __init__(self, max_size: int, ttl: float, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.evicted = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def _peek(self, key):
+        # Entrada ainda válida, sem contar acerto nem mexer na ordem do LRU
+        entry = self._entries.get(key)
+        if entry is not None and self.clock() >= entry.expires_at:
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        return entry
+
+    def _lookup(self, key):
+        entry = self._peek(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def _store(self, key, value, stored_at: float, expires_at: float):
+        self._entries[key] = Entry(value, stored_at, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evicted += 1
+
+    def get(self, key):
+        with self._lock:
+            entry = self._lookup(key)
+            return None if entry is None else entry.value
+
+    def set(self, key, value, generation: int = None, expires_at: float = None):
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            now = self.clock()
+            self._store(key, value, now, now + self.ttl if expires_at is None else expires_at)
+
+    def invalidate(self, key):
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'evicted': self.evicted,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+            }
@@ -0,0 +1,105 @@
+"""
+Lembretes de vacinas a vencer
+
+Percorre a view_vacinas_vencimento na faixa [hoje, hoje + dias] de data_vencimento, em
+páginas de VACCINE_SCAN_PAGE_SIZE com cursor (data_vencimento, id): cada página é uma
+leitura do índice idx_vacinas_vencimento a partir do ponto em que a anterior parou, já com
+animal, tutor e clínica (uma ida ao banco por página), e a tabela de vacinas nunca é lida
+inteira. A view já descarta animais e tutores inativos e vacinas renovadas.
+
+As vacinas são agrupadas por tutor e clínica (um lembrete por par), na ordem do vencimento
+mais próximo. A memória cresce com o número de vacinas a vencer na janela, não com o
+tamanho do histórico.
+
+Execução agendada (cron do Render), a partir da pasta backend-api:
+    python -m src.utils.vaccine_reminders --dias 30 > lembretes.ndjson
+
+Só gera os lembretes (um por linha, na saída padrão); o envio por email ou WhatsApp fica
+fora deste módulo, com quem consumir o NDJSON.
+"""
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+
+from src.config.database import db
+from src.utils.export import iter_pages
+from src.utils.json_provider import dumps_bytes
+
+# Janela padrão do agendamento (dias à frente)
+VACCINE_REMINDER_DAYS = int(os.getenv('VACCINE_REMINDER_DAYS', '30'))
+# Vacinas lidas por página
+VACCINE_SCAN_PAGE_SIZE = int(os.getenv('VACCINE_SCAN_PAGE_SIZE', '1000'))
+
+DUE_KEYSET = ['data_vencimento', 'id']
+DUE_COLUMNS = ['id', 'data_vencimento', 'nome_vacina', 'data_aplicacao', 'lote', 'animal_id', 'nome_animal', 'especie',
+               'tutor_id', 'nome_tutor', 'email_tutor', 'telefone_tutor',
+               'clinica_id', 'nome_clinica', 'email_clinica', 'telefone_clinica']
+
+
+def due_vaccine_pages(days: int, today: date = None, clinica_id: str = None, page_size: int = None):
+    """
+    Páginas de vacinas com vencimento entre ``today`` e ``today + days`` (inclusive),
+    em ordem de vencimento; ``clinica_id`` restringe às vacinas aplicadas pela clínica
+    """
+    today = today or date.today()
+    end = today + timedelta(days=days)
+
+    def query():
+        q = db.table('view_vacinas_vencimento').select(', '.join(DUE_COLUMNS)) \
+            .gte('data_vencimento', today.isoformat()).lte('data_vencimento', end.isoformat())
+        if clinica_id:
+            q = q.eq('clinica_id', clinica_id)
+        return q
+
+    return iter_pages(query, DUE_KEYSET, page_size or VACCINE_SCAN_PAGE_SIZE)
+
+
+def group_reminders(pages) -> list:
+    """
+    Um lembrete por tutor e clínica, com as vacinas a vencer de todos os animais do tutor
+    """
+    groups = {}
+    for rows in pages:
+        for row in rows:
+            key = (row['tutor_id'], row['clinica_id'])
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = {
+                    'tutor': {'id': row['tutor_id'], 'nome': row['nome_tutor'],
+                              'email': row['email_tutor'], 'telefone': row['telefone_tutor']},
+                    'clinica': {'id': row['clinica_id'], 'nome': row['nome_clinica'],
+                                'email': row['email_clinica'], 'telefone': row['telefone_clinica']}
+                    if row['clinica_id'] else None,
+                    'vacinas': [],
+                }
+            group['vacinas'].append({
+                'id': row['id'],
+                'nome_vacina': row['nome_vacina'],
+                'data_aplicacao': row['data_aplicacao'],
+                'data_vencimento': row['data_vencimento'],
+                'lote': row['lote'],
+                'animal': {'id': row['animal_id'], 'nome': row['nome_animal'], 'especie': row['especie']},
+            })
+    return list(groups.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lembretes de vacinas a vencer (NDJSON, um por tutor e clínica)')
+    parser.add_argument('--dias', type=int, default=VACCINE_REMINDER_DAYS)
+    parser.add_argument('--hoje', help='data de referência YYYY-MM-DD (padrão: hoje)')
+    parser.add_argument('--clinica', help='apenas as vacinas aplicadas por esta clínica (id)')
+    args = parser.parse_args()
+
+    today = date.fromisoformat(args.hoje) if args.hoje else date.today()
+    reminders = group_reminders(due_vaccine_pages(args.dias, today, args.clinica))
+    for reminder in reminders:
+        sys.stdout.buffer.write(dumps_bytes(reminder) + b'\n')
+    sys.stdout.flush()
+    total = sum(len(reminder['vacinas']) for reminder in reminders)
+    print(f'{len(reminders)} lembretes, {total} vacinas vencendo até {today + timedelta(days=args.dias)}',
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
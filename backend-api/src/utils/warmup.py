@@ -0,0 +1,48 @@
+"""
+Aquecimento do servidor de produção (gunicorn.conf.py)
+
+- ``preload()`` roda uma vez no processo mestre, antes do fork (o app já foi importado
+  pelo preload_app): carrega bibliotecas nativas (bcrypt) e instancia a engine. Não
+  abre conexões nem inicia threads, que não sobreviveriam ao fork (ou seriam
+  compartilhadas entre os workers).
+- ``warmup_worker()`` roda em cada worker logo após o fork: abre a primeira conexão com
+  o banco (handshake TLS com o Supabase ou conexão do pool SQL) e inicia a thread de
+  bcrypt, para que a primeira requisição não pague esses custos.
+"""
+import time
+
+import bcrypt
+
+from src.config.database import db, get_engine
+from src.utils.auth import hashing_pool
+
+
+def _timed(results: dict, name: str, fn):
+    start = time.perf_counter()
+    try:
+        fn()
+        results[name] = round((time.perf_counter() - start) * 1000, 1)
+    except Exception as e:
+        # Aquecimento nunca impede o servidor de subir (ex.: banco fora do ar no deploy)
+        results[name] = f'falhou: {str(e)}'
+
+
+def preload() -> dict:
+    """
+    Aquecimento no processo mestre (sem conexões nem threads); devolve o tempo de cada etapa em ms
+    """
+    results = {}
+    _timed(results, 'bcrypt', lambda: bcrypt.hashpw(b'warmup', bcrypt.gensalt(rounds=4)))
+    # Só instancia a engine (o cliente Supabase / pool SQL conectam sob demanda)
+    _timed(results, 'engine', get_engine)
+    return results
+
+
+def warmup_worker() -> dict:
+    """
+    Aquecimento de cada worker depois do fork; devolve o tempo de cada etapa em ms
+    """
+    results = {}
+    _timed(results, 'bcrypt', lambda: hashing_pool.run(bcrypt.hashpw, b'warmup', bcrypt.gensalt(rounds=4)))
+    _timed(results, 'database', lambda: db.table('usuarios_clinicas').select('id').limit(1).execute())
+    return results
@@ -0,0 +1,80 @@
+"""
+Fixtures compartilhadas dos testes
+
+Os testes rodam contra o SQLite em memória com o esquema da aplicação, pelo cliente
+Supabase falso dos benchmarks (benchmarks/fake_supabase.py), sem latência.
+
+Execute a partir da pasta backend-api:
+    python -m pytest
+"""
+import os
+
+# Antes de importar o app: bcrypt barato e sem limite de requisições (testado à parte)
+os.environ.setdefault('BCRYPT_ROUNDS', '4')
+os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+
+import pytest
+
+from benchmarks.common import create_sqlite_engine, seed
+from benchmarks.fake_supabase import FakeSupabase, install
+from src.config import database
+from src.main import app as flask_app
+from src.utils.auth import generate_token
+from src.utils.availability import clinic_cache, occupancy_cache
+from src.utils.profile_cache import profile_cache
+
+
+def clear_caches():
+    profile_cache.clear()
+    clinic_cache.clear()
+    occupancy_cache.clear()
+
+
+@pytest.fixture
+def engine():
+    engine = create_sqlite_engine()
+    yield engine
+    engine.pool.close()
+
+
+@pytest.fixture
+def fake(engine):
+    """
+    Cliente Supabase falso instalado no lugar do real (restaurado ao final)
+    """
+    previous = database.supabase, database.supabase_admin, database.get_engine()
+    clear_caches()
+    yield install(FakeSupabase(engine))
+    database.supabase, database.supabase_admin = previous[:2]
+    database.set_engine(previous[2])
+    clear_caches()
+
+
+@pytest.fixture
+def data(engine, fake):
+    """
+    Base pequena: 4 tutores, 2 clínicas, 2 animais por tutor e 2 agendamentos por animal
+    """
+    return seed(engine, tutors=4, clinics=2, animals_per_tutor=2, appointments_per_animal=2, text_size=20)
+
+
+@pytest.fixture
+def app():
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app, fake):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(app):
+    """
+    auth(id, tipo): cabeçalho Authorization com um token válido
+    """
+    def headers(user_id: str, user_type: str) -> dict:
+        with app.app_context():
+            return {'Authorization': f'Bearer {generate_token(user_id, user_type)}'}
+    return headers
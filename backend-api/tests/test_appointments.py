@@ -0,0 +1,87 @@
+"""
+Filtros da listagem de agendamentos (GET /api/appointments/?status=&data=&inicio=&fim=)
+"""
+from datetime import date, timedelta
+
+import pytest
+
+from benchmarks.common import seed
+
+TODAY = date.today()
+URL = '/api/appointments/'
+
+
+@pytest.fixture
+def schedule(engine, fake, auth):
+    data = seed(engine, tutors=2, clinics=2, animals_per_tutor=2, appointments_per_animal=0, text_size=10)
+    clinic = data['clinics'][0]
+    rows = []
+    # Um agendamento por dia e status; muitos no futuro distante, que vêm primeiro na ordem padrão (desc)
+    for offset in [-2, 0, 1, 3] + list(range(100, 160)):
+        for i, status in enumerate(['pendente', 'aceito', 'cancelado']):
+            animal = data['animals'][(offset + i) % len(data['animals'])]
+            rows.append({'tutor_id': animal['tutor_id'], 'clinica_id': clinic['id'], 'animal_id': animal['id'],
+                         'data_agendamento': (TODAY + timedelta(days=offset)).isoformat(),
+                         'horario': f'{9 + i:02d}:00', 'status': status})
+    engine.table('agendamentos').insert(rows).execute()
+    return {
+        'headers': auth(clinic['id'], 'clinica'),
+        'other': auth(data['clinics'][1]['id'], 'clinica'),
+        'tutor': auth(data['animals'][0]['tutor_id'], 'tutor'),
+    }
+
+
+def listing(client, headers, **params) -> list:
+    response = client.get(URL, query_string=params, headers=headers)
+    assert response.status_code == 200
+    return response.get_json()['appointments']
+
+
+def test_pending_from_today_soonest_first(client, schedule):
+    rows = listing(client, schedule['headers'], status='pendente', inicio=TODAY.isoformat(), order='asc', limit=3)
+
+    # Sem o filtro no servidor, a primeira página (desc) só teria o futuro distante
+    assert [r['data_agendamento'] for r in rows] == [(TODAY + timedelta(days=d)).isoformat() for d in (0, 1, 3)]
+    assert {r['status'] for r in rows} == {'pendente'}
+
+
+def test_single_day(client, schedule):
+    rows = listing(client, schedule['headers'], status='aceito', data=TODAY.isoformat())
+
+    assert len(rows) == 1 and rows[0]['data_agendamento'] == TODAY.isoformat() and rows[0]['status'] == 'aceito'
+
+
+def test_several_statuses_and_period(client, schedule):
+    rows = listing(client, schedule['headers'], status='pendente,aceito', inicio=(TODAY - timedelta(days=2)).isoformat(),
+                   fim=(TODAY + timedelta(days=1)).isoformat())
+
+    assert len(rows) == 6 and {r['status'] for r in rows} == {'pendente', 'aceito'}
+
+
+def test_filters_keep_cursor_pagination(client, schedule):
+    ids, cursor = [], None
+    while True:
+        params = {'status': 'cancelado', 'limit': 7, **({'cursor': cursor} if cursor else {})}
+        body = client.get(URL, query_string=params, headers=schedule['headers']).get_json()
+        ids += [r['id'] for r in body['appointments']]
+        cursor = body['next_cursor']
+        if cursor is None:
+            break
+
+    assert len(ids) == len(set(ids)) == 64
+
+
+def test_filters_do_not_widen_access(client, schedule):
+    assert listing(client, schedule['other'], status='pendente') == []
+    assert {r['status'] for r in listing(client, schedule['tutor'], status='aceito')} <= {'aceito'}
+
+
+@pytest.mark.parametrize('params', [
+    {'status': 'confirmado'},
+    {'data': '01/02/2026'},
+    {'inicio': '2026-02-30'},
+    {'inicio': '2026-03-02', 'fim': '2026-03-01'},
+    {'data': '2026-03-01', 'inicio': '2026-03-01'},
+])
+def test_invalid_filters(client, schedule, params):
+    assert client.get(URL, query_string=params, headers=schedule['headers']).status_code == 400
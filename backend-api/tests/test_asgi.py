@@ -0,0 +1,150 @@
+"""
+Entrada ASGI (src/asgi.py): handlers assíncronos de agendamento e repasse das demais rotas ao Flask
+"""
+from datetime import date, timedelta
+
+import jwt
+import pytest
+from starlette.testclient import TestClient
+
+from src import asgi
+from src.config import database
+from src.database.engines import AsyncSQLEngine
+
+URL = '/api/appointments/'
+DAY = (date.today() + timedelta(days=30)).isoformat()
+
+
+@pytest.fixture
+def asgi_client(engine, fake):
+    # Sem o lifespan: a engine assíncrona usa o mesmo SQLite do cliente Supabase falso
+    database.set_async_engine(AsyncSQLEngine(engine))
+    # Mesmo host do cliente de teste do Flask (entra nas URLs geradas, como a do QR Code)
+    yield TestClient(asgi.app, base_url='http://localhost')
+    database.set_async_engine(None)
+
+
+@pytest.fixture
+def booking(data, auth):
+    animal = data['animals'][0]
+    clinic = next(c for c in data['clinics'] if c['id'] == animal['clinica_id'])
+    return {
+        'headers': auth(animal['tutor_id'], 'tutor'),
+        'clinic_headers': auth(clinic['id'], 'clinica'),
+        'body': {'animal_id': animal['id'], 'email_clinica': clinic['email'].upper(), 'data_agendamento': DAY,
+                 'horario': '10:00', 'observacoes': '  retorno  '},
+        'clinic': clinic,
+    }
+
+
+def expired_token(app) -> str:
+    return jwt.encode({'user_id': 'u1', 'user_type': 'tutor', 'exp': 1}, app.config['SECRET_KEY'], algorithm='HS256')
+
+
+def test_listing_matches_flask(asgi_client, client, booking):
+    for headers in (booking['headers'], booking['clinic_headers']):
+        params = {'limit': 2, 'order': 'asc'}
+        sync = client.get(URL, query_string=params, headers=headers).get_json()
+        response = asgi_client.get(URL, params=params, headers=headers)
+
+        assert response.status_code == 200 and response.json() == sync and sync['appointments']
+
+
+def test_listing_validation(asgi_client, booking):
+    for params in ({'status': 'confirmado'}, {'limit': 'muitos'}, {'fields': 'senha_hash'}):
+        assert asgi_client.get(URL, params=params, headers=booking['headers']).status_code == 400
+
+
+@pytest.mark.parametrize('headers', [
+    {},
+    {'Authorization': 'Bearer'},
+    {'Authorization': 'Bearer nao-e-jwt'},
+    'expired',
+])
+def test_token_errors_match_flask(app, asgi_client, client, headers):
+    if headers == 'expired':
+        headers = {'Authorization': f'Bearer {expired_token(app)}'}
+    sync = client.get(URL, headers=headers)
+    response = asgi_client.get(URL, headers=headers)
+
+    assert response.status_code == sync.status_code == 401 and response.json() == sync.get_json()
+
+
+def test_create_appointment(asgi_client, booking, engine):
+    response = asgi_client.post(URL, json=booking['body'], headers=booking['headers'])
+
+    assert response.status_code == 201
+    appointment = response.json()['appointment']
+    assert appointment['clinica_id'] == booking['clinic']['id'] and appointment['status'] == 'pendente'
+    assert appointment['observacoes'] == 'retorno' and appointment['tipo_consulta'] == 'Consulta Geral'
+    stored = engine.table('agendamentos').select('id').eq('id', appointment['id']).execute().data
+    assert len(stored) == 1
+    # O mesmo horário, agora ocupado, pelos dois modos
+    assert asgi_client.post(URL, json=booking['body'], headers=booking['headers']).status_code == 409
+
+
+@pytest.mark.parametrize('change, status', [
+    ({'horario': ''}, 400),
+    ({'horario': '25h'}, 400),
+    ({'data_agendamento': '2020-01-01'}, 400),
+    ({'animal_id': 'inexistente'}, 404),
+    ({'email_clinica': 'nao@existe.teste'}, 404),
+    # Animal e clínica são conferidos antes da data e do horário, como antes da função do banco
+    ({'animal_id': 'inexistente', 'data_agendamento': '2020-01-01'}, 404),
+    ({'email_clinica': 'nao@existe.teste', 'horario': '25h'}, 404),
+    ({'animal_id': 'inexistente', 'email_clinica': 'nao@existe.teste', 'data_agendamento': '01/02/2026'}, 404),
+])
+def test_create_errors_match_flask(asgi_client, client, booking, change, status):
+    body = {**booking['body'], **change}
+    sync = client.post(URL, json=body, headers=booking['headers'])
+    response = asgi_client.post(URL, json=body, headers=booking['headers'])
+
+    assert response.status_code == sync.status_code == status and response.json() == sync.get_json()
+
+
+def test_slot_lookups_only_run_for_invalid_slots(client, fake, booking):
+    fake.calls.clear()
+    assert client.post(URL, json=booking['body'], headers=booking['headers']).status_code == 201
+    assert set(fake.calls) == {'criar_agendamento'}
+
+    fake.calls.clear()
+    past = {**booking['body'], 'data_agendamento': '2020-01-01'}
+    assert client.post(URL, json=past, headers=booking['headers']).get_json() == {
+        'error': 'Data do agendamento não pode ser no passado'}
+    assert 'criar_agendamento' not in fake.calls
+
+
+def test_only_tutors_create(asgi_client, booking):
+    assert asgi_client.post(URL, json=booking['body'], headers=booking['clinic_headers']).status_code == 403
+
+
+def test_available_times_follow_bookings(asgi_client, client, booking):
+    params = {'email_clinica': booking['clinic']['email'], 'data': DAY}
+    before = asgi_client.get(f'{URL}available-times', params=params).json()
+    assert before == client.get(f'{URL}available-times', query_string=params).get_json()
+    assert '10:00' in before['available_times']
+
+    asgi_client.post(URL, json=booking['body'], headers=booking['headers'])
+
+    # O cache de ocupação foi invalidado pela criação
+    after = asgi_client.get(f'{URL}available-times', params=params).json()
+    assert '10:00' not in after['available_times'] and '10:00' in after['occupied_times']
+
+
+def test_available_times_validation(asgi_client, booking):
+    times = f'{URL}available-times'
+
+    assert asgi_client.get(times, params={'data': DAY}).status_code == 400
+    assert asgi_client.get(times, params={'email_clinica': 'nao@existe.teste', 'data': DAY}).status_code == 404
+    assert asgi_client.get(times, params={'email_clinica': booking['clinic']['email'],
+                                          'data': '01/02/2026'}).status_code == 400
+
+
+def test_other_routes_fall_through_to_flask(asgi_client, client, booking):
+    sync = client.get('/api/animals/', headers=booking['headers'])
+    response = asgi_client.get('/api/animals/', headers=booking['headers'])
+
+    assert response.status_code == sync.status_code == 200 and response.json() == sync.get_json()
+    assert asgi_client.get('/health').json()['status'] == 'healthy'
+    login = asgi_client.post('/api/auth/login', json={'email': '', 'senha': ''})
+    assert login.status_code == 400 and login.json() == client.post('/api/auth/login', json={}).get_json()
@@ -0,0 +1,220 @@
+"""
+Autenticação (src/utils/auth.py): tokens JWT em cache, pool de hashing e troca do custo do bcrypt
+"""
+import threading
+import time
+
+import bcrypt
+import jwt
+import pytest
+
+from benchmarks.bench_rate_limit import PASSWORD, login
+from src.routes import auth as auth_routes
+from src.utils import auth as auth_utils
+from src.utils.auth import (HashingPool, HashingPoolFull, TokenCache, generate_token, hash_password, needs_rehash,
+                            token_cache, verify_token)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def context(app):
+    token_cache.clear()
+    with app.app_context():
+        yield app
+    token_cache.clear()
+
+
+def encode(secret: str, exp: float, user_id: str = 'u1') -> str:
+    return jwt.encode({'user_id': user_id, 'user_type': 'tutor', 'exp': exp}, secret, algorithm='HS256')
+
+
+def test_entry_expires_with_the_token():
+    clock = FakeClock()
+    cache = TokenCache(10, clock=clock)
+    cache.set('k', {'user_id': 'u1', 'exp': clock.now + 60})
+
+    clock.now += 59
+    assert cache.get('k')['user_id'] == 'u1'
+    clock.now += 1
+    assert cache.get('k') is None
+
+
+def test_payload_without_exp_is_not_cached():
+    cache = TokenCache(10)
+    cache.set('k', {'user_id': 'u1'})
+
+    assert cache.get('k') is None and cache.stats()['size'] == 0
+
+
+def test_least_recently_used_token_is_evicted():
+    cache = TokenCache(2)
+    exp = time.time() + 60
+    for key in ('a', 'b'):
+        cache.set(key, {'user_id': key, 'exp': exp})
+    cache.get('a')
+
+    cache.set('c', {'user_id': 'c', 'exp': exp})
+
+    assert cache.get('b') is None and cache.get('a') and cache.get('c')
+
+
+def test_key_depends_on_secret():
+    assert TokenCache.key('token', 'segredo-1') != TokenCache.key('token', 'segredo-2')
+    assert TokenCache.key('token', 'segredo-1') == TokenCache.key('token', 'segredo-1')
+
+
+def test_second_verification_is_served_from_cache(context, monkeypatch):
+    token = generate_token('u1', 'tutor')
+    assert verify_token(token)['user_id'] == 'u1'
+    hits = token_cache.stats()['hits']
+
+    def decode(*args, **kwargs):
+        raise AssertionError('jwt.decode não deveria ser chamado')
+    monkeypatch.setattr(jwt, 'decode', decode)
+
+    assert verify_token(token)['user_id'] == 'u1'
+    assert token_cache.stats()['hits'] == hits + 1
+
+
+def test_cached_token_is_refused_once_expired(context):
+    exp = int(time.time()) + 1
+    token = encode(context.config['SECRET_KEY'], exp)
+    assert verify_token(token)['user_id'] == 'u1'
+
+    while time.time() < exp:
+        time.sleep(0.05)
+
+    assert verify_token(token) is None
+
+
+def test_secret_rotation_invalidates_cached_tokens(context, monkeypatch):
+    token = generate_token('u1', 'tutor')
+    assert verify_token(token)['user_id'] == 'u1'
+
+    monkeypatch.setitem(context.config, 'SECRET_KEY', 'outro-segredo')
+
+    assert verify_token(token) is None
+    fresh = generate_token('u1', 'tutor')
+    assert verify_token(fresh)['user_id'] == 'u1'
+
+
+def test_route_rejects_invalid_tokens(client):
+    assert client.get('/api/auth/verify').status_code == 401
+    assert client.get('/api/auth/verify', headers={'Authorization': 'Bearer'}).status_code == 401
+    assert client.get('/api/auth/verify', headers={'Authorization': 'Bearer nao-e-jwt'}).status_code == 401
+
+
+@pytest.fixture
+def tutor(engine, data):
+    tutor = data['tutors'][0]
+    engine.table('usuarios_tutores').update({'senha_hash': hash_password(PASSWORD)}).eq('id', tutor['id']).execute()
+    return tutor
+
+
+@pytest.fixture
+def full_pool(monkeypatch):
+    """
+    Pool de hashing com o único worker ocupado e sem fila (liberado ao final)
+    """
+    pool, release = HashingPool(1, 0), threading.Event()
+    pool.submit(release.wait)
+    monkeypatch.setattr(auth_utils, 'hashing_pool', pool)
+    yield pool
+    release.set()
+
+
+def stored_hash(engine, tutor) -> str:
+    return engine.table('usuarios_tutores').select('senha_hash').eq('id', tutor['id']).execute().data[0]['senha_hash']
+
+
+def wait_for(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_pool_rejects_beyond_workers_and_queue():
+    pool, release = HashingPool(1, 1), threading.Event()
+    running, queued = pool.submit(release.wait), pool.submit(release.wait)
+
+    with pytest.raises(HashingPoolFull):
+        pool.run(time.sleep, 0)
+    assert pool.stats()['in_flight'] == 2 and pool.stats()['queue_depth'] == 1 and pool.rejected == 1
+
+    release.set()
+    running.result(), queued.result()
+    assert wait_for(lambda: pool.stats()['in_flight'] == 0)
+    # Com as vagas devolvidas o pool volta a aceitar
+    assert pool.run(sum, [1, 2]) == 3 and pool.stats()['max_in_flight'] == 2
+
+
+def test_full_pool_answers_503(client, tutor, full_pool):
+    body = {'nome': 'Tutor', 'email': 'novo@cadastro.teste', 'senha': PASSWORD, 'telefone': '11999998888'}
+
+    responses = [login(client, tutor['email'], '10.7.0.1', PASSWORD),
+                 client.post('/api/auth/register/tutor', json=body),
+                 client.post('/api/auth/register/clinica', json={**body, 'nome_clinica': 'C'})]
+
+    assert [r.status_code for r in responses] == [503] * 3
+    assert all(r.headers['Retry-After'] == '1' for r in responses)
+    # Email inexistente não chega ao bcrypt
+    assert login(client, 'nao@existe.teste', '10.7.0.1').status_code == 401
+
+
+@pytest.mark.parametrize('hashed, expected', [
+    (bcrypt.hashpw(b'x', bcrypt.gensalt(rounds=5)).decode(), True),
+    (bcrypt.hashpw(b'x', bcrypt.gensalt(rounds=auth_utils.BCRYPT_ROUNDS)).decode(), False),
+    ('nao-e-bcrypt', False),
+])
+def test_needs_rehash(hashed, expected):
+    assert needs_rehash(hashed) is expected
+
+
+def test_login_rehashes_old_cost_without_waiting(client, engine, tutor, monkeypatch):
+    old = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=5)).decode()
+    engine.table('usuarios_tutores').update({'senha_hash': old}).eq('id', tutor['id']).execute()
+    release, hashpw = threading.Event(), auth_utils._hashpw
+
+    def slow_hashpw(password):
+        release.wait(2)
+        return hashpw(password)
+    monkeypatch.setattr(auth_utils, '_hashpw', slow_hashpw)
+
+    # O login responde com o novo hash ainda sendo gerado
+    assert login(client, tutor['email'], '10.8.0.1', PASSWORD).status_code == 200
+    assert stored_hash(engine, tutor) == old
+
+    release.set()
+    assert wait_for(lambda: stored_hash(engine, tutor) != old)
+    new = stored_hash(engine, tutor)
+    assert not needs_rehash(new) and bcrypt.checkpw(PASSWORD.encode(), new.encode())
+    assert login(client, tutor['email'], '10.8.0.1', PASSWORD).status_code == 200
+
+
+def test_rehash_is_skipped_when_pool_is_full(client, engine, tutor, monkeypatch):
+    old = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=5)).decode()
+    engine.table('usuarios_tutores').update({'senha_hash': old}).eq('id', tutor['id']).execute()
+    pool, release = HashingPool(1, 0), threading.Event()
+    monkeypatch.setattr(auth_utils, 'hashing_pool', pool)
+
+    def fill_then_check(hashed):
+        # Ocupa o pool depois da verificação da senha: só a troca do hash o encontra cheio
+        pool.submit(release.wait)
+        return needs_rehash(hashed)
+    monkeypatch.setattr(auth_routes, 'needs_rehash', fill_then_check)
+
+    try:
+        assert login(client, tutor['email'], '10.9.0.1', PASSWORD).status_code == 200
+        assert pool.rejected == 1 and stored_hash(engine, tutor) == old
+    finally:
+        release.set()
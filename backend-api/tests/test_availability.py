@@ -0,0 +1,199 @@
+"""
+Horários disponíveis (src/utils/availability.py e rotas de disponibilidade)
+"""
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from src.utils.availability import (
+    DEFAULT_SCHEDULE, DEFAULT_TIMES, clinic_cache, compile_schedule, free_masks, get_clinics, get_occupancy,
+    lookup_clinics, lookup_occupancy, occupancy_cache, occupancy_masks, parse_hours, store_clinics,
+    store_missed_occupancy
+)
+
+MONDAY = date(2024, 1, 1)
+SUNDAY = date(2024, 1, 7)
+
+HOURS = {
+    'intervalo': 30,
+    'segunda': ['08:00-12:00', '14:00-18:00'],
+    'sábado': ['08:00-12:00'],
+}
+
+
+def open_times(schedule, day):
+    return schedule.times(schedule.open_mask(day))
+
+
+def test_range_must_fit_whole_appointment():
+    schedule = parse_hours({'intervalo': 30, 'segunda': ['08:00-09:15']})
+
+    assert open_times(schedule, MONDAY) == ['08:00', '08:30']
+    assert schedule.open_mask(SUNDAY) == 0
+
+
+def test_split_shift():
+    schedule = parse_hours({'intervalo': 60, 'segunda': ['08:00-10:00', '14:00-16:00']})
+
+    assert open_times(schedule, MONDAY) == ['08:00', '09:00', '14:00', '15:00']
+
+
+def test_shift_until_midnight_with_overlap_and_accented_weekday():
+    schedule = parse_hours({'intervalo': 60, 'Terça-feira': ['22:00-24:00', '23:00-24:00']})
+
+    assert open_times(schedule, MONDAY + timedelta(days=1)) == ['22:00', '23:00']
+
+
+def test_overnight_shift_is_split_across_days():
+    # Faixas que passam da meia-noite são rejeitadas: o plantão é dividido entre os dois dias
+    with pytest.raises(ValueError):
+        parse_hours({'segunda': ['22:00-02:00']})
+
+    schedule = parse_hours({'intervalo': 60, 'segunda': ['22:00-24:00'], 'terca': ['00:00-02:00']})
+
+    assert open_times(schedule, MONDAY) == ['22:00', '23:00']
+    assert open_times(schedule, MONDAY + timedelta(days=1)) == ['00:00', '01:00']
+
+
+def test_days_share_one_slot_axis():
+    schedule = parse_hours({'segunda': ['08:00-09:00'], 'domingo': ['10:00-11:00']})
+
+    assert schedule.slots == ('08:00', '08:30', '10:00', '10:30')
+    assert open_times(schedule, SUNDAY) == ['10:00', '10:30']
+
+
+@pytest.mark.parametrize('config', [
+    {'segunda': ['08:00']},
+    {'segunda': ['12:00-08:00']},
+    {'segunda': ['24:00-24:30']},
+    {'segunda': ['8:00-12:00']},
+    {'segunda': '08:00-12:00'},
+    {'feriado': ['08:00-12:00']},
+    {'intervalo': 0, 'segunda': []},
+    {'intervalo': True, 'segunda': []},
+    ['08:00-12:00'],
+])
+def test_invalid_hours(config):
+    with pytest.raises(ValueError):
+        parse_hours(config)
+
+
+@pytest.mark.parametrize('raw', [None, '', '{}', 'não é json', {'segunda': ['x']}])
+def test_missing_or_invalid_hours_fall_back_to_default(raw):
+    assert compile_schedule(raw) is DEFAULT_SCHEDULE
+    assert open_times(DEFAULT_SCHEDULE, SUNDAY) == DEFAULT_TIMES
+
+
+def test_text_and_object_compile_to_same_schedule():
+    assert compile_schedule(json.dumps(HOURS)) is compile_schedule(HOURS)
+
+
+def test_occupied_slots_are_subtracted_from_open_mask():
+    schedule = parse_hours({'segunda': ['08:00-10:00']})
+    rows = [
+        # Formato TIME do PostgreSQL, horário fora do modelo e clínica desconhecida
+        {'clinica_id': 'c1', 'data_agendamento': '2024-01-01', 'horario': '08:30:00'},
+        {'clinica_id': 'c1', 'data_agendamento': '2024-01-01', 'horario': '07:00'},
+        {'clinica_id': 'c2', 'data_agendamento': '2024-01-01', 'horario': '08:00'},
+    ]
+
+    occupied = occupancy_masks({'c1': schedule}, rows)
+    masks = free_masks(schedule, 'c1', [MONDAY, SUNDAY], occupied)
+
+    assert masks['2024-01-01'] == schedule.open_mask(MONDAY) & ~0b10
+    assert schedule.times(masks['2024-01-01']) == ['08:00', '09:00', '09:30']
+    assert masks['2024-01-07'] == 0
+
+
+def test_clinic_cache_ignores_store_after_invalidation(fake, data):
+    email = data['clinics'][0]['email']
+    clinics, missing, generation = lookup_clinics([email])
+    assert (clinics, missing) == ({}, [email])
+
+    # Invalidação entre a consulta ao banco e a gravação: o resultado não entra no cache
+    clinic_cache.invalidate(email)
+    store_clinics(clinics, [data['clinics'][0]], generation)
+
+    assert clinics[email]['id'] == data['clinics'][0]['id']
+    assert lookup_clinics([email])[1] == [email]
+
+
+def test_clinics_and_occupancy_are_cached(fake, data):
+    clinic = data['clinics'][0]
+    days = [date.today() + timedelta(days=i) for i in range(1, 4)]
+
+    assert get_clinics([clinic['email']])[clinic['email']]['id'] == clinic['id']
+    rows = get_occupancy([clinic['id']], days)
+    calls = sum(fake.calls.values())
+
+    assert get_clinics([clinic['email']])[clinic['email']]['id'] == clinic['id']
+    assert sorted(map(str, get_occupancy([clinic['id']], days))) == sorted(map(str, rows))
+    assert sum(fake.calls.values()) == calls
+
+
+def test_store_missed_occupancy_returns_only_missed_pairs(fake):
+    day = MONDAY
+    occupancy_cache.set(('c1', day.isoformat()), [], occupancy_cache.generation)
+    rows, missed, generation = lookup_occupancy(['c1', 'c2'], [day])
+    assert missed == {('c2', day)}
+
+    fetched = [
+        {'clinica_id': 'c2', 'data_agendamento': '2024-01-01', 'horario': '08:00'},
+        {'clinica_id': 'c3', 'data_agendamento': '2024-01-01', 'horario': '08:00'},
+    ]
+
+    assert store_missed_occupancy(missed, fetched, generation) == fetched[:1]
+    assert lookup_occupancy(['c2'], [day])[:2] == (fetched[:1], set())
+
+
+def test_range_and_per_day_routes_agree(client, data, engine):
+    clinic = data['clinics'][0]
+    engine.table('usuarios_clinicas').update({'horario_funcionamento': HOURS}).eq('id', clinic['id']).execute()
+    start = date.today() + timedelta(days=1)
+
+    response = client.get(f'/api/appointments/availability?clinicas={clinic["email"]}'
+                          f'&inicio={start.isoformat()}&dias=7')
+    assert response.status_code == 200
+    listed = response.get_json()['clinicas'][0]['dias']
+
+    for i in range(7):
+        day = (start + timedelta(days=i)).isoformat()
+        single = client.get(f'/api/appointments/available-times?email_clinica={clinic["email"]}&data={day}')
+        assert single.get_json()['available_times'] == listed[day]
+
+
+def test_range_bitset_matches_list(client, data):
+    email = data['clinics'][0]['email']
+    url = f'/api/appointments/availability?clinicas={email}&dias=5'
+
+    listed = client.get(f'{url}&formato=lista').get_json()['clinicas'][0]
+    bitset = client.get(f'{url}&formato=bitset').get_json()['clinicas'][0]
+
+    for day, mask in bitset['dias'].items():
+        assert [t for i, t in enumerate(bitset['horarios']) if int(mask, 16) >> i & 1] == listed['dias'][day]
+
+
+def test_booked_slot_disappears(client, data, auth):
+    clinic = data['clinics'][0]
+    animal = next(a for a in data['animals'] if a['clinica_id'] == clinic['id'])
+    day = (date.today() + timedelta(days=200)).isoformat()
+    url = f'/api/appointments/available-times?email_clinica={clinic["email"]}&data={day}'
+    assert '10:00' in client.get(url).get_json()['available_times']
+
+    booked = client.post('/api/appointments/', headers=auth(animal['tutor_id'], 'tutor'), json={
+        'animal_id': animal['id'], 'email_clinica': clinic['email'], 'data_agendamento': day, 'horario': '10:00'
+    })
+
+    assert booked.status_code == 201
+    assert '10:00' not in client.get(url).get_json()['available_times']
+
+
+@pytest.mark.parametrize('query', [
+    'clinicas=',
+    'clinicas=a@b.c&formato=xml',
+    'clinicas=a@b.c&dias=0',
+    'clinicas=a@b.c&inicio=01-01-2024',
+])
+def test_range_invalid_parameters(client, data, query):
+    assert client.get(f'/api/appointments/availability?{query}').status_code == 400
@@ -0,0 +1,29 @@
+"""
+Corrida de agendamentos no mesmo horário (benchmarks/race_booking.py) no SQLite
+"""
+import os
+from collections import Counter
+
+import pytest
+
+from benchmarks.common import create_sqlite_engine
+from benchmarks.race_booking import run
+from src.config import database
+
+REQUESTS = 8
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    # Arquivo (e não memória): cada thread usa a sua conexão do pool
+    engine = create_sqlite_engine(os.path.join(tmp_path, 'race.db'), pool_size=REQUESTS)
+    previous = database.get_engine()
+    yield engine
+    database.set_engine(previous)
+    engine.pool.close()
+
+
+def test_only_one_booking_wins(file_engine):
+    statuses = run(file_engine, REQUESTS)
+
+    assert statuses == Counter({201: 1, 409: REQUESTS - 1})
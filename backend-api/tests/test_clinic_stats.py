@@ -0,0 +1,137 @@
+"""
+Painel da clínica (GET /api/clinics/me/stats)
+"""
+import random
+from collections import Counter
+from datetime import date, timedelta
+
+import pytest
+
+from benchmarks.bench_clinic_stats import expected, stats
+from benchmarks.common import seed
+from src.utils.availability import APPOINTMENT_STATUSES
+
+TODAY = date.today()
+START = TODAY.replace(day=1)
+END = (START.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+
+@pytest.fixture
+def panel(engine, fake, auth):
+    data = seed(engine, tutors=4, clinics=2, animals_per_tutor=2, appointments_per_animal=0, text_size=10)
+    clinic, other = data['clinics']
+    rnd = random.Random(3)
+
+    rows, slot = [], 0
+    for day in [START - timedelta(days=3), START, START + timedelta(days=2), TODAY, END, END + timedelta(days=1),
+                TODAY + timedelta(days=40)]:
+        for status in APPOINTMENT_STATUSES:
+            for clinica in (clinic, other):
+                animal = rnd.choice(data['animals'])
+                slot += 1
+                rows.append({'tutor_id': animal['tutor_id'], 'clinica_id': clinica['id'], 'animal_id': animal['id'],
+                             'data_agendamento': day.isoformat(), 'horario': f'{8 + slot % 10:02d}:{slot % 60:02d}',
+                             'status': status, 'valor': rnd.choice([None, 100, 150.5])})
+    rows = engine.table('agendamentos').insert(rows).execute().data
+    mine = [r for r in rows if r['clinica_id'] == clinic['id']]
+    # Consultas de um concluído do período (o valor delas substitui o do agendamento); a última fica fora do mês
+    done = next(r for r in mine if r['status'] == 'concluido' and r['data_agendamento'] == START.isoformat()
+                and r['valor'])
+    consultations = engine.table('consultas').insert([
+        {'agendamento_id': done['id'], 'animal_id': done['animal_id'], 'clinica_id': clinic['id'],
+         'data_consulta': f'{START.isoformat()}T10:00:00+00:00', 'valor': 180},
+        {'agendamento_id': done['id'], 'animal_id': done['animal_id'], 'clinica_id': clinic['id'],
+         'data_consulta': f'{END.isoformat()}T23:30:00+00:00', 'valor': 20},
+        {'agendamento_id': done['id'], 'animal_id': done['animal_id'], 'clinica_id': clinic['id'],
+         'data_consulta': f'{(END + timedelta(days=1)).isoformat()}T00:10:00+00:00', 'valor': 999},
+    ]).execute().data
+    return {
+        'clinic': clinic,
+        'headers': auth(clinic['id'], 'clinica'),
+        'other': auth(other['id'], 'clinica'),
+        'tutor': auth(data['tutors'][0]['id'], 'tutor'),
+        'expected': expected(mine, consultations, START, END, TODAY),
+    }
+
+
+@pytest.mark.parametrize('params', [
+    {'inicio': '01/01/2026'},
+    {'inicio': END.isoformat(), 'fim': START.isoformat()},
+    # Mais que CLINIC_STATS_MAX_DAYS
+    {'inicio': '2024-01-01', 'fim': '2025-12-31'},
+])
+def test_invalid_period(client, panel, params):
+    assert stats(client, panel['headers'], **params).status_code == 400
+
+
+def test_only_clinics(client, panel):
+    assert stats(client, panel['tutor']).status_code == 403
+
+
+def test_default_month_in_one_call(client, fake, panel):
+    fake.calls.clear()
+
+    response = stats(client, panel['headers'])
+
+    assert response.status_code == 200
+    assert fake.calls == Counter({'estatisticas_clinica': 1})
+    payload = response.get_json()
+    assert payload['periodo'] == {'inicio': START.isoformat(), 'fim': END.isoformat()}
+    # Um item por dia, zerados os dias sem agendamento
+    assert [d['data'] for d in payload['por_dia']] == [(START + timedelta(days=i)).isoformat()
+                                                        for i in range((END - START).days + 1)]
+
+
+def test_counts_match_rows(client, panel):
+    payload = stats(client, panel['headers']).get_json()
+    want = panel['expected']
+
+    assert payload['status'] == want['status'] and payload['total'] == sum(want['status'].values())
+    for day in payload['por_dia']:
+        for status in APPOINTMENT_STATUSES:
+            assert day[status] == want['per_day'][(day['data'], status)]
+        assert day['total'] == sum(day[s] for s in APPOINTMENT_STATUSES)
+    # Pendentes só a partir de hoje
+    assert payload['pacientes'] == want['pacientes'] and payload['pendentes'] == want['pendentes']
+
+
+def test_no_show_and_refusal_rates(client, panel):
+    payload = stats(client, panel['headers']).get_json()
+    missed = panel['expected']['nao_comparecimento']
+    status = payload['status']
+
+    assert payload['nao_comparecimento'] == {'total': missed,
+                                             'taxa': round(missed / (status['concluido'] + missed), 4)}
+    assert payload['recusa'] == {'total': status['recusado'], 'taxa': round(
+        status['recusado'] / (status['recusado'] + status['aceito'] + status['concluido']), 4)}
+
+
+def test_revenue_does_not_count_consulted_appointment_twice(client, panel):
+    revenue = stats(client, panel['headers']).get_json()['receita']
+
+    assert revenue['agendamentos'] == panel['expected']['receita_agendamentos']
+    assert revenue['consultas'] == 200 and revenue['total'] == round(panel['expected']['receita_total'], 2)
+
+
+def test_empty_period(client, panel):
+    empty = stats(client, panel['headers'], inicio='2020-01-01', fim='2020-01-07').get_json()
+
+    assert empty['total'] == 0 and len(empty['por_dia']) == 7 and empty['recusa']['taxa'] is None
+    assert empty['receita'] == {'agendamentos': 0, 'consultas': 0, 'total': 0}
+
+
+def test_other_clinic_is_isolated(client, panel):
+    mine = stats(client, panel['headers']).get_json()
+    other = stats(client, panel['other']).get_json()
+
+    assert other['total'] == mine['total'] and other['receita']['consultas'] == 0
+
+
+def test_period_is_read_by_clinic_index(engine, panel):
+    with engine.pool.connection() as conn:
+        plan = ' '.join(row[-1] for row in conn.execute(
+            'EXPLAIN QUERY PLAN SELECT data_agendamento, status, count(*) FROM agendamentos WHERE clinica_id = ? '
+            'AND data_agendamento BETWEEN ? AND ? GROUP BY data_agendamento, status',
+            [panel['clinic']['id'], START.isoformat(), END.isoformat()]))
+
+    assert 'idx_agendamentos_clinica_pagina' in plan
@@ -0,0 +1,237 @@
+"""
+Gravação adiada (write-behind) das mensagens de contato (src/utils/contact_queue.py)
+"""
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+import pytest
+from postgrest.exceptions import APIError
+
+from benchmarks.bench_contact_queue import CRASH_EXIT, Writer, message, new_queue, record, wait_for
+from src.routes import contact
+from src.utils.contact_queue import REJECTED_FILE, ContactQueue, is_rejected
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def spool(tmp_path):
+    return str(tmp_path / 'spool')
+
+
+@pytest.fixture
+def queues(fake, spool):
+    """
+    queues(writer, **opções): fila no spool do teste (paradas ao final)
+    """
+    created = []
+
+    def make(writer, directory=None, **options):
+        queue = new_queue(directory or spool, writer, **options)
+        created.append(queue)
+        return queue
+    yield make
+    for queue in created:
+        queue.stop()
+
+
+def count(engine) -> int:
+    return len(engine.table('contatos').select('id').execute().data)
+
+
+def spooled_lines(directory: str) -> int:
+    total = 0
+    for name in os.listdir(directory):
+        with open(os.path.join(directory, name), 'rb') as f:
+            total += f.read().count(b'\n')
+    return total
+
+
+def test_upsert_ignores_duplicates(engine):
+    rows = [record(1), record(2)]
+
+    assert len(engine.table('contatos').upsert(rows, ignore_duplicates=True).execute().data) == 2
+    # Replay: nada duplicado, nada devolvido
+    assert engine.table('contatos').upsert(rows, ignore_duplicates=True).execute().data == []
+    updated = engine.table('contatos').upsert(record(1, assunto='Outro')).execute().data
+    assert updated[0]['assunto'] == 'Outro' and count(engine) == 2
+
+
+def test_route_accepts_with_id_generated_on_arrival(client, engine, queues, monkeypatch):
+    queue = queues(Writer())
+    monkeypatch.setattr(contact, 'contact_queue', queue)
+
+    response = client.post('/api/contact/', json=message(0))
+
+    assert response.status_code == 202
+    sent = response.get_json()['contact']
+    wait_for(lambda: queue.stats()['flushed'] == 1)
+    stored = engine.table('contatos').select('*').eq('id', sent['id']).execute().data
+    assert len(stored) == 1 and stored[0]['mensagem'] == sent['mensagem']
+    assert client.post('/api/contact/', json={'nome': 'X', 'email': 'invalido', 'mensagem': 'Y'}).status_code == 400
+    assert queue.stats()['accepted'] == 1
+
+
+def test_batch_by_size(queues):
+    writer = Writer()
+    queue = queues(writer, flush_interval=30)
+
+    for i in range(1, 6):
+        queue.submit(record(i))
+
+    wait_for(lambda: queue.depth() == 0)
+    assert writer.batches == [5]
+
+
+def test_batch_by_time(queues):
+    writer = Writer()
+    queue = queues(writer, flush_interval=0.1)
+    started = time.monotonic()
+
+    queue.submit(record(1))
+    queue.submit(record(2))
+
+    wait_for(lambda: queue.depth() == 0)
+    assert writer.batches == [2] and time.monotonic() - started >= 0.1
+    wait_for(lambda: queue.spooled() == [os.path.basename(queue._active.path)])
+
+
+def test_database_down_keeps_spool_and_retries(engine, queues, spool):
+    writer = Writer()
+    queue = queues(writer)
+    writer.down = True
+
+    for i in range(12):
+        queue.submit(record(i))
+
+    # Nada sai do spool; novas tentativas com espera crescente
+    wait_for(lambda: queue.stats()['flush_errors'] >= 2)
+    stats = queue.stats()
+    assert stats['depth'] == 12 and stats['last_error'] == 'banco fora do ar'
+    assert spooled_lines(spool) == 12 and count(engine) == 0
+    # Na volta, grava tudo uma vez
+    writer.down = False
+    wait_for(lambda: queue.depth() == 0, timeout=2)
+    assert count(engine) == 12 and queue.stats()['retry_in_s'] == 0
+    queue.stop()
+    assert queue.spooled() == []
+
+
+def test_rejected_record_does_not_block_queue(engine, queues, spool):
+    queue = queues(Writer(reject=lambda row: row['telefone'] == 'x' * 30), batch_size=4, flush_interval=30)
+
+    for i in range(3):
+        queue.submit(record(i))
+    queue.submit(record(3, telefone='x' * 30))
+
+    wait_for(lambda: queue.depth() == 0)
+    queue.stop()
+    assert queue.stats()['rejected'] == 1 and count(engine) == 3
+    with open(os.path.join(spool, REJECTED_FILE)) as f:
+        assert [json.loads(line)['contato']['id'] for line in f] == [record(3)['id']]
+
+
+class FlakyWriter(Writer):
+    """
+    Recusa o lote inteiro e cai (erro de rede) ao gravar ``record`` sozinho, ``failures`` vezes
+    """
+
+    def __init__(self, record_id: str, failures: int):
+        super().__init__()
+        self.record_id = record_id
+        self.failures = failures
+
+    def __call__(self, rows):
+        if len(rows) > 1:
+            raise sqlite3.IntegrityError('lote recusado')
+        if rows[0]['id'] == self.record_id and self.failures:
+            self.failures -= 1
+            raise ConnectionError('conexão perdida')
+        super().__call__(rows)
+
+
+def test_transient_error_while_splitting_retries_segment(engine, queues, spool):
+    queue = queues(FlakyWriter(record(2)['id'], failures=1), batch_size=4, flush_interval=30)
+
+    for i in range(4):
+        queue.submit(record(i))
+
+    wait_for(lambda: queue.depth() == 0)
+    stats = queue.stats()
+    # Nada foi parar em rejeitados.ndjson: o segmento voltou inteiro e passou na nova tentativa
+    assert stats['flush_errors'] == 1 and stats['rejected'] == 0 and stats['flushed'] == 4
+    assert count(engine) == 4 and not os.path.exists(os.path.join(spool, REJECTED_FILE))
+
+
+@pytest.mark.parametrize('error, rejected', [
+    (sqlite3.IntegrityError('UNIQUE constraint failed'), True),
+    (sqlite3.DataError('valor grande demais'), True),
+    (APIError({'code': '22001', 'message': 'value too long'}), True),
+    (APIError({'code': '23502', 'message': 'null value'}), True),
+    (APIError({'code': 'PGRST002', 'message': 'schema cache'}), False),
+    (APIError({'code': '57014', 'message': 'statement timeout'}), False),
+    (sqlite3.OperationalError('database is locked'), False),
+    (ConnectionError('banco fora do ar'), False),
+    (TimeoutError(), False),
+])
+def test_is_rejected(error, rejected):
+    assert is_rejected(error) is rejected
+
+
+def test_crashed_process_spool_is_adopted(engine, queues, spool):
+    # Mensagens no spool (a última linha pela metade) são gravadas pelo próximo processo
+    crashed = subprocess.run([sys.executable, '-m', 'benchmarks.bench_contact_queue', '--crash-child', spool],
+                             cwd=BACKEND_DIR, capture_output=True, text=True)
+    assert crashed.returncode == CRASH_EXIT, crashed.stderr
+    segments = [os.path.join(spool, name) for name in os.listdir(spool)]
+    assert len(segments) == 2
+    with open(max(segments, key=os.path.getsize), 'ab') as f:
+        f.write(b'{"nome":"incomple')
+
+    queue = queues(Writer())
+    queue.start()
+
+    wait_for(lambda: queue.stats()['flushed'] == 6)
+    stats = queue.stats()
+    assert stats['adopted'] == 6 and stats['corrupted'] == 1 and count(engine) == 6
+
+
+def test_live_process_segment_is_not_adopted(engine, queues):
+    queue = queues(Writer())
+    queue.start()
+    alive = queues(Writer(), flush_interval=30)
+    alive.submit(record(1))
+
+    assert queue.adopt_orphans() == 0 and alive.depth() == 1
+    assert queue.spooled() == sorted(os.path.basename(q._active.path) for q in (queue, alive))
+    alive.stop()
+    queue.stop()
+    assert count(engine) == 1 and queue.spooled() == []
+
+
+def test_replayed_segment_is_not_duplicated(engine, queues, spool):
+    # Processo caiu depois de gravar e antes de apagar o segmento
+    engine.table('contatos').upsert([record(1)]).execute()
+    os.makedirs(spool)
+    with open(os.path.join(spool, 'segmento-1-replay-000001.ndjson'), 'w') as f:
+        f.write(json.dumps(record(1)) + '\n' + json.dumps(record(2)) + '\n')
+
+    queue = queues(Writer())
+    queue.start()
+
+    wait_for(lambda: queue.stats()['flushed'] == 2)
+    queue.stop()
+    assert count(engine) == 2 and queue.spooled() == []
+
+
+def test_unavailable_disk_writes_directly(client, engine, queues, spool, monkeypatch):
+    monkeypatch.setattr(contact, 'contact_queue', queues(Writer(), directory='/dev/null/spool'))
+
+    assert client.post('/api/contact/', json=message(1)).status_code == 201
+    assert count(engine) == 1
+    monkeypatch.setattr(contact, 'contact_queue', ContactQueue(spool, enabled=False))
+    assert client.post('/api/contact/', json=message(2)).status_code == 201
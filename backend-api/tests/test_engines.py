@@ -0,0 +1,306 @@
+"""
+Engine SQL (src/database/engines.py): compilação das consultas, escrita com RETURNING, RPC e pool
+"""
+import threading
+
+import pytest
+
+from src.database.engines import ConnectionPool, SQLEngine, SQLRpc, split_filters
+
+SCHEMA = '''
+CREATE TABLE itens (
+    id TEXT PRIMARY KEY,
+    nome TEXT NOT NULL,
+    grupo TEXT,
+    valor REAL,
+    ativo BOOLEAN DEFAULT 1,
+    criado_em TEXT
+);
+'''
+
+ROWS = [
+    {'id': 'a', 'nome': 'Rex', 'grupo': 'cao', 'valor': 10, 'ativo': True, 'criado_em': '2026-01-01'},
+    {'id': 'b', 'nome': 'Mia', 'grupo': 'gato', 'valor': 20, 'ativo': True, 'criado_em': '2026-01-02'},
+    {'id': 'c', 'nome': 'Bob', 'grupo': None, 'valor': 30, 'ativo': False, 'criado_em': '2026-01-02'},
+    {'id': 'd', 'nome': 'Lua', 'grupo': 'gato', 'valor': 40, 'ativo': True, 'criado_em': '2026-01-03'},
+]
+
+
+@pytest.fixture
+def sqlite():
+    engine = SQLEngine.from_url('sqlite://', pool_size=2)
+    engine.execute_script(SCHEMA)
+    engine.table('itens').insert(ROWS).execute()
+    yield engine
+    engine.pool.close()
+
+
+class FakeCursor:
+    def __init__(self, rows, columns):
+        self.description = [(c,) for c in columns] if columns else None
+        self._rows = rows
+
+    def fetchall(self):
+        return self._rows
+
+
+class FakeConnection:
+    """
+    Conexão de mentira: registra os comandos e devolve ``rows``/``columns``
+    """
+
+    def __init__(self, rows=(), columns=(), broken=False):
+        self.rows, self.columns, self.broken = list(rows), list(columns), broken
+        self.executed = []
+        self.commits = self.rollbacks = 0
+        self.closed = False
+
+    def execute(self, sql, params):
+        self.executed.append((sql, params))
+        return FakeCursor(self.rows, self.columns)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+        if self.broken:
+            raise ConnectionError('conexão perdida')
+
+    def close(self):
+        self.closed = True
+
+
+def postgres(connection=None) -> SQLEngine:
+    return SQLEngine(lambda: connection or FakeConnection(), dialect='postgres', pool_size=1)
+
+
+def ids(query) -> list:
+    return [row['id'] for row in query.execute().data]
+
+
+@pytest.mark.parametrize('method, args, expected', [
+    ('eq', ('grupo', 'gato'), ['b', 'd']),
+    ('neq', ('grupo', 'gato'), ['a']),
+    ('gt', ('valor', 20), ['c', 'd']),
+    ('gte', ('valor', 20), ['b', 'c', 'd']),
+    ('lt', ('valor', 20), ['a']),
+    ('lte', ('valor', 20), ['a', 'b']),
+    ('like', ('nome', 'M%'), ['b']),
+    ('ilike', ('nome', 'm%'), ['b']),
+    ('in_', ('id', ['a', 'c', 'x']), ['a', 'c']),
+    ('in_', ('id', []), []),
+    ('is_', ('grupo', None), ['c']),
+    ('is_', ('ativo', False), ['c']),
+])
+def test_filters(sqlite, method, args, expected):
+    query = sqlite.table('itens').select('id')
+    assert ids(getattr(query, method)(*args).order('id')) == expected
+
+
+def test_filters_are_combined_with_and(sqlite):
+    assert ids(sqlite.table('itens').select('id').eq('grupo', 'gato').gt('valor', 30)) == ['d']
+
+
+def test_compiled_sql_uses_placeholders():
+    sql, params = postgres().table('itens').select('id, nome').eq('grupo', 'gato').in_('id', ['a', 'b']) \
+        .order('criado_em', desc=True).order('id', desc=True).limit(2).compile()
+
+    assert sql == ('SELECT "id", "nome" FROM "itens" WHERE "grupo" = %s AND "id" = ANY(%s) '
+                   'ORDER BY "criado_em" DESC, "id" DESC LIMIT 2')
+    # Lista inteira em um parâmetro: o texto do SQL não muda com o tamanho do IN
+    assert params == ['gato', ['a', 'b']]
+
+
+@pytest.mark.parametrize('build', [
+    lambda q: q.select('id; DROP TABLE itens'),
+    lambda q: q.eq('nome" OR 1=1 --', 'x'),
+    lambda q: q.order('valor desc'),
+    lambda q: q._filter('nome', 'regex', 'x'),
+])
+def test_invalid_identifiers_and_operators(sqlite, build):
+    with pytest.raises(ValueError):
+        build(sqlite.table('itens'))
+
+
+def test_order_limit_and_range(sqlite):
+    base = sqlite.table('itens').select('id')
+
+    assert ids(base.order('criado_em', desc=True).order('id').limit(3)) == ['d', 'b', 'c']
+    assert ids(sqlite.table('itens').select('id').order('id').range(1, 2)) == ['b', 'c']
+
+
+def test_keyset_filter_with_or(sqlite):
+    # Próxima página depois de (2026-01-02, c) em ordem decrescente
+    query = sqlite.table('itens').select('id').or_(
+        'criado_em.lt."2026-01-02",and(criado_em.eq."2026-01-02",id.lt.c)')
+
+    assert ids(query.order('criado_em', desc=True).order('id', desc=True)) == ['b', 'a']
+
+
+def test_or_with_nested_groups_compiles_parentheses():
+    sql, params = postgres().table('itens').select('id').eq('ativo', True) \
+        .or_('grupo.is.null,and(valor.gte.10,or(nome.eq."Rex, o cão",nome.eq.Mia))').compile()
+
+    assert sql.endswith('WHERE "ativo" = %s AND ("grupo" IS NULL OR ("valor" >= %s AND ("nome" = %s OR "nome" = %s)))')
+    assert params == [True, '10', 'Rex, o cão', 'Mia']
+
+
+def test_split_filters_keeps_quoted_commas():
+    assert split_filters('a.eq.1,and(b.eq.2,c.eq.3),d.eq."x,y"') == ['a.eq.1', 'and(b.eq.2,c.eq.3)', 'd.eq."x,y"']
+
+
+def test_insert_returns_rows(sqlite):
+    rows = sqlite.table('itens').insert([{'id': 'e', 'nome': 'Tom'}, {'id': 'f', 'nome': 'Nina'}]).execute().data
+
+    assert [(r['id'], r['nome'], r['ativo']) for r in rows] == [('e', 'Tom', 1), ('f', 'Nina', 1)]
+
+
+def test_update_returns_changed_rows(sqlite):
+    rows = sqlite.table('itens').update({'valor': 99}).eq('grupo', 'gato').execute().data
+
+    assert sorted(r['id'] for r in rows) == ['b', 'd'] and {r['valor'] for r in rows} == {99}
+    assert sqlite.table('itens').select('valor').eq('id', 'a').execute().data == [{'valor': 10}]
+
+
+def test_delete_returns_removed_rows(sqlite):
+    rows = sqlite.table('itens').delete().eq('ativo', False).execute().data
+
+    assert [r['id'] for r in rows] == ['c']
+    assert ids(sqlite.table('itens').select('id').order('id')) == ['a', 'b', 'd']
+
+
+def test_upsert_updates_or_keeps_existing(sqlite):
+    updated = sqlite.table('itens').upsert({'id': 'a', 'nome': 'Rex II'}).execute().data
+    kept = sqlite.table('itens').upsert({'id': 'b', 'nome': 'Outro'}, ignore_duplicates=True).execute().data
+
+    assert updated[0]['nome'] == 'Rex II' and kept == []
+    assert sqlite.table('itens').select('nome').eq('id', 'b').execute().data == [{'nome': 'Mia'}]
+
+
+def test_json_values_are_adapted(sqlite):
+    sqlite.table('itens').insert({'id': 'j', 'nome': 'J', 'grupo': {'a': [1, 2]}}).execute()
+
+    assert sqlite.table('itens').select('grupo').eq('id', 'j').execute().data == [{'grupo': '{"a": [1, 2]}'}]
+
+
+def test_rpc_dispatches_to_python_handler(sqlite):
+    calls = []
+
+    def handler(engine, **params):
+        calls.append(params)
+        return engine.table('itens').select('id').eq('grupo', params['grupo']).order('id').execute().data
+    sqlite.rpc_handlers['itens_do_grupo'] = handler
+
+    assert sqlite.rpc('itens_do_grupo', {'grupo': 'gato'}).execute().data == [{'id': 'b'}, {'id': 'd'}]
+    assert calls == [{'grupo': 'gato'}]
+
+
+def test_rpc_calls_database_function_with_named_arguments():
+    connection = FakeConnection(rows=[('x', 1), ('y', 2)], columns=['id', 'total'])
+
+    result = postgres(connection).rpc('contar', {'inicio': '2026-01-01', 'fim': '2026-01-31'}).execute()
+
+    assert connection.executed == [('SELECT * FROM "contar"("inicio" => %s, "fim" => %s)', ['2026-01-01', '2026-01-31'])]
+    assert result.data == [{'id': 'x', 'total': 1}, {'id': 'y', 'total': 2}]
+
+
+def test_scalar_rpc_returns_the_value():
+    connection = FakeConnection(rows=[({'ok': True},)], columns=['reservar'])
+
+    assert SQLRpc(postgres(connection), 'reservar', {}).execute().data == {'ok': True}
+
+
+def test_pool_creates_connections_up_to_size_and_reuses_them():
+    created = []
+
+    def connect():
+        created.append(FakeConnection())
+        return created[-1]
+    pool = ConnectionPool(connect, size=2, timeout=0.05)
+
+    with pool.connection() as first:
+        with pool.connection() as second:
+            assert first is not second
+    with pool.connection() as again:
+        # LIFO: a última devolvida é a próxima entregue
+        assert again is first
+    assert len(created) == 2 and first.commits == 2 and second.commits == 1
+
+
+def test_pool_checkout_times_out_when_exhausted():
+    pool = ConnectionPool(FakeConnection, size=1, timeout=0.05)
+
+    with pool.connection():
+        with pytest.raises(RuntimeError):
+            with pool.connection():
+                pass
+    with pool.connection():
+        pass
+
+
+def test_pool_waits_for_a_returned_connection():
+    pool = ConnectionPool(FakeConnection, size=1, timeout=2)
+    checked_out, release = threading.Event(), threading.Event()
+
+    def holder():
+        with pool.connection():
+            checked_out.set()
+            release.wait(2)
+    thread = threading.Thread(target=holder)
+    thread.start()
+    checked_out.wait(2)
+    threading.Timer(0.05, release.set).start()
+
+    with pool.connection() as conn:
+        assert isinstance(conn, FakeConnection)
+    thread.join()
+
+
+def test_pool_rolls_back_and_returns_connection_on_error():
+    connection = FakeConnection()
+    pool = ConnectionPool(lambda: connection, size=1, timeout=0.05)
+
+    with pytest.raises(ValueError):
+        with pool.connection():
+            raise ValueError('consulta inválida')
+
+    assert connection.rollbacks == 1 and connection.commits == 0 and not connection.closed
+    with pool.connection() as conn:
+        assert conn is connection
+
+
+def test_pool_discards_broken_connection():
+    created = []
+
+    def connect():
+        created.append(FakeConnection(broken=not created))
+        return created[-1]
+    pool = ConnectionPool(connect, size=1, timeout=0.05)
+
+    # O rollback falha: o erro da conexão sobe no lugar do erro da consulta
+    with pytest.raises(ConnectionError):
+        with pool.connection():
+            raise ValueError('erro')
+
+    # A vaga volta: a próxima retirada abre uma conexão nova
+    assert created[0].closed
+    with pool.connection() as conn:
+        assert conn is created[1]
+
+
+def test_failed_connect_does_not_use_a_slot():
+    attempts = []
+
+    def connect():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError('banco fora do ar')
+        return FakeConnection()
+    pool = ConnectionPool(connect, size=1, timeout=0.05)
+
+    with pytest.raises(ConnectionError):
+        with pool.connection():
+            pass
+    with pool.connection() as conn:
+        assert isinstance(conn, FakeConnection)
@@ -0,0 +1,93 @@
+"""
+Exportação do histórico da clínica em streaming (GET /api/exports/<recurso>)
+"""
+import csv
+import io
+import json
+from datetime import timedelta
+
+import pytest
+
+from benchmarks.bench_export import FIRST_DAY, PER_DAY, seed_history
+from src.utils import export
+
+ROWS = PER_DAY + 150
+URL = '/api/exports/appointments'
+
+
+@pytest.fixture
+def history(engine, fake, auth, monkeypatch):
+    # Páginas pequenas: a exportação atravessa muitas páginas do cursor
+    monkeypatch.setattr(export, 'EXPORT_PAGE_SIZE', 37)
+    data = seed_history(engine, ROWS, animals=20)
+    return {
+        'clinic': auth(data['clinics'][0], 'clinica'),
+        'other': auth(data['clinics'][1], 'clinica'),
+        'tutor': auth(data['tutor'], 'tutor'),
+        'clinic_id': data['clinics'][0],
+    }
+
+
+def lines(response) -> list:
+    return [json.loads(line) for line in response.data.splitlines()]
+
+
+def test_ndjson_has_every_row_once_in_cursor_order(client, history):
+    response = client.get(URL, headers=history['clinic'])
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.is_streamed and response.headers['Cache-Control'] == 'no-store'
+    rows = lines(response)
+    assert len(rows) == ROWS and len({r['id'] for r in rows}) == ROWS
+    assert {r['clinica_id'] for r in rows} == {history['clinic_id']}
+    keys = [(r['data_agendamento'], r['horario'], r['id']) for r in rows]
+    assert keys == sorted(keys)
+
+
+def test_csv_escapes_quotes_newlines_and_formulas(client, history):
+    response = client.get(f'{URL}?format=csv', headers=history['clinic'])
+
+    assert response.mimetype == 'text/csv'
+    assert 'agendamentos.csv' in response.headers['Content-Disposition']
+    reader = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert len(reader) == ROWS
+    assert {'Linha 1\nLinha 2', 'Tutor relatou "tosse"', "'=1+1", ''} <= {r['observacoes'] for r in reader}
+
+
+def test_period_is_inclusive(client, history):
+    inicio, fim = FIRST_DAY, FIRST_DAY + timedelta(days=1)
+
+    rows = lines(client.get(f'{URL}?inicio={inicio}&fim={fim}', headers=history['clinic']))
+
+    assert len(rows) == ROWS
+    assert {r['data_agendamento'] for r in lines(client.get(f'{URL}?fim={inicio}', headers=history['clinic']))} \
+        == {inicio.isoformat()}
+
+
+def test_empty_period_csv_has_only_header(client, history):
+    response = client.get(f'{URL}?format=csv&inicio=2099-01-01', headers=history['clinic'])
+
+    assert response.get_data(as_text=True).splitlines()[1:] == []
+
+
+def test_other_clinic_only_sees_its_history(client, history):
+    assert len(lines(client.get(URL, headers=history['other']))) == 300
+
+
+def test_streamed_export_is_not_compressed(client, history):
+    response = client.get(URL, headers={**history['clinic'], 'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+
+
+@pytest.mark.parametrize('url, user, status', [
+    (URL, 'tutor', 403),
+    (URL, None, 401),
+    ('/api/exports/usuarios', 'clinic', 404),
+    (f'{URL}?format=xlsx', 'clinic', 400),
+    (f'{URL}?inicio=01/02/2020', 'clinic', 400),
+    (f'{URL}?inicio=2020-02-01&fim=2020-01-01', 'clinic', 400),
+])
+def test_invalid_requests(client, history, url, user, status):
+    assert client.get(url, headers=history[user] if user else {}).status_code == status
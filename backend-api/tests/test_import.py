@@ -0,0 +1,108 @@
+"""
+Importação de animais em lote (POST /api/animals/import)
+"""
+import io
+
+import pytest
+
+from benchmarks.bench_import import make_records, to_csv, to_ndjson
+from src.utils import animal_import
+
+
+@pytest.fixture
+def users(data, auth):
+    tutor = data['tutors'][0]
+    return {
+        'tutor': tutor,
+        'clinic': auth(data['clinics'][0]['id'], 'clinica'),
+        'tutor_headers': auth(tutor['id'], 'tutor'),
+    }
+
+
+def post_import(client, headers, body: bytes, mimetype: str, **params):
+    return client.post('/api/animals/import', data=body, query_string=params,
+                       headers={**headers, 'Content-Type': mimetype})
+
+
+def count_animals(engine) -> int:
+    return len(engine.table('animais').select('id').execute().data)
+
+
+def test_invalid_rows_are_reported_without_aborting(client, engine, users):
+    tutor = users['tutor']
+    before = count_animals(engine)
+    records = make_records(6, [tutor['email']])
+    records[1]['nome'] = ''
+    records[2]['sexo'] = 'M'
+    records[3]['idade'] = 'dois'
+    records[4]['email_tutor'] = 'ninguem@exemplo.com'
+
+    response = post_import(client, users['clinic'], to_csv(records), 'text/csv')
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert body['imported'] == 2 and body['failed'] == 4
+    # A linha 1 é o cabeçalho
+    assert [e['line'] for e in body['errors']] == [3, 4, 5, 6]
+    assert 'nome' in body['errors'][0]['error'] and 'Tutor não encontrado' in body['errors'][3]['error']
+    assert count_animals(engine) == before + 2
+    imported = engine.table('animais').select('*').eq('nome', records[0]['nome']).execute().data[0]
+    # Vírgula decimal e "sim" convertidos
+    assert imported['tutor_id'] == tutor['id'] and imported['peso'] == 0.5 and imported['castrado'] in (True, 1)
+
+
+def test_tutor_ndjson_ignores_email_and_reports_broken_lines(client, users):
+    body = to_ndjson(make_records(2, ['outro@exemplo.com'])) + b'{quebrado\n[1]\n'
+
+    result = post_import(client, users['tutor_headers'], body, 'application/x-ndjson').get_json()
+
+    assert result['imported'] == 2 and [e['line'] for e in result['errors']] == [3, 4]
+
+
+def test_rejected_batch_is_retried_row_by_row(client, engine, users):
+    with engine.pool.connection() as conn:
+        conn.execute("CREATE TRIGGER rejeita_animal BEFORE INSERT ON animais WHEN NEW.nome = 'Rejeitado' "
+                     "BEGIN SELECT RAISE(ABORT, 'animal rejeitado'); END")
+        conn.commit()
+    records = make_records(5, [users['tutor']['email']])
+    records[2]['nome'] = 'Rejeitado'
+
+    body = post_import(client, users['clinic'], to_csv(records), 'text/csv', format='csv').get_json()
+
+    assert body['imported'] == 4 and [e['line'] for e in body['errors']] == [4]
+
+
+def test_row_limit(client, users, monkeypatch):
+    monkeypatch.setattr(animal_import, 'ANIMAL_IMPORT_MAX_ROWS', 3)
+
+    body = post_import(client, users['clinic'], to_csv(make_records(5, [users['tutor']['email']])),
+                       'text/csv').get_json()
+
+    assert body['imported'] == 3 and body['truncated']
+
+
+def test_multipart_upload_with_bom(client, users):
+    # CSV salvo pelo Excel
+    upload = (io.BytesIO(b'\xef\xbb\xbf' + to_csv(make_records(2, [users['tutor']['email']]))), 'pacientes.csv')
+
+    response = client.post('/api/animals/import', data={'file': upload}, headers=users['clinic'],
+                           content_type='multipart/form-data')
+
+    assert response.get_json()['imported'] == 2
+
+
+def test_invalid_files(client, users):
+    not_utf8 = to_csv(make_records(1, [users['tutor']['email']])) + b'\xff\xfe,x\n'
+
+    assert post_import(client, users['clinic'], b'{}', 'application/json').status_code == 400
+    assert post_import(client, users['clinic'], not_utf8, 'text/csv').status_code == 400
+    assert client.post('/api/animals/import', data=b'', content_type='text/csv').status_code == 401
+
+
+def test_single_create_keeps_same_rules(client, users):
+    headers = users['tutor_headers']
+
+    assert client.post('/api/animals/', json={'nome': 'Rex', 'especie': 'Cão', 'sexo': 'M'},
+                       headers=headers).status_code == 400
+    assert client.post('/api/animals/', json={'nome': 'Rex', 'especie': 'Cão', 'idade': 3},
+                       headers=headers).status_code == 201
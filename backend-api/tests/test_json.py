@@ -0,0 +1,95 @@
+"""
+Serialização JSON (src/utils/json_provider.py) e compressão das respostas (src/utils/compression.py)
+"""
+import datetime
+import decimal
+import gzip
+import json
+import uuid
+
+import pytest
+from flask.json.provider import DefaultJSONProvider
+
+from src.utils import compression
+from src.utils.json_provider import FastJSONProvider, dumps_bytes
+
+
+def decode(response) -> bytes:
+    encoding = response.headers.get('Content-Encoding')
+    if encoding == 'gzip':
+        return gzip.decompress(response.data)
+    if encoding == 'br':
+        return compression.brotli.decompress(response.data)
+    return response.data
+
+
+def test_special_types_match_postgrest_format():
+    value = {
+        'id': uuid.UUID(int=1),
+        'data': datetime.date(2024, 1, 2),
+        'horario': datetime.time(8, 30),
+        'criado_em': datetime.datetime(2024, 1, 2, 8, 30, 15),
+        'valor': decimal.Decimal('150.50'),
+        'nome': 'Paçoca',
+    }
+
+    assert json.loads(dumps_bytes(value)) == {
+        'id': '00000000-0000-0000-0000-000000000001',
+        'data': '2024-01-02',
+        'horario': '08:30:00',
+        'criado_em': '2024-01-02T08:30:15',
+        'valor': 150.5,
+        'nome': 'Paçoca',
+    }
+
+
+def test_unknown_type_is_rejected():
+    with pytest.raises(TypeError):
+        dumps_bytes({'x': object()})
+
+
+@pytest.mark.parametrize('url', ['/api/animals/?limit=50&fields=*', '/api/appointments/?limit=50'])
+def test_providers_produce_same_content(app, client, data, auth, url):
+    headers = auth(data['tutors'][0]['id'], 'tutor')
+    body = client.get(url, headers={**headers, 'Accept-Encoding': 'identity'}).get_json()
+
+    assert json.loads(DefaultJSONProvider(app).dumps(body)) == json.loads(FastJSONProvider(app).dumps(body))
+
+
+@pytest.mark.parametrize('encoding', ['gzip'] + (['br'] if compression.brotli is not None else []))
+def test_compressed_body_roundtrips(client, data, auth, encoding):
+    headers = auth(data['tutors'][0]['id'], 'tutor')
+    url = '/api/animals/?fields=*'
+    plain = client.get(url, headers={**headers, 'Accept-Encoding': 'identity'})
+    assert len(plain.data) >= compression.COMPRESSION_MIN_SIZE
+
+    compressed = client.get(url, headers={**headers, 'Accept-Encoding': encoding})
+
+    assert compressed.headers['Content-Encoding'] == encoding
+    assert 'Accept-Encoding' in compressed.headers['Vary']
+    assert decode(compressed) == plain.data
+
+
+def test_small_and_binary_responses_are_not_compressed(client, data):
+    small = client.get('/api/animals/nao-e-um-id', headers={'Accept-Encoding': 'gzip'})
+    qr = client.get(f'/api/animals/{data["animals"][0]["id"]}/qr', headers={'Accept-Encoding': 'gzip'})
+
+    assert len(small.data) < compression.COMPRESSION_MIN_SIZE and 'Content-Encoding' not in small.headers
+    assert qr.mimetype == 'image/png' and 'Content-Encoding' not in qr.headers
+
+
+@pytest.mark.parametrize('accept, expected', [
+    ('', None),
+    ('identity', None),
+    ('gzip', 'gzip'),
+    ('gzip;q=0.5, br', 'br' if compression.brotli is not None else 'gzip'),
+    ('br;q=0, gzip', 'gzip'),
+])
+def test_choose_encoding(accept, expected):
+    assert compression.choose_encoding(accept) == expected
+
+
+def test_add_vary():
+    assert compression.add_vary(None) == 'Accept-Encoding'
+    assert compression.add_vary('Origin') == 'Origin, Accept-Encoding'
+    assert compression.add_vary('origin, accept-encoding') == 'origin, accept-encoding'
@@ -0,0 +1,182 @@
+"""
+Métricas de latência (src/utils/metrics.py e GET /metrics)
+"""
+import asyncio
+import os
+import re
+
+import bcrypt
+import pytest
+
+from benchmarks.bench_metrics import NewObjectQuery
+from src.config import database
+from src.database.engines import AsyncSQLEngine
+from src.utils import metrics
+from src.utils.auth import hashing_pool
+from src.utils.metrics import (CONTENT_TYPE, MetricsMiddleware, TimedQuery, db_query_duration,
+                               http_request_duration, password_hash_duration, registry)
+
+pytestmark = pytest.mark.skipif(not metrics.METRICS_ENABLED, reason='METRICS_ENABLED=false')
+
+SAMPLE = re.compile(r'^([a-z_]+)(?:\{(.*)\})? (\S+)$')
+LABEL = re.compile(r'([a-z_]+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse(text: str) -> dict:
+    """
+    Lê o formato de texto do Prometheus: {(nome, rótulos): valor}
+    """
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith('#'):
+            continue
+        match = SAMPLE.match(line)
+        assert match, f'linha fora do formato: {line!r}'
+        name, labels, value = match.groups()
+        samples[(name, tuple(LABEL.findall(labels or '')))] = float(value)
+    return samples
+
+
+def check_exposition(text: str) -> dict:
+    """
+    Faixas acumuladas e crescentes, +Inf igual ao _count em toda série
+    """
+    samples = parse(text)
+    series = {}
+    for (name, labels), value in samples.items():
+        if name.endswith('_bucket'):
+            base = tuple(label for label in labels if label[0] != 'le')
+            series.setdefault((name[:-len('_bucket')], base), []).append((float(dict(labels)['le']), value))
+    assert series
+    for (name, base), buckets in series.items():
+        buckets.sort()
+        counts = [count for _, count in buckets]
+        assert counts == sorted(counts)
+        assert buckets[-1][0] == float('inf') and counts[-1] == samples[(f'{name}_count', base)]
+    return samples
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    registry.clear()
+    yield
+    registry.clear()
+
+
+def test_requests_are_labeled_by_endpoint_and_status(client, data, auth):
+    headers = auth(data['clinics'][0]['id'], 'clinica')
+
+    assert client.get('/api/appointments/', headers=headers).status_code == 200
+    assert client.get('/api/animals/').status_code == 401
+    assert client.post('/health').status_code == 405
+
+    assert http_request_duration.count(('appointments.get_appointments', 'GET', '200')) == 1
+    assert http_request_duration.count(('animals.get_animals', 'GET', '401')) == 1
+    # Rota inexistente para o método
+    assert http_request_duration.count(('unmatched', 'POST', '405')) == 1
+    assert db_query_duration.count(('view_agendamentos_completo', 'select', 'ok')) == 1
+
+
+def test_queries_are_labeled_by_table_operation_and_outcome(fake):
+    row = database.db.table('usuarios_tutores').insert({
+        'nome': 'Métricas', 'email': 'metricas@teste.local', 'senha_hash': 'x', 'telefone': '1'
+    }).execute().data[0]
+    database.db.table('usuarios_tutores').update({'nome': 'M'}).eq('id', row['id']).execute()
+    database.db.table('usuarios_tutores').delete().eq('id', row['id']).execute()
+    with pytest.raises(Exception):
+        database.db.table('tabela_inexistente').select('*').execute()
+
+    for operation in ('insert', 'update', 'delete'):
+        assert db_query_duration.count(('usuarios_tutores', operation, 'ok')) == 1
+    assert db_query_duration.count(('tabela_inexistente', 'select', 'error')) == 1
+
+
+def test_builders_returning_new_objects():
+    # Estilo do cliente Supabase: cada método devolve um objeto novo
+    query = TimedQuery(NewObjectQuery(), 'agendamentos').upsert({}).eq('id', 1).limit(1)
+
+    assert query.execute() == ['upsert', 'eq', 'limit']
+    assert db_query_duration.count(('agendamentos', 'upsert', 'ok')) == 1
+    TimedQuery(NewObjectQuery(), 'reservar_horario', 'rpc').execute()
+    assert db_query_duration.count(('reservar_horario', 'rpc', 'ok')) == 1
+
+
+def test_password_hashing_is_timed():
+    hashing_pool.run(bcrypt.hashpw, b'metricas', bcrypt.gensalt(rounds=4))
+
+    assert password_hash_duration.count(('hashpw',)) == 1
+
+
+def test_async_queries_and_asgi_middleware(engine, monkeypatch):
+    monkeypatch.setattr(database, '_async_engine', AsyncSQLEngine(engine))
+
+    async def endpoint(scope, receive, send):
+        await send({'type': 'http.response.start', 'status': 201, 'headers': []})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def routed(scope, receive, send):
+        scope['endpoint'] = endpoint
+        await endpoint(scope, receive, send)
+
+    async def noop(message):
+        pass
+
+    async def run():
+        await database.async_db.table('agendamentos').select('id').limit(1).execute()
+        await MetricsMiddleware(routed)({'type': 'http', 'method': 'POST', 'path': '/'}, None, noop)
+    asyncio.run(run())
+
+    assert db_query_duration.count(('agendamentos', 'select', 'ok')) == 1
+    assert http_request_duration.count(('async.endpoint', 'POST', '201')) == 1
+
+
+def test_exposition_format_and_label_escaping(client):
+    TimedQuery(NewObjectQuery(), 'tabela "estranha"\\').execute()
+
+    response = client.get('/metrics')
+
+    assert response.status_code == 200 and response.headers['Content-Type'] == CONTENT_TYPE
+    samples = check_exposition(response.get_data(as_text=True))
+    labels = (('table', 'tabela \\"estranha\\"\\\\'), ('operation', 'select'), ('outcome', 'ok'))
+    assert samples[('db_query_duration_seconds_count', labels)] == 1
+
+
+def test_metrics_token(client, monkeypatch):
+    monkeypatch.setattr(metrics, 'METRICS_TOKEN', 'segredo')
+
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer outro'}).status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer segredo'}).status_code == 200
+
+
+def test_internal_stats_are_behind_metrics_token(client, monkeypatch):
+    # /health é público: só o estado, sem contadores internos
+    assert client.get('/health').get_json() == {'status': 'healthy', 'message': 'API do TCC Veterinário funcionando!'}
+    monkeypatch.setattr(metrics, 'METRICS_TOKEN', 'segredo')
+
+    assert client.get('/metrics/stats').status_code == 401
+    response = client.get('/metrics/stats', headers={'Authorization': 'Bearer segredo'})
+
+    assert response.status_code == 200 and response.headers['Cache-Control'] == 'no-store'
+    stats = response.get_json()
+    assert set(stats) == {'token_cache', 'password_hashing', 'availability_cache', 'animal_profile_cache',
+                          'rate_limit', 'contact_queue', 'static_assets'}
+    assert set(stats['availability_cache']) == {'occupancy', 'clinics'} and 'hits' in stats['token_cache']
+
+
+def test_other_workers_snapshots_are_merged(tmp_path, monkeypatch):
+    directory = str(tmp_path)
+    monkeypatch.setattr(registry, 'directory', directory)
+    key = ('appointments.get_appointments', 'GET', '200')
+    http_request_duration.observe(key, 0.01)
+
+    registry.flush()
+    os.replace(os.path.join(directory, f'{os.getpid()}.json'), os.path.join(directory, '999999.json'))
+    # Arquivo corrompido é ignorado
+    with open(os.path.join(directory, '999998.json'), 'w') as f:
+        f.write('{"incompleto')
+
+    assert registry.collect()['http_request_duration_seconds'][key][-1] == 2
+    check_exposition(registry.render())
+    registry.clear_snapshots()
+    assert os.listdir(directory) == []
@@ -0,0 +1,76 @@
+"""
+Paginação por cursor (src/utils/pagination.py) na listagem de agendamentos
+"""
+import pytest
+
+from benchmarks.common import seed
+from src.utils.pagination import InvalidPage, decode_cursor, encode_cursor, page_args
+
+KEYSET = ['data_agendamento', 'horario', 'id']
+
+
+def walk(client, headers, limit, order):
+    ids, cursor, pages = [], None, 0
+    while True:
+        url = f'/api/appointments/?limit={limit}&order={order}' + (f'&cursor={cursor}' if cursor else '')
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        body = response.get_json()
+        assert len(body['appointments']) <= limit
+        ids += [row['id'] for row in body['appointments']]
+        pages += 1
+        cursor = body['next_cursor']
+        if cursor is None:
+            return ids, pages
+
+
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+def test_walk_visits_each_appointment_once(client, engine, auth, order):
+    data = seed(engine, tutors=3, clinics=1, animals_per_tutor=4, appointments_per_animal=5, text_size=10)
+    headers = auth(data['clinics'][0]['id'], 'clinica')
+
+    ids, pages = walk(client, headers, 7, order)
+
+    assert len(ids) == len(set(ids))
+    assert sorted(ids) == sorted(a['id'] for a in data['appointments'])
+    assert pages == -(-len(ids) // 7)
+
+
+def test_pages_follow_requested_order(client, engine, auth):
+    data = seed(engine, tutors=2, clinics=1, animals_per_tutor=2, appointments_per_animal=4, text_size=10)
+    headers = auth(data['clinics'][0]['id'], 'clinica')
+
+    rows = client.get('/api/appointments/?limit=200&order=asc', headers=headers).get_json()['appointments']
+    keys = [(r['data_agendamento'], r['horario'], r['id']) for r in rows]
+
+    assert keys == sorted(keys)
+
+
+def test_cursor_roundtrip():
+    cursor = encode_cursor(['2024-01-01', '08:00', 'abc'], 'asc')
+
+    assert decode_cursor(cursor, KEYSET, 'asc') == ['2024-01-01', '08:00', 'abc']
+
+
+@pytest.mark.parametrize('cursor, order', [
+    ('lixo', 'asc'),
+    (encode_cursor(['2024-01-01', '08:00'], 'asc'), 'asc'),
+    (encode_cursor(['2024-01-01', '08:00', 'a"b'], 'asc'), 'asc'),
+    (encode_cursor(['2024-01-01', '08:00', {'x': 1}], 'asc'), 'asc'),
+    (encode_cursor(['2024-01-01', '08:00', 'abc'], 'asc'), 'desc'),
+])
+def test_invalid_cursor(cursor, order):
+    with pytest.raises(InvalidPage):
+        decode_cursor(cursor, KEYSET, order)
+
+
+@pytest.mark.parametrize('args', [{'order': 'up'}, {'limit': 'x'}, {'limit': '0'}, {'limit': '100000'}])
+def test_invalid_page_args(args):
+    with pytest.raises(InvalidPage):
+        page_args(args, KEYSET)
+
+
+def test_invalid_cursor_is_bad_request(client, data, auth):
+    response = client.get('/api/appointments/?cursor=lixo', headers=auth(data['clinics'][0]['id'], 'clinica'))
+
+    assert response.status_code == 400
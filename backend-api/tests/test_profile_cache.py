@@ -0,0 +1,157 @@
+"""
+Perfil público do animal (GET /api/animals/<id>): ProfileCache, ETag/304 e banco fora do ar
+"""
+import time
+import uuid
+
+import pytest
+
+from src.utils.profile_cache import ProfileCache, profile_cache
+
+
+class Loader:
+    """
+    Carregador de teste: conta as chamadas e pode simular o banco fora do ar
+    """
+
+    def __init__(self, value='v1'):
+        self.value = value
+        self.down = False
+        self.calls = 0
+
+    def __call__(self, key):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError('banco fora do ar')
+        return self.value
+
+
+def wait_for(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_fresh_entry_is_a_hit():
+    cache, loader = ProfileCache(10, 60, 0, 0), Loader()
+
+    assert cache.get('a', loader) == 'v1'
+    assert cache.get('a', loader) == 'v1'
+    assert loader.calls == 1
+    assert cache.stats()['hits'] == 1
+
+
+def test_stale_entry_is_served_while_refreshing():
+    cache, loader = ProfileCache(10, 0.01, 60, 60), Loader()
+    cache.get('a', loader)
+    loader.value = 'v2'
+    time.sleep(0.02)
+
+    assert cache.get('a', loader) == 'v1'
+    assert wait_for(lambda: cache.stats()['refreshes'] == 1)
+    assert wait_for(lambda: cache.get('a', loader) == 'v2')
+
+
+def test_stale_entry_is_served_when_loader_fails():
+    cache, loader = ProfileCache(10, 0.01, 0, 60, retry_after=60), Loader()
+    cache.get('a', loader)
+    time.sleep(0.02)
+    loader.down = True
+
+    assert cache.get('a', loader) == 'v1'
+    calls = loader.calls
+    # Até retry_after as próximas leituras nem tentam o banco
+    assert cache.get('a', loader) == 'v1'
+    assert loader.calls == calls
+    assert cache.stats()['stale_on_error'] == 2
+    with pytest.raises(ConnectionError):
+        cache.get('b', loader)
+
+
+def test_load_started_before_invalidation_is_not_stored():
+    cache, loader = ProfileCache(10, 60, 0, 0), Loader()
+    generation = cache.generation
+    cache.invalidate('a')
+
+    cache.set('a', 'antigo', generation)
+
+    assert cache.get('a', loader) == 'v1'
+
+
+def test_missing_value_is_not_cached_and_size_is_bounded():
+    cache = ProfileCache(2, 60, 0, 0)
+    assert cache.get('a', lambda key: None) is None
+    for key in 'bcd':
+        cache.get(key, Loader())
+
+    assert cache.stats()['size'] == 2
+    assert cache.get('a', Loader('v1')) == 'v1'
+
+
+def test_disabled_cache_always_loads():
+    cache, loader = ProfileCache(0, 60, 0, 0), Loader()
+    cache.get('a', loader)
+    cache.get('a', loader)
+
+    assert loader.calls == 2
+
+
+@pytest.fixture
+def animal(data):
+    return data['animals'][0]
+
+
+def test_profile_conditional_requests(client, fake, animal):
+    url = f'/api/animals/{animal["id"]}'
+    response = client.get(url)
+    etag = response.headers['ETag']
+
+    assert response.status_code == 200
+    assert response.headers['Last-Modified']
+    assert 'stale-if-error' in response.headers['Cache-Control']
+
+    # Versão igual: 304 sem corpo e sem ir ao banco
+    calls = sum(fake.calls.values())
+    revalidated = client.get(url, headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304 and revalidated.data == b''
+    assert sum(fake.calls.values()) == calls
+
+    # Outra projeção, outra ETag
+    assert client.get(f'{url}?fields=nome_animal').headers['ETag'] != etag
+
+
+def test_update_invalidates_profile(client, animal, auth):
+    url = f'/api/animals/{animal["id"]}'
+    etag = client.get(url).headers['ETag']
+
+    assert client.put(url, json={'nome': 'Rex Atualizado'}, headers=auth(animal['tutor_id'], 'tutor')).status_code == 200
+    updated = client.get(url, headers={'If-None-Match': etag})
+
+    assert updated.status_code == 200
+    assert updated.get_json()['animal']['nome_animal'] == 'Rex Atualizado'
+
+
+def test_profile_served_from_cache_when_database_is_down(client, fake, animal, monkeypatch):
+    url = f'/api/animals/{animal["id"]}'
+    assert client.get(url).status_code == 200
+    monkeypatch.setattr(profile_cache, 'ttl', 0.01)
+    monkeypatch.setattr(profile_cache, 'stale_while_revalidate', 0)
+    time.sleep(0.02)
+
+    def down(table):
+        raise ConnectionError('Supabase indisponível')
+    monkeypatch.setattr(fake, 'wait', down)
+
+    assert client.get(url).status_code == 200
+    assert client.get(f'/api/animals/{uuid.uuid4()}').status_code == 500
+
+
+def test_invalid_and_missing_profile(client, fake):
+    missing = str(uuid.uuid4())
+
+    assert client.get('/api/animals/nao-e-um-id').status_code == 400
+    assert client.get(f'/api/animals/{missing}').status_code == 404
+    assert profile_cache.stats()['size'] == 0
@@ -0,0 +1,64 @@
+"""
+Projeção das respostas (parâmetro fields, src/utils/fields.py)
+"""
+import pytest
+
+from src.routes.animals import ANIMAL_FIELDS
+from src.utils.fields import InvalidFields, Projection
+
+LEGACY_QR = 'data:image/png;base64,iVBORw0KGgo'
+
+
+@pytest.fixture
+def tutor(data, engine, auth):
+    tutor = data['tutors'][0]
+    # QR Code antigo em base64 na coluna, como nas bases não migradas
+    engine.table('animais').update({'qr_code_url': LEGACY_QR}).eq('tutor_id', tutor['id']).execute()
+    return auth(tutor['id'], 'tutor')
+
+
+def test_default_projection_leaves_out_long_texts(client, tutor):
+    animals = client.get('/api/animals/', headers=tutor).get_json()['animals']
+
+    assert animals
+    assert set(animals[0]) == set(ANIMAL_FIELDS.default) | set(ANIMAL_FIELDS.required)
+    assert animals[0]['qr_code_url'].endswith(f'/api/animals/{animals[0]["id"]}/qr')
+
+
+def test_requested_fields_only(client, tutor):
+    animals = client.get('/api/animals/?fields=nome,especie', headers=tutor).get_json()['animals']
+
+    # Colunas da paginação sempre vêm junto
+    assert set(animals[0]) == {'nome', 'especie', *ANIMAL_FIELDS.required}
+
+
+def test_all_fields_compute_qr_code_url(client, tutor):
+    animals = client.get('/api/animals/?fields=*', headers=tutor).get_json()['animals']
+
+    assert set(ANIMAL_FIELDS.allowed) <= set(animals[0])
+    assert not animals[0]['qr_code_url'].startswith('data:')
+
+
+def test_appointment_fields(client, data, auth):
+    headers = auth(data['tutors'][0]['id'], 'tutor')
+
+    response = client.get('/api/appointments/?fields=status,horario', headers=headers)
+
+    assert response.status_code == 200
+    assert set(response.get_json()['appointments'][0]) == {'status', 'horario', 'data_agendamento', 'id'}
+
+
+@pytest.mark.parametrize('url', ['/api/animals/?fields=senha_hash', '/api/appointments/?fields=nome,,', '/api/animals/?fields=,'])
+def test_unknown_fields_are_rejected(client, tutor, url):
+    assert client.get(url, headers=tutor).status_code == 400
+
+
+def test_projection_select_and_pick():
+    projection = Projection(allowed=['id', 'nome', 'url'], default=['nome'], computed=('url',), required=('id',))
+
+    assert projection.fields({}) == ['nome']
+    assert projection.fields({'fields': 'nome, url, nome'}) == ['nome', 'url']
+    assert projection.select(['nome', 'url']) == 'nome, id'
+    assert projection.pick([{'id': 1, 'nome': 'Rex', 'extra': 'x'}], ['nome']) == [{'nome': 'Rex', 'id': 1}]
+    with pytest.raises(InvalidFields):
+        projection.fields({'fields': 'senha'})
@@ -0,0 +1,117 @@
+"""
+QR Code do animal (GET /api/animals/<id>/qr) e etiquetas em lote (POST /api/animals/qr-sheet)
+"""
+import io
+import uuid
+import zipfile
+
+import pytest
+
+from src.routes import animals
+from src.routes.animals import QR_MAX_AGE
+
+
+def test_qr_code_png_with_revalidatable_cache(client, data):
+    animal_id = data['animals'][0]['id']
+
+    response = client.get(f'/api/animals/{animal_id}/qr')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'image/png'
+    assert response.data.startswith(b'\x89PNG')
+    assert response.headers['Cache-Control'] == f'public, max-age={QR_MAX_AGE}'
+    assert response.headers['ETag']
+
+
+def test_qr_code_not_modified(client, data):
+    animal_id = data['animals'][0]['id']
+    etag = client.get(f'/api/animals/{animal_id}/qr?format=svg').headers['ETag']
+
+    response = client.get(f'/api/animals/{animal_id}/qr?format=svg', headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+
+
+def test_qr_code_unknown_animal(client, data):
+    response = client.get(f'/api/animals/{uuid.uuid4()}/qr')
+
+    assert response.status_code == 404
+
+
+def test_qr_code_inactive_animal(client, data, engine):
+    animal_id = data['animals'][0]['id']
+    engine.table('animais').update({'ativo': False}).eq('id', animal_id).execute()
+
+    assert client.get(f'/api/animals/{animal_id}/qr').status_code == 404
+
+
+def test_qr_code_invalid_parameters(client, data):
+    animal_id = data['animals'][0]['id']
+
+    assert client.get('/api/animals/nao-e-uuid/qr').status_code == 400
+    assert client.get(f'/api/animals/{animal_id}/qr?format=gif').status_code == 400
+    assert client.get(f'/api/animals/{animal_id}/qr?size=abc').status_code == 400
+    assert client.get(f'/api/animals/{animal_id}/qr?size=41').status_code == 400
+
+
+def clinic_animals(data, clinic):
+    return [a['id'] for a in data['animals'] if a['clinica_id'] == clinic['id']]
+
+
+def test_qr_sheet_zip(client, data, auth):
+    clinic = data['clinics'][0]
+    animal_ids = clinic_animals(data, clinic)
+
+    response = client.post('/api/animals/qr-sheet', headers=auth(clinic['id'], 'clinica'),
+                           json={'animal_ids': animal_ids, 'format': 'zip', 'size': 2})
+
+    assert response.status_code == 200
+    assert response.headers['X-Truncated'] == 'false'
+    assert len(zipfile.ZipFile(io.BytesIO(response.data)).namelist()) == len(animal_ids)
+
+
+def test_qr_sheet_all_reports_truncation(client, data, auth, monkeypatch):
+    clinic = data['clinics'][0]
+    monkeypatch.setattr(animals, 'QR_SHEET_MAX_ANIMALS', 2)
+
+    response = client.post('/api/animals/qr-sheet', headers=auth(clinic['id'], 'clinica'),
+                           json={'all': True, 'format': 'zip', 'size': 1})
+
+    assert response.status_code == 200
+    assert response.headers['X-Truncated'] == 'true'
+    assert len(zipfile.ZipFile(io.BytesIO(response.data)).namelist()) == 2
+
+
+def test_qr_sheet_only_clinic_animals(client, data, auth):
+    clinic, other = data['clinics']
+
+    response = client.post('/api/animals/qr-sheet', headers=auth(clinic['id'], 'clinica'),
+                           json={'animal_ids': clinic_animals(data, other), 'format': 'zip'})
+
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize('body', [
+    None,
+    ['lista'],
+    {},
+    {'animal_ids': 'nao-e-lista'},
+    {'animal_ids': ['nao-e-uuid']},
+    {'animal_ids': [1]},
+    {'all': True, 'size': True},
+    {'all': True, 'size': 0},
+    {'all': True, 'format': 'gif'},
+])
+def test_qr_sheet_invalid_body(client, data, auth, body):
+    clinic = data['clinics'][0]
+
+    response = client.post('/api/animals/qr-sheet', headers=auth(clinic['id'], 'clinica'), json=body)
+
+    assert response.status_code == 400
+
+
+def test_qr_sheet_tutor_forbidden(client, data, auth):
+    response = client.post('/api/animals/qr-sheet', headers=auth(data['tutors'][0]['id'], 'tutor'),
+                           json={'all': True})
+
+    assert response.status_code == 403
@@ -0,0 +1,220 @@
+"""
+Limite de requisições (token bucket) no login, cadastro e contato (src/utils/rate_limit.py)
+"""
+import os
+import threading
+
+import pytest
+
+from benchmarks.bench_rate_limit import PASSWORD, login
+from benchmarks.common import create_sqlite_engine
+from benchmarks.fake_supabase import FakeSupabase, install
+from src.config import database
+from src.utils import rate_limit
+from src.utils.auth import hash_password, hashing_pool
+from src.utils.rate_limit import (RATE_LIMIT_POLICIES, DatabaseBackend, MemoryBackend, RateLimitBackend,
+                                  RateLimiter, RateLimitPolicy, bucket_key, rate_limiter)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class BrokenBackend(DatabaseBackend):
+    def consume(self, key, policy, cost=1.0):
+        raise ConnectionError('banco fora do ar')
+
+
+@pytest.fixture
+def limited(monkeypatch):
+    monkeypatch.setattr(rate_limit, 'RATE_LIMIT_ENABLED', True)
+    rate_limiter.local.clear()
+    yield
+    rate_limiter.local.clear()
+
+
+@pytest.fixture
+def tutor(engine, data):
+    tutor = data['tutors'][0]
+    engine.table('usuarios_tutores').update({'senha_hash': hash_password(PASSWORD)}).eq('id', tutor['id']).execute()
+    return tutor
+
+
+@pytest.fixture
+def shared_engine(tmp_path):
+    # Arquivo (e não memória): cada thread usa a sua conexão do pool
+    engine = create_sqlite_engine(os.path.join(tmp_path, 'shared.db'), pool_size=10)
+    previous = database.supabase, database.supabase_admin, database.get_engine()
+    install(FakeSupabase(engine))
+    yield engine
+    database.supabase, database.supabase_admin = previous[:2]
+    database.set_engine(previous[2])
+    engine.pool.close()
+
+
+def test_policy_parsing():
+    policy = RateLimitPolicy.parse('20/60')
+
+    assert policy.capacity == 20 and policy.per_second == 20 / 60
+    assert RateLimitPolicy.parse('') is None and RateLimitPolicy.parse('  ') is None
+
+
+@pytest.mark.parametrize('value', ['0/60', '5/0', 'abc'])
+def test_invalid_policy(value):
+    with pytest.raises(ValueError):
+        RateLimitPolicy.parse(value)
+
+
+def test_incomplete_backend_fails_on_creation():
+    class NoConsume(RateLimitBackend):
+        def stats(self):
+            return {}
+
+    with pytest.raises(TypeError):
+        NoConsume()
+
+
+def test_burst_wait_and_refill():
+    clock = FakeClock()
+    backend = MemoryBackend(10, clock=clock)
+    policy = RateLimitPolicy(3, 30)
+    key = bucket_key('login', 'ip', '10.0.0.1')
+
+    assert [backend.consume(key, policy) for _ in range(3)] == [0, 0, 0]
+    assert backend.consume(key, policy) == pytest.approx(10.0)
+    clock.now += 5
+    assert backend.consume(key, policy) == pytest.approx(5.0)
+    clock.now += 5
+    assert backend.consume(key, policy) == 0
+    # A recarga não passa da capacidade
+    clock.now += 3600
+    assert [backend.consume(key, policy) for _ in range(4)][-1] > 0
+
+
+def test_least_recently_used_buckets_are_evicted():
+    backend = MemoryBackend(10, clock=FakeClock())
+    policy = RateLimitPolicy(3, 30)
+    key = bucket_key('login', 'ip', '10.0.0.1')
+
+    for i in range(25):
+        backend.consume(bucket_key('login', 'ip', f'10.1.0.{i}'), policy)
+        backend.consume(key, policy)
+
+    assert backend.stats()['keys'] == 10 and backend.stats()['evicted'] == 16
+    assert key in backend._buckets and bucket_key('login', 'ip', '10.1.0.0') not in backend._buckets
+
+
+def test_login_ip_limit_skips_database_and_bcrypt(client, fake, limited):
+    for i in range(20):
+        assert login(client, f'nao{i}@existe.teste', '10.0.0.1').status_code == 401
+    calls, hashes = sum(fake.calls.values()), hashing_pool.count
+
+    response = login(client, 'outro@existe.teste', '10.0.0.1')
+
+    assert response.status_code == 429 and response.headers['Retry-After'] == '3'
+    assert sum(fake.calls.values()) == calls and hashing_pool.count == hashes
+    assert login(client, 'outro@existe.teste', '10.0.0.2').status_code == 401
+
+
+def test_failed_logins_do_not_lock_out_the_account(client, tutor, limited):
+    email = tutor['email']
+    for _ in range(5):
+        assert login(client, email, '10.2.0.1').status_code == 401
+
+    # O email é normalizado como no login
+    assert login(client, f'  {email.upper()} ', '10.2.0.1').status_code == 429
+    assert login(client, email, '10.2.0.1', PASSWORD).status_code == 429
+    # O dono da conta, de outro IP, continua entrando
+    assert login(client, email, '10.2.0.2', PASSWORD).status_code == 200
+
+
+def test_login_email_cap_across_ips(client, tutor, limited, monkeypatch):
+    monkeypatch.setitem(RATE_LIMIT_POLICIES['login'], 'email', RateLimitPolicy(8, 600))
+    email = tutor['email']
+
+    statuses = [login(client, email, f'10.2.1.{i // 4}').status_code for i in range(12)]
+
+    # Quatro tentativas por IP: só o balde do email, somado entre os IPs, barra
+    assert statuses == [401] * 8 + [429] * 4
+    assert login(client, email, '10.2.1.9', PASSWORD).status_code == 429
+
+
+def test_client_ip_behind_proxy(client, fake, limited, monkeypatch):
+    monkeypatch.setattr(rate_limit, 'RATE_LIMIT_PROXY_HOPS', 1)
+    for i in range(20):
+        headers = {'X-Forwarded-For': f'1.1.1.{i}, 10.3.0.1'}
+        assert login(client, f'p{i}@proxy.teste', '172.16.0.1', headers=headers).status_code == 401
+
+    # O cliente não escolhe o início da lista
+    blocked = login(client, 'p99@proxy.teste', '172.16.0.1', headers={'X-Forwarded-For': '9.9.9.9, 10.3.0.1'})
+
+    assert blocked.status_code == 429
+    assert login(client, 'p99@proxy.teste', '172.16.0.1', headers={'X-Forwarded-For': '10.3.0.2'}).status_code == 401
+
+
+def test_register_routes_share_bucket(client, fake, limited):
+    body = {'nome': 'Tutor', 'senha': PASSWORD, 'telefone': '11999998888', 'nome_clinica': 'C'}
+
+    statuses = [client.post(f'/api/auth/register/{"tutor" if i % 2 else "clinica"}',
+                            json={**body, 'email': f'r{i}@cadastro.teste'},
+                            environ_base={'REMOTE_ADDR': '10.4.0.1'}).status_code for i in range(6)]
+
+    assert statuses == [201] * 5 + [429]
+
+
+def test_contact_email_limit(client, fake, limited):
+    contact = {'nome': 'Spam', 'mensagem': 'Compre já', 'email': 'spam@bot.teste'}
+
+    statuses = [client.post('/api/contact/', json=contact, environ_base={'REMOTE_ADDR': f'10.5.0.{i}'}).status_code
+                for i in range(4)]
+
+    assert statuses == [201] * 3 + [429]
+
+
+def test_body_without_json(client, fake, limited):
+    # A rota responde como antes (só o limite por IP se aplica)
+    assert client.post('/api/contact/', data='x', environ_base={'REMOTE_ADDR': '10.6.0.1'}).status_code == 500
+
+
+def test_disabled_limit(client, tutor):
+    assert all(login(client, tutor['email'], '10.2.0.1').status_code == 401 for _ in range(10))
+
+
+def test_shared_bucket_across_workers(shared_engine):
+    policy = RateLimitPolicy(10, 600)
+    # Dois workers: cada um com seu balde local, o compartilhado soma os dois
+    workers = [RateLimiter(MemoryBackend(100), DatabaseBackend()) for _ in range(2)]
+    key = bucket_key('login', 'email', 'alvo@teste')
+
+    assert sum(1 for i in range(30) if not workers[i % 2].hit(key, policy)) == 10
+
+
+def test_concurrent_consumption_grants_no_extra_tokens(shared_engine):
+    policy = RateLimitPolicy(10, 600)
+    key = bucket_key('login', 'email', 'concorrente@teste')
+    shared = DatabaseBackend()
+    results = []
+
+    def worker():
+        for _ in range(10):
+            results.append(shared.consume(key, policy))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(1 for wait in results if not wait) == 10
+
+
+def test_shared_backend_down_falls_back_to_local():
+    limiter = RateLimiter(MemoryBackend(100), BrokenBackend())
+    key = bucket_key('login', 'ip', '10.9.9.9')
+
+    assert sum(1 for _ in range(15) if not limiter.hit(key, RateLimitPolicy(10, 600))) == 10
+    assert limiter.shared_errors == 10
@@ -0,0 +1,95 @@
+"""
+Busca de animais (GET /api/animals/search, RPC buscar_animais)
+"""
+import pytest
+
+from benchmarks.common import SENHA_HASH
+
+
+@pytest.fixture
+def base(engine, fake, auth):
+    """
+    Uma clínica com 30 animais (nomes acentuados e repetidos) de dois tutores, mais um
+    tutor de outra clínica com o mesmo sobrenome
+    """
+    clinics = engine.table('usuarios_clinicas').insert([
+        {'nome_clinica': f'Clínica {i}', 'email': f'clinica{i}@busca.local', 'senha_hash': SENHA_HASH}
+        for i in range(2)
+    ]).execute().data
+    tutors = engine.table('usuarios_tutores').insert([
+        {'nome': name, 'email': f'tutor{i}@busca.local', 'senha_hash': SENHA_HASH}
+        for i, name in enumerate(['Ana Conceição', 'José Souza', 'Maria Conceição'])
+    ]).execute().data
+    names = ['Paçoca', 'Zeferino Quixabá', "O'Neil"] + [f'Thor {i}' for i in range(25)] + ['Thorzinho', 'Mel']
+    animals = engine.table('animais').insert([
+        {'nome': name, 'especie': 'Cão', 'tutor_id': tutors[i % 2]['id'], 'clinica_id': clinics[0]['id']}
+        for i, name in enumerate(names)
+    ]).execute().data
+    animals += engine.table('animais').insert([
+        {'nome': 'Thor da Maria', 'especie': 'Cão', 'tutor_id': tutors[2]['id'], 'clinica_id': clinics[1]['id']}
+    ]).execute().data
+    return {
+        'animals': animals,
+        'tutors': tutors,
+        'clinic': auth(clinics[0]['id'], 'clinica'),
+        'tutor': auth(tutors[0]['id'], 'tutor'),
+    }
+
+
+def search(client, headers, **params):
+    response = client.get('/api/animals/search', query_string=params, headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_accents_and_case_are_ignored(client, base):
+    rare = search(client, base['clinic'], q='QUIXABA')['animals']
+    accented = search(client, base['clinic'], q='paçoca')['animals']
+    unaccented = search(client, base['clinic'], q='pacoca')['animals']
+
+    assert [a['nome_animal'] for a in rare] == ['Zeferino Quixabá']
+    assert accented and [a['id'] for a in accented] == [a['id'] for a in unaccented]
+
+
+@pytest.mark.parametrize('term', ['%', '_', 'a,id.neq.0', 'thor),or(ativo.eq.false', '"thor"', "o'neil"])
+def test_wildcards_and_filter_syntax_are_plain_text(client, base, term):
+    found = search(client, base['clinic'], q=term)['animals']
+
+    assert [a['nome_animal'] for a in found] == (["O'Neil"] if term == "o'neil" else [])
+
+
+def test_tutor_only_finds_own_animals(client, base):
+    own = {a['id'] for a in base['animals'] if a['tutor_id'] == base['tutors'][0]['id']}
+
+    found = search(client, base['tutor'], q='Conceição', limit=200)['animals']
+
+    assert {a['id'] for a in found} == own
+
+
+def test_clinic_only_finds_its_animals(client, base):
+    found = search(client, base['clinic'], q='thor', limit=200)['animals']
+
+    assert len(found) == 26
+    assert 'Thor da Maria' not in {a['nome_animal'] for a in found}
+
+
+def test_pages_follow_relevance_without_repetition(client, base):
+    full = search(client, base['clinic'], q='thor', limit=200)['animals']
+    walked, cursor = [], None
+    while True:
+        body = search(client, base['clinic'], q='thor', limit=7, **({'cursor': cursor} if cursor else {}))
+        walked += body['animals']
+        cursor = body['next_cursor']
+        if cursor is None:
+            break
+
+    assert [a['id'] for a in walked] == [a['id'] for a in full]
+    scores = [a['relevancia'] for a in walked]
+    assert scores == sorted(scores, reverse=True)
+
+
+@pytest.mark.parametrize('query', [{'q': 'x' * 500}, {'q': 'thor', 'order': 'asc'}])
+def test_invalid_search(client, base, query):
+    response = client.get('/api/animals/search', query_string=query, headers=base['clinic'])
+
+    assert response.status_code == 400
@@ -0,0 +1,106 @@
+"""
+Arquivos estáticos do frontend servidos do manifesto em memória (src/utils/static_assets.py)
+"""
+import gzip
+import os
+
+import pytest
+
+from benchmarks.bench_static import CSS_NAME, IMAGE_NAME, JS_NAME, write_build
+from src import main as server
+from src.utils import compression
+from src.utils.static_assets import IMMUTABLE_CACHE_CONTROL, StaticAssets
+
+BOTH = {'Accept-Encoding': 'br, gzip'}
+BEST = 'br' if compression.brotli is not None else 'gzip'
+
+
+@pytest.fixture
+def build(tmp_path):
+    root = str(tmp_path)
+    return root, write_build(root, 20000)
+
+
+@pytest.fixture
+def client(app, build, monkeypatch):
+    monkeypatch.setattr(server, 'static_assets', StaticAssets(build[0]).load())
+    return app.test_client()
+
+
+@pytest.fixture
+def files(build):
+    return build[1]
+
+
+def decode(response) -> bytes:
+    encoding = response.headers.get('Content-Encoding')
+    if encoding == 'br':
+        return compression.brotli.decompress(response.data)
+    if encoding == 'gzip':
+        return gzip.decompress(response.data)
+    return response.data
+
+
+def test_cache_policy_by_file(client):
+    assert client.get(f'/{JS_NAME}').headers['Cache-Control'] == IMMUTABLE_CACHE_CONTROL
+    assert client.get(f'/{IMAGE_NAME}').headers['Cache-Control'] == IMMUTABLE_CACHE_CONTROL
+    assert client.get('/').headers['Cache-Control'] == 'no-cache'
+    assert 'max-age=' in client.get('/favicon.svg').headers['Cache-Control']
+
+
+@pytest.mark.parametrize('accept, expected', [
+    ('br, gzip', BEST),
+    ('gzip', 'gzip'),
+    ('identity', None),
+    ('', None),
+    ('br;q=0.1, gzip;q=0.9', 'gzip'),
+])
+def test_encoding_negotiation(client, files, accept, expected):
+    response = client.get(f'/{JS_NAME}', headers={'Accept-Encoding': accept})
+
+    assert response.headers.get('Content-Encoding') == expected
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert decode(response) == files[JS_NAME]
+
+
+def test_binary_files_are_not_compressed(client, files):
+    image = client.get(f'/{IMAGE_NAME}', headers=BOTH)
+
+    assert 'Content-Encoding' not in image.headers and image.data == files[IMAGE_NAME]
+
+
+def test_not_modified_per_variant(client):
+    compressed = client.get(f'/{JS_NAME}', headers=BOTH)
+    etag = compressed.headers['ETag']
+
+    # A ETag da versão comprimida não vale para a versão sem compressão
+    assert client.get(f'/{JS_NAME}', headers={**BOTH, 'If-None-Match': etag}).status_code == 304
+    assert client.get(f'/{JS_NAME}', headers={'If-None-Match': etag}).status_code == 200
+    assert client.get('/', headers={'If-Modified-Since': compressed.headers['Last-Modified']}).status_code == 304
+
+
+def test_range_and_head(client, files):
+    partial = client.get(f'/{IMAGE_NAME}', headers={'Range': 'bytes=0-99'})
+    head = client.head(f'/{JS_NAME}', headers=BOTH)
+
+    assert partial.status_code == 206 and partial.data == files[IMAGE_NAME][:100]
+    assert head.status_code == 200 and head.data == b'' and head.headers['Content-Encoding'] == BEST
+
+
+def test_spa_fallback_and_missing_assets(client, files):
+    assert client.get('/painel/animais/123').data == files['index.html']
+    assert client.get('/assets/index-naoexiste.js').status_code == 404
+    # Nada fora da pasta do build
+    assert client.get('/../main.py').data == files['index.html']
+
+
+def test_build_gzip_variant_is_used(build):
+    root, files = build
+    built = gzip.compress(files[CSS_NAME], compresslevel=1)
+    with open(os.path.join(root, CSS_NAME + '.gz'), 'wb') as f:
+        f.write(built)
+
+    assets = StaticAssets(root).load()
+
+    assert CSS_NAME + '.gz' not in assets.files
+    assert assets.files[CSS_NAME].variants['gzip'] == built
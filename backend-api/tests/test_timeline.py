@@ -0,0 +1,132 @@
+"""
+Linha do tempo médica do animal (GET /api/animals/<id>/timeline)
+"""
+import uuid
+
+import pytest
+
+from benchmarks.bench_timeline import VIEW, timeline
+from benchmarks.common import seed
+
+
+@pytest.fixture
+def history(engine, fake, auth):
+    data = seed(engine, tutors=3, clinics=3, animals_per_tutor=2, appointments_per_animal=1, text_size=10)
+    clinic, visiting, stranger = data['clinics']
+    animal = next(a for a in data['animals'] if a['clinica_id'] == clinic['id'])
+    other_animal = next(a for a in data['animals'] if a['id'] != animal['id'])
+    # Sem agendamentos da clínica estranha com o animal; a visitante só tem um agendamento
+    engine.table('agendamentos').delete().eq('animal_id', animal['id']).neq('clinica_id', clinic['id']).execute()
+
+    def appointment(day, hour, status, clinica=clinic, target=animal):
+        return engine.table('agendamentos').insert({
+            'tutor_id': target['tutor_id'], 'clinica_id': clinica['id'], 'animal_id': target['id'],
+            'data_agendamento': day, 'horario': hour, 'status': status, 'tipo_consulta': 'Retorno', 'valor': 120
+        }).execute().data[0]
+
+    done = appointment('2026-03-10', '14:00', 'concluido')
+    appointment('2026-03-10', '09:30', 'cancelado', clinica=visiting)
+    consultation = engine.table('consultas').insert({
+        'agendamento_id': done['id'], 'animal_id': animal['id'], 'clinica_id': clinic['id'],
+        'data_consulta': '2026-03-10T14:20:00+00:00', 'diagnostico': 'Otite', 'tratamento': 'Limpeza',
+        'medicamentos': 'Otosporin', 'valor': 150, 'proxima_consulta': '2026-04-10'
+    }).execute().data[0]
+    for name, applied in [('V10', '2026-03-10'), ('Antirrábica', '2025-03-10'), ('Giárdia', '2026-03-10')]:
+        engine.table('vacinas').insert({'animal_id': animal['id'], 'clinica_id': clinic['id'], 'nome_vacina': name,
+                                        'data_aplicacao': applied, 'data_vencimento': '2027-03-10'}).execute()
+    appointment('2026-01-05', '08:00', 'concluido', target=other_animal)
+    other_tutor = next(t for t in data['tutors'] if t['id'] != animal['tutor_id'])
+    return {
+        'animal': animal['id'],
+        'clinic': clinic,
+        'done': done,
+        'consultation': consultation,
+        'tutor': auth(animal['tutor_id'], 'tutor'),
+        'other_tutor': auth(other_tutor['id'], 'tutor'),
+        'clinic_headers': auth(clinic['id'], 'clinica'),
+        'visiting': auth(visiting['id'], 'clinica'),
+        'stranger': auth(stranger['id'], 'clinica'),
+    }
+
+
+def all_pages(client, animal: str, headers: dict, **params) -> list:
+    events, cursor = [], None
+    while True:
+        extra = {**params, 'cursor': cursor} if cursor else params
+        response = timeline(client, animal, headers, **extra)
+        assert response.status_code == 200
+        payload = response.get_json()
+        events += payload['timeline']
+        cursor = payload['next_cursor']
+        if cursor is None:
+            return events
+
+
+@pytest.mark.parametrize('user, status', [
+    ('tutor', 200),
+    ('other_tutor', 404),
+    ('clinic_headers', 200),
+    # Clínica com um agendamento com o animal
+    ('visiting', 200),
+    ('stranger', 403),
+])
+def test_permissions(client, history, user, status):
+    assert timeline(client, history['animal'], history[user]).status_code == status
+
+
+def test_invalid_requests(client, history):
+    assert timeline(client, 'nao-e-uuid', history['tutor']).status_code == 400
+    assert timeline(client, str(uuid.uuid4()), history['clinic_headers']).status_code == 404
+    assert timeline(client, history['animal'], history['tutor'], tipo='exame').status_code == 400
+    assert timeline(client, history['animal'], history['tutor'], order='lado').status_code == 400
+
+
+def test_chronological_order_across_tables(client, history):
+    events = timeline(client, history['animal'], history['tutor']).get_json()['timeline']
+
+    # O mais recente primeiro, só do animal
+    assert {e['tipo'] for e in events} == {'consulta', 'vacina', 'agendamento'}
+    keys = [(e['data'], e['id']) for e in events]
+    assert keys == sorted(keys, reverse=True) and len(events) == 1 + 3 + 3
+    # seed deixa um agendamento futuro, o primeiro da lista; a vacina de 2025 é a última
+    assert events[0]['tipo'] == 'agendamento' and events[-1]['titulo'] == 'Antirrábica'
+    consultation, done = history['consultation']['id'], history['done']['id']
+    assert [e['id'] for e in events[1:3]] == [consultation, done]
+    by_id = {e['id']: e for e in events}
+    assert by_id[consultation]['data'] == '2026-03-10T14:20:00'
+    assert by_id[consultation]['medicamentos'] == 'Otosporin'
+    assert by_id[consultation]['nome_clinica'] == history['clinic']['nome_clinica']
+    assert by_id[done]['data'] == '2026-03-10T14:00:00' and by_id[done]['status'] == 'concluido'
+    ascending = timeline(client, history['animal'], history['tutor'], order='asc').get_json()['timeline']
+    assert ascending == events[::-1]
+
+
+def test_type_filter(client, history):
+    vaccines = timeline(client, history['animal'], history['tutor'], tipo='vacina').get_json()['timeline']
+    mixed = timeline(client, history['animal'], history['tutor'], tipo='consulta,agendamento').get_json()['timeline']
+
+    assert [e['tipo'] for e in vaccines] == ['vacina'] * 3 and vaccines[0]['proxima_data'] == '2027-03-10'
+    assert len(mixed) == 4 and {e['tipo'] for e in mixed} == {'consulta', 'agendamento'}
+
+
+@pytest.mark.parametrize('order', ['desc', 'asc'])
+def test_small_pages_match_single_page(client, fake, history, order):
+    # 3 vacinas e o agendamento da visitante no mesmo dia atravessam as páginas
+    single = timeline(client, history['animal'], history['tutor'], order=order).get_json()['timeline']
+    fake.calls.clear()
+
+    assert all_pages(client, history['animal'], history['tutor'], limit=2, order=order) == single
+    # Uma chamada à view por página
+    assert fake.calls[VIEW] == 4
+
+
+def test_view_reads_each_table_by_animal_index(engine, history):
+    with engine.pool.connection() as conn:
+        plan = ' '.join(row[-1] for row in conn.execute(
+            f'EXPLAIN QUERY PLAN SELECT * FROM {VIEW} WHERE animal_id = ? ORDER BY data DESC, id DESC LIMIT 51',
+            [history['animal']]))
+
+    # A união é filtrada pelo animal dentro de cada parte
+    assert 'idx_consultas_animal_id' in plan and 'idx_agendamentos_animal_id' in plan
+    assert 'idx_vacinas_animal_id' in plan or 'idx_vacinas_animal_aplicacao' in plan
+    assert 'SCAN co' not in plan and 'SCAN v' not in plan and 'SCAN ag' not in plan
@@ -0,0 +1,63 @@
+"""
+Cache LRU com validade e geração compartilhado pelos caches da API (src/utils/ttl_cache.py)
+"""
+from src.utils.ttl_cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entry_expires_after_ttl():
+    clock = FakeClock()
+    cache = TTLCache(10, 30, clock=clock)
+    cache.set('a', 1)
+
+    clock.now += 29
+    assert cache.get('a') == 1
+    clock.now += 1
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1 and cache.stats()['size'] == 0
+
+
+def test_entry_expires_at_its_own_deadline():
+    clock = FakeClock()
+    cache = TTLCache(10, 30, clock=clock)
+    cache.set('a', 1, expires_at=clock.now + 5)
+
+    clock.now += 5
+    assert cache.get('a') is None
+
+
+def test_least_recently_used_is_evicted():
+    cache = TTLCache(2, 30)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+
+    cache.set('c', 3)
+
+    assert cache.get('b') is None and cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evicted'] == 1
+
+
+def test_write_from_before_invalidation_is_dropped():
+    cache = TTLCache(10, 30)
+    generation = cache.generation
+    cache.invalidate('a')
+
+    cache.set('a', 'antigo', generation)
+    assert cache.get('a') is None
+    cache.set('a', 'novo', cache.generation)
+    assert cache.get('a') == 'novo'
+
+
+def test_disabled_cache_stores_nothing():
+    cache = TTLCache(10, 0)
+    cache.set('a', 1)
+
+    assert cache.get('a') is None and cache.stats()['size'] == 0
@@ -0,0 +1,178 @@
+"""
+Vacinas: CRUD das clínicas e varredura de vencimentos (src/routes/vaccines.py e src/utils/vaccine_reminders.py)
+"""
+from datetime import date, timedelta
+
+import pytest
+
+from benchmarks.common import seed
+from src.utils.vaccine_reminders import due_vaccine_pages
+
+TODAY = date.today()
+
+
+def days(n: int) -> str:
+    return (TODAY + timedelta(days=n)).isoformat()
+
+
+@pytest.fixture
+def base(engine, fake, auth):
+    data = seed(engine, tutors=3, clinics=2, animals_per_tutor=2, appointments_per_animal=1, text_size=10)
+    clinic, other_clinic = data['clinics']
+    # seed distribui os animais entre as clínicas; os da clínica têm agendamento com ela
+    own = [a for a in data['animals'] if a['clinica_id'] == clinic['id']]
+    foreign = [a for a in data['animals'] if a['clinica_id'] != clinic['id']][0]
+    engine.table('agendamentos').delete().eq('animal_id', foreign['id']).eq('clinica_id', clinic['id']).execute()
+    return {
+        **data,
+        'clinic': clinic,
+        'own': own,
+        'foreign': foreign,
+        'clinic_headers': auth(clinic['id'], 'clinica'),
+        'other_headers': auth(other_clinic['id'], 'clinica'),
+        'tutor_headers': auth(data['tutors'][0]['id'], 'tutor'),
+        'owner_headers': auth(own[0]['tutor_id'], 'tutor'),
+    }
+
+
+@pytest.fixture
+def post(client, base):
+    def post(body, headers=None):
+        return client.post('/api/vaccines/', json=body, headers=headers or base['clinic_headers'])
+    return post
+
+
+@pytest.fixture
+def body(base):
+    return {'animal_id': base['own'][0]['id'], 'nome_vacina': 'V10', 'data_aplicacao': days(-340),
+            'data_vencimento': days(25), 'lote': 'L1'}
+
+
+@pytest.fixture
+def vaccine(post, body):
+    return post(body).get_json()['vaccine']
+
+
+@pytest.fixture
+def due(post):
+    def due(animal, name, applied_days_ago, due_in):
+        return post({'animal_id': animal['id'], 'nome_vacina': name, 'data_aplicacao': days(-applied_days_ago),
+                     'data_vencimento': days(due_in)}).get_json()['vaccine']
+    return due
+
+
+def test_create(post, body, base):
+    response = post(body)
+
+    assert response.status_code == 201
+    vaccine = response.get_json()['vaccine']
+    assert vaccine['clinica_id'] == base['clinic']['id'] and vaccine['lote'] == 'L1'
+
+
+def test_create_permissions(post, body, base):
+    assert post(body, base['tutor_headers']).status_code == 403
+    assert post({**body, 'animal_id': base['foreign']['id']}).status_code == 403
+    assert post({**body, 'animal_id': 'inexistente'}).status_code == 404
+
+
+@pytest.mark.parametrize('field, value', [
+    ('nome_vacina', '  '),
+    ('data_aplicacao', days(1)),
+    ('data_vencimento', days(-400)),
+    ('data_aplicacao', '15/01/2026'),
+    ('lote', 'x' * 101),
+])
+def test_create_validation(post, body, field, value):
+    assert post({**body, field: value}).status_code == 400
+
+
+def test_read_permissions(client, base, vaccine, auth):
+    url = f'/api/vaccines/{vaccine["id"]}'
+    animal = base['own'][0]
+    other_tutor = next(t for t in base['tutors'] if t['id'] != animal['tutor_id'])
+
+    assert client.get(url, headers=base['clinic_headers']).status_code == 200
+    assert client.get(url, headers=base['other_headers']).status_code == 404
+    assert client.get(url, headers=base['owner_headers']).status_code == 200
+    assert client.get('/api/vaccines/', headers=base['owner_headers']).status_code == 400
+    listed = client.get(f'/api/vaccines/?animal_id={animal["id"]}', headers=base['owner_headers']).get_json()
+    assert [v['id'] for v in listed['vaccines']] == [vaccine['id']]
+    assert client.get(f'/api/vaccines/?animal_id={animal["id"]}',
+                      headers=auth(other_tutor['id'], 'tutor')).status_code == 404
+
+
+def test_partial_update_is_validated_against_stored_row(client, base, vaccine):
+    url = f'/api/vaccines/{vaccine["id"]}'
+    headers = base['clinic_headers']
+
+    assert client.put(url, json={'data_vencimento': days(-400)}, headers=headers).status_code == 400
+    assert client.put(url, json={}, headers=headers).status_code == 400
+    assert client.put(url, json={'lote': 'L2'}, headers=base['other_headers']).status_code == 404
+    updated = client.put(url, json={'lote': 'L2'}, headers=headers).get_json()['vaccine']
+    assert updated['lote'] == 'L2' and updated['nome_vacina'] == 'V10'
+
+
+def test_delete(client, base, vaccine):
+    url = f'/api/vaccines/{vaccine["id"]}'
+
+    assert client.delete(url, headers=base['other_headers']).status_code == 404
+    assert client.delete(url, headers=base['clinic_headers']).status_code == 200
+    assert client.get(url, headers=base['clinic_headers']).status_code == 404
+
+
+def test_due_reminders(client, engine, base, vaccine, due):
+    own = base['own']
+    rabies = due(own[0], 'Antirrábica', 350, 10)
+    due(own[1], 'V10', 360, 5)
+    renewed = due(own[0], 'Gripe canina', 360, 3)
+    due(own[0], 'gripe CANINA', 2, 363)
+    outside = due(own[1], 'Giárdia', 300, 60)
+    inactive = own[2]
+    due(inactive, 'V10', 350, 8)
+    engine.table('animais').update({'ativo': False}).eq('id', inactive['id']).execute()
+
+    response = client.get('/api/vaccines/due?dias=30', headers=base['clinic_headers'])
+
+    assert response.status_code == 200
+    payload = response.get_json()
+    ids = [v['id'] for reminder in payload['reminders'] for v in reminder['vacinas']]
+    # Renovada, animal inativo e fora da janela ficam de fora
+    assert rabies['id'] in ids and vaccine['id'] in ids
+    assert renewed['id'] not in ids and outside['id'] not in ids and payload['total'] == len(ids) == 3
+    # Um lembrete por tutor e clínica
+    for reminder in payload['reminders']:
+        animal_ids = {v['animal']['id'] for v in reminder['vacinas']}
+        assert all(a['tutor_id'] == reminder['tutor']['id'] for a in base['animals'] if a['id'] in animal_ids)
+        assert reminder['clinica']['id'] == base['clinic']['id'] and reminder['tutor']['email']
+    # Primeiro o lembrete com o vencimento mais próximo
+    soonest = [min(v['data_vencimento'] for v in reminder['vacinas']) for reminder in payload['reminders']]
+    assert soonest == sorted(soonest)
+    assert client.get('/api/vaccines/due?dias=60', headers=base['clinic_headers']).get_json()['total'] == 4
+
+
+def test_due_permissions_and_validation(client, base, vaccine):
+    assert client.get('/api/vaccines/due?dias=-1', headers=base['clinic_headers']).status_code == 400
+    assert client.get('/api/vaccines/due', headers=base['tutor_headers']).status_code == 403
+    assert client.get('/api/vaccines/due', headers=base['other_headers']).get_json()['total'] == 0
+
+
+def test_small_pages_match_single_page(base, vaccine, due):
+    # Empates de data_vencimento atravessando as páginas; varredura sem filtro de clínica
+    for i in range(7):
+        due(base['own'][1], f'Reforço {i}', 300, 20)
+
+    single = [row['id'] for rows in due_vaccine_pages(30, page_size=1000) for row in rows]
+    paged = [row['id'] for rows in due_vaccine_pages(30, page_size=2) for row in rows]
+
+    assert paged == single and len(single) == len(set(single)) == 8
+
+
+def test_scan_uses_indexes(engine):
+    with engine.pool.connection() as conn:
+        plan = ' '.join(row[-1] for row in conn.execute(
+            'EXPLAIN QUERY PLAN SELECT * FROM view_vacinas_vencimento WHERE data_vencimento >= ? '
+            'AND data_vencimento <= ? ORDER BY data_vencimento, id LIMIT 1001', ['2026-01-01', '2026-02-01']))
+
+    # Faixa de datas pelo índice parcial, sem ordenar depois; renovação lida só do índice
+    assert 'idx_vacinas_vencimento' in plan and 'TEMP B-TREE' not in plan
+    assert 'COVERING INDEX idx_vacinas_animal_aplicacao' in plan
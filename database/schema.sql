@@ -6,6 +6,16 @@
 
 -- Extensões necessárias
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+-- Busca de animais por trechos do nome, sem acentos e tolerante a erros de digitação
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+-- Texto normalizado para a busca (minúsculas e sem acentos).
+-- unaccent() não é IMMUTABLE (depende do dicionário), então não pode ir direto em um índice.
+CREATE OR REPLACE FUNCTION normalizar_busca(texto TEXT)
+RETURNS TEXT AS $$
+    SELECT lower(unaccent('unaccent'::regdictionary, texto))
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
 
 -- =====================================================
 -- TABELA: usuarios_tutores
@@ -178,6 +188,17 @@ CREATE TABLE itens (
     atualizado_em TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- =====================================================
+-- TABELA: limites_requisicao
+-- Baldes do limite de requisições compartilhado entre os workers da API
+-- (RATE_LIMIT_BACKEND=database). Estado descartável: UNLOGGED evita o custo do WAL
+-- =====================================================
+CREATE UNLOGGED TABLE limites_requisicao (
+    chave TEXT PRIMARY KEY,
+    tokens DOUBLE PRECISION NOT NULL,
+    atualizado_em TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
 -- =====================================================
 -- ÍNDICES PARA OTIMIZAÇÃO DE PERFORMANCE
 -- =====================================================
@@ -185,6 +206,8 @@ CREATE TABLE itens (
 -- Índices para usuarios_tutores
 CREATE INDEX idx_usuarios_tutores_email ON usuarios_tutores(email);
 CREATE INDEX idx_usuarios_tutores_ativo ON usuarios_tutores(ativo);
+-- Busca por nome do tutor (buscar_animais)
+CREATE INDEX idx_usuarios_tutores_nome_busca ON usuarios_tutores USING gin (normalizar_busca(nome) gin_trgm_ops);
 
 -- Índices para usuarios_clinicas
 CREATE INDEX idx_usuarios_clinicas_email ON usuarios_clinicas(email);
@@ -195,6 +218,11 @@ CREATE INDEX idx_animais_tutor_id ON animais(tutor_id);
 CREATE INDEX idx_animais_clinica_id ON animais(clinica_id);
 CREATE INDEX idx_animais_nome ON animais(nome);
 CREATE INDEX idx_animais_ativo ON animais(ativo);
+-- Busca por trechos do nome (LIKE '%...%') e por semelhança (%>), usada por buscar_animais
+CREATE INDEX idx_animais_nome_busca ON animais USING gin (normalizar_busca(nome) gin_trgm_ops) WHERE ativo = true;
+-- Paginação por cursor das listagens (ordem criado_em, id)
+CREATE INDEX idx_animais_tutor_pagina ON animais(tutor_id, criado_em, id);
+CREATE INDEX idx_animais_clinica_pagina ON animais(clinica_id, criado_em, id);
 
 -- Índices para agendamentos
 CREATE INDEX idx_agendamentos_tutor_id ON agendamentos(tutor_id);
@@ -202,15 +230,34 @@ CREATE INDEX idx_agendamentos_clinica_id ON agendamentos(clinica_id);
 CREATE INDEX idx_agendamentos_animal_id ON agendamentos(animal_id);
 CREATE INDEX idx_agendamentos_data ON agendamentos(data_agendamento);
 CREATE INDEX idx_agendamentos_status ON agendamentos(status);
+-- Paginação por cursor das listagens (ordem data_agendamento, horario, id)
+CREATE INDEX idx_agendamentos_tutor_pagina ON agendamentos(tutor_id, data_agendamento, horario, id);
+CREATE INDEX idx_agendamentos_clinica_pagina ON agendamentos(clinica_id, data_agendamento, horario, id);
+-- Impede dois agendamentos ativos no mesmo horário da mesma clínica
+CREATE UNIQUE INDEX idx_agendamentos_horario_ativo ON agendamentos(clinica_id, data_agendamento, horario)
+    WHERE status IN ('pendente', 'aceito');
 
 -- Índices para consultas
 CREATE INDEX idx_consultas_animal_id ON consultas(animal_id);
 CREATE INDEX idx_consultas_clinica_id ON consultas(clinica_id);
 CREATE INDEX idx_consultas_data ON consultas(data_consulta);
+-- Exportação do histórico da clínica (paginação por cursor)
+CREATE INDEX idx_consultas_clinica_pagina ON consultas(clinica_id, data_consulta, id);
+-- Agendamento concluído sem consulta (estatisticas_clinica) e exclusão em cascata
+CREATE INDEX idx_consultas_agendamento_id ON consultas(agendamento_id);
 
 -- Índices para vacinas
 CREATE INDEX idx_vacinas_animal_id ON vacinas(animal_id);
 CREATE INDEX idx_vacinas_data_aplicacao ON vacinas(data_aplicacao);
+CREATE INDEX idx_vacinas_clinica_pagina ON vacinas(clinica_id, data_aplicacao, id);
+-- Lembretes de vacinas a vencer: faixa de datas percorrida em ordem pelo índice (cursor data_vencimento, id)
+CREATE INDEX idx_vacinas_vencimento ON vacinas(data_vencimento, id) WHERE data_vencimento IS NOT NULL;
+CREATE INDEX idx_vacinas_clinica_vencimento ON vacinas(clinica_id, data_vencimento, id) WHERE data_vencimento IS NOT NULL;
+-- Vacina renovada (view_vacinas_vencimento): aplicações posteriores do animal lidas só do índice
+CREATE INDEX idx_vacinas_animal_aplicacao ON vacinas(animal_id, data_aplicacao, nome_vacina);
+
+-- Índices para contatos (paginação por cursor)
+CREATE INDEX idx_contatos_pagina ON contatos(criado_em, id);
 
 -- =====================================================
 -- TRIGGERS PARA ATUALIZAÇÃO AUTOMÁTICA DE TIMESTAMPS
@@ -233,6 +280,214 @@ CREATE TRIGGER update_agendamentos_updated_at BEFORE UPDATE ON agendamentos FOR
 CREATE TRIGGER update_configuracoes_usuario_updated_at BEFORE UPDATE ON configuracoes_usuario FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 CREATE TRIGGER update_itens_updated_at BEFORE UPDATE ON itens FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- =====================================================
+-- FUNÇÕES (RPC)
+-- =====================================================
+
+-- Cria um agendamento em uma única ida ao banco.
+-- A verificação de conflito é feita pelo índice idx_agendamentos_horario_ativo,
+-- então duas reservas simultâneas no mesmo horário não passam ao mesmo tempo.
+-- Retorna {"agendamento": {...}} ou {"erro": "animal_nao_encontrado" | "clinica_nao_encontrada" | "horario_ocupado"}
+CREATE OR REPLACE FUNCTION criar_agendamento(
+    p_tutor_id UUID,
+    p_animal_id UUID,
+    p_email_clinica TEXT,
+    p_data_agendamento DATE,
+    p_horario TIME,
+    p_tipo_consulta TEXT DEFAULT 'Consulta Geral',
+    p_observacoes TEXT DEFAULT NULL
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_clinica_id UUID;
+    v_agendamento agendamentos;
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM animais WHERE id = p_animal_id AND tutor_id = p_tutor_id AND ativo = true
+    ) THEN
+        RETURN jsonb_build_object('erro', 'animal_nao_encontrado');
+    END IF;
+
+    SELECT id INTO v_clinica_id FROM usuarios_clinicas WHERE email = p_email_clinica AND ativo = true;
+    IF v_clinica_id IS NULL THEN
+        RETURN jsonb_build_object('erro', 'clinica_nao_encontrada');
+    END IF;
+
+    INSERT INTO agendamentos (tutor_id, clinica_id, animal_id, data_agendamento, horario, tipo_consulta, observacoes, status)
+    VALUES (p_tutor_id, v_clinica_id, p_animal_id, p_data_agendamento, p_horario, p_tipo_consulta, p_observacoes, 'pendente')
+    RETURNING * INTO v_agendamento;
+
+    RETURN jsonb_build_object('agendamento', to_jsonb(v_agendamento));
+EXCEPTION
+    WHEN unique_violation THEN
+        RETURN jsonb_build_object('erro', 'horario_ocupado');
+END;
+$$ LANGUAGE plpgsql;
+
+-- Busca de animais por nome do animal, nome do tutor ou id, sem diferenciar acentos e
+-- maiúsculas. Encontra trechos do nome e nomes parecidos (erros de digitação) pelos
+-- índices de trigramas e ordena por relevância (0 a 1, o id exato vale 1).
+-- p_tutor_id / p_clinica_id restringem a busca aos animais do tutor ou da clínica.
+-- Paginação por cursor: (p_apos_relevancia, p_apos_id) é a última linha da página anterior.
+CREATE OR REPLACE FUNCTION buscar_animais(
+    p_termo TEXT,
+    p_tutor_id UUID DEFAULT NULL,
+    p_clinica_id UUID DEFAULT NULL,
+    p_limite INTEGER DEFAULT 50,
+    p_apos_relevancia DOUBLE PRECISION DEFAULT NULL,
+    p_apos_id UUID DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    nome_animal VARCHAR,
+    especie VARCHAR,
+    raca VARCHAR,
+    idade INTEGER,
+    sexo VARCHAR,
+    foto_url TEXT,
+    nome_tutor VARCHAR,
+    email_tutor VARCHAR,
+    telefone_tutor VARCHAR,
+    nome_clinica VARCHAR,
+    criado_em TIMESTAMP WITH TIME ZONE,
+    relevancia NUMERIC
+) AS $$
+#variable_conflict use_column
+DECLARE
+    v_termo TEXT := normalizar_busca(trim(p_termo));
+    v_padrao TEXT;
+    v_id UUID;
+BEGIN
+    IF v_termo IS NULL OR v_termo = '' THEN
+        RETURN;
+    END IF;
+
+    -- Curingas do LIKE digitados na busca são tratados como texto
+    v_padrao := '%' || replace(replace(replace(v_termo, '\', '\\'), '%', '\%'), '_', '\_') || '%';
+    IF trim(p_termo) ~* '^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$' THEN
+        v_id := trim(p_termo)::uuid;
+    END IF;
+
+    RETURN QUERY
+    WITH candidatos AS (
+        SELECT a.id,
+               (similarity(normalizar_busca(a.nome), v_termo) + word_similarity(v_termo, normalizar_busca(a.nome))) / 2 AS nota
+        FROM animais a
+        WHERE a.ativo = true
+          AND (normalizar_busca(a.nome) LIKE v_padrao OR normalizar_busca(a.nome) %> v_termo)
+          AND (p_tutor_id IS NULL OR a.tutor_id = p_tutor_id)
+          AND (p_clinica_id IS NULL OR a.clinica_id = p_clinica_id)
+        UNION ALL
+        -- Nome do tutor pesa um pouco menos que o nome do animal
+        SELECT a.id,
+               (similarity(normalizar_busca(t.nome), v_termo) + word_similarity(v_termo, normalizar_busca(t.nome))) / 2 * 0.8
+        FROM usuarios_tutores t
+        JOIN animais a ON a.tutor_id = t.id
+        WHERE (normalizar_busca(t.nome) LIKE v_padrao OR normalizar_busca(t.nome) %> v_termo)
+          AND a.ativo = true
+          AND (p_tutor_id IS NULL OR a.tutor_id = p_tutor_id)
+          AND (p_clinica_id IS NULL OR a.clinica_id = p_clinica_id)
+        UNION ALL
+        SELECT a.id, 1.0
+        FROM animais a
+        WHERE a.id = v_id
+          AND a.ativo = true
+          AND (p_tutor_id IS NULL OR a.tutor_id = p_tutor_id)
+          AND (p_clinica_id IS NULL OR a.clinica_id = p_clinica_id)
+    ),
+    ranking AS (
+        SELECT c.id, round(max(c.nota)::numeric, 4) AS relevancia
+        FROM candidatos c
+        GROUP BY c.id
+    )
+    SELECT v.id, v.nome_animal, v.especie, v.raca, v.idade, v.sexo, v.foto_url, v.nome_tutor,
+           v.email_tutor, v.telefone_tutor, v.nome_clinica, v.criado_em, r.relevancia
+    FROM ranking r
+    JOIN view_animais_completo v ON v.id = r.id
+    WHERE p_apos_id IS NULL OR (r.relevancia, r.id) < (p_apos_relevancia, p_apos_id)
+    ORDER BY r.relevancia DESC, r.id DESC
+    LIMIT p_limite;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Limite de requisições (token bucket): consome p_custo fichas do balde p_chave, que guarda
+-- até p_capacidade fichas e recarrega p_por_segundo fichas por segundo.
+-- O upsert trava a linha, então consumos simultâneos da mesma chave são serializados.
+-- Retorna {"permitido": true, "espera": 0} ou {"permitido": false, "espera": <segundos até haver ficha>}
+CREATE OR REPLACE FUNCTION consumir_limite(
+    p_chave TEXT,
+    p_capacidade DOUBLE PRECISION,
+    p_por_segundo DOUBLE PRECISION,
+    p_custo DOUBLE PRECISION DEFAULT 1
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_agora TIMESTAMP WITH TIME ZONE := clock_timestamp();
+    v_tokens DOUBLE PRECISION;
+BEGIN
+    INSERT INTO limites_requisicao AS l (chave, tokens, atualizado_em)
+    VALUES (p_chave, p_capacidade, v_agora)
+    ON CONFLICT (chave) DO UPDATE
+        SET tokens = LEAST(p_capacidade, l.tokens + EXTRACT(EPOCH FROM (v_agora - l.atualizado_em)) * p_por_segundo),
+            atualizado_em = v_agora
+    RETURNING tokens INTO v_tokens;
+
+    -- De vez em quando remove baldes parados há um dia (já estariam cheios)
+    IF random() < 0.001 THEN
+        DELETE FROM limites_requisicao WHERE atualizado_em < v_agora - INTERVAL '1 day';
+    END IF;
+
+    IF v_tokens < p_custo THEN
+        RETURN jsonb_build_object('permitido', false, 'espera', (p_custo - v_tokens) / p_por_segundo);
+    END IF;
+
+    UPDATE limites_requisicao SET tokens = v_tokens - p_custo WHERE chave = p_chave;
+    RETURN jsonb_build_object('permitido', true, 'espera', 0);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Painel da clínica no período [p_inicio, p_fim], em uma ida ao banco e agregado com GROUP BY:
+-- o resultado tem o mesmo tamanho qualquer que seja o histórico (no máximo um grupo por dia e
+-- status). Lê só o período, pelos índices idx_agendamentos_clinica_pagina e idx_consultas_clinica_pagina.
+-- nao_comparecimento: aceitos com data anterior a p_hoje que não foram concluídos.
+-- receita_sem_consulta: valor dos agendamentos concluídos que não têm consulta registrada
+-- (o valor da consulta, quando existe, substitui o do agendamento).
+-- pendentes: aguardando resposta a partir de p_hoje (fora do período).
+-- Retorna {"por_dia": [{"data", "status", "total"}], "pacientes", "pendentes", "nao_comparecimento",
+--          "receita_agendamentos", "receita_consultas", "receita_sem_consulta"}
+CREATE OR REPLACE FUNCTION estatisticas_clinica(
+    p_clinica_id UUID,
+    p_inicio DATE,
+    p_fim DATE,
+    p_hoje DATE DEFAULT CURRENT_DATE
+)
+RETURNS JSONB AS $$
+    WITH periodo AS (
+        SELECT id, data_agendamento, status, valor, animal_id
+        FROM agendamentos
+        WHERE clinica_id = p_clinica_id AND data_agendamento BETWEEN p_inicio AND p_fim
+    ),
+    por_dia AS (
+        SELECT data_agendamento AS data, status, count(*) AS total
+        FROM periodo
+        GROUP BY data_agendamento, status
+    )
+    SELECT jsonb_build_object(
+        'por_dia', COALESCE((SELECT jsonb_agg(jsonb_build_object('data', data, 'status', status, 'total', total)
+                                              ORDER BY data, status) FROM por_dia), '[]'::jsonb),
+        'pacientes', (SELECT count(DISTINCT animal_id) FROM periodo WHERE status <> 'cancelado' AND status <> 'recusado'),
+        'pendentes', (SELECT count(*) FROM agendamentos
+                      WHERE clinica_id = p_clinica_id AND data_agendamento >= p_hoje AND status = 'pendente'),
+        'nao_comparecimento', (SELECT count(*) FROM periodo WHERE status = 'aceito' AND data_agendamento < p_hoje),
+        'receita_agendamentos', (SELECT COALESCE(sum(valor), 0) FROM periodo WHERE status = 'concluido'),
+        'receita_consultas', (SELECT COALESCE(sum(valor), 0) FROM consultas
+                              WHERE clinica_id = p_clinica_id AND data_consulta >= p_inicio AND data_consulta < p_fim + 1),
+        'receita_sem_consulta', (SELECT COALESCE(sum(p.valor), 0) FROM periodo p
+                                 WHERE p.status = 'concluido'
+                                   AND NOT EXISTS (SELECT 1 FROM consultas c WHERE c.agendamento_id = p.id))
+    );
+$$ LANGUAGE sql STABLE;
+
 -- =====================================================
 -- POLÍTICAS RLS (ROW LEVEL SECURITY) - OPCIONAL
 -- Para maior segurança, descomente se necessário
@@ -272,7 +527,8 @@ SELECT
     t.email AS email_tutor,
     t.telefone AS telefone_tutor,
     c.nome_clinica,
-    a.criado_em
+    a.criado_em,
+    a.atualizado_em
 FROM animais a
 JOIN usuarios_tutores t ON a.tutor_id = t.id
 LEFT JOIN usuarios_clinicas c ON a.clinica_id = c.id
@@ -294,12 +550,92 @@ SELECT
     t.telefone AS telefone_tutor,
     c.nome_clinica,
     c.email AS email_clinica,
+    ag.tutor_id,
+    ag.clinica_id,
+    ag.animal_id,
     ag.criado_em
 FROM agendamentos ag
 JOIN animais an ON ag.animal_id = an.id
 JOIN usuarios_tutores t ON ag.tutor_id = t.id
 JOIN usuarios_clinicas c ON ag.clinica_id = c.id;
 
+-- View de vacinas com vencimento, com animal, tutor e clínica (lembretes de vacinação).
+-- Só animais e tutores ativos; uma vacina renovada (mesmo nome aplicado de novo no animal)
+-- sai da lista. Filtrada por faixa de data_vencimento, usa idx_vacinas_vencimento.
+CREATE VIEW view_vacinas_vencimento AS
+SELECT
+    v.id,
+    v.data_vencimento,
+    v.nome_vacina,
+    v.data_aplicacao,
+    v.lote,
+    v.animal_id,
+    an.nome AS nome_animal,
+    an.especie,
+    an.tutor_id,
+    t.nome AS nome_tutor,
+    t.email AS email_tutor,
+    t.telefone AS telefone_tutor,
+    v.clinica_id,
+    c.nome_clinica,
+    c.email AS email_clinica,
+    c.telefone AS telefone_clinica
+FROM vacinas v
+JOIN animais an ON v.animal_id = an.id AND an.ativo = true
+JOIN usuarios_tutores t ON an.tutor_id = t.id AND t.ativo = true
+LEFT JOIN usuarios_clinicas c ON v.clinica_id = c.id
+WHERE v.data_vencimento IS NOT NULL
+  AND NOT EXISTS (
+      SELECT 1 FROM vacinas r
+      WHERE r.animal_id = v.animal_id
+        AND lower(r.nome_vacina) = lower(v.nome_vacina)
+        AND r.data_aplicacao > v.data_aplicacao
+  );
+
+-- Linha do tempo médica do animal: consultas, vacinas e agendamentos em uma só leitura,
+-- em ordem cronológica por (data, id). Filtrada por animal_id, cada parte da união lê o
+-- índice do animal (idx_consultas_animal_id, idx_vacinas_animal_id, idx_agendamentos_animal_id).
+-- data: consultas pela data_consulta, vacinas pela data_aplicacao, agendamentos pelo dia e horário.
+CREATE VIEW view_linha_do_tempo_animal AS
+SELECT
+    e.tipo,
+    e.id,
+    e.animal_id,
+    e.data,
+    e.titulo,
+    e.descricao,
+    e.medicamentos,
+    e.veterinario,
+    e.status,
+    e.valor,
+    e.proxima_data,
+    e.clinica_id,
+    c.nome_clinica
+FROM (
+    SELECT 'consulta'::VARCHAR(20) AS tipo, co.id, co.animal_id, co.data_consulta::TIMESTAMP AS data,
+           co.diagnostico AS titulo, co.tratamento AS descricao, co.medicamentos, co.veterinario,
+           NULL::VARCHAR(20) AS status, co.valor, co.proxima_consulta AS proxima_data, co.clinica_id
+    FROM consultas co
+    UNION ALL
+    SELECT 'vacina', v.id, v.animal_id, v.data_aplicacao::TIMESTAMP,
+           v.nome_vacina, v.observacoes, NULL, v.veterinario,
+           NULL, NULL, v.data_vencimento, v.clinica_id
+    FROM vacinas v
+    UNION ALL
+    SELECT 'agendamento', ag.id, ag.animal_id, ag.data_agendamento + ag.horario,
+           ag.tipo_consulta, ag.observacoes, NULL, NULL,
+           ag.status, ag.valor, NULL, ag.clinica_id
+    FROM agendamentos ag
+) e
+LEFT JOIN usuarios_clinicas c ON e.clinica_id = c.id;
+
+-- =====================================================
+-- MANUTENÇÃO (OPCIONAL)
+-- O QR Code agora é gerado sob demanda em /api/animals/{id}/qr.
+-- Para remover as imagens base64 antigas gravadas em animais.qr_code_url:
+-- UPDATE animais SET qr_code_url = NULL WHERE qr_code_url LIKE 'data:image/%';
+-- =====================================================
+
 -- =====================================================
 -- FIM DO SCRIPT
 -- =====================================================
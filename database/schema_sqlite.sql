@@ -0,0 +1,285 @@
+-- =====================================================
+-- ESQUEMA EQUIVALENTE EM SQLITE
+-- Usado como banco local em benchmarks e testes (DATABASE_URL=sqlite://)
+-- Mantém os mesmos nomes de tabelas, colunas e views do schema.sql
+-- As funções (RPC) estão em backend-api/src/database/sqlite_functions.py
+-- =====================================================
+
+CREATE TABLE usuarios_tutores (
+    id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(16)))),
+    nome TEXT NOT NULL,
+    email TEXT UNIQUE NOT NULL,
+    senha_hash TEXT NOT NULL,
+    telefone TEXT,
+    endereco TEXT,
+    cidade TEXT,
+    estado TEXT,
+    cep TEXT,
+    ativo BOOLEAN DEFAULT 1,
+    criado_em TEXT DEFAULT CURRENT_TIMESTAMP,
+    atualizado_em TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE usuarios_clinicas (
+    id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(16)))),
+    nome_clinica TEXT NOT NULL,
+    email TEXT UNIQUE NOT NULL,
+    senha_hash TEXT NOT NULL,
+    telefone TEXT,
+    endereco TEXT,
+    cidade TEXT,
+    estado TEXT,
+    cep TEXT,
+    cnpj TEXT,
+    responsavel_tecnico TEXT,
+    crmv TEXT,
+    horario_funcionamento TEXT,
+    ativo BOOLEAN DEFAULT 1,
+    criado_em TEXT DEFAULT CURRENT_TIMESTAMP,
+    atualizado_em TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE animais (
+    id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(16)))),
+    nome TEXT NOT NULL,
+    especie TEXT NOT NULL,
+    raca TEXT,
+    idade INTEGER,
+    peso REAL,
+    cor TEXT,
+    sexo TEXT CHECK (sexo IN ('Macho', 'Fêmea')),
+    castrado BOOLEAN DEFAULT 0,
+    foto_url TEXT,
+    qr_code_url TEXT,
+    historico_medico TEXT,
+    observacoes TEXT,
+    tutor_id TEXT NOT NULL REFERENCES usuarios_tutores(id) ON DELETE CASCADE,
+    clinica_id TEXT REFERENCES usuarios_clinicas(id) ON DELETE SET NULL,
+    ativo BOOLEAN DEFAULT 1,
+    criado_em TEXT DEFAULT CURRENT_TIMESTAMP,
+    atualizado_em TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE agendamentos (
+    id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(16)))),
+    tutor_id TEXT NOT NULL REFERENCES usuarios_tutores(id) ON DELETE CASCADE,
+    clinica_id TEXT NOT NULL REFERENCES usuarios_clinicas(id) ON DELETE CASCADE,
+    animal_id TEXT NOT NULL REFERENCES animais(id) ON DELETE CASCADE,
+    data_agendamento TEXT NOT NULL,
+    horario TEXT NOT NULL,
+    tipo_consulta TEXT DEFAULT 'Consulta Geral',
+    observacoes TEXT,
+    status TEXT DEFAULT 'pendente' CHECK (status IN ('pendente', 'aceito', 'recusado', 'concluido', 'cancelado')),
+    motivo_recusa TEXT,
+    valor REAL,
+    criado_em TEXT DEFAULT CURRENT_TIMESTAMP,
+    atualizado_em TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE consultas (
+    id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(16)))),
+    agendamento_id TEXT NOT NULL REFERENCES agendamentos(id) ON DELETE CASCADE,
+    animal_id TEXT NOT NULL REFERENCES animais(id) ON DELETE CASCADE,
+    clinica_id TEXT NOT NULL REFERENCES usuarios_clinicas(id) ON DELETE CASCADE,
+    veterinario TEXT,
+    data_consulta TEXT NOT NULL,
+    diagnostico TEXT,
+    tratamento TEXT,
+    medicamentos TEXT,
+    observacoes TEXT,
+    proxima_consulta TEXT,
+    valor REAL,
+    criado_em TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE vacinas (
+    id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(16)))),
+    animal_id TEXT NOT NULL REFERENCES animais(id) ON DELETE CASCADE,
+    clinica_id TEXT REFERENCES usuarios_clinicas(id) ON DELETE SET NULL,
+    nome_vacina TEXT NOT NULL,
+    data_aplicacao TEXT NOT NULL,
+    data_vencimento TEXT,
+    lote TEXT,
+    veterinario TEXT,
+    observacoes TEXT,
+    criado_em TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE contatos (
+    id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(16)))),
+    nome TEXT NOT NULL,
+    email TEXT NOT NULL,
+    telefone TEXT,
+    assunto TEXT,
+    mensagem TEXT NOT NULL,
+    respondido BOOLEAN DEFAULT 0,
+    criado_em TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+-- atualizado_em em segundos (epoch), para a conta da recarga
+CREATE TABLE limites_requisicao (
+    chave TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    atualizado_em REAL NOT NULL
+);
+
+-- Índices (mesmos do schema.sql)
+CREATE INDEX idx_usuarios_tutores_email ON usuarios_tutores(email);
+CREATE INDEX idx_usuarios_clinicas_email ON usuarios_clinicas(email);
+CREATE INDEX idx_animais_tutor_id ON animais(tutor_id);
+CREATE INDEX idx_animais_clinica_id ON animais(clinica_id);
+CREATE INDEX idx_animais_nome ON animais(nome);
+CREATE INDEX idx_animais_tutor_pagina ON animais(tutor_id, criado_em, id);
+CREATE INDEX idx_animais_clinica_pagina ON animais(clinica_id, criado_em, id);
+CREATE INDEX idx_agendamentos_tutor_id ON agendamentos(tutor_id);
+CREATE INDEX idx_agendamentos_clinica_id ON agendamentos(clinica_id);
+CREATE INDEX idx_agendamentos_animal_id ON agendamentos(animal_id);
+CREATE INDEX idx_agendamentos_data ON agendamentos(data_agendamento);
+CREATE INDEX idx_agendamentos_tutor_pagina ON agendamentos(tutor_id, data_agendamento, horario, id);
+CREATE INDEX idx_agendamentos_clinica_pagina ON agendamentos(clinica_id, data_agendamento, horario, id);
+CREATE UNIQUE INDEX idx_agendamentos_horario_ativo ON agendamentos(clinica_id, data_agendamento, horario)
+    WHERE status IN ('pendente', 'aceito');
+CREATE INDEX idx_consultas_animal_id ON consultas(animal_id);
+CREATE INDEX idx_consultas_clinica_pagina ON consultas(clinica_id, data_consulta, id);
+CREATE INDEX idx_consultas_agendamento_id ON consultas(agendamento_id);
+CREATE INDEX idx_vacinas_animal_id ON vacinas(animal_id);
+CREATE INDEX idx_vacinas_clinica_pagina ON vacinas(clinica_id, data_aplicacao, id);
+CREATE INDEX idx_vacinas_vencimento ON vacinas(data_vencimento, id) WHERE data_vencimento IS NOT NULL;
+CREATE INDEX idx_vacinas_clinica_vencimento ON vacinas(clinica_id, data_vencimento, id) WHERE data_vencimento IS NOT NULL;
+CREATE INDEX idx_vacinas_animal_aplicacao ON vacinas(animal_id, data_aplicacao, nome_vacina);
+CREATE INDEX idx_contatos_pagina ON contatos(criado_em, id);
+
+-- Busca de animais (equivalente aos índices de trigramas do schema.sql): tabelas FTS5 com
+-- tokenizador trigram, sincronizadas por triggers. normalizar_busca() é registrada em cada
+-- conexão pela engine (sqlite_functions.py). As linhas são ligadas pelo rowid, que o VACUUM
+-- pode renumerar: depois de um VACUUM, recrie o conteúdo das tabelas de busca.
+CREATE VIRTUAL TABLE animais_busca USING fts5(nome, tokenize = 'trigram');
+CREATE VIRTUAL TABLE usuarios_tutores_busca USING fts5(nome, tokenize = 'trigram');
+
+CREATE TRIGGER animais_busca_insert AFTER INSERT ON animais BEGIN
+    INSERT INTO animais_busca(rowid, nome) VALUES (new.rowid, normalizar_busca(new.nome));
+END;
+CREATE TRIGGER animais_busca_update AFTER UPDATE OF nome ON animais BEGIN
+    UPDATE animais_busca SET nome = normalizar_busca(new.nome) WHERE rowid = new.rowid;
+END;
+CREATE TRIGGER animais_busca_delete AFTER DELETE ON animais BEGIN
+    DELETE FROM animais_busca WHERE rowid = old.rowid;
+END;
+CREATE TRIGGER usuarios_tutores_busca_insert AFTER INSERT ON usuarios_tutores BEGIN
+    INSERT INTO usuarios_tutores_busca(rowid, nome) VALUES (new.rowid, normalizar_busca(new.nome));
+END;
+CREATE TRIGGER usuarios_tutores_busca_update AFTER UPDATE OF nome ON usuarios_tutores BEGIN
+    UPDATE usuarios_tutores_busca SET nome = normalizar_busca(new.nome) WHERE rowid = new.rowid;
+END;
+CREATE TRIGGER usuarios_tutores_busca_delete AFTER DELETE ON usuarios_tutores BEGIN
+    DELETE FROM usuarios_tutores_busca WHERE rowid = old.rowid;
+END;
+
+-- Views
+CREATE VIEW view_animais_completo AS
+SELECT
+    a.id,
+    a.nome AS nome_animal,
+    a.especie,
+    a.raca,
+    a.idade,
+    a.sexo,
+    a.foto_url,
+    a.qr_code_url,
+    t.nome AS nome_tutor,
+    t.email AS email_tutor,
+    t.telefone AS telefone_tutor,
+    c.nome_clinica,
+    a.criado_em,
+    a.atualizado_em
+FROM animais a
+JOIN usuarios_tutores t ON a.tutor_id = t.id
+LEFT JOIN usuarios_clinicas c ON a.clinica_id = c.id
+WHERE a.ativo = 1;
+
+CREATE VIEW view_agendamentos_completo AS
+SELECT
+    ag.id,
+    ag.data_agendamento,
+    ag.horario,
+    ag.tipo_consulta,
+    ag.status,
+    ag.observacoes,
+    an.nome AS nome_animal,
+    an.especie,
+    t.nome AS nome_tutor,
+    t.email AS email_tutor,
+    t.telefone AS telefone_tutor,
+    c.nome_clinica,
+    c.email AS email_clinica,
+    ag.tutor_id,
+    ag.clinica_id,
+    ag.animal_id,
+    ag.criado_em
+FROM agendamentos ag
+JOIN animais an ON ag.animal_id = an.id
+JOIN usuarios_tutores t ON ag.tutor_id = t.id
+JOIN usuarios_clinicas c ON ag.clinica_id = c.id;
+
+CREATE VIEW view_vacinas_vencimento AS
+SELECT
+    v.id,
+    v.data_vencimento,
+    v.nome_vacina,
+    v.data_aplicacao,
+    v.lote,
+    v.animal_id,
+    an.nome AS nome_animal,
+    an.especie,
+    an.tutor_id,
+    t.nome AS nome_tutor,
+    t.email AS email_tutor,
+    t.telefone AS telefone_tutor,
+    v.clinica_id,
+    c.nome_clinica,
+    c.email AS email_clinica,
+    c.telefone AS telefone_clinica
+FROM vacinas v
+JOIN animais an ON v.animal_id = an.id AND an.ativo = 1
+JOIN usuarios_tutores t ON an.tutor_id = t.id AND t.ativo = 1
+LEFT JOIN usuarios_clinicas c ON v.clinica_id = c.id
+WHERE v.data_vencimento IS NOT NULL
+  AND NOT EXISTS (
+      SELECT 1 FROM vacinas r
+      WHERE r.animal_id = v.animal_id
+        AND lower(r.nome_vacina) = lower(v.nome_vacina)
+        AND r.data_aplicacao > v.data_aplicacao
+  );
+
+CREATE VIEW view_linha_do_tempo_animal AS
+SELECT
+    e.tipo,
+    e.id,
+    e.animal_id,
+    e.data,
+    e.titulo,
+    e.descricao,
+    e.medicamentos,
+    e.veterinario,
+    e.status,
+    e.valor,
+    e.proxima_data,
+    e.clinica_id,
+    c.nome_clinica
+FROM (
+    SELECT 'consulta' AS tipo, co.id, co.animal_id, replace(substr(co.data_consulta, 1, 19), ' ', 'T') AS data,
+           co.diagnostico AS titulo, co.tratamento AS descricao, co.medicamentos, co.veterinario,
+           NULL AS status, co.valor, co.proxima_consulta AS proxima_data, co.clinica_id
+    FROM consultas co
+    UNION ALL
+    SELECT 'vacina', v.id, v.animal_id, v.data_aplicacao || 'T00:00:00',
+           v.nome_vacina, v.observacoes, NULL, v.veterinario,
+           NULL, NULL, v.data_vencimento, v.clinica_id
+    FROM vacinas v
+    UNION ALL
+    SELECT 'agendamento', ag.id, ag.animal_id, ag.data_agendamento || 'T' || substr(ag.horario || ':00', 1, 8),
+           ag.tipo_consulta, ag.observacoes, NULL, NULL,
+           ag.status, ag.valor, NULL, ag.clinica_id
+    FROM agendamentos ag
+) e
+LEFT JOIN usuarios_clinicas c ON e.clinica_id = c.id;
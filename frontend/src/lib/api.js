@@ -40,6 +40,14 @@ const apiRequest = async (endpoint, options = {}) => {
   }
 };
 
+// Parâmetros de paginação das listagens ({ limit, cursor, order }); a resposta traz next_cursor
+const pageQuery = (params = {}) => {
+  const query = new URLSearchParams(
+    Object.entries(params).filter(([, value]) => value !== undefined && value !== null)
+  ).toString();
+  return query ? `?${query}` : '';
+};
+
 // API de Autenticação
 export const authAPI = {
   registerTutor: (userData) =>
@@ -70,7 +78,7 @@ export const authAPI = {
 
 // API de Animais
 export const animalsAPI = {
-  getAnimals: () => apiRequest('/animals/'),
+  getAnimals: (params) => apiRequest(`/animals/${pageQuery(params)}`),
 
   createAnimal: (animalData) =>
     apiRequest('/animals/', {
@@ -86,13 +94,13 @@ export const animalsAPI = {
       body: JSON.stringify(animalData)
     }),
 
-  searchAnimals: (query) =>
-    apiRequest(`/animals/search?q=${encodeURIComponent(query)}`)
+  searchAnimals: (query, params) =>
+    apiRequest(`/animals/search${pageQuery({ q: query, ...params })}`)
 };
 
 // API de Agendamentos
 export const appointmentsAPI = {
-  getAppointments: () => apiRequest('/appointments/'),
+  getAppointments: (params) => apiRequest(`/appointments/${pageQuery(params)}`),
 
   createAppointment: (appointmentData) =>
     apiRequest('/appointments/', {
@@ -119,6 +127,12 @@ export const appointmentsAPI = {
     )
 };
 
+// API de Clínicas
+export const clinicsAPI = {
+  // Painel agregado no servidor (params: inicio, fim em YYYY-MM-DD; padrão: mês atual)
+  getStats: (params) => apiRequest(`/clinics/me/stats${pageQuery(params)}`)
+};
+
 // API de Contato
 export const contactAPI = {
   sendMessage: (contactData) =>
@@ -127,7 +141,7 @@ export const contactAPI = {
       body: JSON.stringify(contactData)
     }),
 
-  getMessages: () => apiRequest('/contact/'),
+  getMessages: (params) => apiRequest(`/contact/${pageQuery(params)}`),
 
   markAsResponded: (id) =>
     apiRequest(`/contact/${id}/respond`, {
@@ -35,7 +35,7 @@ const AnimalProfile = () => {
   const handleDownloadQR = () => {
     if (animal?.qr_code_url) {
       const link = document.createElement('a');
-      link.href = animal.qr_code_url;
+      link.href = `${animal.qr_code_url}?download=1`;
       link.download = `qr-code-${animal.nome}.png`;
       link.click();
     }
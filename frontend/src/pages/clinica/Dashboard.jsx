@@ -3,11 +3,13 @@ import { Calendar, Users, CheckCircle, Clock, AlertCircle, TrendingUp } from 'lu
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '../../components/ui/card';
 import { Button } from '../../components/ui/button';
 import { useAuth } from '../../hooks/useAuth';
-import { appointmentsAPI, utils } from '../../lib/api';
+import { appointmentsAPI, clinicsAPI, utils } from '../../lib/api';
 
 const ClinicaDashboard = () => {
   const { user } = useAuth();
-  const [appointments, setAppointments] = useState([]);
+  const [pendingAppointments, setPendingAppointments] = useState([]);
+  const [todayAppointments, setTodayAppointments] = useState([]);
+  const [recentAppointments, setRecentAppointments] = useState([]);
   const [loading, setLoading] = useState(true);
   const [stats, setStats] = useState({
     totalPatients: 0,
@@ -19,31 +21,27 @@ const ClinicaDashboard = () => {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const appointmentsResponse = await appointmentsAPI.getClinicaAppointments();
-        setAppointments(appointmentsResponse.appointments || []);
-
-        // Calcular estatísticas
+        // Contagens e receita vêm agregadas do servidor; as listas são filtradas no servidor
+        // (pendentes a partir de hoje e aceitos de hoje, os mais próximos primeiro; atividade
+        // recente até hoje, a mais nova primeiro)
         const today = new Date().toISOString().split('T')[0];
-        const thisMonth = new Date().getMonth();
-        const thisYear = new Date().getFullYear();
+        const [statsResponse, pendingResponse, todayResponse, recentResponse] = await Promise.all([
+          clinicsAPI.getStats(),
+          appointmentsAPI.getAppointments({ status: 'pendente', inicio: today, order: 'asc', limit: 3 }),
+          appointmentsAPI.getAppointments({ status: 'aceito', data: today, order: 'asc', limit: 3 }),
+          appointmentsAPI.getAppointments({ fim: today, limit: 5 })
+        ]);
+        setPendingAppointments(pendingResponse.appointments || []);
+        setTodayAppointments(todayResponse.appointments || []);
+        setRecentAppointments(recentResponse.appointments || []);
 
-        const pending = appointmentsResponse.appointments?.filter(apt => apt.status === 'pendente').length || 0;
-        const todayApts = appointmentsResponse.appointments?.filter(apt => 
-          apt.data_agendamento === today
-        ).length || 0;
-        
-        // Simular dados de pacientes únicos e receita
-        const uniquePatients = new Set(appointmentsResponse.appointments?.map(apt => apt.animal_id)).size || 0;
-        const monthlyRevenue = appointmentsResponse.appointments?.filter(apt => {
-          const aptDate = new Date(apt.data_agendamento);
-          return aptDate.getMonth() === thisMonth && aptDate.getFullYear() === thisYear && apt.status === 'concluido';
-        }).length * 150 || 0; // Simulando R$ 150 por consulta
+        const todayStats = statsResponse.por_dia?.find(day => day.data === today);
 
         setStats({
-          totalPatients: uniquePatients,
-          pendingAppointments: pending,
-          todayAppointments: todayApts,
-          monthlyRevenue: monthlyRevenue
+          totalPatients: statsResponse.pacientes || 0,
+          pendingAppointments: statsResponse.pendentes || 0,
+          todayAppointments: todayStats ? todayStats.total - todayStats.cancelado - todayStats.recusado : 0,
+          monthlyRevenue: statsResponse.receita?.total || 0
         });
       } catch (error) {
         console.error('Erro ao carregar dados:', error);
@@ -106,7 +104,7 @@ const ClinicaDashboard = () => {
             <CardContent>
               <div className="text-2xl font-bold">{stats.totalPatients}</div>
               <p className="text-xs text-muted-foreground">
-                Total de animais atendidos
+                Animais atendidos no mês
               </p>
             </CardContent>
           </Card>
@@ -168,7 +166,7 @@ const ClinicaDashboard = () => {
               </div>
             </CardHeader>
             <CardContent>
-              {appointments.filter(apt => apt.status === 'pendente').length === 0 ? (
+              {pendingAppointments.length === 0 ? (
                 <div className="text-center py-8">
                   <Clock className="w-12 h-12 text-gray-400 mx-auto mb-4" />
                   <p className="text-gray-600">
@@ -177,10 +175,7 @@ const ClinicaDashboard = () => {
                 </div>
               ) : (
                 <div className="space-y-4">
-                  {appointments
-                    .filter(apt => apt.status === 'pendente')
-                    .slice(0, 3)
-                    .map((appointment) => (
+                  {pendingAppointments.map((appointment) => (
                     <div key={appointment.id} className="p-3 bg-gray-50 rounded-lg">
                       <div className="flex items-center justify-between mb-2">
                         <h4 className="font-medium text-gray-900">
@@ -226,10 +221,7 @@ const ClinicaDashboard = () => {
               </div>
             </CardHeader>
             <CardContent>
-              {appointments.filter(apt => 
-                apt.data_agendamento === new Date().toISOString().split('T')[0] && 
-                apt.status === 'aceito'
-              ).length === 0 ? (
+              {todayAppointments.length === 0 ? (
                 <div className="text-center py-8">
                   <Calendar className="w-12 h-12 text-gray-400 mx-auto mb-4" />
                   <p className="text-gray-600">
@@ -238,13 +230,7 @@ const ClinicaDashboard = () => {
                 </div>
               ) : (
                 <div className="space-y-4">
-                  {appointments
-                    .filter(apt => 
-                      apt.data_agendamento === new Date().toISOString().split('T')[0] && 
-                      apt.status === 'aceito'
-                    )
-                    .slice(0, 3)
-                    .map((appointment) => (
+                  {todayAppointments.map((appointment) => (
                     <div key={appointment.id} className="p-3 bg-green-50 rounded-lg">
                       <div className="flex items-center justify-between mb-2">
                         <h4 className="font-medium text-gray-900">
@@ -326,7 +312,7 @@ const ClinicaDashboard = () => {
             </CardHeader>
             <CardContent>
               <div className="space-y-4">
-                {appointments.slice(0, 5).map((appointment, index) => (
+                {recentAppointments.map((appointment) => (
                   <div key={appointment.id} className="flex items-center space-x-4">
                     <div className="w-2 h-2 bg-primary rounded-full"></div>
                     <div className="flex-1">
@@ -340,7 +326,7 @@ const ClinicaDashboard = () => {
                     </div>
                   </div>
                 ))}
-                {appointments.length === 0 && (
+                {recentAppointments.length === 0 && (
                   <p className="text-gray-600 text-center py-4">
                     Nenhuma atividade recente
                   </p>
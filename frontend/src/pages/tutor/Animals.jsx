@@ -36,7 +36,8 @@ const TutorAnimals = () => {
 
   const fetchAnimals = async () => {
     try {
-      const response = await animalsAPI.getAnimals();
+      // O formulário de edição usa o histórico e as observações, fora da projeção padrão
+      const response = await animalsAPI.getAnimals({ fields: '*' });
       setAnimals(response.animals || []);
     } catch (error) {
       console.error('Erro ao carregar animais:', error);
@@ -119,7 +120,7 @@ const TutorAnimals = () => {
   const handleDownloadQR = (animal) => {
     if (animal.qr_code_url) {
       const link = document.createElement('a');
-      link.href = animal.qr_code_url;
+      link.href = `${animal.qr_code_url}?download=1`;
       link.download = `qr-code-${animal.nome}.png`;
       link.click();
     }